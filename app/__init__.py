@@ -3,7 +3,6 @@ from flask_login import LoginManager
 from config import Config
 from app.models import db
 from app.models.usuario import Usuario
-from app.utils.email_service import mail
 import os
 import logging
 from dotenv import load_dotenv
@@ -11,23 +10,50 @@ from dotenv import load_dotenv
 logger = logging.getLogger(__name__)
 login_manager = LoginManager()
 
+# Revisiones de Alembic (flask db upgrade / flask db migrate)
+DIRECTORIO_MIGRACIONES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
 
-def create_app():
+
+def create_app(configuracion=None):
+    """
+    Crea la aplicación.
+
+    Args:
+        configuracion: dict que sobrescribe Config antes de inicializar las
+                       extensiones (ej. {'SQLALCHEMY_DATABASE_URI': ...} en tests)
+    """
     # Cargar variables de entorno desde .env
     load_dotenv()
 
     app = Flask(__name__)
     app.config.from_object(Config)
+    if configuracion:
+        app.config.update(configuracion)
+
+    # Logging JSON escrito desde un hilo aparte y niveles por módulo (LOG_LEVEL)
+    from app.utils.registro_logs import configurar_logs
+    configurar_logs(app)
 
     # Crear carpeta de uploads si no existe
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
-    # Inicializar extensiones
+    # Inicializar extensiones (pool de conexiones según el motor de la URL)
+    from app.utils.base_datos import configurar_base_datos, configurar_conexiones
+    configurar_base_datos(app)
     db.init_app(app)
+    configurar_conexiones(app)  # PRAGMA de SQLite (WAL, busy_timeout...)
+    # Consultas SQL, render y latencia por endpoint (/metrics)
+    from app.utils.instrumentacion import configurar_instrumentacion
+    configurar_instrumentacion(app)
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
+    from app.utils.email_service import mail
     mail.init_app(app)  # Inicializar Flask-Mail
 
+    # Plantillas de email precompiladas (caché de bytecode de Jinja)
+    from app.utils.plantillas import configurar_plantillas
+    configurar_plantillas(app)
+
     @login_manager.user_loader
     def load_user(user_id):
         return Usuario.query.get(int(user_id))
@@ -37,16 +63,22 @@ def create_app():
     from app.routes.incapacidades import incapacidades_bp
     from app.routes.documentos import documentos_bp
     from app.routes.notificaciones import notificaciones_bp
+    from app.routes.cargas import cargas_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(incapacidades_bp)
     app.register_blueprint(documentos_bp)
     app.register_blueprint(notificaciones_bp)
+    app.register_blueprint(cargas_bp)
 
-    # Crear tablas (sin usuarios automáticos)
-    with app.app_context():
-        db.create_all()
-        # crear_usuarios_prueba()  # Desactivado - usar crear_usuarios.py
+    avisar_dependencias_opcionales(app)
+
+    # Registrar comandos CLI (flask <comando>)
+    from app.cli import registrar_comandos
+    registrar_comandos(app)
+
+    # El esquema se crea y actualiza con las migraciones (flask db upgrade), no al iniciar
+    # crear_usuarios_prueba()  # Desactivado - usar crear_usuarios.py
 
     # Inicializar scheduler de tareas periódicas (UC6)
     # Solo iniciar en producción o si está explícitamente habilitado
@@ -56,11 +88,52 @@ def create_app():
             iniciar_scheduler(app)
             logger.info("✅ Scheduler de tareas periódicas iniciado")
         except Exception as e:
-            logger.error(f"❌ Error al iniciar scheduler: {str(e)}", exc_info=True)
+            logger.error('❌ Error al iniciar scheduler: %s', e, exc_info=True)
 
     return app
 
 
+def avisar_dependencias_opcionales(app):
+    """
+    Advierte al iniciar si una función habilitada no tiene su dependencia.
+
+    Pillow y PyMuPDF están en requirements.txt, pero los módulos que las usan
+    siguen funcionando sin ellas (la etapa simplemente no se ejecuta). Solo
+    se busca el módulo, sin importarlo, para no alargar el arranque.
+    """
+    from importlib.util import find_spec
+
+    pillow = find_spec('PIL') is not None
+    pymupdf = find_spec('pymupdf') is not None or find_spec('fitz') is not None
+    faltantes = []
+    if app.config.get('PREVIEWS_ENABLED') and not pillow:
+        faltantes.append(('Pillow', 'miniaturas de previsualización'))
+    if app.config.get('PREVIEWS_ENABLED') and not pymupdf:
+        faltantes.append(('PyMuPDF', 'miniaturas de documentos PDF'))
+    if app.config.get('IMAGENES_OPTIMIZAR') and not pillow:
+        faltantes.append(('Pillow', 'optimización de imágenes cargadas'))
+    if app.config.get('INSPECCION_ENABLED') and not pymupdf:
+        faltantes.append(('PyMuPDF', 'inspección de la estructura de PDFs'))
+    for paquete, funcion in faltantes:
+        logger.warning('⚠️ %s no está instalado: sin %s (pip install -r requirements.txt)', paquete, funcion)
+
+
+def iniciar_migraciones(app):
+    """
+    Registra Flask-Migrate en la app.
+
+    Importa Alembic (~0.3 s), por eso create_app no lo hace: ``flask db`` lo
+    llama al usarse (ver app/cli.py) y los scripts que migran desde Python
+    antes de ``flask_migrate.upgrade()``.
+    """
+    if 'migrate' in app.extensions:
+        return
+    from flask_migrate import Migrate
+
+    # render_as_batch: ALTER en SQLite mediante copia de tabla cuando no hay ALTER nativo
+    Migrate(app, db, directory=DIRECTORIO_MIGRACIONES, render_as_batch=True, compare_type=True)
+
+
 def crear_usuarios_prueba():
     """Crea usuarios de prueba si no existen"""
     from app.models.usuario import Usuario
@@ -85,4 +158,4 @@ def crear_usuarios_prueba():
         db.session.add(colaborador)
         db.session.add(auxiliar)
         db.session.commit()
-        print('Usuarios de prueba creados')
+        logger.info('Usuarios de prueba creados')
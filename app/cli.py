@@ -0,0 +1,191 @@
+"""
+Comandos de línea de comandos (``flask <comando>``) para tareas operativas.
+
+Uso:
+    flask importar-incapacidades archivo.csv
+    flask exportar-incapacidades auditoria.csv.gz --formato csv
+    flask archivar-documentos --dias 90
+    flask escanear-integridad --max 50000
+    flask db upgrade
+"""
+
+import click
+from flask.cli import ScriptInfo, with_appcontext
+
+
+class ComandosMigracion(click.Group):
+    """
+    ``flask db`` de Flask-Migrate, cargado al invocarlo.
+
+    Así los workers y los demás comandos no importan Alembic al arrancar.
+    """
+
+    def _grupo_db(self, ctx):
+        from app import iniciar_migraciones
+        from flask_migrate.cli import db as grupo_db
+
+        iniciar_migraciones(ctx.ensure_object(ScriptInfo).load_app())
+        return grupo_db
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        # El contexto (opciones --directory/--x-arg incluidas) lo arma el grupo real
+        return self._grupo_db(parent).make_context(info_name, args, parent=parent, **extra)
+
+    def invoke(self, ctx):
+        return ctx.command.invoke(ctx)
+
+
+comandos_migracion = ComandosMigracion('db', help='Migraciones de la base de datos (Alembic).')
+
+
+@click.command('importar-incapacidades')
+@click.argument('archivo', type=click.Path(exists=True, dir_okay=False))
+@click.option('--lote', default=500, show_default=True, help='Filas por inserción (executemany), máximo 5000')
+@click.option('--sin-notificar', is_flag=True, help='No enviar el resumen a Gestión Humana')
+@with_appcontext
+def importar_incapacidades(archivo, lote, sin_notificar):
+    """Importa incapacidades desde un CSV o Excel (.xlsx)."""
+    from app.services.importacion_service import (
+        ImportacionIncapacidadesService,
+        ArchivoImportacionInvalido,
+        leer_filas_archivo,
+        TAMAÑO_LOTE_MAX,
+    )
+
+    try:
+        with open(archivo, 'rb') as f:
+            resumen = ImportacionIncapacidadesService.importar(
+                leer_filas_archivo(f, archivo),
+                tamaño_lote=min(max(1, lote), TAMAÑO_LOTE_MAX),
+                notificar=not sin_notificar,
+            )
+    except ArchivoImportacionInvalido as e:
+        raise click.ClickException(str(e))
+
+    click.echo(
+        f"✅ {resumen['importadas']} importadas, {resumen['rechazadas']} rechazadas "
+        f"de {resumen['total']} filas"
+    )
+    for error in resumen['errores']:
+        click.echo(f"  Línea {error['linea']}: {error['error']}")
+
+
+@click.command('exportar-incapacidades')
+@click.argument('salida', type=click.Path(dir_okay=False, writable=True))
+@click.option('--formato', type=click.Choice(['csv', 'ndjson']), default='csv', show_default=True)
+@click.option('--estado', default=None, help='Exportar solo incapacidades en este estado')
+@click.option('--desde', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='Fecha de inicio mínima')
+@click.option('--hasta', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='Fecha de inicio máxima')
+@click.option('--bloque', default=1000, show_default=True, help='Filas por bloque de lectura')
+@with_appcontext
+def exportar_incapacidades(salida, formato, estado, desde, hasta, bloque):
+    """Exporta incapacidades con historial y documentos (gzip si SALIDA termina en .gz)."""
+    from app.services.exportacion_service import ExportacionIncapacidadesService
+
+    comprimir = salida.endswith('.gz')
+    contenido = ExportacionIncapacidadesService.exportar(
+        formato=formato,
+        comprimir=comprimir,
+        estado=estado,
+        desde=desde.date() if desde else None,
+        hasta=hasta.date() if hasta else None,
+        tamaño_bloque=max(1, bloque),
+    )
+
+    modo = 'wb' if comprimir else 'w'
+    with open(salida, modo, **({} if comprimir else {'encoding': 'utf-8', 'newline': ''})) as f:
+        for trozo in contenido:
+            f.write(trozo)
+
+    click.echo(f"✅ Exportación escrita en {salida}")
+
+
+@click.command('archivar-documentos')
+@click.option('--dias', type=int, default=None, help='Antigüedad mínima (default: ALMACENAMIENTO_FRIO_DIAS)')
+@click.option('--limite', type=int, default=None, help='Máximo de documentos a mover en esta ejecución')
+@with_appcontext
+def archivar_documentos(dias, limite):
+    """Mueve documentos de incapacidades PAGADA/RECHAZADA al almacenamiento frío."""
+    from app.services.almacenamiento_service import AlmacenamientoService
+    from app.utils.almacenamiento import NIVEL_FRIO, obtener_almacenamiento
+
+    if obtener_almacenamiento(NIVEL_FRIO) is None:
+        raise click.ClickException('Configure ALMACENAMIENTO_FRIO (local o s3) para archivar documentos')
+
+    resultado = AlmacenamientoService.archivar_documentos_antiguos(dias=dias, limite=limite)
+    click.echo(
+        f"✅ {resultado['movidos']} documentos movidos, {resultado['errores']} errores, "
+        f"{resultado['bytes_liberados'] / (1024 * 1024):.1f} MB liberados"
+    )
+
+
+@click.command('escanear-integridad')
+@click.option('--max', 'max_documentos', type=int, default=None,
+              help='Documentos a revisar en esta ejecución (el escaneo se reanuda en la siguiente)')
+@click.option('--nuevo', is_flag=True, help='Descartar el escaneo en curso y empezar desde el inicio')
+@click.option('--sin-checksum', is_flag=True, help='Verificar solo existencia y tamaño (no calcular MD5)')
+@click.option('--workers', type=int, default=None, help='Hilos de verificación (default: INTEGRIDAD_WORKERS)')
+@click.option('--mb-por-segundo', type=float, default=None, help='Límite de lectura para MD5 (0 = sin límite)')
+@with_appcontext
+def escanear_integridad(max_documentos, nuevo, sin_checksum, workers, mb_por_segundo):
+    """Verifica existencia, tamaño y MD5 de los documentos y busca archivos huérfanos."""
+    from app.services.integridad_service import IntegridadService
+
+    escaneo = IntegridadService.escanear(
+        max_documentos=max_documentos,
+        verificar_checksum=False if sin_checksum else None,
+        nuevo=nuevo,
+        workers=workers,
+        mb_por_segundo=mb_por_segundo,
+    )
+    click.echo(
+        f"{'✅' if escaneo.estado == 'COMPLETADO' else '⏸️'} Escaneo #{escaneo.id} {escaneo.estado}: "
+        f"{escaneo.documentos_revisados} documentos revisados (cursor #{escaneo.ultimo_documento_id})"
+    )
+    click.echo(
+        f"  Faltantes: {escaneo.faltantes} | Tamaño distinto: {escaneo.tamaño_incorrecto} | "
+        f"Checksum distinto: {escaneo.checksum_incorrecto} | Errores: {escaneo.errores} | "
+        f"Huérfanos: {'-' if escaneo.huerfanos is None else escaneo.huerfanos}"
+    )
+    if escaneo.incapacidades_sin_documentos:
+        click.echo(f"  Incapacidades sin documentos: {escaneo.incapacidades_sin_documentos}")
+
+
+@click.command('inspeccionar-documentos')
+@click.option('--todos', is_flag=True, help='Revisar también los ya inspeccionados (p. ej. con firmas nuevas)')
+@click.option('--limite', type=int, default=None, help='Máximo de documentos a revisar en esta ejecución')
+@with_appcontext
+def inspeccionar_documentos(todos, limite):
+    """Revisa tipo real, estructura PDF y antivirus de los documentos pendientes."""
+    from app.utils.inspeccion_documentos import inspeccionar_pendientes
+
+    conteo = inspeccionar_pendientes(todos=todos, limite=limite)
+    click.echo(f"✅ {sum(conteo.values())} documentos inspeccionados")
+    click.echo(
+        f"  Limpios: {conteo['LIMPIO']} | Sospechosos: {conteo['SOSPECHOSO']} | "
+        f"Infectados: {conteo['INFECTADO']} | Con error: {conteo['ERROR']}"
+    )
+
+
+@click.command('enviar-resumenes')
+@click.option('--frecuencia', 'frecuencias', multiple=True, default=['HORARIA', 'DIARIA'], show_default=True,
+              type=click.Choice(['INMEDIATA', 'HORARIA', 'DIARIA']),
+              help='Frecuencias de usuario a procesar (repetible)')
+@with_appcontext
+def enviar_resumenes(frecuencias):
+    """Envía ya los resúmenes de notificaciones pendientes."""
+    from app.utils.email_service import enviar_resumenes_notificaciones
+
+    conteo = enviar_resumenes_notificaciones(frecuencias)
+    click.echo(f"✅ {conteo['resumenes']} resúmenes enviados ({conteo['notificaciones']} notificaciones)")
+
+
+def registrar_comandos(app):
+    """Registra los comandos CLI en la aplicación."""
+    app.cli.add_command(importar_incapacidades)
+    app.cli.add_command(exportar_incapacidades)
+    app.cli.add_command(archivar_documentos)
+    app.cli.add_command(escanear_integridad)
+    app.cli.add_command(inspeccionar_documentos)
+    app.cli.add_command(enviar_resumenes)
+    app.cli.add_command(comandos_migracion)
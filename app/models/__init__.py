@@ -8,4 +8,6 @@ from app.models.incapacidad import Incapacidad  # noqa: E402,F401
 from app.models.documento import Documento  # noqa: E402,F401
 from app.models.solicitud_documento import SolicitudDocumento  # noqa: E402,F401
 from app.models.historial_estado import HistorialEstado  # noqa: E402,F401
-from app.models.notificacion import Notificacion  # noqa: E402,F401
\ No newline at end of file
+from app.models.notificacion import Notificacion  # noqa: E402,F401
+from app.models.consecutivo_radicacion import ConsecutivoRadicacion  # noqa: E402,F401
+from app.models.escaneo_integridad import EscaneoIntegridad, HallazgoIntegridad  # noqa: E402,F401
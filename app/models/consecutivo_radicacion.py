@@ -0,0 +1,13 @@
+from app.models import db
+
+
+class ConsecutivoRadicacion(db.Model):
+    """Contador diario usado para asignar códigos de radicación sin colisiones."""
+
+    __tablename__ = "consecutivos_radicacion"
+
+    fecha = db.Column(db.String(8), primary_key=True)  # YYYYMMDD
+    ultimo = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<ConsecutivoRadicacion {self.fecha}={self.ultimo}>"
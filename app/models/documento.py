@@ -8,13 +8,22 @@ class Documento(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     incapacidad_id = db.Column(db.Integer, db.ForeignKey('incapacidades.id'), nullable=False)
     nombre_archivo = db.Column(db.String(255), nullable=False)  # Nombre original del archivo
-    nombre_unico = db.Column(db.String(255), nullable=False)  # Nombre único generado (UUID + timestamp)
+    nombre_unico = db.Column(db.String(255), nullable=False, index=True)  # Nombre único generado (UUID + timestamp)
     ruta = db.Column(db.String(500), nullable=False)  # Ruta completa en servidor
     tipo_documento = db.Column(db.String(50), nullable=False)  # certificado, epicrisis, furips, etc.
     tamaño_bytes = db.Column(db.Integer, nullable=True)  # Tamaño del archivo en bytes
     checksum_md5 = db.Column(db.String(32), nullable=True)  # Hash MD5 del archivo (opcional)
     mime_type = db.Column(db.String(100), nullable=True)  # Tipo MIME del archivo
     fecha_carga = db.Column(db.DateTime, default=datetime.utcnow)
+    # Nivel de almacenamiento: 'caliente' (UPLOAD_FOLDER) o 'frio' (archivo económico, ver app/utils/almacenamiento.py)
+    nivel_almacenamiento = db.Column(db.String(20), nullable=False, default='caliente', server_default='caliente', index=True)
+    clave_almacenamiento = db.Column(db.String(500), nullable=True, index=True)  # Clave en el almacenamiento frío
+    fecha_archivado = db.Column(db.DateTime, nullable=True)
+    # Inspección posterior a la carga (ver app/utils/inspeccion_documentos.py)
+    mime_detectado = db.Column(db.String(100), nullable=True)  # Tipo real según los bytes del archivo
+    estado_inspeccion = db.Column(db.String(20), nullable=False, default='PENDIENTE', server_default='PENDIENTE', index=True)
+    detalle_inspeccion = db.Column(db.String(500), nullable=True)
+    fecha_inspeccion = db.Column(db.DateTime, nullable=True)
 
     def __repr__(self):
         return f'<Documento {self.nombre_archivo}>'
@@ -32,3 +41,8 @@ class Documento(db.Model):
         if self.nombre_archivo and '.' in self.nombre_archivo:
             return self.nombre_archivo.rsplit('.', 1)[1].lower()
         return None
+    
+    @property
+    def bloqueado(self):
+        """True si la inspección encontró malware: el archivo no se entrega"""
+        return self.estado_inspeccion == 'INFECTADO'
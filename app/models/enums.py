@@ -47,6 +47,7 @@ class TipoNotificacionEnum(StrEnum):
     APROBACION = "APROBACION"
     RECHAZO = "RECHAZO"
     CAMBIO_ESTADO = "CAMBIO_ESTADO"
+    IMPORTACION_MASIVA = "IMPORTACION_MASIVA"
 
 
 class EstadoNotificacionEnum(StrEnum):
@@ -57,9 +58,25 @@ class EstadoNotificacionEnum(StrEnum):
     ERROR = "ERROR"
 
 
+class FrecuenciaNotificacionEnum(StrEnum):
+    INMEDIATA = "INMEDIATA"
+    HORARIA = "HORARIA"
+    DIARIA = "DIARIA"
+
+
+class EstadoInspeccionEnum(StrEnum):
+    PENDIENTE = "PENDIENTE"
+    LIMPIO = "LIMPIO"
+    SOSPECHOSO = "SOSPECHOSO"
+    INFECTADO = "INFECTADO"
+    ERROR = "ERROR"
+
+
 # Alias para retrocompatibilidad y conveniencia
 TipoDocumento = TipoDocumentoEnum
 EstadoSolicitudDocumento = EstadoSolicitudDocumentoEnum
 EstadoIncapacidad = EstadoIncapacidadEnum
 TipoNotificacion = TipoNotificacionEnum
 EstadoNotificacion = EstadoNotificacionEnum
+EstadoInspeccion = EstadoInspeccionEnum
+FrecuenciaNotificacion = FrecuenciaNotificacionEnum
@@ -0,0 +1,86 @@
+from datetime import datetime
+
+from app.models import db
+
+
+class EscaneoIntegridad(db.Model):
+    """
+    Reporte de un escaneo de integridad del almacenamiento de documentos.
+
+    El escaneo recorre ``documentos`` por id; ``ultimo_documento_id`` es el
+    cursor persistido que permite reanudarlo en la siguiente ejecución.
+    """
+
+    __tablename__ = "escaneos_integridad"
+
+    id = db.Column(db.Integer, primary_key=True)
+    estado = db.Column(db.String(20), nullable=False, default="EN_CURSO", index=True)  # EN_CURSO, COMPLETADO
+    verificar_checksum = db.Column(db.Boolean, nullable=False, default=True)
+    ultimo_documento_id = db.Column(db.Integer, nullable=False, default=0)
+    fecha_inicio = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    fecha_actualizacion = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    fecha_fin = db.Column(db.DateTime, nullable=True)
+
+    documentos_revisados = db.Column(db.Integer, nullable=False, default=0)
+    bytes_verificados = db.Column(db.BigInteger, nullable=False, default=0)
+    faltantes = db.Column(db.Integer, nullable=False, default=0)
+    tamaño_incorrecto = db.Column(db.Integer, nullable=False, default=0)
+    checksum_incorrecto = db.Column(db.Integer, nullable=False, default=0)
+    checksums_registrados = db.Column(db.Integer, nullable=False, default=0)  # Documentos sin MD5 previo
+    errores = db.Column(db.Integer, nullable=False, default=0)
+    huerfanos = db.Column(db.Integer, nullable=True)  # None hasta terminar el recorrido de documentos
+    incapacidades_sin_documentos = db.Column(db.Integer, nullable=True)
+
+    hallazgos = db.relationship(
+        "HallazgoIntegridad",
+        backref="escaneo",
+        lazy="dynamic",
+        cascade="all, delete-orphan",
+    )
+
+    @property
+    def problemas(self) -> int:
+        return (
+            self.faltantes + self.tamaño_incorrecto + self.checksum_incorrecto
+            + self.errores + (self.huerfanos or 0)
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "estado": self.estado,
+            "verificar_checksum": self.verificar_checksum,
+            "ultimo_documento_id": self.ultimo_documento_id,
+            "fecha_inicio": self.fecha_inicio.isoformat() if self.fecha_inicio else None,
+            "fecha_fin": self.fecha_fin.isoformat() if self.fecha_fin else None,
+            "documentos_revisados": self.documentos_revisados,
+            "bytes_verificados": self.bytes_verificados,
+            "faltantes": self.faltantes,
+            "tamaño_incorrecto": self.tamaño_incorrecto,
+            "checksum_incorrecto": self.checksum_incorrecto,
+            "checksums_registrados": self.checksums_registrados,
+            "errores": self.errores,
+            "huerfanos": self.huerfanos,
+            "incapacidades_sin_documentos": self.incapacidades_sin_documentos,
+        }
+
+    def __repr__(self) -> str:
+        return f"<EscaneoIntegridad {self.id} {self.estado} cursor={self.ultimo_documento_id}>"
+
+
+class HallazgoIntegridad(db.Model):
+    """Problema detectado por un escaneo (archivo faltante, checksum distinto, huérfano...)."""
+
+    __tablename__ = "hallazgos_integridad"
+
+    id = db.Column(db.Integer, primary_key=True)
+    escaneo_id = db.Column(db.Integer, db.ForeignKey("escaneos_integridad.id"), nullable=False, index=True)
+    tipo = db.Column(db.String(30), nullable=False)  # FALTANTE, TAMAÑO, CHECKSUM, ERROR, HUERFANO
+    documento_id = db.Column(db.Integer, nullable=True)  # Sin FK: el documento pudo eliminarse después
+    nivel_almacenamiento = db.Column(db.String(20), nullable=True)
+    clave = db.Column(db.String(500), nullable=True)
+    detalle = db.Column(db.String(500), nullable=True)
+    fecha = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<HallazgoIntegridad {self.tipo} doc={self.documento_id} {self.clave}>"
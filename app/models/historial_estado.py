@@ -1,14 +1,14 @@
-import uuid
 from datetime import datetime
 from typing import Optional
 
 from app.models import db
+from app.models.tipos import UUIDBinario, nuevo_id
 
 
 class HistorialEstado(db.Model):
     __tablename__ = "historial_estados"
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(UUIDBinario, primary_key=True, default=nuevo_id)
     incapacidad_id = db.Column(
         db.Integer,
         db.ForeignKey("incapacidades.id"),
@@ -26,8 +26,9 @@ class HistorialEstado(db.Model):
         nullable=True,
     )
 
-    usuario = db.relationship("Usuario", lazy="joined")
-    documento_soporte = db.relationship("Documento", lazy="joined")
+    # Perezosas: cada consulta precarga lo que necesita (app/models/perfiles_carga.py)
+    usuario = db.relationship("Usuario")
+    documento_soporte = db.relationship("Documento")
 
     def __repr__(self) -> str:
         return (
@@ -1,5 +1,6 @@
 from datetime import datetime
 import uuid
+import warnings
 from typing import List, TYPE_CHECKING
 
 from app.models import db
@@ -26,7 +27,11 @@ TIPOS_VALIDOS = list(TIPOS_INCAPACIDAD.values())
 
 def generar_codigo_radicacion():
     """
-    Generar código único de radicación para incapacidad.
+    Legacy: código aleatorio de radicación (formato anterior al consecutivo).
+
+    No usar para registrar: puede repetir un código del consecutivo diario.
+    El registro usa ``generar_codigo_radicacion_unico``; se conserva solo
+    para código externo que aún lo importe y emite DeprecationWarning.
     
     Formato: INC-YYYYMMDD-XXXX
     - INC: Prefijo fijo
@@ -38,8 +43,12 @@ def generar_codigo_radicacion():
         INC-20251014-B7C1
     
     Returns:
-        str: Código de radicación único
+        str: Código de radicación aleatorio
     """
+    warnings.warn(
+        'generar_codigo_radicacion es legacy; use generar_codigo_radicacion_unico',
+        DeprecationWarning, stacklevel=2,
+    )
     # Fecha actual en formato YYYYMMDD
     fecha = datetime.now().strftime('%Y%m%d')
     
@@ -67,26 +76,109 @@ def verificar_codigo_unico(codigo):
     return existe is None
 
 
+def _incrementar_consecutivo(conexion, fecha, cantidad):
+    """
+    Incrementa el consecutivo del día en una sola sentencia atómica.
+
+    En SQLite y PostgreSQL se usa ``INSERT ... ON CONFLICT DO UPDATE ... RETURNING``,
+    de modo que no hay consulta previa ni ventana de carrera entre workers.
+    En otros motores se recurre a ``UPDATE`` + ``INSERT`` dentro de un savepoint.
+
+    Returns:
+        int: Último consecutivo reservado (el rango es ``ultimo - cantidad + 1 .. ultimo``)
+    """
+    from sqlalchemy import select, update
+    from sqlalchemy.exc import IntegrityError
+    from app.models.consecutivo_radicacion import ConsecutivoRadicacion
+
+    tabla = ConsecutivoRadicacion.__table__
+    dialecto = conexion.dialect.name
+
+    if dialecto in ('sqlite', 'postgresql'):
+        if dialecto == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+
+        sentencia = (
+            insert(tabla)
+            .values(fecha=fecha, ultimo=cantidad)
+            .on_conflict_do_update(
+                index_elements=[tabla.c.fecha],
+                set_={'ultimo': tabla.c.ultimo + cantidad},
+            )
+            .returning(tabla.c.ultimo)
+        )
+        return conexion.execute(sentencia).scalar_one()
+
+    # Fallback genérico (MySQL, etc.)
+    actualizadas = conexion.execute(
+        update(tabla).where(tabla.c.fecha == fecha).values(ultimo=tabla.c.ultimo + cantidad)
+    ).rowcount
+    if not actualizadas:
+        try:
+            with conexion.begin_nested():
+                conexion.execute(tabla.insert().values(fecha=fecha, ultimo=cantidad))
+            return cantidad
+        except IntegrityError:
+            # Otro worker creó la fila del día entre el UPDATE y el INSERT
+            conexion.execute(
+                update(tabla).where(tabla.c.fecha == fecha).values(ultimo=tabla.c.ultimo + cantidad)
+            )
+    return conexion.execute(select(tabla.c.ultimo).where(tabla.c.fecha == fecha)).scalar_one()
+
+
+def generar_codigos_radicacion(cantidad=1, fecha=None):
+    """
+    Reservar en bloque códigos de radicación únicos para un día.
+
+    El sufijo es un consecutivo diario en hexadecimal (mínimo 4 caracteres),
+    asignado atómicamente en la tabla ``consecutivos_radicacion``. La unicidad
+    queda garantizada por el contador, sin consultas de verificación.
+
+    En SQLite la reserva participa de la transacción en curso (un rollback
+    libera los consecutivos). En motores con concurrencia real se confirma en
+    una transacción propia para no retener el bloqueo de la fila del día
+    hasta el commit del registro; un rollback posterior solo deja huecos.
+
+    Args:
+        cantidad (int): Número de códigos a reservar
+        fecha (date|datetime, optional): Día de radicación (default: hoy)
+
+    Returns:
+        list[str]: Códigos en formato INC-YYYYMMDD-XXXX
+    """
+    from app.models import db
+
+    if cantidad < 1:
+        return []
+
+    dia = (fecha or datetime.now()).strftime('%Y%m%d')
+
+    if db.session.get_bind().dialect.name == 'sqlite':
+        ultimo = _incrementar_consecutivo(db.session.connection(), dia, cantidad)
+    else:
+        with db.engine.begin() as conexion:
+            ultimo = _incrementar_consecutivo(conexion, dia, cantidad)
+
+    primero = ultimo - cantidad + 1
+    return [f"INC-{dia}-{numero:04X}" for numero in range(primero, ultimo + 1)]
+
+
 def generar_codigo_radicacion_unico(max_intentos=10):
     """
     Generar código de radicación garantizando unicidad en BD.
     
+    Usa el consecutivo diario atómico, por lo que no hay reintentos ni
+    consultas de verificación.
+    
     Args:
-        max_intentos (int): Número máximo de intentos antes de fallar
+        max_intentos (int): Se conserva por compatibilidad; ya no se usa
     
     Returns:
         str: Código único
-    
-    Raises:
-        RuntimeError: Si no se puede generar código único después de max_intentos
     """
-    for intento in range(max_intentos):
-        codigo = generar_codigo_radicacion()
-        if verificar_codigo_unico(codigo):
-            return codigo
-    
-    # Si llegamos aquí, hubo colisión en todos los intentos (muy improbable)
-    raise RuntimeError(f"No se pudo generar código único después de {max_intentos} intentos")
+    return generar_codigos_radicacion(1)[0]
 
 
 class Incapacidad(db.Model):
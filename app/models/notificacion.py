@@ -1,15 +1,15 @@
-import uuid
 from datetime import datetime
 from typing import Optional
 
 from app.models import db
+from app.models.tipos import UUIDBinario, nuevo_id
 from app.models.enums import EstadoNotificacionEnum, TipoNotificacionEnum
 
 
 class Notificacion(db.Model):
     __tablename__ = "notificaciones"
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(UUIDBinario, primary_key=True, default=nuevo_id)
     tipo = db.Column(db.String(50), nullable=False)
     destinatario_id = db.Column(
         db.Integer,
@@ -28,15 +28,18 @@ class Notificacion(db.Model):
         index=True,
     )
     solicitud_documento_id = db.Column(
-        db.String(36),
+        UUIDBinario,
         db.ForeignKey("solicitudes_documento.id"),
         nullable=True,
         index=True,
     )
     numero_reintento = db.Column(db.Integer, nullable=False, default=1)
+    # Email diferido al próximo resumen del destinatario (se envía mientras siga PENDIENTE)
+    en_resumen = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
 
-    destinatario = db.relationship("Usuario", backref="notificaciones", lazy="joined")
-    solicitud_documento = db.relationship("SolicitudDocumento", lazy="joined")
+    # Perezosas: cada consulta precarga lo que necesita (app/models/perfiles_carga.py)
+    destinatario = db.relationship("Usuario", backref="notificaciones")
+    solicitud_documento = db.relationship("SolicitudDocumento")
 
     def __repr__(self) -> str:
         return f"<Notificacion tipo={self.tipo} destinatario={self.destinatario_id}>"
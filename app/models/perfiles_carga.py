@@ -0,0 +1,59 @@
+"""
+Perfiles de carga de relaciones por consulta.
+
+Las relaciones de los modelos son perezosas (``lazy='select'``): una consulta
+no une tablas que no pidió. Cada ruta elige el perfil según lo que usa su
+plantilla o su respuesta:
+
+- ``lista``: lo que muestra cada fila de un listado, precargado en bloque
+  (``selectinload`` para colecciones, ``joinedload`` para muchos-a-uno) para
+  no hacer una consulta por fila.
+- ``detalle``: lo que muestra la vista de un solo registro.
+- ``conteo``: solo la clave primaria y ninguna relación, para ``count()`` y
+  recorridos que no leen nada más.
+
+Uso:
+    Incapacidad.query.options(*opciones_carga(Incapacidad, 'lista')).all()
+
+tests/test_consultas_por_ruta.py fija cuántas consultas hace cada ruta.
+"""
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload
+
+from app.models.historial_estado import HistorialEstado
+from app.models.incapacidad import Incapacidad
+
+PERFILES = {
+    Incapacidad: {
+        'lista': lambda: (
+            joinedload(Incapacidad.usuario),
+            selectinload(Incapacidad.documentos),
+        ),
+        'detalle': lambda: (
+            joinedload(Incapacidad.usuario),
+            selectinload(Incapacidad.documentos),
+        ),
+    },
+    HistorialEstado: {
+        'lista': lambda: (
+            joinedload(HistorialEstado.usuario),
+            joinedload(HistorialEstado.documento_soporte),
+        ),
+    },
+}
+
+
+def _conteo(modelo):
+    clave = [getattr(modelo, columna.key) for columna in inspect(modelo).primary_key]
+    return (load_only(*clave), raiseload('*'))
+
+
+def opciones_carga(modelo, perfil: str) -> tuple:
+    """Opciones de carga de ``modelo`` para ``perfil`` ('lista', 'detalle' o 'conteo')."""
+    if perfil == 'conteo':
+        return _conteo(modelo)
+    try:
+        return PERFILES.get(modelo, {})[perfil]()
+    except KeyError:
+        raise ValueError(f"Perfil de carga no definido: {modelo.__name__}.{perfil}") from None
@@ -1,8 +1,8 @@
-import uuid
 from datetime import datetime
 from typing import Optional
 
 from app.models import db
+from app.models.tipos import UUIDBinario, nuevo_id
 from app.models.enums import EstadoSolicitudDocumentoEnum, TipoDocumentoEnum
 
 try:  # La utilidad de calendario se agregará en la tarea 2
@@ -14,7 +14,7 @@ except Exception:  # pragma: no cover - fallback para evitar import circular
 class SolicitudDocumento(db.Model):
     __tablename__ = "solicitudes_documento"
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(UUIDBinario, primary_key=True, default=nuevo_id)
     incapacidad_id = db.Column(
         db.Integer,
         db.ForeignKey("incapacidades.id"),
@@ -0,0 +1,63 @@
+"""
+Tipos de columna compartidos por los modelos.
+
+Claves UUID compactas para las tablas de mayor crecimiento (notificaciones,
+historial_estados, solicitudes_documento): se guardan en 16 bytes (``uuid``
+nativo en PostgreSQL, BLOB en SQLite) en lugar de ``VARCHAR(36)``, y las
+nuevas son UUIDv7, ordenadas por tiempo, así que cada INSERT cae al final
+del índice en lugar de en una hoja al azar.
+
+Hacia el código y las URLs el id sigue siendo el texto canónico
+(``'0190b6a2-...'``): los ids existentes no cambian.
+"""
+
+import os
+import time
+import uuid
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import TypeDecorator
+
+
+def uuid7() -> uuid.UUID:
+    """UUID versión 7 (RFC 9562): 48 bits de milisegundos Unix + 74 aleatorios."""
+    milisegundos = time.time_ns() // 1_000_000
+    aleatorio = int.from_bytes(os.urandom(10), 'big')
+    valor = (milisegundos & 0xFFFF_FFFF_FFFF) << 80
+    valor |= 0x7 << 76                                   # versión
+    valor |= ((aleatorio >> 62) & 0xFFF) << 64           # rand_a (12 bits)
+    valor |= 0b10 << 62                                  # variante RFC
+    valor |= aleatorio & 0x3FFF_FFFF_FFFF_FFFF           # rand_b (62 bits)
+    return uuid.UUID(int=valor)
+
+
+def nuevo_id() -> str:
+    """Default de las claves UUIDBinario."""
+    return str(uuid7())
+
+
+class UUIDBinario(TypeDecorator):
+    """UUID en 16 bytes; acepta y retorna el texto canónico."""
+
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value if dialect.name == 'postgresql' else value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(bytes=bytes(value)))
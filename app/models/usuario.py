@@ -10,6 +10,8 @@ class Usuario(UserMixin, db.Model):
     nombre = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     email_notificaciones = db.Column(db.String(120), nullable=True)  # Email para recibir notificaciones
+    # Entrega de emails: INMEDIATA o resumen HORARIA/DIARIA (FrecuenciaNotificacionEnum)
+    frecuencia_notificaciones = db.Column(db.String(10), nullable=False, default='INMEDIATA', server_default='INMEDIATA')
     password_hash = db.Column(db.String(200), nullable=False)
     rol = db.Column(db.String(20), nullable=False)  # 'colaborador' o 'auxiliar'
 
@@ -0,0 +1,99 @@
+"""
+Endpoints de cargas reanudables (tus 1.0). Ver app/utils/cargas_reanudables.py.
+"""
+
+from flask import Blueprint, Response, current_app, jsonify, request, url_for
+from flask_login import current_user, login_required
+
+from app.utils.cargas_reanudables import (
+    EXTENSIONES_TUS,
+    VERSION_TUS,
+    ErrorCarga,
+    crear_carga,
+    eliminar_carga,
+    escribir_fragmento,
+    leer_metadata_tus,
+    obtener_carga,
+    tamaño_maximo,
+)
+
+cargas_bp = Blueprint('cargas', __name__, url_prefix='/cargas')
+
+
+def _respuesta(status, **cabeceras):
+    respuesta = Response(status=status)
+    respuesta.headers['Tus-Resumable'] = VERSION_TUS
+    respuesta.headers['Cache-Control'] = 'no-store'
+    for nombre, valor in cabeceras.items():
+        respuesta.headers[nombre.replace('_', '-')] = str(valor)
+    return respuesta
+
+
+def _entero_cabecera(nombre):
+    try:
+        return int(request.headers[nombre])
+    except (KeyError, ValueError):
+        raise ErrorCarga(f'Cabecera {nombre} ausente o inválida')
+
+
+@cargas_bp.errorhandler(ErrorCarga)
+def error_carga(e):
+    respuesta = jsonify({'success': False, 'errors': [str(e)]})
+    respuesta.status_code = e.codigo
+    respuesta.headers['Tus-Resumable'] = VERSION_TUS
+    return respuesta
+
+
+@cargas_bp.route('', methods=['OPTIONS'])
+def opciones():
+    """Capacidades del servidor (descubrimiento tus)."""
+    return _respuesta(
+        204,
+        Tus_Version=VERSION_TUS,
+        Tus_Extension=EXTENSIONES_TUS,
+        Tus_Max_Size=tamaño_maximo(),
+    )
+
+
+@cargas_bp.route('', methods=['POST'])
+@login_required
+def crear():
+    """Inicia una carga: Upload-Length + Upload-Metadata (filename, campo)."""
+    metadata = leer_metadata_tus(request.headers.get('Upload-Metadata'))
+    carga = crear_carga(
+        current_user.id,
+        metadata.get('filename'),
+        _entero_cabecera('Upload-Length'),
+        campo=metadata.get('campo'),
+    )
+    current_app.logger.info(
+        '📤 Carga reanudable %s iniciada: %s (%s bytes)', carga['id'], carga['nombre_archivo'], carga['tamaño']
+    )
+    return _respuesta(201, Location=url_for('cargas.fragmento', id_carga=carga['id']), Upload_Offset=0)
+
+
+@cargas_bp.route('/<id_carga>', methods=['HEAD'])
+@login_required
+def estado(id_carga):
+    """Offset recibido hasta ahora (para reanudar)."""
+    carga = obtener_carga(id_carga, current_user.id)
+    return _respuesta(200, Upload_Offset=carga['offset'], Upload_Length=carga['tamaño'])
+
+
+@cargas_bp.route('/<id_carga>', methods=['PATCH'])
+@login_required
+def fragmento(id_carga):
+    """Recibe un fragmento en la posición Upload-Offset."""
+    if request.mimetype != 'application/offset+octet-stream':
+        raise ErrorCarga('Content-Type debe ser application/offset+octet-stream', 415)
+    nuevo_offset = escribir_fragmento(
+        id_carga, current_user.id, _entero_cabecera('Upload-Offset'), request.stream
+    )
+    return _respuesta(204, Upload_Offset=nuevo_offset)
+
+
+@cargas_bp.route('/<id_carga>', methods=['DELETE'])
+@login_required
+def cancelar(id_carga):
+    eliminar_carga(id_carga, current_user.id)
+    return _respuesta(204)
@@ -1,55 +1,343 @@
-from flask import Blueprint, send_file, flash, redirect, url_for, send_from_directory
+from flask import (
+    Blueprint, send_file, flash, redirect, url_for, send_from_directory,
+    Response, stream_with_context, jsonify, request, abort, current_app
+)
 from flask_login import login_required, current_user
 from app.models.documento import Documento
 from app.models.incapacidad import Incapacidad
+from app.utils.almacenamiento import ErrorAlmacenamiento, ubicacion_documento, ruta_local_documento
+from datetime import datetime
+from urllib.parse import quote
+import unicodedata
+import mimetypes
 import os
 
 documentos_bp = Blueprint('documentos', __name__, url_prefix='/documentos')
 
-@documentos_bp.route('/descargar/<int:documento_id>')
-@login_required
-def descargar(documento_id):
-    """UC8: Descargar documento individual"""
+
+def _ruta_interna_proxy(ruta):
+    """
+    Ruta interna para X-Accel-Redirect (nginx) o None si no aplica.
+    
+    Solo se delegan archivos dentro de UPLOAD_FOLDER; la ubicación interna
+    de nginx debe apuntar a esa carpeta (ver DOCUMENTOS_X_ACCEL_PREFIX).
+    """
+    prefijo = current_app.config.get('DOCUMENTOS_X_ACCEL_PREFIX')
+    if not prefijo:
+        return None
+    
+    base = os.path.realpath(current_app.config['UPLOAD_FOLDER'])
+    ruta_real = os.path.realpath(ruta)
+    if os.path.commonpath([base, ruta_real]) != base:
+        return None
+    
+    relativa = os.path.relpath(ruta_real, base).replace(os.sep, '/')
+    return f"{prefijo.rstrip('/')}/{quote(relativa)}"
+
+
+def _content_disposition(tipo, nombre):
+    """Content-Disposition con nombre ASCII de respaldo y filename* UTF-8 (RFC 6266)."""
+    nombre_ascii = unicodedata.normalize('NFKD', nombre).encode('ascii', 'ignore').decode('ascii')
+    nombre_ascii = nombre_ascii.replace('"', '') or 'documento'
+    if nombre_ascii == nombre:
+        return f'{tipo}; filename="{nombre}"'
+    return f"{tipo}; filename=\"{nombre_ascii}\"; filename*=UTF-8''{quote(nombre, safe='')}"
+
+
+def _servir_documento(documento, como_adjunto):
+    """
+    Respuesta condicional para un documento.
+    
+    - ETag = checksum_md5 almacenado (sin leer el archivo) → 304 con If-None-Match
+    - Range/If-Range para PDFs grandes (werkzeug)
+    - Cache-Control privado: los documentos requieren sesión
+    - Con proxy configurado, nginx (X-Accel-Redirect) o Apache (X-Sendfile)
+      envía los bytes y el worker queda libre
+    - Documentos en almacenamiento frío remoto (S3): redirección a una URL
+      prefirmada temporal
+    """
+    mimetype = (
+        documento.mime_type
+        or mimetypes.guess_type(documento.nombre_archivo)[0]
+        or 'application/octet-stream'
+    )
+    max_age = current_app.config.get('DOCUMENTOS_CACHE_MAX_AGE', 0)
+    
+    driver, clave = ubicacion_documento(documento)
+    ruta = driver.ruta_local(clave)
+    if ruta is None:
+        return _servir_documento_remoto(documento, driver, clave, mimetype, como_adjunto)
+    
+    ruta_proxy = _ruta_interna_proxy(ruta)
+    if ruta_proxy:
+        if not os.path.isfile(ruta):
+            raise FileNotFoundError(ruta)
+        respuesta = current_app.response_class(mimetype=mimetype)
+        respuesta.headers['X-Accel-Redirect'] = ruta_proxy
+        respuesta.headers['Content-Disposition'] = _content_disposition(
+            'attachment' if como_adjunto else 'inline', documento.nombre_archivo
+        )
+        if documento.checksum_md5:
+            respuesta.set_etag(documento.checksum_md5)
+        respuesta.cache_control.max_age = max_age
+        respuesta = respuesta.make_conditional(request)
+    else:
+        respuesta = send_file(
+            ruta,
+            mimetype=mimetype,
+            as_attachment=como_adjunto,
+            download_name=documento.nombre_archivo,
+            conditional=True,
+            etag=documento.checksum_md5 or True,
+            max_age=max_age,
+        )
+    
+    respuesta.cache_control.private = True
+    respuesta.cache_control.public = False
+    return respuesta
+
+
+def _servir_documento_remoto(documento, driver, clave, mimetype, como_adjunto):
+    """Entrega desde un almacenamiento sin ruta local (URL prefirmada o streaming)."""
+    url = driver.url_temporal(
+        clave,
+        documento.nombre_archivo,
+        mime_type=mimetype,
+        como_adjunto=como_adjunto,
+        expira=current_app.config.get('ALMACENAMIENTO_URL_EXPIRA', 300)
+    )
+    if url:
+        respuesta = redirect(url)
+        respuesta.cache_control.no_store = True
+        return respuesta
+    
+    origen = driver.abrir(clave)
+    
+    def leer():
+        try:
+            for bloque in iter(lambda: origen.read(256 * 1024), b''):
+                yield bloque
+        finally:
+            origen.close()
+    
+    respuesta = Response(leer(), mimetype=mimetype)
+    respuesta.headers['Content-Disposition'] = _content_disposition(
+        'attachment' if como_adjunto else 'inline', documento.nombre_archivo
+    )
+    if documento.checksum_md5:
+        respuesta.set_etag(documento.checksum_md5)
+    return respuesta
+
+
+def _documento_autorizado(documento_id, mensaje_sin_permiso):
     documento = Documento.query.get_or_404(documento_id)
     incapacidad = Incapacidad.query.get(documento.incapacidad_id)
     
     # Verificar permisos
     if current_user.rol == 'colaborador' and incapacidad.usuario_id != current_user.id:
-        flash('No tiene permisos para descargar este documento', 'danger')
-        return redirect(url_for('incapacidades.mis_incapacidades'))
+        flash(mensaje_sin_permiso, 'danger')
+        return documento, incapacidad, redirect(url_for('incapacidades.mis_incapacidades'))
+    if documento.bloqueado:
+        flash(f'El documento fue bloqueado por el antivirus: {documento.detalle_inspeccion}', 'danger')
+        return documento, incapacidad, redirect(url_for('incapacidades.detalle', id=incapacidad.id))
+    return documento, incapacidad, None
+
+
+@documentos_bp.route('/descargar/<int:documento_id>')
+@login_required
+def descargar(documento_id):
+    """UC8: Descargar documento individual"""
+    documento, incapacidad, denegado = _documento_autorizado(
+        documento_id, 'No tiene permisos para descargar este documento'
+    )
+    if denegado:
+        return denegado
     
-    # Verificar que el archivo existe
-    if not os.path.exists(documento.ruta):
+    try:
+        return _servir_documento(documento, como_adjunto=True)
+    except (FileNotFoundError, ErrorAlmacenamiento):
         flash('Archivo no encontrado en el servidor', 'danger')
         return redirect(url_for('incapacidades.detalle', id=incapacidad.id))
+
+
+@documentos_bp.route('/ver/<int:documento_id>')
+@login_required
+def ver(documento_id):
+    """Ver documento en el navegador (PDFs e imágenes)"""
+    documento, incapacidad, denegado = _documento_autorizado(
+        documento_id, 'No tiene permisos para ver este documento'
+    )
+    if denegado:
+        return denegado
     
     try:
-        return send_file(
-            documento.ruta,
-            as_attachment=True,
-            download_name=documento.nombre_archivo
-        )
-    except Exception as e:
-        flash(f'Error al descargar el archivo: {str(e)}', 'danger')
+        return _servir_documento(documento, como_adjunto=False)
+    except (FileNotFoundError, ErrorAlmacenamiento):
+        flash('Archivo no encontrado', 'danger')
         return redirect(url_for('incapacidades.detalle', id=incapacidad.id))
 
-@documentos_bp.route('/ver/<int:documento_id>')
+
+@documentos_bp.route('/incapacidad/<int:incapacidad_id>/zip')
 @login_required
-def ver(documento_id):
-    """Ver documento en el navegador (para PDFs)"""
-    documento = Documento.query.get_or_404(documento_id)
-    incapacidad = Incapacidad.query.get(documento.incapacidad_id)
+def descargar_todos(incapacidad_id):
+    """Descargar todos los documentos de una incapacidad en un ZIP (generado en streaming)"""
+    from app.services.documentos_zip_service import DocumentosZipService
+    
+    incapacidad = Incapacidad.query.get_or_404(incapacidad_id)
     
     # Verificar permisos
     if current_user.rol == 'colaborador' and incapacidad.usuario_id != current_user.id:
-        flash('No tiene permisos para ver este documento', 'danger')
+        flash('No tiene permisos para descargar estos documentos', 'danger')
         return redirect(url_for('incapacidades.mis_incapacidades'))
     
-    if not os.path.exists(documento.ruta):
-        flash('Archivo no encontrado', 'danger')
+    if not incapacidad.documentos:
+        flash('La incapacidad no tiene documentos adjuntos', 'warning')
         return redirect(url_for('incapacidades.detalle', id=incapacidad.id))
     
+    # Las entradas se resuelven antes de responder; el ZIP se escribe mientras se envía
+    contenido = DocumentosZipService.zip_incapacidad(incapacidad)
+    nombre = DocumentosZipService.nombre_zip_incapacidad(incapacidad)
+    
+    return Response(
+        stream_with_context(contenido),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{nombre}"'}
+    )
+
+
+# =============================================================================
+# PAQUETES DE AUDITORÍA (ZIP preparado en segundo plano)
+# =============================================================================
+
+def _paquete_del_usuario(trabajo_id):
+    from app.tasks.paquetes_auditoria import obtener_trabajo
+    
+    trabajo = obtener_trabajo(trabajo_id)
+    if not trabajo or trabajo['usuario_id'] != current_user.id:
+        abort(404)
+    return trabajo
+
+
+@documentos_bp.route('/paquetes', methods=['POST'])
+@login_required
+def crear_paquete():
+    """
+    Inicia la preparación de un paquete ZIP de auditoría (Auxiliar RRHH).
+    
+    Form/JSON:
+        estado: Filtrar por estado (opcional)
+        desde, hasta: Rango de fecha_inicio AAAA-MM-DD (opcional)
+    
+    Retorna 202 con el id del trabajo y la URL para consultar el progreso.
+    """
+    from app.tasks.paquetes_auditoria import iniciar_paquete
+    
+    if current_user.rol != 'auxiliar':
+        return jsonify({'success': False, 'errors': ['Acceso denegado']}), 403
+    
+    datos = request.get_json(silent=True) or request.form
     try:
-        return send_file(documento.ruta, mimetype='application/pdf')
-    except:
-        return send_file(documento.ruta, as_attachment=False)
\ No newline at end of file
+        filtros = {
+            'estado': datos.get('estado') or None,
+            'desde': datetime.strptime(datos['desde'], '%Y-%m-%d').date() if datos.get('desde') else None,
+            'hasta': datetime.strptime(datos['hasta'], '%Y-%m-%d').date() if datos.get('hasta') else None,
+        }
+    except ValueError:
+        return jsonify({'success': False, 'errors': ['Formato de fecha inválido (use AAAA-MM-DD)']}), 400
+    
+    trabajo_id = iniciar_paquete(current_app._get_current_object(), current_user.id, filtros)
+    
+    return jsonify({
+        'success': True,
+        'trabajo_id': trabajo_id,
+        'url_estado': url_for('documentos.estado_paquete', trabajo_id=trabajo_id)
+    }), 202
+
+
+@documentos_bp.route('/paquetes/<trabajo_id>')
+@login_required
+def estado_paquete(trabajo_id):
+    """Progreso de un paquete de auditoría"""
+    from app.tasks.paquetes_auditoria import ESTADO_LISTO
+    
+    trabajo = _paquete_del_usuario(trabajo_id)
+    total = trabajo['total']
+    
+    respuesta = {
+        'success': True,
+        'estado': trabajo['estado'],
+        'total': total,
+        'procesados': trabajo['procesados'],
+        'faltantes': trabajo['faltantes'],
+        'progreso': round(100 * trabajo['procesados'] / total, 1) if total else (100.0 if trabajo['estado'] == ESTADO_LISTO else 0.0),
+        'error': trabajo['error'],
+    }
+    if trabajo['estado'] == ESTADO_LISTO:
+        respuesta['url_descarga'] = url_for('documentos.descargar_paquete', trabajo_id=trabajo_id)
+    return jsonify(respuesta)
+
+
+@documentos_bp.route('/paquetes/<trabajo_id>/descargar')
+@login_required
+def descargar_paquete(trabajo_id):
+    """Descargar un paquete de auditoría ya preparado"""
+    from app.tasks.paquetes_auditoria import ESTADO_LISTO
+    
+    trabajo = _paquete_del_usuario(trabajo_id)
+    if trabajo['estado'] != ESTADO_LISTO:
+        return jsonify({'success': False, 'errors': ['El paquete aún no está listo']}), 409
+    
+    return send_file(
+        trabajo['ruta'],
+        mimetype='application/zip',
+        as_attachment=True,
+        download_name=f"auditoria_{trabajo['fecha_inicio'].strftime('%Y%m%d_%H%M%S')}.zip"
+    )
+
+
+# Marcador mientras la miniatura se genera en segundo plano
+PREVIEW_PENDIENTE = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="320" height="240" viewBox="0 0 320 240">'
+    '<rect width="320" height="240" fill="#f1f3f5"/>'
+    '<text x="160" y="125" font-family="sans-serif" font-size="14" fill="#868e96" '
+    'text-anchor="middle">Generando vista previa…</text></svg>'
+)
+
+
+@documentos_bp.route('/preview/<int:documento_id>')
+@login_required
+def preview(documento_id):
+    """Miniatura JPEG de la primera página del documento (generada en segundo plano)"""
+    from app.utils.inspeccion_documentos import permite_preview
+    from app.utils.previsualizaciones import programar_preview, puede_generar, ruta_preview
+    
+    documento, _, denegado = _documento_autorizado(
+        documento_id, 'No tiene permisos para ver este documento'
+    )
+    if denegado:
+        return denegado
+    if not permite_preview(documento.estado_inspeccion):
+        abort(404)  # No se renderizan documentos sospechosos
+    
+    ruta = ruta_preview(documento.id, documento.checksum_md5, current_app.config['PREVIEWS_FOLDER'])
+    
+    # Si el trabajo en segundo plano aún no la generó, se encola y se responde
+    # con un marcador: la petición nunca renderiza el documento
+    if not os.path.exists(ruta):
+        ruta_documento = ruta_local_documento(documento)
+        if not ruta_documento:
+            abort(404)
+        programar_preview(ruta_documento, documento.mime_type, ruta)
+        if not os.path.exists(ruta):
+            if not puede_generar(documento.mime_type):
+                abort(404)
+            respuesta = Response(PREVIEW_PENDIENTE, status=202, mimetype='image/svg+xml')
+            respuesta.headers['Retry-After'] = '2'
+            respuesta.cache_control.no_store = True
+            return respuesta
+    
+    # La clave incluye el checksum: la miniatura de una ruta nunca cambia
+    respuesta = send_file(ruta, mimetype='image/jpeg', conditional=True, max_age=86400)
+    respuesta.cache_control.private = True
+    respuesta.cache_control.public = False
+    return respuesta
@@ -1,21 +1,31 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, current_app
+from flask import (
+    Blueprint, Response, render_template, redirect, url_for, flash, request, jsonify, current_app,
+    stream_with_context
+)
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
-from datetime import datetime
-import os
+from datetime import datetime, date
 import logging
 from app.models import db
 from app.models.incapacidad import Incapacidad
 from app.models.documento import Documento
+from app.models.enums import EstadoIncapacidadEnum, EstadoSolicitudDocumentoEnum, TipoDocumentoEnum
+from app.models.historial_estado import HistorialEstado
+from app.models.perfiles_carga import opciones_carga
+from app.models.solicitud_documento import SolicitudDocumento
+from app.routes.auth import require_role
+from app.utils.calendario import dias_habiles_restantes, formatar_fecha_legible
 from config import Config
 from app.utils.validaciones import (
     validar_tipo_incapacidad, 
     validar_rango_fechas, 
     validar_archivo,
     validar_documentos_incapacidad,
-    obtener_documentos_requeridos,
-    procesar_archivo_completo
+    obtener_documentos_requeridos
 )
+from app.utils.staging import procesar_carga
+from app.utils.cargas_reanudables import ErrorCarga, archivo_de_formulario
+from app.utils.unidad_trabajo import confirmar, unidad_de_trabajo
 from app.utils.email_service import (
     notificar_nueva_incapacidad,
     notificar_validacion_completada,
@@ -25,26 +35,15 @@ from app.utils.email_service import (
     confirmar_almacenamiento_definitivo
 )
 
+logger = logging.getLogger(__name__)
+
+# Los servicios de uso ocasional (importación, exportación, solicitudes UC6,
+# inspección) se importan dentro de sus rutas para no cargarlos al arrancar.
 incapacidades_bp = Blueprint('incapacidades', __name__, url_prefix='/incapacidades')
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in Config.ALLOWED_EXTENSIONS
 
-def limpiar_archivos_huerfanos(incapacidad_id):
-    """
-    Elimina archivos físicos de una incapacidad cuando falla la transacción.
-    Se usa en rollback para evitar archivos huérfanos en el sistema.
-    """
-    try:
-        documentos = Documento.query.filter_by(incapacidad_id=incapacidad_id).all()
-        for doc in documentos:
-            ruta_completa = os.path.join(Config.UPLOAD_FOLDER, doc.ruta_archivo)
-            if os.path.exists(ruta_completa):
-                os.remove(ruta_completa)
-                print(f"🗑️ Archivo huérfano eliminado: {ruta_completa}")
-    except Exception as e:
-        print(f"⚠️ Error al limpiar archivos huérfanos: {e}")
-
 def calcular_dias(fecha_inicio, fecha_fin):
     return (fecha_fin - fecha_inicio).days + 1
 
@@ -109,107 +108,115 @@ def registrar():
         # El colaborador puede registrar sin documentos o con documentos parciales
 
         # ========================================
-        # TRANSACCIÓN ATÓMICA: Incapacidad + Documentos
-        # Si falla cualquier paso, se revierte todo
+        # TRANSACCIÓN ATÓMICA: Incapacidad + Documentos + Notificaciones
+        # Un solo commit al salir de la unidad de trabajo; si falla cualquier
+        # paso, se revierte todo (app/utils/unidad_trabajo.py)
         # ========================================
         try:
-            from app.models.enums import EstadoIncapacidadEnum
-            
-            # Crear incapacidad (sin commit aún)
-            incapacidad = Incapacidad(
-                usuario_id=current_user.id,
-                tipo=tipo,
-                fecha_inicio=fecha_inicio,
-                fecha_fin=fecha_fin,
-                dias=dias,
-                estado=EstadoIncapacidadEnum.PENDIENTE_VALIDACION.value
-            )
+            with unidad_de_trabajo():
+                # Crear incapacidad (sin commit aún)
+                incapacidad = Incapacidad(
+                    usuario_id=current_user.id,
+                    tipo=tipo,
+                    fecha_inicio=fecha_inicio,
+                    fecha_fin=fecha_fin,
+                    dias=dias,
+                    estado=EstadoIncapacidadEnum.PENDIENTE_VALIDACION.value
+                )
             
-            # Asignar código de radicación único
-            incapacidad.asignar_codigo_radicacion()
+                # Asignar código de radicación único
+                incapacidad.asignar_codigo_radicacion()
             
-            # Agregar a sesión (sin commit)
-            db.session.add(incapacidad)
-            db.session.flush()  # Obtener ID sin hacer commit
+                # Agregar a sesión (sin commit)
+                db.session.add(incapacidad)
+                db.session.flush()  # Obtener ID sin hacer commit
             
-            # ========================================
-            # UC5: VALIDACIÓN DE REQUISITOS POR TIPO
-            # Integración 2.1 - Validar antes de guardar
-            # ========================================
-            from app.services.validacion_requisitos_service import ValidadorRequisitos
-            import logging
+                # ========================================
+                # UC5: VALIDACIÓN DE REQUISITOS POR TIPO
+                # Integración 2.1 - Validar antes de guardar
+                # ========================================
+                from app.services.validacion_requisitos_service import ValidadorRequisitos
             
-            logger = logging.getLogger(__name__)
-            logger.info(f"✅ UC5: Iniciando validación de requisitos para incapacidad #{incapacidad.id}")
+                logger.info('✅ UC5: Iniciando validación de requisitos para incapacidad #%s', incapacidad.id)
             
-            # Inicializar lista de warnings para requests AJAX
-            warnings = []
+                # Inicializar lista de warnings para requests AJAX
+                warnings = []
             
-            try:
-                validador = ValidadorRequisitos()
-                resultado_uc5 = validador.validar(incapacidad)
+                try:
+                    validador = ValidadorRequisitos()
+                    resultado_uc5 = validador.validar(incapacidad)
                 
-                # Guardar resultado en BD para referencia futura
-                incapacidad.validacion_uc5 = resultado_uc5
+                    # Guardar resultado en BD para referencia futura
+                    incapacidad.validacion_uc5 = resultado_uc5
                 
-                logger.info(f"✅ UC5: Validación ejecutada - Completo: {resultado_uc5['completo']}")
+                    logger.info('✅ UC5: Validación ejecutada - Completo: %s', resultado_uc5['completo'])
                 
-                # UC1 + UC5: Si documentación NO está completa, mostrar advertencia pero PERMITIR guardar
-                # (El auxiliar podrá usar UC6 para solicitar documentos faltantes)
-                if not resultado_uc5['completo']:
-                    documentos_faltantes = [doc['nombre'] for doc in resultado_uc5['faltantes']]
-                    warning_msg = f"⚠️ Documentos faltantes según tipo de incapacidad: {', '.join(documentos_faltantes)}. Gestión Humana podrá solicitarlos posteriormente."
+                    # UC1 + UC5: Si documentación NO está completa, mostrar advertencia pero PERMITIR guardar
+                    # (El auxiliar podrá usar UC6 para solicitar documentos faltantes)
+                    if not resultado_uc5['completo']:
+                        documentos_faltantes = [doc['nombre'] for doc in resultado_uc5['faltantes']]
+                        warning_msg = f"⚠️ Documentos faltantes según tipo de incapacidad: {', '.join(documentos_faltantes)}. Gestión Humana podrá solicitarlos posteriormente."
                     
-                    if is_ajax:
-                        warnings.append(warning_msg)
-                    else:
-                        flash(warning_msg, 'warning')
+                        if is_ajax:
+                            warnings.append(warning_msg)
+                        else:
+                            flash(warning_msg, 'warning')
                     
-                    logger.info(f"📋 UC5: Documentos faltantes identificados: {', '.join(documentos_faltantes)}")
-                else:
-                    success_msg = "✅ UC5: Documentación completa según tipo de incapacidad"
-                    if is_ajax:
-                        warnings.append(success_msg)
+                        logger.info('📋 UC5: Documentos faltantes identificados: %s', ', '.join(documentos_faltantes))
                     else:
-                        flash(success_msg, 'success')
+                        success_msg = "✅ UC5: Documentación completa según tipo de incapacidad"
+                        if is_ajax:
+                            warnings.append(success_msg)
+                        else:
+                            flash(success_msg, 'success')
                     
-                    logger.info("✅ UC5: Validación completa - todos los requisitos cumplidos")
+                        logger.info("✅ UC5: Validación completa - todos los requisitos cumplidos")
                     
-            except Exception as e:
-                # Si falla UC5, registrar error pero NO bloquear el registro
-                logger.error(f"❌ UC5: Error en validación de requisitos: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                except Exception as e:
+                    # Si falla UC5, registrar error pero NO bloquear el registro
+                    logger.exception('❌ UC5: Error en validación de requisitos: %s', e)
                 
-                error_msg = f"⚠️ UC5: Error en validación automática: {str(e)}. La incapacidad se registrará normalmente."
-                if is_ajax:
-                    warnings.append(error_msg)
-                else:
-                    flash(error_msg, 'warning')
+                    error_msg = f"⚠️ UC5: Error en validación automática: {str(e)}. La incapacidad se registrará normalmente."
+                    if is_ajax:
+                        warnings.append(error_msg)
+                    else:
+                        flash(error_msg, 'warning')
                 
-                # Guardar error en validacion_uc5 para debugging
-                incapacidad.validacion_uc5 = {
-                    'error': str(e),
-                    'timestamp': datetime.now().isoformat(),
-                    'completo': False
-                }
+                    # Guardar error en validacion_uc5 para debugging
+                    incapacidad.validacion_uc5 = {
+                        'error': str(e),
+                        'timestamp': datetime.now().isoformat(),
+                        'completo': False
+                    }
             
-            # Procesar archivos (puede lanzar excepciones)
-            archivos_guardados, errores_archivos = procesar_archivos(request.files, incapacidad.id)
+                # Procesar archivos (puede lanzar excepciones)
+                archivos_guardados, errores_archivos = procesar_archivos(request.files, incapacidad.id, request.form)
             
-            # UC6: Ya NO requerimos documentos en el registro inicial
-            # El auxiliar los solicitará después si faltan
-            # if archivos_guardados == 0:
-            #     raise ValueError('No se cargaron documentos.')
+                # UC6: Ya NO requerimos documentos en el registro inicial
+                # El auxiliar los solicitará después si faltan
+                # if archivos_guardados == 0:
+                #     raise ValueError('No se cargaron documentos.')
             
-            # Si hay errores en archivos, agregar a warnings existentes
-            if errores_archivos:
-                warnings.extend(errores_archivos)
-                for error in errores_archivos:
-                    flash(error, 'warning')
+                # Si hay errores en archivos, agregar a warnings existentes
+                if errores_archivos:
+                    warnings.extend(errores_archivos)
+                    for error in errores_archivos:
+                        flash(error, 'warning')
             
-            # ✅ COMMIT: Todo exitoso
-            db.session.commit()
+                # UC2: Notificaciones internas en la misma transacción (SAVEPOINT:
+                # si fallan, el registro sigue); los emails salen después del commit
+                try:
+                    notificaciones_ok = notificar_nueva_incapacidad(incapacidad)
+                    if not notificaciones_ok:
+                        logger.warning('⚠️ UC2: Advertencia al enviar notificaciones para #%s', incapacidad.id)
+                        warning_msg = 'Incapacidad registrada, pero no se pudieron enviar todas las notificaciones'
+                        flash(warning_msg, 'warning')
+                        warnings.append(warning_msg)
+                except Exception as e:
+                    logger.exception('❌ UC2: Error al enviar notificaciones: %s', e)
+                    warning_msg = 'Incapacidad registrada, pero falló el envío de notificaciones'
+                    flash(warning_msg, 'warning')
+                    warnings.append(warning_msg)
             
             # ========================================
             # POST-COMMIT: Hooks e Integraciones
@@ -220,29 +227,11 @@ def registrar():
             try:
                 almacenamiento_ok = confirmar_almacenamiento_definitivo(incapacidad)
                 if not almacenamiento_ok:
-                    print(f"⚠️ UC15: Advertencia en confirmación de almacenamiento para #{incapacidad.id}")
+                    logger.warning('⚠️ UC15: Advertencia en confirmación de almacenamiento para #%s', incapacidad.id)
             except Exception as e:
-                print(f"❌ UC15: Error al confirmar almacenamiento: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception('❌ UC15: Error al confirmar almacenamiento: %s', e)
                 # No interrumpir flujo si falla UC15
             
-            # UC2: Enviar notificaciones
-            try:
-                notificaciones_ok = notificar_nueva_incapacidad(incapacidad)
-                if not notificaciones_ok:
-                    print(f"⚠️ UC2: Advertencia al enviar notificaciones para #{incapacidad.id}")
-                    warning_msg = 'Incapacidad registrada, pero no se pudieron enviar todas las notificaciones'
-                    flash(warning_msg, 'warning')
-                    warnings.append(warning_msg)
-            except Exception as e:
-                print(f"❌ UC2: Error al enviar notificaciones: {e}")
-                import traceback
-                traceback.print_exc()
-                warning_msg = 'Incapacidad registrada, pero falló el envío de notificaciones'
-                flash(warning_msg, 'warning')
-                warnings.append(warning_msg)
-            
             # Responder según tipo de petición
             if is_ajax:
                 return jsonify({
@@ -269,17 +258,10 @@ def registrar():
             db.session.rollback()
             
             # Log del error
-            print(f"❌ Error en transacción de registro: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('❌ Error en transacción de registro: %s', e)
             
-            # Limpiar archivos huérfanos si se guardaron
-            # (los archivos físicos se guardan antes del commit)
-            try:
-                if 'incapacidad' in locals() and hasattr(incapacidad, 'id'):
-                    limpiar_archivos_huerfanos(incapacidad.id)
-            except:
-                pass  # Si falla limpieza, no importa
+            # Los archivos cargados siguen en staging: el rollback los descarta
+            # (ver app/utils/staging.py), no quedan huérfanos en UPLOAD_FOLDER
             
             # Responder según tipo de petición
             error_msg = f'Error al registrar incapacidad: {str(e)}. Por favor, intente nuevamente.'
@@ -296,11 +278,12 @@ def registrar():
 
     return render_template('incapacidades/crear.html')
 
-def procesar_archivos(files, incapacidad_id):
+def procesar_archivos(files, incapacidad_id, form=None):
     """
     UC2 + Tarea 3: Cargar documentos con validación completa y metadatos.
     
-    Procesa todos los archivos subidos:
+    Procesa todos los archivos subidos (adjuntos directos o cargas
+    reanudables referidas con '<tipo>_carga' en ``form``):
     - Valida formato y tamaño
     - Genera nombres únicos (UUID + timestamp)
     - Calcula metadatos (tamaño, checksum, MIME type)
@@ -323,20 +306,20 @@ def procesar_archivos(files, incapacidad_id):
     ]
 
     for tipo_doc in tipos_documentos:
-        if tipo_doc in files:
-            file = files[tipo_doc]
-            
+        try:
+            file, max_mb = archivo_de_formulario(files, form, tipo_doc, current_user.id)
+        except ErrorCarga as e:
+            errores_procesamiento.append(f"{tipo_doc}: {e}")
+            continue
+        
+        if file:
             # Verificar que hay archivo
-            if not file or file.filename == '':
+            if file.filename == '':
                 continue
             
-            # Procesar archivo completo (validar + guardar + metadatos)
-            resultado = procesar_archivo_completo(
-                file, 
-                tipo_doc, 
-                incapacidad_id,
-                Config.UPLOAD_FOLDER
-            )
+            # Procesar archivo completo (validar + guardar en staging + metadatos)
+            # El archivo pasa a UPLOAD_FOLDER cuando se confirma la transacción
+            resultado = procesar_carga(file, tipo_doc, incapacidad_id, max_mb=max_mb)
             
             if resultado['exito']:
                 # Crear documento en BD con metadatos completos
@@ -360,9 +343,9 @@ def procesar_archivos(files, incapacidad_id):
                 for error in resultado['errores']:
                     errores_procesamiento.append(f"{tipo_doc}: {error}")
 
-    # Commit solo si todo fue exitoso
+    # Commit solo si todo fue exitoso (flush dentro de la unidad de trabajo del registro)
     if archivos_guardados > 0:
-        db.session.commit()
+        confirmar()
     
     return archivos_guardados, errores_procesamiento
 
@@ -384,52 +367,36 @@ def mis_incapacidades():
 @login_required
 def dashboard_auxiliar():
     """Dashboard de Auxiliar RRHH (CU-006 y CU-007)"""
-    from app.models.enums import EstadoIncapacidadEnum
     
     if current_user.rol != 'auxiliar':
         flash('Acceso denegado. Solo Auxiliar RRHH puede acceder.', 'danger')
         return redirect(url_for('auth.index'))
 
     # Obtener incapacidades en diferentes estados (compatibilidad legacy + nuevos)
-    pendientes = Incapacidad.query.filter(
-        Incapacidad.estado.in_([
-            EstadoIncapacidadEnum.PENDIENTE_VALIDACION.value,
-            'Pendiente'  # Legacy
-        ])
-    ).all()
-    
-    en_revision = Incapacidad.query.filter(
-        Incapacidad.estado.in_([
-            EstadoIncapacidadEnum.DOCUMENTACION_COMPLETA.value,
-            'En revision'  # Legacy
-        ])
-    ).all()
-    
-    aprobadas = Incapacidad.query.filter(
-        Incapacidad.estado.in_([
-            EstadoIncapacidadEnum.APROBADA_PENDIENTE_TRANSCRIPCION.value,
-            'Aprobada'  # Legacy
-        ])
-    ).all()
-    
-    rechazadas = Incapacidad.query.filter(
-        Incapacidad.estado.in_([
-            EstadoIncapacidadEnum.RECHAZADA.value,
-            'Rechazada'  # Legacy
-        ])
+    # en una sola consulta, con colaborador y documentos precargados
+    estados_por_grupo = {
+        'pendientes': [EstadoIncapacidadEnum.PENDIENTE_VALIDACION.value, 'Pendiente'],  # Legacy
+        'en_revision': [EstadoIncapacidadEnum.DOCUMENTACION_COMPLETA.value, 'En revision'],  # Legacy
+        'aprobadas': [EstadoIncapacidadEnum.APROBADA_PENDIENTE_TRANSCRIPCION.value, 'Aprobada'],  # Legacy
+        'rechazadas': [EstadoIncapacidadEnum.RECHAZADA.value, 'Rechazada'],  # Legacy
+    }
+    grupo_de_estado = {
+        estado: grupo for grupo, estados in estados_por_grupo.items() for estado in estados
+    }
+    grupos = {grupo: [] for grupo in estados_por_grupo}
+    incapacidades = Incapacidad.query.options(*opciones_carga(Incapacidad, 'lista')).filter(
+        Incapacidad.estado.in_(list(grupo_de_estado))
     ).all()
+    for incapacidad in incapacidades:
+        grupos[grupo_de_estado[incapacidad.estado]].append(incapacidad)
 
-    return render_template('dashboard_auxiliar.html', 
-                         pendientes=pendientes, 
-                         en_revision=en_revision,
-                         aprobadas=aprobadas,
-                         rechazadas=rechazadas)
+    return render_template('dashboard_auxiliar.html', **grupos)
 
 @incapacidades_bp.route('/detalle/<int:id>')
 @login_required
 def detalle(id):
     """UC4: Ver detalle de incapacidad"""
-    incapacidad = Incapacidad.query.get_or_404(id)
+    incapacidad = Incapacidad.query.options(*opciones_carga(Incapacidad, 'detalle')).get_or_404(id)
 
     # Verificar permisos
     if current_user.rol == 'colaborador' and incapacidad.usuario_id != current_user.id:
@@ -442,13 +409,12 @@ def detalle(id):
 @login_required
 def validar(id):
     """CU-006: Validar documentación (Auxiliar RRHH)"""
-    from app.models.enums import EstadoIncapacidadEnum
     
     if current_user.rol != 'auxiliar':
         flash('Acceso denegado. Solo Auxiliar RRHH puede validar documentación.', 'danger')
         return redirect(url_for('auth.index'))
     
-    incapacidad = Incapacidad.query.get_or_404(id)
+    incapacidad = Incapacidad.query.options(*opciones_carga(Incapacidad, 'detalle')).get_or_404(id)
     
     if request.method == 'POST':
         accion = request.form.get('accion')
@@ -462,9 +428,7 @@ def validar(id):
             try:
                 notificar_validacion_completada(incapacidad)
             except Exception as e:
-                print(f"❌ Error al enviar notificacion: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception('❌ Error al enviar notificacion: %s', e)
             
             flash('Documentacion marcada como completa. Ahora puede aprobar o rechazar.', 'success')
             return redirect(url_for('incapacidades.aprobar_rechazar', id=id))
@@ -534,7 +498,6 @@ def validar_requisitos_automatico(incapacidad):
 @login_required
 def aprobar_rechazar(id):
     """CU-007: Aprobar o rechazar incapacidad (Auxiliar RRHH)"""
-    from app.models.enums import EstadoIncapacidadEnum
     
     if current_user.rol != 'auxiliar':
         flash('Acceso denegado. Solo Auxiliar RRHH puede aprobar/rechazar incapacidades.', 'danger')
@@ -566,9 +529,7 @@ def aprobar_rechazar(id):
             try:
                 notificar_aprobacion(incapacidad)
             except Exception as e:
-                print(f"❌ Error al enviar notificacion: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception('❌ Error al enviar notificacion: %s', e)
             
             flash(f'Incapacidad #{id} aprobada exitosamente', 'success')
             return redirect(url_for('incapacidades.dashboard_auxiliar'))
@@ -587,9 +548,7 @@ def aprobar_rechazar(id):
             try:
                 notificar_rechazo(incapacidad)
             except Exception as e:
-                print(f"❌ Error al enviar notificacion: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception('❌ Error al enviar notificacion: %s', e)
             
             flash(f'Incapacidad #{id} rechazada', 'info')
             return redirect(url_for('incapacidades.dashboard_auxiliar'))
@@ -600,7 +559,6 @@ def aprobar_rechazar(id):
 @login_required
 def estadisticas():
     """Vista de estadísticas básicas (Auxiliar RRHH)"""
-    from app.models.enums import EstadoIncapacidadEnum
     
     if current_user.rol != 'auxiliar':
         flash('Acceso denegado', 'danger')
@@ -661,11 +619,13 @@ def validar_requisitos_automatico(incapacidad):
         'nivel_cumplimiento': 0  # 0-100
     }
     
+    # Documentos ya cargados con la incapacidad (perfil 'detalle' en validar)
+    por_tipo = {}
+    for doc in incapacidad.documentos:
+        por_tipo.setdefault(doc.tipo_documento, doc)
+    
     # Verificar certificado
-    certificado = Documento.query.filter_by(
-        incapacidad_id=incapacidad.id,
-        tipo_documento='certificado'
-    ).first()
+    certificado = por_tipo.get('certificado')
     resultado['certificado_presente'] = certificado is not None
     
     if not certificado:
@@ -676,10 +636,7 @@ def validar_requisitos_automatico(incapacidad):
         resultado['recomendaciones'].append('✅ Certificado presente')
     
     # Verificar epicrisis
-    epicrisis = Documento.query.filter_by(
-        incapacidad_id=incapacidad.id,
-        tipo_documento='epicrisis'
-    ).first()
+    epicrisis = por_tipo.get('epicrisis')
     resultado['epicrisis_presente'] = epicrisis is not None
     
     # Determinar si epicrisis es requerida
@@ -738,9 +695,7 @@ def solicitar_documentos(incapacidad_id):
     1. Si hay solicitudes PENDIENTES → Mostrar esas solicitudes con estado de documentos
     2. Si NO hay solicitudes PENDIENTES → Mostrar documentos requeridos para crear nuevas
     """
-    from app.routes.auth import require_role
-    from app.models.enums import EstadoIncapacidadEnum, TipoDocumentoEnum, EstadoSolicitudDocumentoEnum
-    from app.models.solicitud_documento import SolicitudDocumento
+    # La ruta obtener_documentos_requeridos (más abajo) oculta la función de validaciones
     from app.utils.validaciones import obtener_documentos_requeridos
     
     # Verificar rol auxiliar
@@ -863,7 +818,6 @@ def procesar_solicitud_documentos(incapacidad_id):
     Acceso: Solo AUXILIAR_GH
     """
     from app.services.solicitud_documentos_service import SolicitudDocumentosService
-    from app.models.enums import TipoDocumentoEnum
     
     # Verificar rol auxiliar
     if current_user.rol != 'auxiliar':
@@ -928,10 +882,6 @@ def cargar_documentos_solicitados(incapacidad_id):
     RUTA 3 UC6: Mostrar formulario para cargar documentos solicitados.
     Acceso: Solo COLABORADOR propietario
     """
-    from app.models.solicitud_documento import SolicitudDocumento
-    from app.models.enums import EstadoIncapacidadEnum, EstadoSolicitudDocumentoEnum
-    from app.utils.calendario import dias_habiles_restantes, formatar_fecha_legible
-    from datetime import datetime, date
     
     # Obtener incapacidad
     incapacidad = Incapacidad.query.get_or_404(incapacidad_id)
@@ -990,8 +940,6 @@ def procesar_cargar_documentos_solicitados(incapacidad_id):
     Soporta AJAX (respuesta JSON)
     """
     from app.services.solicitud_documentos_service import SolicitudDocumentosService
-    from app.models.solicitud_documento import SolicitudDocumento
-    from app.models.enums import EstadoSolicitudDocumentoEnum
     
     # Obtener incapacidad
     incapacidad = Incapacidad.query.get_or_404(incapacidad_id)
@@ -1014,12 +962,14 @@ def procesar_cargar_documentos_solicitados(incapacidad_id):
     for solicitud in solicitudes_pendientes:
         archivo_key = f'documento_{solicitud.tipo_documento}'
         
-        if archivo_key not in request.files:
+        # Adjunto directo o carga reanudable ('<campo>_carga')
+        try:
+            archivo, max_mb = archivo_de_formulario(request.files, request.form, archivo_key, current_user.id)
+        except ErrorCarga as e:
+            errores_validacion.append(f'{solicitud.tipo_documento}: {e}')
             continue
         
-        archivo = request.files[archivo_key]
-        
-        if archivo.filename == '':
+        if archivo is None or archivo.filename == '':
             continue
         
         # Validar formato
@@ -1029,24 +979,24 @@ def procesar_cargar_documentos_solicitados(incapacidad_id):
             )
             continue
         
-        # Validar tamaño (10MB = 10 * 1024 * 1024 bytes)
+        # Validar tamaño (10MB por adjunto directo; CARGAS_MAX_MB por fragmentos)
         archivo.seek(0, 2)  # Ir al final
         tamaño = archivo.tell()
         archivo.seek(0)  # Volver al inicio
         
-        if tamaño > 10 * 1024 * 1024:
+        if tamaño > max_mb * 1024 * 1024:
             errores_validacion.append(
-                f'{solicitud.tipo_documento}: Archivo muy grande ({tamaño / 1024 / 1024:.2f} MB). Máximo 10MB.'
+                f'{solicitud.tipo_documento}: Archivo muy grande ({tamaño / 1024 / 1024:.2f} MB). Máximo {max_mb}MB.'
             )
             continue
         
         # Procesar archivo válido
         try:
-            resultado = procesar_archivo_completo(
+            resultado = procesar_carga(
                 file=archivo,
                 tipo_documento=solicitud.tipo_documento,
                 incapacidad_id=incapacidad.id,
-                upload_folder=current_app.config['UPLOAD_FOLDER']
+                max_mb=max_mb
             )
             
             # Verificar si fue exitoso
@@ -1076,6 +1026,7 @@ def procesar_cargar_documentos_solicitados(incapacidad_id):
                 ruta=metadatos['ruta'],
                 tipo_documento=tipo_simple,  # Guardar como tipo simple
                 tamaño_bytes=metadatos['tamaño_bytes'],
+                checksum_md5=metadatos['checksum_md5'],
                 mime_type=metadatos['mime_type']
             )
             
@@ -1086,7 +1037,9 @@ def procesar_cargar_documentos_solicitados(incapacidad_id):
             errores_validacion.append(f'{solicitud.tipo_documento}: Error al procesar archivo - {str(e)}')
     
     # Si hay errores de validación, retornar sin procesar
+    # (el rollback descarta también los archivos ya puestos en staging)
     if errores_validacion:
+        db.session.rollback()
         return jsonify({'success': False, 'errors': errores_validacion}), 400
     
     # Si no se subió ningún archivo
@@ -1100,6 +1053,13 @@ def procesar_cargar_documentos_solicitados(incapacidad_id):
         db.session.rollback()
         return jsonify({'success': False, 'errors': [f'Error al guardar documentos: {str(e)}']}), 500
     
+    # Inspección de contenido y miniaturas para la revisión del auxiliar (en segundo plano)
+    try:
+        from app.utils.inspeccion_documentos import programar_inspeccion
+        programar_inspeccion(archivos_subidos)
+    except Exception as e:
+        current_app.logger.warning('No se pudo encolar la inspección de documentos: %s', e)
+    
     # Llamar al servicio para validar respuesta
     completo, errores_servicio, pendientes = SolicitudDocumentosService.validar_respuesta_colaborador(
         incapacidad_id=incapacidad.id,
@@ -1148,7 +1108,6 @@ def historial_estados(incapacidad_id):
     RUTA 5 UC6: Mostrar historial completo de cambios de estado (auditoría).
     Acceso: Propietario, AUXILIAR_GH o ADMINISTRADOR
     """
-    from app.models.historial_estado import HistorialEstado
     
     # Obtener incapacidad
     incapacidad = Incapacidad.query.get_or_404(incapacidad_id)
@@ -1165,7 +1124,7 @@ def historial_estados(incapacidad_id):
         return redirect(url_for('incapacidades.mis_incapacidades'))
     
     # Obtener historial ordenado por fecha DESC
-    historial = HistorialEstado.query.filter_by(
+    historial = HistorialEstado.query.options(*opciones_carga(HistorialEstado, 'lista')).filter_by(
         incapacidad_id=incapacidad.id
     ).order_by(HistorialEstado.fecha_cambio.desc()).all()
     
@@ -1222,9 +1181,117 @@ def obtener_documentos_requeridos(tipo):
         }), 503
         
     except Exception as e:
-        current_app.logger.error(f'Error obteniendo documentos requeridos: {e}')
+        current_app.logger.error('Error obteniendo documentos requeridos: %s', e)
         return jsonify({
             'error': 'Error interno del servidor',
             'obligatorios': ['CERTIFICADO_INCAPACIDAD'],
             'condicionales': []
-        }), 500
\ No newline at end of file
+        }), 500
+
+# =============================================================================
+# IMPORTACIÓN MASIVA (CSV / Excel)
+# =============================================================================
+
+@incapacidades_bp.route('/importar', methods=['POST'])
+@login_required
+def importar():
+    """
+    Importación masiva de incapacidades desde CSV o Excel (Auxiliar RRHH).
+    
+    Form data:
+        archivo: .csv (separador ',' o ';', UTF-8 o cp1252) o .xlsx con columnas
+                 email, tipo, fecha_inicio, fecha_fin
+        lote: Filas por inserción (opcional, default 500)
+    
+    Retorna:
+        JSON con el resumen de la importación
+    """
+    from app.services.importacion_service import (
+        ImportacionIncapacidadesService,
+        ArchivoImportacionInvalido,
+        leer_filas_archivo,
+        TAMAÑO_LOTE_DEFAULT,
+        TAMAÑO_LOTE_MAX,
+    )
+    
+    if current_user.rol != 'auxiliar':
+        return jsonify({'success': False, 'errors': ['Acceso denegado']}), 403
+    
+    archivo = request.files.get('archivo')
+    if not archivo or archivo.filename == '':
+        return jsonify({'success': False, 'errors': ['Debe adjuntar un archivo CSV o Excel']}), 400
+    
+    tamaño_lote = request.form.get('lote', TAMAÑO_LOTE_DEFAULT, type=int)
+    
+    try:
+        filas = leer_filas_archivo(archivo.stream, archivo.filename)
+        resumen = ImportacionIncapacidadesService.importar(
+            filas,
+            usuario_auxiliar=current_user,
+            tamaño_lote=min(max(1, tamaño_lote), TAMAÑO_LOTE_MAX)
+        )
+    except ArchivoImportacionInvalido as e:
+        return jsonify({'success': False, 'errors': [str(e)]}), 400
+    
+    return jsonify({'success': True, **resumen}), 200
+
+# =============================================================================
+# EXPORTACIÓN PARA AUDITORÍA (CSV / NDJSON en streaming)
+# =============================================================================
+
+@incapacidades_bp.route('/exportar', methods=['GET'])
+@login_required
+def exportar():
+    """
+    Exportación completa de incapacidades con historial y documentos (Auxiliar RRHH).
+    
+    Query params:
+        formato: 'csv' (default) o 'ndjson'
+        gzip: '1' (default) para descargar .gz, '0' para texto plano
+        estado: Filtrar por estado (opcional)
+        desde, hasta: Rango de fecha_inicio AAAA-MM-DD (opcional)
+    
+    La respuesta se genera por bloques: el uso de memoria no depende
+    del tamaño de la tabla.
+    """
+    from app.services.exportacion_service import ExportacionIncapacidadesService
+    
+    if current_user.rol != 'auxiliar':
+        return jsonify({'success': False, 'errors': ['Acceso denegado']}), 403
+    
+    formato = request.args.get('formato', 'csv').lower()
+    comprimir = request.args.get('gzip', '1') != '0'
+    
+    try:
+        desde = request.args.get('desde')
+        hasta = request.args.get('hasta')
+        desde = datetime.strptime(desde, '%Y-%m-%d').date() if desde else None
+        hasta = datetime.strptime(hasta, '%Y-%m-%d').date() if hasta else None
+        contenido = ExportacionIncapacidadesService.exportar(
+            formato=formato,
+            comprimir=comprimir,
+            estado=request.args.get('estado') or None,
+            desde=desde,
+            hasta=hasta
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'errors': [str(e)]}), 400
+    
+    if comprimir:
+        mimetype = 'application/gzip'
+    elif formato == 'csv':
+        mimetype = 'text/csv; charset=utf-8'
+    else:
+        mimetype = 'application/x-ndjson; charset=utf-8'
+    
+    nombre = ExportacionIncapacidadesService.nombre_archivo(formato, comprimir)
+    current_app.logger.info('📤 Exportación %s solicitada por %s', nombre, current_user.email)
+    
+    return Response(
+        stream_with_context(contenido),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename="{nombre}"',
+            'Cache-Control': 'no-store',
+        }
+    )
@@ -9,7 +9,8 @@ from sqlalchemy import desc
 
 from app.models import db
 from app.models.notificacion import Notificacion
-from app.models.enums import EstadoNotificacionEnum
+from app.models.enums import EstadoNotificacionEnum, FrecuenciaNotificacionEnum
+from app.models.perfiles_carga import opciones_carga
 
 notificaciones_bp = Blueprint("notificaciones", __name__, url_prefix="/notificaciones")
 
@@ -53,7 +54,7 @@ def obtener_mis_notificaciones():
     query = query.order_by(desc(Notificacion.fecha_envio))
     
     # Contar total
-    total = query.count()
+    total = query.options(*opciones_carga(Notificacion, 'conteo')).count()
     
     # Paginación
     offset = (pagina - 1) * limite
@@ -79,7 +80,7 @@ def obtener_mis_notificaciones():
         "total": total,
         "pagina": pagina,
         "total_paginas": (total + limite - 1) // limite,
-        "no_leidas": Notificacion.query.filter_by(
+        "no_leidas": Notificacion.query.options(*opciones_carga(Notificacion, 'conteo')).filter_by(
             destinatario_id=current_user.id
         ).filter(
             Notificacion.estado != EstadoNotificacionEnum.LEIDA.value
@@ -94,7 +95,7 @@ def contador_no_leidas():
     API rápida para obtener solo el contador de notificaciones no leídas.
     Usado por el badge en el navbar.
     """
-    count = Notificacion.query.filter_by(
+    count = Notificacion.query.options(*opciones_carga(Notificacion, 'conteo')).filter_by(
         destinatario_id=current_user.id
     ).filter(
         Notificacion.estado != EstadoNotificacionEnum.LEIDA.value
@@ -103,7 +104,7 @@ def contador_no_leidas():
     return jsonify({"no_leidas": count})
 
 
-@notificaciones_bp.route("/api/marcar-leida/<string:notificacion_id>", methods=["POST"])
+@notificaciones_bp.route("/api/marcar-leida/<uuid:notificacion_id>", methods=["POST"])
 @login_required
 def marcar_leida(notificacion_id):
     """
@@ -128,12 +129,12 @@ def marcar_leida(notificacion_id):
     
     return jsonify({
         "success": True,
-        "notificacion_id": notificacion_id,
+        "notificacion_id": notificacion.id,
         "fecha_lectura": notificacion.fecha_lectura.isoformat()
     })
 
 
-@notificaciones_bp.route("/api/marcar-no-leida/<string:notificacion_id>", methods=["POST"])
+@notificaciones_bp.route("/api/marcar-no-leida/<uuid:notificacion_id>", methods=["POST"])
 @login_required
 def marcar_no_leida(notificacion_id):
     """
@@ -159,7 +160,7 @@ def marcar_no_leida(notificacion_id):
     
     return jsonify({
         "success": True,
-        "notificacion_id": notificacion_id
+        "notificacion_id": notificacion.id
     })
 
 
@@ -172,7 +173,7 @@ def marcar_todas_leidas():
     Returns:
         JSON con número de notificaciones actualizadas
     """
-    notificaciones = Notificacion.query.filter_by(
+    notificaciones = Notificacion.query.options(*opciones_carga(Notificacion, 'conteo')).filter_by(
         destinatario_id=current_user.id
     ).filter(
         Notificacion.estado != EstadoNotificacionEnum.LEIDA.value
@@ -191,6 +192,31 @@ def marcar_todas_leidas():
     })
 
 
+@notificaciones_bp.route("/api/preferencias", methods=["GET", "POST"])
+@login_required
+def preferencias():
+    """
+    Consulta o actualiza la frecuencia de emails del usuario actual.
+    
+    Body (POST): {"frecuencia": "INMEDIATA" | "HORARIA" | "DIARIA"}
+    
+    Returns:
+        JSON con la frecuencia vigente
+    """
+    if request.method == "POST":
+        frecuencia = str((request.get_json(silent=True) or {}).get("frecuencia", "")).upper()
+        if frecuencia not in FrecuenciaNotificacionEnum.__members__:
+            return jsonify({"error": "Frecuencia inválida"}), 400
+        
+        current_user.frecuencia_notificaciones = frecuencia
+        db.session.commit()
+    
+    return jsonify({
+        "success": True,
+        "frecuencia": current_user.frecuencia_notificaciones
+    })
+
+
 def _formatear_tiempo_relativo(fecha):
     """
     Formatea una fecha como tiempo relativo (ej: 'hace 5 minutos').
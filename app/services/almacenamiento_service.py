@@ -0,0 +1,127 @@
+"""
+Servicio de niveles de almacenamiento (caliente → frío).
+
+Los documentos de incapacidades cerradas (PAGADA o RECHAZADA) casi no se
+consultan después de unas semanas. Pasados ALMACENAMIENTO_FRIO_DIAS desde la
+última actualización de la incapacidad, se copian al almacenamiento frío
+configurado y se liberan del disco local. La entrega sigue siendo
+transparente: ``documentos.ver``/``descargar`` resuelven la ubicación según
+``Documento.nivel_almacenamiento``.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from app.models import db
+from app.models.documento import Documento
+from app.models.enums import EstadoIncapacidadEnum
+from app.models.incapacidad import Incapacidad
+from app.utils.almacenamiento import (
+    NIVEL_CALIENTE,
+    NIVEL_FRIO,
+    ErrorAlmacenamiento,
+    obtener_almacenamiento,
+    ubicacion_documento,
+)
+
+logger = logging.getLogger(__name__)
+
+ESTADOS_ARCHIVABLES = (
+    EstadoIncapacidadEnum.PAGADA.value,
+    EstadoIncapacidadEnum.RECHAZADA.value,
+)
+
+
+def clave_fria(documento: Documento) -> str:
+    """Clave en el almacenamiento frío: año/mes de carga + nombre único."""
+    fecha = documento.fecha_carga or datetime.utcnow()
+    return f"{fecha:%Y/%m}/{documento.nombre_unico}"
+
+
+class AlmacenamientoService:
+    """Movimiento de documentos entre niveles de almacenamiento."""
+
+    @staticmethod
+    def documentos_para_archivar(dias: int, limite: Optional[int] = None):
+        """Documentos en nivel caliente de incapacidades cerradas hace más de ``dias`` días."""
+        limite_fecha = datetime.utcnow() - timedelta(days=dias)
+        consulta = (
+            db.select(Documento)
+            .join(Incapacidad, Incapacidad.id == Documento.incapacidad_id)
+            .where(
+                Documento.nivel_almacenamiento == NIVEL_CALIENTE,
+                Incapacidad.estado.in_(ESTADOS_ARCHIVABLES),
+                Incapacidad.fecha_actualizacion < limite_fecha,
+            )
+            .order_by(Documento.id)
+        )
+        if limite:
+            consulta = consulta.limit(limite)
+        return db.session.execute(consulta).scalars().all()
+
+    @staticmethod
+    def mover_a_frio(documento: Documento) -> bool:
+        """
+        Copia un documento al almacenamiento frío y libera el archivo local.
+
+        El archivo local se elimina solo después de verificar el tamaño de la
+        copia y confirmar el cambio en BD: si algo falla, el documento queda
+        en nivel caliente (a lo sumo con una copia sobrante en frío).
+        """
+        frio = obtener_almacenamiento(NIVEL_FRIO)
+        if frio is None:
+            raise ErrorAlmacenamiento('No hay almacenamiento frío configurado (ALMACENAMIENTO_FRIO)')
+
+        caliente, clave_local = ubicacion_documento(documento)
+        clave = clave_fria(documento)
+
+        with caliente.abrir(clave_local) as origen:
+            tamaño = frio.guardar(clave, origen, documento.mime_type)
+
+        tamaño_local = caliente.tamaño(clave_local)
+        if tamaño != tamaño_local:
+            frio.eliminar(clave)
+            raise ErrorAlmacenamiento(
+                f"La copia en frío de '{clave}' tiene {tamaño} bytes (esperados {tamaño_local})"
+            )
+
+        documento.nivel_almacenamiento = NIVEL_FRIO
+        documento.clave_almacenamiento = clave
+        documento.fecha_archivado = datetime.utcnow()
+        db.session.commit()
+
+        caliente.eliminar(clave_local)
+        return True
+
+    @staticmethod
+    def archivar_documentos_antiguos(dias: Optional[int] = None, limite: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Mueve a frío los documentos elegibles.
+
+        Returns:
+            dict: {'movidos': int, 'errores': int, 'bytes_liberados': int}
+        """
+        from flask import current_app
+
+        if dias is None:
+            dias = current_app.config.get('ALMACENAMIENTO_FRIO_DIAS', 90)
+
+        resultado = {'movidos': 0, 'errores': 0, 'bytes_liberados': 0}
+        documentos = AlmacenamientoService.documentos_para_archivar(dias, limite)
+        logger.info('🧊 Archivado: %s documento(s) elegibles (> %s días)', len(documentos), dias)
+
+        for documento in documentos:
+            try:
+                AlmacenamientoService.mover_a_frio(documento)
+                resultado['movidos'] += 1
+                resultado['bytes_liberados'] += documento.tamaño_bytes or 0
+            except Exception as e:
+                db.session.rollback()
+                resultado['errores'] += 1
+                logger.error('❌ No se pudo archivar el documento #%s: %s', documento.id, e)
+
+        logger.info(
+            '✅ Archivado completado: %s movidos, %s errores, %.1f MB liberados', resultado['movidos'], resultado['errores'], resultado['bytes_liberados'] / (1024 * 1024)
+        )
+        return resultado
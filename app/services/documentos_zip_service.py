@@ -0,0 +1,130 @@
+"""
+Descarga agrupada de documentos en ZIP.
+
+- Todos los documentos de una incapacidad ("Descargar todo").
+- Paquetes de auditoría: documentos de un conjunto filtrado de incapacidades,
+  organizados por código de radicación.
+"""
+
+import logging
+from datetime import date
+from typing import Iterator, Optional, Tuple
+
+from app.models import db
+from app.models.documento import Documento
+from app.models.incapacidad import Incapacidad
+from app.utils.almacenamiento import NIVEL_FRIO, obtener_almacenamiento
+from app.utils.zip_stream import generar_zip, nombre_unico_en_zip
+
+logger = logging.getLogger(__name__)
+
+TAMAÑO_BLOQUE_DEFAULT = 500
+
+
+def _nombre_entrada(tipo_documento: str, nombre_archivo: str, prefijo: str = '') -> str:
+    nombre = f"{tipo_documento}_{nombre_archivo}" if tipo_documento else nombre_archivo
+    return f"{prefijo}/{nombre}" if prefijo else nombre
+
+
+def _origen(ruta, nivel, clave):
+    """Ruta local o función que abre el documento en el almacenamiento frío."""
+    if nivel != NIVEL_FRIO:
+        return ruta
+    driver = obtener_almacenamiento(NIVEL_FRIO)
+    if driver is None:
+        return ruta  # Se reportará como faltante dentro del ZIP
+    return driver.ruta_local(clave) or (lambda: driver.abrir(clave))
+
+
+def _filtrar(consulta, estado=None, desde=None, hasta=None):
+    # Los documentos bloqueados por el antivirus nunca se entregan
+    consulta = consulta.where(Documento.estado_inspeccion != 'INFECTADO')
+    if estado:
+        consulta = consulta.where(Incapacidad.estado == estado)
+    if desde:
+        consulta = consulta.where(Incapacidad.fecha_inicio >= desde)
+    if hasta:
+        consulta = consulta.where(Incapacidad.fecha_inicio <= hasta)
+    return consulta
+
+
+class DocumentosZipService:
+    """Construcción de archivos ZIP con documentos de incapacidades."""
+
+    @staticmethod
+    def entradas_incapacidad(incapacidad: Incapacidad) -> list:
+        """(nombre en ZIP, ruta) de cada documento de la incapacidad."""
+        usados = set()
+        return [
+            (
+                nombre_unico_en_zip(_nombre_entrada(doc.tipo_documento, doc.nombre_archivo), usados),
+                _origen(doc.ruta, doc.nivel_almacenamiento, doc.clave_almacenamiento)
+            )
+            for doc in sorted(incapacidad.documentos, key=lambda d: d.id)
+            if not doc.bloqueado
+        ]
+
+    @staticmethod
+    def zip_incapacidad(incapacidad: Incapacidad) -> Iterator[bytes]:
+        """Generador con el ZIP de todos los documentos de una incapacidad."""
+        return generar_zip(DocumentosZipService.entradas_incapacidad(incapacidad))
+
+    @staticmethod
+    def nombre_zip_incapacidad(incapacidad: Incapacidad) -> str:
+        return f"{incapacidad.codigo_radicacion or f'incapacidad_{incapacidad.id}'}_documentos.zip"
+
+    @staticmethod
+    def contar_documentos_auditoria(
+        estado: Optional[str] = None,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+    ) -> int:
+        consulta = db.select(db.func.count(Documento.id)).join(
+            Incapacidad, Incapacidad.id == Documento.incapacidad_id
+        )
+        return db.session.execute(_filtrar(consulta, estado, desde, hasta)).scalar_one()
+
+    @staticmethod
+    def entradas_auditoria(
+        estado: Optional[str] = None,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+        tamaño_bloque: int = TAMAÑO_BLOQUE_DEFAULT,
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        (nombre en ZIP, ruta) de los documentos de las incapacidades filtradas.
+
+        Recorre la tabla por bloques sin instanciar modelos; cada incapacidad
+        queda en una carpeta con su código de radicación.
+        """
+        consulta = _filtrar(
+            db.select(
+                Incapacidad.id.label('incapacidad_id'),
+                Incapacidad.codigo_radicacion,
+                Documento.tipo_documento,
+                Documento.nombre_archivo,
+                Documento.ruta,
+                Documento.nivel_almacenamiento,
+                Documento.clave_almacenamiento,
+            )
+            .join(Incapacidad, Incapacidad.id == Documento.incapacidad_id)
+            .order_by(Incapacidad.id, Documento.id),
+            estado, desde, hasta
+        )
+        resultado = db.session.execute(
+            consulta.execution_options(yield_per=tamaño_bloque, stream_results=True)
+        )
+        try:
+            usados = set()
+            incapacidad_actual = None
+            for fila in resultado:
+                # Los nombres solo pueden repetirse dentro de la misma carpeta
+                if fila.incapacidad_id != incapacidad_actual:
+                    incapacidad_actual = fila.incapacidad_id
+                    usados = set()
+                carpeta = fila.codigo_radicacion or f'incapacidad_{fila.incapacidad_id}'
+                nombre = _nombre_entrada(fila.tipo_documento, fila.nombre_archivo, carpeta)
+                origen = _origen(fila.ruta, fila.nivel_almacenamiento, fila.clave_almacenamiento)
+                yield nombre_unico_en_zip(nombre, usados), origen
+        finally:
+            resultado.close()
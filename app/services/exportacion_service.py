@@ -0,0 +1,244 @@
+"""
+Servicio de exportación de incapacidades para auditoría.
+
+Genera un volcado completo de ``incapacidades`` con su ``historial_estados``
+y los metadatos de ``documentos`` sin cargar la tabla en memoria: la consulta
+principal se recorre por bloques con ``yield_per`` (cursor de servidor cuando
+el motor lo soporta) y el historial/documentos se consultan una vez por bloque.
+Las salidas son generadores de texto (CSV o NDJSON) que pueden comprimirse
+con gzip trozo a trozo, de modo que el uso de memoria es constante sin
+importar el tamaño de la tabla.
+"""
+
+import csv
+import io
+import json
+import logging
+import zlib
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from app.models import db
+from app.models.documento import Documento
+from app.models.historial_estado import HistorialEstado
+from app.models.incapacidad import Incapacidad
+from app.models.usuario import Usuario
+
+logger = logging.getLogger(__name__)
+
+FORMATOS_EXPORTACION = ('csv', 'ndjson')
+
+TAMAÑO_BLOQUE_DEFAULT = 1000
+
+# Tamaño mínimo de cada trozo comprimido que se entrega al cliente
+TAMAÑO_TROZO_GZIP = 64 * 1024
+
+COLUMNAS_CSV = (
+    'id', 'codigo_radicacion', 'usuario_id', 'email_colaborador', 'nombre_colaborador',
+    'tipo', 'fecha_inicio', 'fecha_fin', 'dias', 'estado', 'motivo_rechazo',
+    'fecha_registro', 'fecha_actualizacion', 'historial_estados', 'documentos',
+)
+
+
+def _serializar(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    return valor
+
+
+def _historial_por_incapacidad(ids) -> Dict[int, list]:
+    filas = db.session.execute(
+        db.select(
+            HistorialEstado.incapacidad_id,
+            HistorialEstado.estado_anterior,
+            HistorialEstado.estado_nuevo,
+            HistorialEstado.fecha_cambio,
+            HistorialEstado.usuario_id,
+            HistorialEstado.observaciones,
+        )
+        .where(HistorialEstado.incapacidad_id.in_(ids))
+        .order_by(HistorialEstado.incapacidad_id, HistorialEstado.fecha_cambio)
+    )
+    historial = defaultdict(list)
+    for fila in filas:
+        historial[fila.incapacidad_id].append({
+            'estado_anterior': fila.estado_anterior,
+            'estado_nuevo': fila.estado_nuevo,
+            'fecha_cambio': _serializar(fila.fecha_cambio),
+            'usuario_id': fila.usuario_id,
+            'observaciones': fila.observaciones,
+        })
+    return historial
+
+
+def _documentos_por_incapacidad(ids) -> Dict[int, list]:
+    filas = db.session.execute(
+        db.select(
+            Documento.incapacidad_id,
+            Documento.id,
+            Documento.nombre_archivo,
+            Documento.tipo_documento,
+            Documento.tamaño_bytes,
+            Documento.checksum_md5,
+            Documento.mime_type,
+            Documento.fecha_carga,
+        )
+        .where(Documento.incapacidad_id.in_(ids))
+        .order_by(Documento.incapacidad_id, Documento.id)
+    )
+    documentos = defaultdict(list)
+    for fila in filas:
+        documentos[fila.incapacidad_id].append({
+            'id': fila.id,
+            'nombre_archivo': fila.nombre_archivo,
+            'tipo_documento': fila.tipo_documento,
+            'tamaño_bytes': fila.tamaño_bytes,
+            'checksum_md5': fila.checksum_md5,
+            'mime_type': fila.mime_type,
+            'fecha_carga': _serializar(fila.fecha_carga),
+        })
+    return documentos
+
+
+def iterar_incapacidades(
+    estado: Optional[str] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    tamaño_bloque: int = TAMAÑO_BLOQUE_DEFAULT,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Recorre las incapacidades (filtradas por estado y fecha de inicio) como dicts.
+
+    Solo se seleccionan columnas planas (sin instanciar modelos ni cargar
+    relaciones), y cada bloque de ``tamaño_bloque`` filas dispara exactamente
+    dos consultas adicionales: historial y documentos del bloque.
+    """
+    consulta = (
+        db.select(
+            Incapacidad.id,
+            Incapacidad.codigo_radicacion,
+            Incapacidad.usuario_id,
+            Usuario.email.label('email_colaborador'),
+            Usuario.nombre.label('nombre_colaborador'),
+            Incapacidad.tipo,
+            Incapacidad.fecha_inicio,
+            Incapacidad.fecha_fin,
+            Incapacidad.dias,
+            Incapacidad.estado,
+            Incapacidad.motivo_rechazo,
+            Incapacidad.fecha_registro,
+            Incapacidad.fecha_actualizacion,
+        )
+        .join(Usuario, Usuario.id == Incapacidad.usuario_id)
+        .order_by(Incapacidad.id)
+    )
+    if estado:
+        consulta = consulta.where(Incapacidad.estado == estado)
+    if desde:
+        consulta = consulta.where(Incapacidad.fecha_inicio >= desde)
+    if hasta:
+        consulta = consulta.where(Incapacidad.fecha_inicio <= hasta)
+
+    # yield_per implica stream_results: cursor de servidor en PostgreSQL/MySQL
+    resultado = db.session.execute(
+        consulta.execution_options(yield_per=tamaño_bloque, stream_results=True)
+    )
+    total = 0
+    try:
+        for bloque in resultado.partitions():
+            ids = [fila.id for fila in bloque]
+            historial = _historial_por_incapacidad(ids)
+            documentos = _documentos_por_incapacidad(ids)
+            for fila in bloque:
+                registro = {clave: _serializar(valor) for clave, valor in fila._mapping.items()}
+                registro['historial_estados'] = historial.get(fila.id, [])
+                registro['documentos'] = documentos.get(fila.id, [])
+                yield registro
+            total += len(bloque)
+    finally:
+        resultado.close()
+        logger.info('📤 Exportación: %s incapacidades recorridas', total)
+
+
+def generar_csv(registros: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Convierte los registros a líneas CSV; historial y documentos van como JSON."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+
+    def vaciar():
+        contenido = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return contenido
+
+    escritor.writerow(COLUMNAS_CSV)
+    yield vaciar()
+    for registro in registros:
+        escritor.writerow([
+            json.dumps(registro[columna], ensure_ascii=False)
+            if columna in ('historial_estados', 'documentos') else registro[columna]
+            for columna in COLUMNAS_CSV
+        ])
+        yield vaciar()
+
+
+def generar_ndjson(registros: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Un objeto JSON por línea (historial y documentos anidados)."""
+    for registro in registros:
+        yield json.dumps(registro, ensure_ascii=False) + '\n'
+
+
+def comprimir_gzip(trozos: Iterable[str], tamaño_trozo: int = TAMAÑO_TROZO_GZIP) -> Iterator[bytes]:
+    """Comprime un flujo de texto en formato gzip sin acumularlo en memoria."""
+    compresor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 → cabecera gzip
+    pendiente = []
+    tamaño_pendiente = 0
+    for trozo in trozos:
+        datos = compresor.compress(trozo.encode('utf-8'))
+        if datos:
+            pendiente.append(datos)
+            tamaño_pendiente += len(datos)
+        if tamaño_pendiente >= tamaño_trozo:
+            yield b''.join(pendiente)
+            pendiente = []
+            tamaño_pendiente = 0
+    pendiente.append(compresor.flush())
+    yield b''.join(pendiente)
+
+
+class ExportacionIncapacidadesService:
+    """Exportación de incapacidades con historial y documentos en streaming."""
+
+    @staticmethod
+    def exportar(
+        formato: str = 'csv',
+        comprimir: bool = True,
+        estado: Optional[str] = None,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+        tamaño_bloque: int = TAMAÑO_BLOQUE_DEFAULT,
+    ) -> Iterator:
+        """
+        Retorna un generador con el contenido de la exportación.
+
+        Args:
+            formato: 'csv' o 'ndjson'
+            comprimir: Si True el generador produce bytes gzip; si no, texto
+            estado, desde, hasta: Filtros opcionales (estado y rango de fecha_inicio)
+            tamaño_bloque: Filas por bloque de lectura
+
+        Raises:
+            ValueError: Si el formato no es soportado
+        """
+        if formato not in FORMATOS_EXPORTACION:
+            raise ValueError(f"Formato no soportado: '{formato}'. Use: {', '.join(FORMATOS_EXPORTACION)}")
+
+        registros = iterar_incapacidades(estado=estado, desde=desde, hasta=hasta, tamaño_bloque=tamaño_bloque)
+        trozos = generar_csv(registros) if formato == 'csv' else generar_ndjson(registros)
+        return comprimir_gzip(trozos) if comprimir else trozos
+
+    @staticmethod
+    def nombre_archivo(formato: str, comprimir: bool = True) -> str:
+        nombre = f"incapacidades_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{formato}"
+        return f"{nombre}.gz" if comprimir else nombre
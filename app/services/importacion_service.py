@@ -0,0 +1,346 @@
+"""
+Servicio de importación masiva de incapacidades.
+
+Permite cargar decenas de miles de registros (migración desde el sistema
+anterior de RRHH o lotes mensuales de EPS) sin pasar por el formulario de
+registro: las filas se leen en streaming, se validan con las mismas reglas
+de UC1, los códigos de radicación se reservan por bloque y las inserciones
+se hacen con executemany por lotes. Las notificaciones se consolidan en un
+único resumen para Gestión Humana.
+"""
+
+import codecs
+import csv
+import io
+import itertools
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from app.models import db
+from app.models.enums import EstadoIncapacidadEnum
+from app.models.incapacidad import Incapacidad, TIPOS_INCAPACIDAD, generar_codigos_radicacion
+from app.models.usuario import Usuario
+from app.utils.validaciones import validar_rango_fechas, validar_tipo_incapacidad
+
+logger = logging.getLogger(__name__)
+
+# Columnas esperadas en el archivo (encabezados, sin distinguir mayúsculas)
+COLUMNA_EMAIL = 'email'
+COLUMNA_TIPO = 'tipo'
+COLUMNA_FECHA_INICIO = 'fecha_inicio'
+COLUMNA_FECHA_FIN = 'fecha_fin'
+COLUMNAS_REQUERIDAS = (COLUMNA_EMAIL, COLUMNA_TIPO, COLUMNA_FECHA_INICIO, COLUMNA_FECHA_FIN)
+
+# Formatos de fecha aceptados (ISO y el formato local que exporta Excel)
+FORMATOS_FECHA = ('%Y-%m-%d', '%d/%m/%Y')
+
+TAMAÑO_LOTE_DEFAULT = 500
+# Tope del lote pedido por el usuario (formulario o --lote): acota la memoria
+# del lote y la duración de cada transacción
+TAMAÑO_LOTE_MAX = 5000
+
+# Codificaciones probadas en orden: Excel con configuración regional es-CO
+# guarda los CSV en cp1252; latin-1 decodifica cualquier byte (último recurso)
+CODIFICACIONES_CSV = ('utf-8-sig', 'cp1252', 'latin-1')
+TAMAÑO_BLOQUE_LECTURA = 64 * 1024
+
+# Límite de errores detallados que se conservan en el resumen (memoria acotada)
+MAX_ERRORES_DETALLADOS = 200
+
+
+class ArchivoImportacionInvalido(ValueError):
+    """El archivo no tiene el formato esperado (encabezados, tipo de archivo)."""
+
+
+def _parsear_fecha(valor: str):
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(valor, formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Formato de fecha inválido: '{valor}' (use AAAA-MM-DD o DD/MM/AAAA)")
+
+
+def _normalizar_tipo(valor: str) -> str:
+    """Acepta el nombre legible ('Enfermedad General') o la clave ('enfermedad_general')."""
+    valor = (valor or '').strip()
+    return TIPOS_INCAPACIDAD.get(valor.lower(), valor)
+
+
+def _normalizar_fila(fila: Dict[Any, Any]) -> Dict[str, str]:
+    return {
+        str(clave).strip().lower(): ('' if valor is None else str(valor).strip())
+        for clave, valor in fila.items()
+        if clave is not None
+    }
+
+
+def leer_filas_csv(flujo: Iterable[str]) -> Iterator[Dict[str, str]]:
+    """
+    Itera las filas de un CSV sin cargarlo completo en memoria.
+
+    Detecta el separador a partir del encabezado (',' o ';', este último es el
+    que usa Excel en configuración regional es-CO).
+    """
+    flujo = iter(flujo)
+    encabezado = next(flujo, '')
+    if not encabezado.strip():
+        raise ArchivoImportacionInvalido('El archivo está vacío')
+
+    separador = ';' if encabezado.count(';') > encabezado.count(',') else ','
+    lector = csv.DictReader(itertools.chain([encabezado], flujo), delimiter=separador)
+
+    columnas = {c.strip().lower() for c in (lector.fieldnames or []) if c}
+    faltantes = [c for c in COLUMNAS_REQUERIDAS if c not in columnas]
+    if faltantes:
+        raise ArchivoImportacionInvalido(f"Faltan columnas obligatorias: {', '.join(faltantes)}")
+
+    try:
+        for fila in lector:
+            yield _normalizar_fila(fila)
+    except csv.Error as e:
+        raise ArchivoImportacionInvalido(f'CSV mal formado en la línea {lector.line_num + 1}: {e}') from e
+    except UnicodeDecodeError as e:
+        raise ArchivoImportacionInvalido(
+            f'Codificación no reconocida en la línea {lector.line_num + 1}; guarde el archivo como CSV UTF-8'
+        ) from e
+
+
+def detectar_codificacion(archivo) -> str:
+    """
+    Elige la codificación del CSV antes de importar la primera fila.
+
+    Decodifica el archivo completo por bloques (sin cargarlo en memoria) con
+    cada codificación de CODIFICACIONES_CSV y deja el flujo al inicio. Así
+    un byte inválido al final del archivo no aparece después de haber
+    confirmado los primeros lotes.
+    """
+    for codificacion in CODIFICACIONES_CSV:
+        archivo.seek(0)
+        decodificador = codecs.getincrementaldecoder(codificacion)()
+        try:
+            for bloque in iter(lambda: archivo.read(TAMAÑO_BLOQUE_LECTURA), b''):
+                decodificador.decode(bloque)
+            decodificador.decode(b'', final=True)
+        except UnicodeDecodeError:
+            continue
+        archivo.seek(0)
+        return codificacion
+    raise ArchivoImportacionInvalido('Codificación no reconocida; guarde el archivo como CSV UTF-8')  # pragma: no cover
+
+
+def leer_filas_xlsx(archivo) -> Iterator[Dict[str, str]]:
+    """
+    Itera las filas de la primera hoja de un libro .xlsx en modo solo lectura.
+
+    Requiere la dependencia opcional ``openpyxl``.
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:  # pragma: no cover - depende del entorno
+        raise ArchivoImportacionInvalido(
+            'Para importar archivos .xlsx instale openpyxl o exporte el archivo a CSV'
+        ) from e
+
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        encabezado = [str(c).strip().lower() if c is not None else '' for c in next(filas, ())]
+        faltantes = [c for c in COLUMNAS_REQUERIDAS if c not in encabezado]
+        if faltantes:
+            raise ArchivoImportacionInvalido(f"Faltan columnas obligatorias: {', '.join(faltantes)}")
+
+        for valores in filas:
+            if not any(v not in (None, '') for v in valores):
+                continue
+            fila = {}
+            for clave, valor in zip(encabezado, valores):
+                # Excel entrega las fechas como datetime
+                if isinstance(valor, datetime):
+                    valor = valor.date().isoformat()
+                fila[clave] = valor
+            yield _normalizar_fila(fila)
+    finally:
+        libro.close()
+
+
+def leer_filas_archivo(archivo, nombre_archivo: str) -> Iterator[Dict[str, str]]:
+    """Selecciona el lector según la extensión del archivo subido."""
+    extension = nombre_archivo.rsplit('.', 1)[-1].lower() if '.' in nombre_archivo else ''
+    if extension == 'xlsx':
+        return leer_filas_xlsx(archivo)
+    if extension in ('csv', 'txt'):
+        codificacion = detectar_codificacion(archivo)
+        if codificacion != 'utf-8-sig':
+            logger.info('📥 Importación: archivo %s leído como %s', nombre_archivo, codificacion)
+        flujo = io.TextIOWrapper(archivo, encoding=codificacion, newline='')
+        return leer_filas_csv(flujo)
+    raise ArchivoImportacionInvalido('Formato no soportado. Use CSV (.csv) o Excel (.xlsx)')
+
+
+class ImportacionIncapacidadesService:
+    """Importación masiva de incapacidades por lotes."""
+
+    @staticmethod
+    def importar(
+        filas: Iterable[Dict[str, str]],
+        usuario_auxiliar: Optional[Usuario] = None,
+        tamaño_lote: int = TAMAÑO_LOTE_DEFAULT,
+        notificar: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Valida e inserta filas de incapacidades por lotes.
+
+        Cada lote se confirma por separado: un error de BD solo descarta ese
+        lote y la importación continúa con el siguiente.
+
+        Args:
+            filas: Iterable de dicts con las columnas email, tipo, fecha_inicio, fecha_fin
+            usuario_auxiliar: Usuario que ejecuta la importación (para el resumen)
+            tamaño_lote: Filas por executemany/commit
+            notificar: Si True, envía un único resumen a Gestión Humana al final
+
+        Returns:
+            dict: {'total', 'importadas', 'rechazadas', 'errores': [{'linea', 'error'}], 'codigos': [primero, ultimo]}
+        """
+        resumen = {
+            'total': 0,
+            'importadas': 0,
+            'rechazadas': 0,
+            'errores': [],
+            'codigos': [],
+        }
+        usuarios_por_email: Dict[str, Optional[int]] = {}
+        lote: List[Dict[str, Any]] = []
+
+        def registrar_error(linea, mensaje):
+            resumen['rechazadas'] += 1
+            if len(resumen['errores']) < MAX_ERRORES_DETALLADOS:
+                resumen['errores'].append({'linea': linea, 'error': mensaje})
+
+        # La línea 1 es el encabezado
+        try:
+            for linea, fila in enumerate(filas, start=2):
+                resumen['total'] += 1
+                try:
+                    lote.append(ImportacionIncapacidadesService._validar_fila(fila, linea))
+                except ValueError as e:
+                    registrar_error(linea, str(e))
+                    continue
+
+                if len(lote) >= tamaño_lote:
+                    ImportacionIncapacidadesService._insertar_lote(lote, usuarios_por_email, resumen, registrar_error)
+                    lote = []
+        except ArchivoImportacionInvalido as e:
+            # Los lotes anteriores ya están confirmados: el mensaje debe decirlo
+            if resumen['importadas']:
+                raise ArchivoImportacionInvalido(
+                    f"{e}. Ya se habían importado {resumen['importadas']} filas de lotes anteriores"
+                ) from e
+            raise
+
+        if lote:
+            ImportacionIncapacidadesService._insertar_lote(lote, usuarios_por_email, resumen, registrar_error)
+
+        logger.info(
+            '📥 Importación masiva: %s importadas, %s rechazadas de %s filas', resumen['importadas'], resumen['rechazadas'], resumen['total']
+        )
+
+        if notificar and resumen['total']:
+            try:
+                from app.utils.email_service import notificar_resumen_importacion
+                notificar_resumen_importacion(resumen, usuario_auxiliar)
+            except Exception as e:
+                logger.warning('No se pudo enviar el resumen de importación: %s', e)
+
+        return resumen
+
+    @staticmethod
+    def _validar_fila(fila: Dict[str, str], linea: int) -> Dict[str, Any]:
+        email = fila.get(COLUMNA_EMAIL, '').lower()
+        if not email:
+            raise ValueError('El email del colaborador es obligatorio')
+
+        tipo = _normalizar_tipo(fila.get(COLUMNA_TIPO, ''))
+        tipo_valido, error_tipo = validar_tipo_incapacidad(tipo)
+        if not tipo_valido:
+            raise ValueError(error_tipo)
+
+        fecha_inicio = _parsear_fecha(fila.get(COLUMNA_FECHA_INICIO, ''))
+        fecha_fin = _parsear_fecha(fila.get(COLUMNA_FECHA_FIN, ''))
+        errores_fechas = validar_rango_fechas(fecha_inicio, fecha_fin)
+        if errores_fechas:
+            raise ValueError('; '.join(errores_fechas))
+
+        return {
+            'linea': linea,
+            'email': email,
+            'tipo': tipo,
+            'fecha_inicio': fecha_inicio,
+            'fecha_fin': fecha_fin,
+            'dias': (fecha_fin - fecha_inicio).days + 1,
+        }
+
+    @staticmethod
+    def _resolver_usuarios(emails, usuarios_por_email: Dict[str, Optional[int]]) -> None:
+        """Completa el caché email → id con una sola consulta por lote."""
+        pendientes = {e for e in emails if e not in usuarios_por_email}
+        if not pendientes:
+            return
+        encontrados = db.session.execute(
+            db.select(Usuario.id, db.func.lower(Usuario.email)).where(
+                db.func.lower(Usuario.email).in_(pendientes)
+            )
+        ).all()
+        for usuario_id, email in encontrados:
+            usuarios_por_email[email] = usuario_id
+        for email in pendientes:
+            usuarios_por_email.setdefault(email, None)
+
+    @staticmethod
+    def _insertar_lote(lote, usuarios_por_email, resumen, registrar_error) -> None:
+        ImportacionIncapacidadesService._resolver_usuarios(
+            {fila['email'] for fila in lote}, usuarios_por_email
+        )
+
+        validas = []
+        for fila in lote:
+            usuario_id = usuarios_por_email.get(fila['email'])
+            if usuario_id is None:
+                registrar_error(fila['linea'], f"No existe un usuario con email {fila['email']}")
+                continue
+            validas.append((fila, usuario_id))
+
+        if not validas:
+            return
+
+        try:
+            codigos = generar_codigos_radicacion(len(validas))
+            registros = [
+                {
+                    'usuario_id': usuario_id,
+                    'codigo_radicacion': codigo,
+                    'tipo': fila['tipo'],
+                    'fecha_inicio': fila['fecha_inicio'],
+                    'fecha_fin': fila['fecha_fin'],
+                    'dias': fila['dias'],
+                    'estado': EstadoIncapacidadEnum.PENDIENTE_VALIDACION.value,
+                }
+                for (fila, usuario_id), codigo in zip(validas, codigos)
+            ]
+            # executemany: una sola sentencia preparada para todo el lote
+            db.session.execute(Incapacidad.__table__.insert(), registros)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error('❌ Error insertando lote de importación: %s', e)
+            for fila, _ in validas:
+                registrar_error(fila['linea'], f'Error al guardar el lote: {e}')
+            return
+
+        resumen['importadas'] += len(registros)
+        if not resumen['codigos']:
+            resumen['codigos'] = [codigos[0], codigos[-1]]
+        else:
+            resumen['codigos'][1] = codigos[-1]
@@ -0,0 +1,391 @@
+"""
+Escaneo incremental de integridad del almacenamiento de documentos.
+
+Recorre la tabla ``documentos`` por id en lotes (paginación por clave, sin
+``OFFSET`` ni ``query.all()``) y guarda el último id revisado en
+``EscaneoIntegridad.ultimo_documento_id``: cada ejecución continúa donde
+terminó la anterior, de modo que un escaneo de millones de archivos se
+reparte entre varias noches.
+
+Por cada documento se verifica, en un pool de hilos:
+
+1. Que el archivo exista en su nivel de almacenamiento (caliente o frío).
+2. Que el tamaño coincida con ``tamaño_bytes``.
+3. Que el MD5 coincida con ``checksum_md5`` (si no había uno, se registra).
+
+Al terminar el recorrido se listan los almacenamientos para detectar archivos
+sin fila en ``documentos`` (huérfanos). Los problemas se guardan como
+``HallazgoIntegridad``; nada se borra ni se corrige automáticamente.
+
+La velocidad se puede limitar en documentos y MB por segundo para no
+competir con la operación normal del servidor.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+from app.models import db
+from app.models.documento import Documento
+from app.models.escaneo_integridad import EscaneoIntegridad, HallazgoIntegridad
+from app.models.incapacidad import Incapacidad
+from app.utils.almacenamiento import (
+    NIVEL_CALIENTE,
+    NIVEL_FRIO,
+    ErrorAlmacenamiento,
+    obtener_almacenamiento,
+    ubicacion_documento,
+)
+from app.utils.imagenes import CARPETA_ORIGINALES
+
+logger = logging.getLogger(__name__)
+
+ESTADO_EN_CURSO = 'EN_CURSO'
+ESTADO_COMPLETADO = 'COMPLETADO'
+ESTADO_CANCELADO = 'CANCELADO'
+
+FALTANTE = 'FALTANTE'
+TAMAÑO = 'TAMAÑO'
+CHECKSUM = 'CHECKSUM'
+ERROR = 'ERROR'
+HUERFANO = 'HUERFANO'
+
+TAMAÑO_BLOQUE_HASH = 1024 * 1024
+TAMAÑO_LOTE_HUERFANOS = 500
+
+# Contenido del nivel caliente que no corresponde a filas de documentos
+PREFIJOS_EXCLUIDOS = (f'{CARPETA_ORIGINALES}/',)
+
+
+class LimitadorTasa:
+    """
+    Limita unidades por segundo (documentos, bytes) entre varios hilos.
+
+    Cada llamada a ``consumir`` reserva su turno y duerme lo necesario para
+    que el promedio no supere la tasa. Con tasa 0 o None no limita.
+    """
+
+    def __init__(self, tasa: Optional[float]):
+        self.tasa = tasa or 0
+        self._lock = threading.Lock()
+        self._siguiente = time.monotonic()
+
+    def consumir(self, cantidad: float = 1) -> None:
+        if self.tasa <= 0 or cantidad <= 0:
+            return
+        with self._lock:
+            ahora = time.monotonic()
+            inicio = max(ahora, self._siguiente)
+            self._siguiente = inicio + cantidad / self.tasa
+        espera = inicio - ahora
+        if espera > 0:
+            time.sleep(espera)
+
+
+def verificar_archivo(
+    driver,
+    clave: str,
+    tamaño_esperado: Optional[int] = None,
+    checksum_esperado: Optional[str] = None,
+    calcular_checksum: bool = True,
+    limitador_bytes: Optional[LimitadorTasa] = None,
+) -> Dict[str, Any]:
+    """
+    Verifica un archivo del almacenamiento.
+
+    Returns:
+        dict: {'tipo': None o FALTANTE/TAMAÑO/CHECKSUM/ERROR, 'detalle': str,
+               'checksum': MD5 calculado o None, 'bytes': bytes leídos}
+    """
+    resultado = {'tipo': None, 'detalle': None, 'checksum': None, 'bytes': 0}
+    try:
+        try:
+            tamaño = driver.tamaño(clave)
+        except FileNotFoundError:
+            resultado.update(tipo=FALTANTE, detalle='Archivo no encontrado')
+            return resultado
+
+        if tamaño_esperado is not None and tamaño != tamaño_esperado:
+            resultado.update(tipo=TAMAÑO, detalle=f'{tamaño} bytes (esperados {tamaño_esperado})')
+            return resultado
+
+        if not calcular_checksum:
+            return resultado
+
+        md5 = hashlib.md5()
+        with driver.abrir(clave) as archivo:
+            while True:
+                bloque = archivo.read(TAMAÑO_BLOQUE_HASH)
+                if not bloque:
+                    break
+                if limitador_bytes:
+                    limitador_bytes.consumir(len(bloque))
+                md5.update(bloque)
+                resultado['bytes'] += len(bloque)
+
+        resultado['checksum'] = md5.hexdigest()
+        if checksum_esperado and resultado['checksum'] != checksum_esperado.lower():
+            resultado.update(
+                tipo=CHECKSUM,
+                detalle=f"MD5 {resultado['checksum']} (esperado {checksum_esperado})"
+            )
+    except Exception as e:
+        resultado.update(tipo=ERROR, detalle=str(e)[:500])
+    return resultado
+
+
+class IntegridadService:
+    """Escaneos de integridad de documentos con cursor persistido."""
+
+    @staticmethod
+    def escaneo_en_curso() -> Optional[EscaneoIntegridad]:
+        return db.session.execute(
+            db.select(EscaneoIntegridad)
+            .where(EscaneoIntegridad.estado == ESTADO_EN_CURSO)
+            .order_by(EscaneoIntegridad.id.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+
+    @staticmethod
+    def ultimo_escaneo_completado() -> Optional[EscaneoIntegridad]:
+        return db.session.execute(
+            db.select(EscaneoIntegridad)
+            .where(EscaneoIntegridad.estado == ESTADO_COMPLETADO)
+            .order_by(EscaneoIntegridad.id.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+
+    @staticmethod
+    def escanear(
+        max_documentos: Optional[int] = None,
+        verificar_checksum: Optional[bool] = None,
+        nuevo: bool = False,
+        lote: Optional[int] = None,
+        workers: Optional[int] = None,
+        documentos_por_segundo: Optional[float] = None,
+        mb_por_segundo: Optional[float] = None,
+    ) -> EscaneoIntegridad:
+        """
+        Avanza el escaneo en curso (o inicia uno nuevo).
+
+        Args:
+            max_documentos: Documentos a revisar en esta ejecución (None = hasta terminar).
+                            El escaneo queda EN_CURSO y la siguiente llamada lo continúa
+            verificar_checksum: Calcular MD5 (default: INTEGRIDAD_VERIFICAR_CHECKSUM)
+            nuevo: Cancelar el escaneo en curso y empezar desde el primer documento
+            lote, workers, documentos_por_segundo, mb_por_segundo: Sobrescriben la
+                            configuración INTEGRIDAD_*
+
+        Returns:
+            EscaneoIntegridad: Reporte actualizado (COMPLETADO al terminar el recorrido)
+        """
+        from flask import current_app
+
+        config = current_app.config
+        lote = max(1, lote or config.get('INTEGRIDAD_LOTE', 500))
+        workers = max(1, workers or config.get('INTEGRIDAD_WORKERS', 4))
+        if documentos_por_segundo is None:
+            documentos_por_segundo = config.get('INTEGRIDAD_DOCUMENTOS_POR_SEGUNDO', 0)
+        if mb_por_segundo is None:
+            mb_por_segundo = config.get('INTEGRIDAD_MB_POR_SEGUNDO', 0)
+        max_hallazgos = config.get('INTEGRIDAD_MAX_HALLAZGOS', 10000)
+
+        escaneo = IntegridadService.escaneo_en_curso()
+        if escaneo is not None and nuevo:
+            escaneo.estado = ESTADO_CANCELADO
+            escaneo.fecha_fin = datetime.utcnow()
+            escaneo = None
+        if escaneo is None:
+            if verificar_checksum is None:
+                verificar_checksum = config.get('INTEGRIDAD_VERIFICAR_CHECKSUM', True)
+            escaneo = EscaneoIntegridad(estado=ESTADO_EN_CURSO, verificar_checksum=verificar_checksum)
+            db.session.add(escaneo)
+            db.session.commit()
+            logger.info('🔍 Escaneo de integridad #%s iniciado', escaneo.id)
+        else:
+            logger.info('🔍 Reanudando escaneo de integridad #%s desde el documento #%s', escaneo.id, escaneo.ultimo_documento_id)
+
+        limitador_documentos = LimitadorTasa(documentos_por_segundo)
+        limitador_bytes = LimitadorTasa(mb_por_segundo * 1024 * 1024)
+        contexto = _ContextoEscaneo(escaneo, max_hallazgos)
+        revisados = 0
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='integridad') as pool:
+            while max_documentos is None or revisados < max_documentos:
+                tamaño = lote if max_documentos is None else min(lote, max_documentos - revisados)
+                filas = db.session.execute(
+                    db.select(
+                        Documento.id,
+                        Documento.ruta,
+                        Documento.nivel_almacenamiento,
+                        Documento.clave_almacenamiento,
+                        Documento.tamaño_bytes,
+                        Documento.checksum_md5,
+                    )
+                    .where(Documento.id > escaneo.ultimo_documento_id)
+                    .order_by(Documento.id)
+                    .limit(tamaño)
+                ).all()
+
+                if not filas:
+                    IntegridadService._finalizar(escaneo, contexto, limitador_documentos)
+                    break
+
+                IntegridadService._revisar_lote(
+                    filas, escaneo, contexto, pool, limitador_documentos, limitador_bytes
+                )
+                revisados += len(filas)
+
+        logger.info(
+            f"✅ Escaneo #{escaneo.id} {escaneo.estado}: {escaneo.documentos_revisados} revisados, "
+            f"{escaneo.faltantes} faltantes, {escaneo.tamaño_incorrecto} con tamaño distinto, "
+            f"{escaneo.checksum_incorrecto} con checksum distinto, {escaneo.errores} errores"
+            + (f", {escaneo.huerfanos} huérfanos" if escaneo.huerfanos is not None else '')
+        )
+        return escaneo
+
+    @staticmethod
+    def _revisar_lote(filas, escaneo, contexto, pool, limitador_documentos, limitador_bytes) -> None:
+        """Verifica un lote en paralelo, registra hallazgos y avanza el cursor."""
+        calcular = escaneo.verificar_checksum
+
+        def tarea(fila, driver, clave):
+            limitador_documentos.consumir()
+            return verificar_archivo(
+                driver, clave, fila.tamaño_bytes, fila.checksum_md5, calcular, limitador_bytes
+            )
+
+        pendientes = []
+        for fila in filas:
+            # La ubicación se resuelve en el hilo principal (usa el contexto de la app)
+            try:
+                driver, clave = ubicacion_documento(fila)
+            except ErrorAlmacenamiento as e:
+                pendientes.append((fila, None, {'tipo': ERROR, 'detalle': str(e), 'checksum': None, 'bytes': 0}))
+                continue
+            pendientes.append((fila, clave, pool.submit(tarea, fila, driver, clave)))
+
+        checksums_nuevos = []
+        for fila, clave, futuro in pendientes:
+            resultado = futuro if isinstance(futuro, dict) else futuro.result()
+            escaneo.bytes_verificados += resultado['bytes']
+            tipo = resultado['tipo']
+            if tipo is None:
+                if resultado['checksum'] and not fila.checksum_md5:
+                    checksums_nuevos.append({'id': fila.id, 'checksum_md5': resultado['checksum']})
+                continue
+            contexto.registrar(tipo, fila.id, fila.nivel_almacenamiento, clave, resultado['detalle'])
+
+        if checksums_nuevos:
+            # Documentos antiguos sin MD5: se completa (también sirve como ETag al servirlos)
+            db.session.execute(db.update(Documento), checksums_nuevos)
+            escaneo.checksums_registrados += len(checksums_nuevos)
+
+        escaneo.documentos_revisados += len(filas)
+        escaneo.ultimo_documento_id = filas[-1].id
+        escaneo.fecha_actualizacion = datetime.utcnow()
+        db.session.commit()
+
+    @staticmethod
+    def _finalizar(escaneo, contexto, limitador) -> None:
+        """Detección de huérfanos e incapacidades sin documentos al terminar el recorrido."""
+        escaneo.huerfanos = 0
+        for nivel in (NIVEL_CALIENTE, NIVEL_FRIO):
+            driver = obtener_almacenamiento(nivel)
+            if driver is None:
+                continue
+            for clave in IntegridadService.archivos_huerfanos(driver, nivel, limitador):
+                contexto.registrar(HUERFANO, None, nivel, clave, 'Archivo sin registro en documentos')
+            db.session.commit()
+
+        tiene_documentos = db.select(Documento.id).where(Documento.incapacidad_id == Incapacidad.id).exists()
+        escaneo.incapacidades_sin_documentos = db.session.execute(
+            db.select(db.func.count(Incapacidad.id)).where(~tiene_documentos)
+        ).scalar_one()
+
+        escaneo.estado = ESTADO_COMPLETADO
+        escaneo.fecha_fin = escaneo.fecha_actualizacion = datetime.utcnow()
+        db.session.commit()
+
+    @staticmethod
+    def archivos_huerfanos(driver, nivel: str, limitador: Optional[LimitadorTasa] = None) -> Iterator[str]:
+        """
+        Claves del almacenamiento que no corresponden a ningún documento de ese nivel.
+
+        El listado se compara por lotes contra la BD (índices sobre
+        ``nombre_unico`` y ``clave_almacenamiento``): la memoria usada no
+        depende del número de archivos.
+        """
+        lote = []
+        for clave in driver.listar():
+            nombre = clave.rsplit('/', 1)[-1]
+            if nombre.startswith('.') or clave.startswith(PREFIJOS_EXCLUIDOS):
+                continue
+            lote.append(clave)
+            if len(lote) >= TAMAÑO_LOTE_HUERFANOS:
+                yield from _sin_documento(lote, nivel)
+                if limitador:
+                    limitador.consumir(len(lote))
+                lote = []
+        if lote:
+            yield from _sin_documento(lote, nivel)
+
+
+class _ContextoEscaneo:
+    """Acumula hallazgos de un escaneo respetando INTEGRIDAD_MAX_HALLAZGOS."""
+
+    CONTADORES = {
+        FALTANTE: 'faltantes',
+        TAMAÑO: 'tamaño_incorrecto',
+        CHECKSUM: 'checksum_incorrecto',
+        ERROR: 'errores',
+        HUERFANO: 'huerfanos',
+    }
+
+    def __init__(self, escaneo: EscaneoIntegridad, max_hallazgos: int):
+        self.escaneo = escaneo
+        self.disponibles = max_hallazgos - escaneo.hallazgos.count()
+
+    def registrar(self, tipo, documento_id, nivel, clave, detalle) -> None:
+        atributo = self.CONTADORES[tipo]
+        setattr(self.escaneo, atributo, (getattr(self.escaneo, atributo) or 0) + 1)
+        if tipo != HUERFANO:
+            logger.warning('⚠️ Integridad: documento #%s %s (%s)', documento_id, tipo, detalle)
+        if self.disponibles <= 0:
+            return
+        self.disponibles -= 1
+        db.session.add(HallazgoIntegridad(
+            escaneo_id=self.escaneo.id,
+            tipo=tipo,
+            documento_id=documento_id,
+            nivel_almacenamiento=nivel,
+            clave=clave[:500] if clave else None,
+            detalle=detalle[:500] if detalle else None,
+        ))
+
+
+def _sin_documento(claves, nivel):
+    """Filtra las claves de un lote que no tienen fila en documentos."""
+    if nivel == NIVEL_FRIO:
+        conocidas = set(db.session.execute(
+            db.select(Documento.clave_almacenamiento).where(
+                Documento.nivel_almacenamiento == NIVEL_FRIO,
+                Documento.clave_almacenamiento.in_(claves),
+            )
+        ).scalars())
+        return [clave for clave in claves if clave not in conocidas]
+
+    # Nivel caliente: los archivos se guardan con el nombre único del documento
+    nombres = {clave: os.path.basename(clave) for clave in claves}
+    conocidos = set(db.session.execute(
+        db.select(Documento.nombre_unico).where(
+            Documento.nivel_almacenamiento == NIVEL_CALIENTE,
+            Documento.nombre_unico.in_(set(nombres.values())),
+        )
+    ).scalars())
+    return [clave for clave in claves if nombres[clave] not in conocidos]
@@ -133,7 +133,7 @@ class SolicitudDocumentosService:
                     usuario_auxiliar=usuario_auxiliar
                 )
             except Exception as email_error:
-                logger.warning(f"No se pudo enviar notificación de solicitud: {email_error}")
+                logger.warning('No se pudo enviar notificación de solicitud: %s', email_error)
             
             # g) Retornar éxito
             return True, f"Solicitud creada exitosamente. Vencimiento: {fecha_vencimiento}", solicitudes_creadas
@@ -266,7 +266,7 @@ class SolicitudDocumentosService:
                         email_auxiliar=email_auxiliar
                     )
                 except Exception as email_error:
-                    logger.warning(f"No se pudo notificar documentación completada: {email_error}")
+                    logger.warning('No se pudo notificar documentación completada: %s', email_error)
                 
                 return True, [], []
             
@@ -337,7 +337,7 @@ class SolicitudDocumentosService:
                                     solicitudes_pendientes=solicitudes_pendientes_inc
                                 )
                             except Exception as email_error:
-                                logger.warning(f"Error al enviar recordatorio #1 para #{incapacidad.id}: {email_error}")
+                                logger.warning('Error al enviar recordatorio #1 para #%s: %s', incapacidad.id, email_error)
                             
                             emitir_recordatorio_enviado(
                                 incapacidad_id=solicitud.incapacidad_id,
@@ -368,7 +368,7 @@ class SolicitudDocumentosService:
                                     solicitudes_pendientes=solicitudes_pendientes_inc
                                 )
                             except Exception as email_error:
-                                logger.warning(f"Error al enviar recordatorio #2 para #{incapacidad.id}: {email_error}")
+                                logger.warning('Error al enviar recordatorio #2 para #%s: %s', incapacidad.id, email_error)
                             
                             emitir_recordatorio_enviado(
                                 incapacidad_id=solicitud.incapacidad_id,
@@ -403,7 +403,7 @@ class SolicitudDocumentosService:
                             stats['requieren_citacion'] += 1
                 
                 except Exception as e:
-                    print(f"⚠️ Error procesando solicitud {solicitud.id}: {e}")
+                    logger.exception('⚠️ Error procesando solicitud %s: %s', solicitud.id, e)
                     stats['errores'] += 1
                     continue
             
@@ -412,7 +412,7 @@ class SolicitudDocumentosService:
         
         except Exception as e:
             db.session.rollback()
-            print(f"❌ Error en procesar_recordatorios: {e}")
+            logger.exception('❌ Error en procesar_recordatorios: %s', e)
             stats['errores'] += 1
             return stats
 
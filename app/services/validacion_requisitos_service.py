@@ -45,8 +45,7 @@ class TipoIncapacidadNoDefinido(ValueError):
         
         # Logging inmediato del error
         logger.error(
-            f"E1 - Tipo no definido: incapacidad_id={incapacidad_id}. "
-            "Validación bloqueada hasta definir tipo."
+            'E1 - Tipo no definido: incapacidad_id=%s. Validación bloqueada hasta definir tipo.', incapacidad_id
         )
 
 
@@ -70,9 +69,7 @@ class ReglasNoConfiguradas(Exception):
         
         # Logging con nivel WARNING para administrador
         logger.warning(
-            f"E2 - Reglas no configuradas: tipo='{tipo}'. "
-            "ACCIÓN REQUERIDA: Configurar reglas en REQUISITOS_POR_TIPO. "
-            "Aplicando fallback a validación básica."
+            "E2 - Reglas no configuradas: tipo='%s'. ACCIÓN REQUERIDA: Configurar reglas en REQUISITOS_POR_TIPO. Aplicando fallback a validación básica.", tipo
         )
 
 
@@ -124,9 +121,7 @@ class ValidadorRequisitos:
         Las reglas se definen en el diccionario REQUISITOS_POR_TIPO.
         """
         self._cargar_reglas()
-        logger.info(
-            f"ValidadorRequisitos inicializado con {len(self.REQUISITOS_POR_TIPO)} tipos"
-        )
+        logger.debug('ValidadorRequisitos inicializado con %s tipos', len(self.REQUISITOS_POR_TIPO))
     
     def _cargar_reglas(self):
         """
@@ -246,16 +241,12 @@ class ValidadorRequisitos:
         if not incapacidad.tipo:
             # E1: Tipo no definido - elevar excepción custom
             logger.error(
-                f"E1 - Validación bloqueada: incapacidad {incapacidad.id} "
-                f"sin tipo definido. Usuario: {getattr(incapacidad, 'usuario_id', 'N/A')}"
+                'E1 - Validación bloqueada: incapacidad %s sin tipo definido. Usuario: %s', incapacidad.id, getattr(incapacidad, 'usuario_id', 'N/A')
             )
             raise TipoIncapacidadNoDefinido(incapacidad.id)
         
         tipo = incapacidad.tipo
-        logger.info(
-            f"Validando incapacidad {incapacidad.id} "
-            f"(tipo: {tipo}, días: {incapacidad.dias})"
-        )
+        logger.debug('Validando incapacidad %s (tipo: %s, días: %s)', incapacidad.id, tipo, incapacidad.dias)
         
         # Paso 2: Cargar reglas de validación para ese tipo
         reglas = self._obtener_reglas(tipo)
@@ -264,12 +255,12 @@ class ValidadorRequisitos:
         documentos_cargados = incapacidad.documentos
         tipos_cargados = {doc.tipo_documento for doc in documentos_cargados}
         
-        logger.debug(f"Documentos cargados: {tipos_cargados}")
+        logger.debug('Documentos cargados: %s', tipos_cargados)
         
         # Paso 3-8: Verificar documentos según reglas
         requisitos_totales = self._calcular_requisitos(incapacidad, reglas)
         
-        logger.debug(f"Requisitos totales: {requisitos_totales}")
+        logger.debug('Requisitos totales: %s', requisitos_totales)
         
         # Paso 9: Generar checklist
         faltantes = []
@@ -315,8 +306,7 @@ class ValidadorRequisitos:
         }
         
         logger.info(
-            f"Validación completada: completo={completo}, "
-            f"presentes={len(presentes)}, faltantes={len(faltantes)}"
+            'Validación completada: completo=%s, presentes=%s, faltantes=%s', completo, len(presentes), len(faltantes)
         )
         
         return resultado
@@ -403,8 +393,7 @@ class ValidadorRequisitos:
             
             # Notificar al administrador (logging ya hecho en __init__)
             logger.critical(
-                f"ADMINISTRADOR: Configurar reglas para tipo '{tipo}' "
-                f"en ValidadorRequisitos.REQUISITOS_POR_TIPO"
+                "ADMINISTRADOR: Configurar reglas para tipo '%s' en ValidadorRequisitos.REQUISITOS_POR_TIPO", tipo
             )
             
             # Fallback a validación básica (solo CERTIFICADO)
@@ -415,7 +404,7 @@ class ValidadorRequisitos:
                 'es_fallback': True
             }
             
-            logger.info(f"Aplicando fallback para tipo '{tipo}': {reglas_fallback}")
+            logger.info("Aplicando fallback para tipo '%s': %s", tipo, reglas_fallback)
             return reglas_fallback
         
         return self.REQUISITOS_POR_TIPO[tipo]
@@ -446,7 +435,7 @@ class ValidadorRequisitos:
             if condicion(incapacidad):
                 requisitos.append(documento)
                 logger.debug(
-                    f"Condición cumplida: {regla_condicional['descripcion']}"
+                    'Condición cumplida: %s', regla_condicional['descripcion']
                 )
         
         return requisitos
@@ -564,7 +553,7 @@ class ValidadorRequisitos:
                 }
         """
         if tipo not in self.REQUISITOS_POR_TIPO:
-            logger.warning(f"Tipo de incapacidad no reconocido: {tipo}")
+            logger.warning('Tipo de incapacidad no reconocido: %s', tipo)
             return {
                 'obligatorios': [],
                 'condicionales': [],
@@ -593,7 +582,7 @@ class ValidadorRequisitos:
                 # Si la condición NO se cumple, el documento NO es requerido
                 # (no se agrega ni a obligatorios ni a condicionales)
             except Exception as e:
-                logger.error(f"Error evaluando condición para {documento}: {e}")
+                logger.error('Error evaluando condición para %s: %s', documento, e)
                 # En caso de error, tratar como condicional (no obligatorio)
                 if documento not in condicionales:
                     condicionales.append(documento)
@@ -0,0 +1,140 @@
+/**
+ * Cargas reanudables por fragmentos (protocolo tus 1.0 del endpoint /cargas).
+ *
+ * Cada archivo se envía en fragmentos con PATCH; si la conexión se cae, se
+ * consulta el offset con HEAD y se continúa desde ahí (también después de
+ * recargar la página: la URL de la carga se guarda en localStorage).
+ * El formulario se envía después con '<campo>_carga=<id>' en lugar del archivo.
+ */
+const CargasReanudables = (function () {
+  const ENDPOINT = '/cargas';
+  const TUS_VERSION = '1.0.0';
+  const TAMANO_FRAGMENTO = 2 * 1024 * 1024;  // 2MB por petición
+  const REINTENTOS = 5;
+
+  class ErrorDefinitivo extends Error {}
+
+  function claveLocal(file, campo) {
+    return `carga:${campo}:${file.name}:${file.size}:${file.lastModified}`;
+  }
+
+  function base64(texto) {
+    return btoa(unescape(encodeURIComponent(texto)));
+  }
+
+  function esperar(ms) {
+    return new Promise(resolve => setTimeout(resolve, ms));
+  }
+
+  async function mensajeError(response) {
+    try {
+      const data = await response.json();
+      return (data.errors || []).join(' ') || `Error ${response.status}`;
+    } catch (e) {
+      return `Error ${response.status}`;
+    }
+  }
+
+  async function crear(file, campo) {
+    const response = await fetch(ENDPOINT, {
+      method: 'POST',
+      headers: {
+        'Tus-Resumable': TUS_VERSION,
+        'Upload-Length': String(file.size),
+        'Upload-Metadata': `filename ${base64(file.name)},campo ${base64(campo)}`
+      }
+    });
+    if (response.status !== 201) {
+      throw new ErrorDefinitivo(await mensajeError(response));
+    }
+    return response.headers.get('Location');
+  }
+
+  async function offsetActual(url) {
+    const response = await fetch(url, { method: 'HEAD', headers: { 'Tus-Resumable': TUS_VERSION } });
+    if (!response.ok) {
+      return null;
+    }
+    return parseInt(response.headers.get('Upload-Offset'), 10);
+  }
+
+  /**
+   * Sube un archivo y retorna el id de la carga.
+   * alProgreso(fraccion) se llama después de cada fragmento.
+   */
+  async function subir(file, campo, alProgreso) {
+    const clave = claveLocal(file, campo);
+    let url = localStorage.getItem(clave);
+    let offset = url ? await offsetActual(url).catch(() => null) : null;
+
+    if (offset === null) {
+      url = await crear(file, campo);
+      localStorage.setItem(clave, url);
+      offset = 0;
+    }
+
+    let fallos = 0;
+    while (offset < file.size) {
+      try {
+        const response = await fetch(url, {
+          method: 'PATCH',
+          headers: {
+            'Tus-Resumable': TUS_VERSION,
+            'Upload-Offset': String(offset),
+            'Content-Type': 'application/offset+octet-stream'
+          },
+          body: file.slice(offset, offset + TAMANO_FRAGMENTO)
+        });
+
+        if (response.status === 409 || response.status === 423) {
+          // Offset desincronizado u otro fragmento en curso: consultar y reintentar
+          throw new Error(await mensajeError(response));
+        }
+        if (!response.ok) {
+          localStorage.removeItem(clave);
+          throw new ErrorDefinitivo(await mensajeError(response));
+        }
+
+        offset = parseInt(response.headers.get('Upload-Offset'), 10);
+        fallos = 0;
+        if (alProgreso) {
+          alProgreso(offset / file.size);
+        }
+      } catch (error) {
+        if (error instanceof ErrorDefinitivo || ++fallos > REINTENTOS) {
+          throw error;
+        }
+        await esperar(1000 * 2 ** (fallos - 1));
+        const actual = await offsetActual(url).catch(() => null);
+        if (actual !== null) {
+          offset = actual;
+        }
+      }
+    }
+
+    localStorage.removeItem(clave);
+    return url.split('/').pop();
+  }
+
+  /**
+   * FormData del formulario con los archivos ya subidos por fragmentos.
+   */
+  async function prepararFormData(form, alProgreso) {
+    const formData = new FormData(form);
+    for (const input of form.querySelectorAll('input[type="file"]')) {
+      if (!input.name || !input.files.length) {
+        continue;
+      }
+      const id = await subir(input.files[0], input.name, fraccion => {
+        if (alProgreso) {
+          alProgreso(input.name, fraccion);
+        }
+      });
+      formData.delete(input.name);
+      formData.append(`${input.name}_carga`, id);
+    }
+    return formData;
+  }
+
+  return { subir, prepararFormData };
+})();
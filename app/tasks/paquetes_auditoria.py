@@ -0,0 +1,203 @@
+"""
+Preparación en segundo plano de paquetes ZIP de auditoría.
+
+Un paquete con los documentos de cientos de incapacidades puede tardar
+minutos; en lugar de mantener abierta la petición HTTP, el trabajo se
+ejecuta en un hilo y el auxiliar consulta el progreso hasta que el ZIP
+queda listo para descargar.
+
+El estado de cada trabajo se guarda en ``PAQUETES_FOLDER/<id>.json`` junto a
+``<id>.zip``, así cualquier worker responde el progreso y la descarga. Los
+trabajos más antiguos que PAQUETES_TTL los elimina ``barrer_paquetes``.
+"""
+
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from datetime import datetime
+from threading import Thread
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+ESTADO_EN_COLA = 'EN_COLA'
+ESTADO_EN_PROCESO = 'EN_PROCESO'
+ESTADO_LISTO = 'LISTO'
+ESTADO_ERROR = 'ERROR'
+
+INTERVALO_PROGRESO = 0.5  # segundos entre escrituras del progreso en disco
+
+_ID_VALIDO = re.compile(r'^[0-9a-f]{32}$')
+_CAMPOS_FECHA = ('fecha_inicio', 'fecha_fin')
+
+
+def _carpeta() -> str:
+    from flask import current_app
+    return current_app.config['PAQUETES_FOLDER']
+
+
+def _ruta_estado(carpeta: str, trabajo_id: str) -> str:
+    return os.path.join(carpeta, f'{trabajo_id}.json')
+
+
+def _guardar(carpeta: str, trabajo: Dict[str, Any]) -> None:
+    """Escribe el estado de forma atómica (otro worker nunca lee un JSON a medias)."""
+    ruta = _ruta_estado(carpeta, trabajo['id'])
+    ruta_temporal = f'{ruta}.{os.getpid()}.tmp'
+    datos = {
+        clave: valor.isoformat() if isinstance(valor, datetime) else valor
+        for clave, valor in trabajo.items()
+    }
+    with open(ruta_temporal, 'w', encoding='utf-8') as f:
+        json.dump(datos, f)
+    os.replace(ruta_temporal, ruta)
+
+
+def obtener_trabajo(trabajo_id: str) -> Optional[Dict[str, Any]]:
+    """Estado actual del trabajo (None si no existe o ya expiró)."""
+    if not _ID_VALIDO.match(trabajo_id or ''):
+        return None
+    try:
+        with open(_ruta_estado(_carpeta(), trabajo_id), encoding='utf-8') as f:
+            trabajo = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    for campo in _CAMPOS_FECHA:
+        if trabajo.get(campo):
+            trabajo[campo] = datetime.fromisoformat(trabajo[campo])
+    return trabajo
+
+
+def _construir_paquete(app, trabajo: Dict[str, Any], filtros: Dict[str, Any]) -> None:
+    from app.services.documentos_zip_service import DocumentosZipService
+    from app.utils.zip_stream import generar_zip
+
+    trabajo_id = trabajo['id']
+    with app.app_context():
+        carpeta = app.config['PAQUETES_FOLDER']
+        ruta = os.path.join(carpeta, f'{trabajo_id}.zip')
+        ruta_parcial = f'{ruta}.parcial'
+
+        try:
+            total = DocumentosZipService.contar_documentos_auditoria(**filtros)
+            trabajo.update(estado=ESTADO_EN_PROCESO, total=total)
+            _guardar(carpeta, trabajo)
+            logger.info('📦 Paquete de auditoría %s: %s documentos', trabajo_id, total)
+
+            ultima_escritura = time.monotonic()
+
+            def al_agregar(nombre, agregado):
+                nonlocal ultima_escritura
+                trabajo['procesados'] += 1
+                if not agregado:
+                    trabajo['faltantes'] += 1
+                if time.monotonic() - ultima_escritura >= INTERVALO_PROGRESO:
+                    _guardar(carpeta, trabajo)
+                    ultima_escritura = time.monotonic()
+
+            with open(ruta_parcial, 'wb') as destino:
+                for trozo in generar_zip(DocumentosZipService.entradas_auditoria(**filtros), al_agregar):
+                    destino.write(trozo)
+            os.replace(ruta_parcial, ruta)
+
+            trabajo.update(estado=ESTADO_LISTO, ruta=ruta, fecha_fin=datetime.utcnow())
+            _guardar(carpeta, trabajo)
+            logger.info('✅ Paquete de auditoría %s listo', trabajo_id)
+        except Exception as e:
+            logger.error('❌ Error preparando paquete de auditoría %s: %s', trabajo_id, e, exc_info=True)
+            if os.path.exists(ruta_parcial):
+                os.remove(ruta_parcial)
+            trabajo.update(estado=ESTADO_ERROR, error=str(e), fecha_fin=datetime.utcnow())
+            _guardar(carpeta, trabajo)
+        finally:
+            from app.models import db
+            db.session.remove()
+
+
+def iniciar_paquete(app, usuario_id: int, filtros: Dict[str, Any], en_segundo_plano: bool = True) -> str:
+    """
+    Registra y lanza la construcción de un paquete de auditoría.
+
+    Args:
+        app: Aplicación Flask (``current_app._get_current_object()``)
+        usuario_id: Usuario que solicita el paquete (solo él puede descargarlo)
+        filtros: {'estado', 'desde', 'hasta'} (todos opcionales)
+        en_segundo_plano: False ejecuta en el hilo actual (tests/CLI)
+
+    Returns:
+        str: Identificador del trabajo
+    """
+    carpeta = app.config['PAQUETES_FOLDER']
+    os.makedirs(carpeta, exist_ok=True)
+
+    trabajo = {
+        'id': uuid.uuid4().hex,
+        'usuario_id': usuario_id,
+        'estado': ESTADO_EN_COLA,
+        'total': None,
+        'procesados': 0,
+        'faltantes': 0,
+        'ruta': None,
+        'error': None,
+        'fecha_inicio': datetime.utcnow(),
+        'fecha_fin': None,
+    }
+    # Registrado en disco antes de responder: la consulta de estado puede llegar a otro worker
+    _guardar(carpeta, trabajo)
+
+    if en_segundo_plano:
+        Thread(target=_construir_paquete, args=(app, trabajo, filtros), daemon=True).start()
+    else:
+        _construir_paquete(app, trabajo, filtros)
+
+    return trabajo['id']
+
+
+def barrer_paquetes(max_edad: Optional[int] = None) -> Dict[str, int]:
+    """
+    Elimina los paquetes (estado, ZIP y restos parciales) más antiguos que el TTL.
+
+    La antigüedad se mide desde la última escritura del estado, por lo que un
+    trabajo en curso no se elimina mientras avanza.
+
+    Args:
+        max_edad: Antigüedad mínima en segundos (default: PAQUETES_TTL)
+
+    Returns:
+        dict: {'eliminados': int, 'bytes_liberados': int}
+    """
+    from flask import current_app
+
+    if max_edad is None:
+        max_edad = current_app.config.get('PAQUETES_TTL', 86400)
+    carpeta = _carpeta()
+    resultado = {'eliminados': 0, 'bytes_liberados': 0}
+    if not os.path.isdir(carpeta):
+        return resultado
+
+    limite = time.time() - max_edad
+    for nombre in os.listdir(carpeta):
+        trabajo_id = nombre.split('.', 1)[0]
+        ruta_estado = _ruta_estado(carpeta, trabajo_id)
+        try:
+            # Los archivos sin estado (restos de un worker caído) se juzgan por su propia fecha
+            referencia = ruta_estado if os.path.exists(ruta_estado) else os.path.join(carpeta, nombre)
+            if os.path.getmtime(referencia) > limite:
+                continue
+            ruta = os.path.join(carpeta, nombre)
+            tamaño = os.path.getsize(ruta)
+            os.remove(ruta)
+        except FileNotFoundError:
+            continue
+        resultado['eliminados'] += 1
+        resultado['bytes_liberados'] += tamaño
+
+    if resultado['eliminados']:
+        logger.info(
+            '🧹 Paquetes de auditoría: %s archivos eliminados (%.1f MB)',
+            resultado['eliminados'], resultado['bytes_liberados'] / (1024 * 1024)
+        )
+    return resultado
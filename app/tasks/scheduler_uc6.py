@@ -40,35 +40,143 @@ def procesar_recordatorios_documentos():
         
         if resultado['exito']:
             logger.info(
-                f"✅ Tarea de recordatorios ejecutada correctamente - "
-                f"Procesados: {resultado.get('total_procesados', 0)}, "
-                f"Recordatorios enviados: {resultado.get('recordatorios_enviados', 0)}"
+                '✅ Tarea de recordatorios ejecutada correctamente - Procesados: %s, Recordatorios enviados: %s', resultado.get('total_procesados', 0), resultado.get('recordatorios_enviados', 0)
             )
             return True
         else:
             logger.warning(
-                f"⚠️ Tarea de recordatorios completada con advertencias - "
-                f"{resultado.get('mensaje', 'Sin detalles')}"
+                '⚠️ Tarea de recordatorios completada con advertencias - %s', resultado.get('mensaje', 'Sin detalles')
             )
             return True  # No fallar aunque haya advertencias
             
     except Exception as e:
         # En caso de error, loguear pero no fallar completamente
         # El scheduler debe continuar ejecutándose
-        logger.error(f"❌ Error en tarea programada de recordatorios: {str(e)}", exc_info=True)
+        logger.error('❌ Error en tarea programada de recordatorios: %s', e, exc_info=True)
         return False
 
 
-def registrar_tareas_periodicas(scheduler_instance):
+def archivar_documentos_antiguos(app):
+    """
+    Tarea diaria: mueve al almacenamiento frío los documentos de
+    incapacidades PAGADA/RECHAZADA con más de ALMACENAMIENTO_FRIO_DIAS días.
+    
+    Returns:
+        bool: True si la ejecución fue exitosa
+    """
+    try:
+        logger.info("🔄 Iniciando tarea programada: archivar_documentos_antiguos()")
+        
+        from app.services.almacenamiento_service import AlmacenamientoService
+        
+        with app.app_context():
+            AlmacenamientoService.archivar_documentos_antiguos()
+        return True
+        
+    except Exception as e:
+        logger.error('❌ Error en tarea programada de archivado: %s', e, exc_info=True)
+        return False
+
+
+def barrer_staging_cargas(app):
+    """
+    Tarea horaria: elimina del staging de cargas los archivos abandonados
+    (más antiguos que UPLOAD_STAGING_TTL) para que el disco no crezca.
+    
+    Returns:
+        bool: True si la ejecución fue exitosa
+    """
+    try:
+        from app.utils.staging import barrer_staging
+        
+        with app.app_context():
+            barrer_staging()
+        return True
+        
+    except Exception as e:
+        logger.error('❌ Error en tarea programada de barrido de staging: %s', e, exc_info=True)
+        return False
+
+
+def barrer_paquetes_auditoria(app):
+    """
+    Tarea horaria: elimina los paquetes ZIP de auditoría (y su estado)
+    más antiguos que PAQUETES_TTL para que el disco no crezca.
+    
+    Returns:
+        bool: True si la ejecución fue exitosa
+    """
+    try:
+        from app.tasks.paquetes_auditoria import barrer_paquetes
+        
+        with app.app_context():
+            barrer_paquetes()
+        return True
+        
+    except Exception as e:
+        logger.error('❌ Error en tarea programada de barrido de paquetes: %s', e, exc_info=True)
+        return False
+
+
+def escanear_integridad_documentos(app):
+    """
+    Tarea diaria: avanza el escaneo de integridad de documentos.
+    
+    Cada ejecución revisa hasta INTEGRIDAD_MAX_POR_EJECUCION documentos y
+    deja el cursor guardado; la siguiente noche continúa desde ahí.
+    
+    Returns:
+        bool: True si la ejecución fue exitosa
+    """
+    try:
+        logger.info("🔄 Iniciando tarea programada: escanear_integridad_documentos()")
+        
+        from app.services.integridad_service import IntegridadService
+        
+        with app.app_context():
+            IntegridadService.escanear(max_documentos=app.config.get('INTEGRIDAD_MAX_POR_EJECUCION'))
+        return True
+        
+    except Exception as e:
+        logger.error('❌ Error en tarea programada de integridad: %s', e, exc_info=True)
+        return False
+
+
+def enviar_resumenes_notificaciones(app, frecuencias):
+    """
+    Tarea horaria/diaria: envía un email de resumen a cada usuario con
+    notificaciones diferidas según su frecuencia (HORARIA o DIARIA).
+    
+    Returns:
+        bool: True si la ejecución fue exitosa
+    """
+    try:
+        from app.utils.email_service import enviar_resumenes_notificaciones as enviar_resumenes
+        
+        with app.app_context():
+            enviar_resumenes(frecuencias)
+        return True
+        
+    except Exception as e:
+        logger.error('❌ Error en tarea programada de resúmenes de notificaciones: %s', e, exc_info=True)
+        return False
+
+
+def registrar_tareas_periodicas(scheduler_instance, app=None):
     """
     Registra todas las tareas periódicas de UC6 en el scheduler.
     
     Esta función se ejecuta una vez al startup de la aplicación y configura:
     - Tarea diaria de recordatorios a las 08:00 AM
+    - Tarea diaria de archivado en almacenamiento frío a las 02:00 AM (si está configurado)
+    - Tarea diaria de escaneo incremental de integridad a las 03:00 AM
+    - Tarea horaria de barrido del staging de cargas
+    - Resúmenes de notificaciones: cada hora (HORARIA) y diario a RESUMEN_DIARIO_HORA (DIARIA)
     - Cualquier otra tarea periódica necesaria para UC6
     
     Args:
         scheduler_instance: Instancia de APScheduler (BackgroundScheduler)
+        app: Aplicación Flask (requerida por las tareas que usan la BD)
     
     Returns:
         bool: True si las tareas fueron registradas exitosamente
@@ -88,15 +196,98 @@ def registrar_tareas_periodicas(scheduler_instance):
         
         logger.info("✅ Tarea 'procesar_recordatorios_uc6' registrada para ejecutarse diariamente a las 08:00 AM")
         
+        # Tarea diaria: Archivar documentos de incapacidades cerradas a las 02:00 AM
+        if app is not None and app.config.get('ALMACENAMIENTO_FRIO'):
+            scheduler_instance.add_job(
+                func=archivar_documentos_antiguos,
+                args=[app],
+                trigger=CronTrigger(hour=2, minute=0),
+                id='archivar_documentos_antiguos',
+                name='Mover documentos antiguos a almacenamiento frío',
+                replace_existing=True,
+                misfire_grace_time=3600
+            )
+            logger.info("✅ Tarea 'archivar_documentos_antiguos' registrada para ejecutarse diariamente a las 02:00 AM")
+        
+        # Tarea diaria: Escaneo incremental de integridad a las 03:00 AM
+        if app is not None and app.config.get('INTEGRIDAD_ESCANEO_PROGRAMADO'):
+            scheduler_instance.add_job(
+                func=escanear_integridad_documentos,
+                args=[app],
+                trigger=CronTrigger(hour=3, minute=0),
+                id='escanear_integridad_documentos',
+                name='Escaneo incremental de integridad de documentos',
+                replace_existing=True,
+                misfire_grace_time=3600,
+                max_instances=1
+            )
+            logger.info("✅ Tarea 'escanear_integridad_documentos' registrada para ejecutarse diariamente a las 03:00 AM")
+        
+        # Tarea horaria: Barrer archivos abandonados en el staging de cargas
+        if app is not None:
+            scheduler_instance.add_job(
+                func=barrer_staging_cargas,
+                args=[app],
+                trigger=CronTrigger(minute=30),
+                id='barrer_staging_cargas',
+                name='Barrido del staging de cargas',
+                replace_existing=True,
+                misfire_grace_time=600,
+                max_instances=1
+            )
+            logger.info("✅ Tarea 'barrer_staging_cargas' registrada para ejecutarse cada hora")
+            
+            # Tarea horaria: Eliminar paquetes de auditoría expirados
+            scheduler_instance.add_job(
+                func=barrer_paquetes_auditoria,
+                args=[app],
+                trigger=CronTrigger(minute=45),
+                id='barrer_paquetes_auditoria',
+                name='Barrido de paquetes de auditoría expirados',
+                replace_existing=True,
+                misfire_grace_time=600,
+                max_instances=1
+            )
+            logger.info("✅ Tarea 'barrer_paquetes_auditoria' registrada para ejecutarse cada hora")
+        
+        # Resúmenes de notificaciones: la tarea horaria también despacha lo que quedó
+        # pendiente de usuarios que volvieron al envío inmediato
+        if app is not None and app.config.get('RESUMEN_NOTIFICACIONES_ENABLED'):
+            from app.models.enums import FrecuenciaNotificacionEnum
+            
+            scheduler_instance.add_job(
+                func=enviar_resumenes_notificaciones,
+                args=[app, [FrecuenciaNotificacionEnum.HORARIA, FrecuenciaNotificacionEnum.INMEDIATA]],
+                trigger=CronTrigger(minute=0),
+                id='resumen_notificaciones_horario',
+                name='Resumen horario de notificaciones',
+                replace_existing=True,
+                misfire_grace_time=600,
+                max_instances=1
+            )
+            hora = app.config.get('RESUMEN_DIARIO_HORA', 7)
+            scheduler_instance.add_job(
+                func=enviar_resumenes_notificaciones,
+                args=[app, [FrecuenciaNotificacionEnum.DIARIA]],
+                trigger=CronTrigger(hour=hora, minute=0),
+                id='resumen_notificaciones_diario',
+                name='Resumen diario de notificaciones',
+                replace_existing=True,
+                misfire_grace_time=3600,
+                max_instances=1
+            )
+            logger.info(
+                '✅ Tareas de resumen de notificaciones registradas (cada hora y diaria a las %02d:00)', hora
+            )
+        
         # Aquí se podrían agregar más tareas periódicas en el futuro:
-        # - Limpieza de documentos antiguos
         # - Reportes automáticos
         # - Auditorías programadas
         
         return True
         
     except Exception as e:
-        logger.error(f"❌ Error al registrar tareas periódicas: {str(e)}", exc_info=True)
+        logger.error('❌ Error al registrar tareas periódicas: %s', e, exc_info=True)
         return False
 
 
@@ -129,16 +320,16 @@ def iniciar_scheduler(app=None):
         )
         
         # Registrar todas las tareas periódicas
-        if registrar_tareas_periodicas(scheduler):
+        if registrar_tareas_periodicas(scheduler, app):
             # Iniciar el scheduler
             scheduler.start()
             logger.info("✅ Scheduler iniciado correctamente")
             
             # Loguear las tareas registradas
             jobs = scheduler.get_jobs()
-            logger.info(f"📊 Tareas programadas activas: {len(jobs)}")
+            logger.info('📊 Tareas programadas activas: %s', len(jobs))
             for job in jobs:
-                logger.info(f"   - {job.id}: {job.name} (próxima ejecución: {job.next_run_time})")
+                logger.info('   - %s: %s (próxima ejecución: %s)', job.id, job.name, job.next_run_time)
         else:
             logger.error("❌ No se pudieron registrar las tareas periódicas")
             scheduler = None
@@ -146,7 +337,7 @@ def iniciar_scheduler(app=None):
         return scheduler
         
     except Exception as e:
-        logger.error(f"❌ Error al inicializar scheduler: {str(e)}", exc_info=True)
+        logger.error('❌ Error al inicializar scheduler: %s', e, exc_info=True)
         scheduler = None
         return None
 
@@ -167,7 +358,7 @@ def detener_scheduler():
             scheduler = None
             logger.info("✅ Scheduler detenido correctamente")
         except Exception as e:
-            logger.error(f"❌ Error al detener scheduler: {str(e)}", exc_info=True)
+            logger.error('❌ Error al detener scheduler: %s', e, exc_info=True)
 
 
 def obtener_scheduler():
@@ -191,14 +382,14 @@ def ejecutar_tarea_manual(nombre_tarea):
         bool: True si la tarea se ejecutó correctamente
     """
     try:
-        logger.info(f"🔧 Ejecución manual de tarea: {nombre_tarea}")
+        logger.info('🔧 Ejecución manual de tarea: %s', nombre_tarea)
         
         if nombre_tarea == 'procesar_recordatorios':
             return procesar_recordatorios_documentos()
         else:
-            logger.error(f"❌ Tarea desconocida: {nombre_tarea}")
+            logger.error('❌ Tarea desconocida: %s', nombre_tarea)
             return False
             
     except Exception as e:
-        logger.error(f"❌ Error en ejecución manual de tarea: {str(e)}", exc_info=True)
+        logger.error('❌ Error en ejecución manual de tarea: %s', e, exc_info=True)
         return False
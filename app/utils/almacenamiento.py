@@ -0,0 +1,310 @@
+"""
+Backends de almacenamiento de documentos.
+
+Los documentos se guardan en dos niveles:
+
+- ``caliente``: disco local (UPLOAD_FOLDER). Es donde llegan las cargas y
+  donde trabajan la optimización de imágenes y las previsualizaciones.
+- ``frio``: almacenamiento más económico para documentos de incapacidades
+  cerradas (PAGADA/RECHAZADA). Puede ser otra carpeta local (NAS/NFS) o un
+  bucket compatible con S3 (AWS, MinIO, ...).
+
+Todos los drivers exponen la misma interfaz basada en claves relativas
+(``2025/01/INC1_certificado_....pdf``), de modo que el resto de la
+aplicación no depende de ``os.path.join`` ni del proveedor.
+
+El driver S3 requiere la dependencia opcional ``boto3``.
+"""
+
+import logging
+import os
+import shutil
+from typing import BinaryIO, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+NIVEL_CALIENTE = 'caliente'
+NIVEL_FRIO = 'frio'
+
+TAMAÑO_BLOQUE_COPIA = 1024 * 1024
+
+
+class ErrorAlmacenamiento(Exception):
+    """Error de configuración u operación de un backend de almacenamiento."""
+
+
+class AlmacenamientoLocal:
+    """Driver de sistema de archivos local (una carpeta raíz)."""
+
+    tipo = 'local'
+
+    def __init__(self, carpeta: str):
+        self.carpeta = os.path.abspath(carpeta)
+
+    def __repr__(self) -> str:
+        return f'<AlmacenamientoLocal {self.carpeta}>'
+
+    def _ruta(self, clave: str) -> str:
+        ruta = os.path.abspath(os.path.join(self.carpeta, clave))
+        if os.path.commonpath([self.carpeta, ruta]) != self.carpeta:
+            raise ErrorAlmacenamiento(f"Clave fuera de la carpeta de almacenamiento: '{clave}'")
+        return ruta
+
+    def clave_de_ruta(self, ruta: str) -> Optional[str]:
+        """Clave relativa de una ruta absoluta dentro de la carpeta (None si está fuera)."""
+        ruta = os.path.abspath(ruta)
+        if os.path.commonpath([self.carpeta, ruta]) != self.carpeta:
+            return None
+        return os.path.relpath(ruta, self.carpeta).replace(os.sep, '/')
+
+    def ruta_local(self, clave: str) -> str:
+        return self._ruta(clave)
+
+    def guardar(self, clave: str, origen: BinaryIO, mime_type: Optional[str] = None) -> int:
+        ruta = self._ruta(clave)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = f'{ruta}.tmp'
+        with open(temporal, 'wb') as destino:
+            shutil.copyfileobj(origen, destino, TAMAÑO_BLOQUE_COPIA)
+        os.replace(temporal, ruta)
+        return os.path.getsize(ruta)
+
+    def abrir(self, clave: str) -> BinaryIO:
+        return open(self._ruta(clave), 'rb')
+
+    def existe(self, clave: str) -> bool:
+        return os.path.exists(self._ruta(clave))
+
+    def tamaño(self, clave: str) -> int:
+        return os.path.getsize(self._ruta(clave))
+
+    def eliminar(self, clave: str) -> None:
+        try:
+            os.remove(self._ruta(clave))
+        except FileNotFoundError:
+            pass
+
+    def listar(self, prefijo: str = '') -> Iterator[str]:
+        base = self._ruta(prefijo) if prefijo else self.carpeta
+        for raiz, _, archivos in os.walk(base):
+            for nombre in archivos:
+                if nombre.endswith('.tmp'):
+                    continue
+                yield self.clave_de_ruta(os.path.join(raiz, nombre))
+
+    def url_temporal(self, clave: str, nombre_descarga: str, mime_type: Optional[str] = None,
+                     como_adjunto: bool = True, expira: int = 300) -> Optional[str]:
+        """Los archivos locales se sirven desde la aplicación (o X-Accel-Redirect)."""
+        return None
+
+
+class AlmacenamientoS3:
+    """Driver para buckets compatibles con S3 (AWS S3, MinIO, Ceph...)."""
+
+    tipo = 's3'
+
+    def __init__(
+        self,
+        bucket: str,
+        prefijo: str = '',
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        clase_almacenamiento: Optional[str] = None,
+        cliente=None,
+    ):
+        if not bucket:
+            raise ErrorAlmacenamiento('Debe configurar el bucket del almacenamiento S3')
+
+        if cliente is None:
+            try:
+                import boto3
+                from botocore.config import Config as ConfigBotocore
+            except ImportError as e:  # pragma: no cover - depende del entorno
+                raise ErrorAlmacenamiento('El almacenamiento S3 requiere instalar boto3') from e
+            cliente = boto3.client(
+                's3',
+                endpoint_url=endpoint_url,
+                region_name=region,
+                aws_access_key_id=access_key,
+                aws_secret_access_key=secret_key,
+                # SigV4 y rutas estilo path: requeridos por MinIO y otros compatibles
+                config=ConfigBotocore(
+                    signature_version='s3v4',
+                    s3={'addressing_style': 'path' if endpoint_url else 'auto'},
+                ),
+            )
+
+        self.cliente = cliente
+        self.bucket = bucket
+        self.prefijo = prefijo.strip('/')
+        self.clase_almacenamiento = clase_almacenamiento
+
+    def __repr__(self) -> str:
+        return f'<AlmacenamientoS3 s3://{self.bucket}/{self.prefijo}>'
+
+    def _clave(self, clave: str) -> str:
+        return f'{self.prefijo}/{clave}' if self.prefijo else clave
+
+    def _es_no_encontrado(self, error) -> bool:
+        codigo = getattr(error, 'response', {}).get('Error', {}).get('Code')
+        return codigo in ('404', 'NoSuchKey', 'NotFound')
+
+    def ruta_local(self, clave: str) -> None:
+        return None
+
+    def guardar(self, clave: str, origen: BinaryIO, mime_type: Optional[str] = None) -> int:
+        extra = {}
+        if mime_type:
+            extra['ContentType'] = mime_type
+        if self.clase_almacenamiento:
+            extra['StorageClass'] = self.clase_almacenamiento
+        # upload_fileobj hace carga multiparte para archivos grandes
+        self.cliente.upload_fileobj(origen, self.bucket, self._clave(clave), ExtraArgs=extra or None)
+        return self.tamaño(clave)
+
+    def abrir(self, clave: str) -> BinaryIO:
+        try:
+            return self.cliente.get_object(Bucket=self.bucket, Key=self._clave(clave))['Body']
+        except Exception as e:
+            if self._es_no_encontrado(e):
+                raise FileNotFoundError(clave) from e
+            raise
+
+    def existe(self, clave: str) -> bool:
+        try:
+            self.cliente.head_object(Bucket=self.bucket, Key=self._clave(clave))
+            return True
+        except Exception as e:
+            if self._es_no_encontrado(e):
+                return False
+            raise
+
+    def tamaño(self, clave: str) -> int:
+        try:
+            return self.cliente.head_object(Bucket=self.bucket, Key=self._clave(clave))['ContentLength']
+        except Exception as e:
+            if self._es_no_encontrado(e):
+                raise FileNotFoundError(clave) from e
+            raise
+
+    def eliminar(self, clave: str) -> None:
+        self.cliente.delete_object(Bucket=self.bucket, Key=self._clave(clave))
+
+    def listar(self, prefijo: str = '') -> Iterator[str]:
+        inicio = len(self.prefijo) + 1 if self.prefijo else 0
+        paginador = self.cliente.get_paginator('list_objects_v2')
+        for pagina in paginador.paginate(Bucket=self.bucket, Prefix=self._clave(prefijo)):
+            for objeto in pagina.get('Contents', []):
+                yield objeto['Key'][inicio:]
+
+    def url_temporal(self, clave: str, nombre_descarga: str, mime_type: Optional[str] = None,
+                     como_adjunto: bool = True, expira: int = 300) -> str:
+        """URL prefirmada: el cliente descarga directo del bucket, sin pasar por el worker."""
+        from urllib.parse import quote
+
+        disposicion = 'attachment' if como_adjunto else 'inline'
+        parametros = {
+            'Bucket': self.bucket,
+            'Key': self._clave(clave),
+            'ResponseContentDisposition': f"{disposicion}; filename*=UTF-8''{quote(nombre_descarga, safe='')}",
+        }
+        if mime_type:
+            parametros['ResponseContentType'] = mime_type
+        return self.cliente.generate_presigned_url('get_object', Params=parametros, ExpiresIn=expira)
+
+
+def crear_almacenamiento(tipo: str, **opciones):
+    """Fábrica de drivers: 'local' (carpeta=...) o 's3' (bucket=..., endpoint_url=...)."""
+    if tipo == 'local':
+        return AlmacenamientoLocal(opciones['carpeta'])
+    if tipo == 's3':
+        return AlmacenamientoS3(**opciones)
+    raise ErrorAlmacenamiento(f"Tipo de almacenamiento desconocido: '{tipo}'")
+
+
+def _desde_config(config, nivel: str):
+    if nivel == NIVEL_CALIENTE:
+        return AlmacenamientoLocal(config['UPLOAD_FOLDER'])
+
+    tipo = config.get('ALMACENAMIENTO_FRIO')
+    if not tipo:
+        return None
+    if tipo == 'local':
+        return AlmacenamientoLocal(config['ALMACENAMIENTO_FRIO_CARPETA'])
+    return crear_almacenamiento(
+        tipo,
+        bucket=config.get('ALMACENAMIENTO_FRIO_BUCKET'),
+        prefijo=config.get('ALMACENAMIENTO_FRIO_PREFIJO') or '',
+        endpoint_url=config.get('ALMACENAMIENTO_FRIO_ENDPOINT'),
+        region=config.get('ALMACENAMIENTO_FRIO_REGION'),
+        access_key=config.get('ALMACENAMIENTO_FRIO_ACCESS_KEY'),
+        secret_key=config.get('ALMACENAMIENTO_FRIO_SECRET_KEY'),
+        clase_almacenamiento=config.get('ALMACENAMIENTO_FRIO_CLASE'),
+    )
+
+
+def obtener_almacenamiento(nivel: str = NIVEL_CALIENTE):
+    """
+    Driver configurado para el nivel indicado en la aplicación actual.
+
+    Los drivers se crean una vez por aplicación (``app.extensions``).
+    Retorna None si el nivel frío no está configurado.
+    """
+    from flask import current_app
+
+    drivers = current_app.extensions.setdefault('almacenamiento', {})
+    if nivel not in drivers:
+        drivers[nivel] = _desde_config(current_app.config, nivel)
+    return drivers[nivel]
+
+
+# ---------------------------------------------------------------------------
+# Acceso a documentos (independiente del nivel)
+# ---------------------------------------------------------------------------
+
+def ubicacion_documento(documento):
+    """(driver, clave) donde está almacenado actualmente el documento."""
+    if getattr(documento, 'nivel_almacenamiento', None) == NIVEL_FRIO:
+        driver = obtener_almacenamiento(NIVEL_FRIO)
+        if driver is None:
+            raise ErrorAlmacenamiento('El documento está en almacenamiento frío pero no hay uno configurado')
+        return driver, documento.clave_almacenamiento
+
+    driver = obtener_almacenamiento(NIVEL_CALIENTE)
+    if not os.path.isabs(documento.ruta):
+        # Rutas relativas: siempre fueron relativas a UPLOAD_FOLDER
+        return driver, documento.ruta.replace(os.sep, '/')
+    clave = driver.clave_de_ruta(documento.ruta)
+    if clave is None:
+        # Documentos guardados fuera de UPLOAD_FOLDER (rutas antiguas)
+        driver = AlmacenamientoLocal(os.path.dirname(documento.ruta))
+        clave = os.path.basename(documento.ruta)
+    return driver, clave
+
+
+def ruta_local_documento(documento) -> Optional[str]:
+    """Ruta en disco del documento, o None si está en un almacenamiento remoto."""
+    driver, clave = ubicacion_documento(documento)
+    return driver.ruta_local(clave)
+
+
+def abrir_documento(documento) -> BinaryIO:
+    """Abre el documento para lectura binaria, esté donde esté."""
+    driver, clave = ubicacion_documento(documento)
+    return driver.abrir(clave)
+
+
+def existe_documento(documento) -> bool:
+    try:
+        driver, clave = ubicacion_documento(documento)
+    except ErrorAlmacenamiento:
+        return False
+    return driver.existe(clave)
+
+
+def eliminar_documento(documento) -> None:
+    """Elimina el archivo físico del documento (la fila de BD no se toca)."""
+    driver, clave = ubicacion_documento(documento)
+    driver.eliminar(clave)
@@ -0,0 +1,113 @@
+"""
+Configuración del motor de base de datos a partir de la URL (SQLite o PostgreSQL).
+
+La URL llega del entorno (DATABASE_URL, ver config.py). Para PostgreSQL y
+MySQL se arma ``SQLALCHEMY_ENGINE_OPTIONS`` con el pool de conexiones:
+
+- ``pool_size``/``max_overflow``: conexiones por proceso; con varios workers
+  de gunicorn el total es workers × (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+- ``pool_pre_ping``: descarta conexiones cortadas por el servidor o un proxy
+  (pgbouncer, balanceadores) antes de usarlas.
+- ``pool_recycle``: renueva las conexiones antes de los timeouts de inactividad.
+- PostgreSQL además identifica la aplicación (``application_name``) y puede
+  limitar la duración de las consultas (DB_STATEMENT_TIMEOUT_MS).
+
+SQLite conserva el pool que elige Flask-SQLAlchemy (StaticPool en memoria).
+Las opciones definidas explícitamente en SQLALCHEMY_ENGINE_OPTIONS tienen
+prioridad sobre las calculadas.
+
+En SQLite cada conexión nueva recibe los PRAGMA de ``pragmas_sqlite``:
+WAL (los lectores no se bloquean mientras otro proceso escribe),
+``synchronous=NORMAL`` (seguro con WAL; solo el último commit puede perderse
+ante un corte de energía), ``busy_timeout`` (espera en lugar de fallar con
+"database is locked"), ``mmap_size`` y ``cache_size``.
+"""
+
+import logging
+from typing import Any, Dict, List, Mapping
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+NOMBRE_APLICACION = 'incapacidades'
+NIVELES_SYNCHRONOUS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+def opciones_motor(config: Mapping[str, Any]) -> Dict[str, Any]:
+    """Opciones de ``create_engine`` según el motor de SQLALCHEMY_DATABASE_URI."""
+    backend = make_url(config['SQLALCHEMY_DATABASE_URI']).get_backend_name()
+    if backend == 'sqlite':
+        return {}
+
+    opciones: Dict[str, Any] = {
+        'pool_size': config.get('DB_POOL_SIZE', 5),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': config.get('DB_POOL_PRE_PING', True),
+    }
+
+    if backend == 'postgresql':
+        connect_args = {'application_name': NOMBRE_APLICACION}
+        if config.get('DB_STATEMENT_TIMEOUT_MS'):
+            connect_args['options'] = f"-c statement_timeout={int(config['DB_STATEMENT_TIMEOUT_MS'])}"
+        opciones['connect_args'] = connect_args
+
+    return opciones
+
+
+def configurar_base_datos(app) -> None:
+    """Completa SQLALCHEMY_ENGINE_OPTIONS antes de ``db.init_app``."""
+    opciones = opciones_motor(app.config)
+    opciones.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opciones
+
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    logger.debug('🗄️ Base de datos: %s | opciones: %s', url.render_as_string(hide_password=True), sorted(opciones))
+
+
+def pragmas_sqlite(config: Mapping[str, Any]) -> List[str]:
+    """PRAGMA a ejecutar en cada conexión SQLite nueva según SQLITE_*."""
+    pragmas = []
+    if config.get('SQLITE_WAL', True):
+        pragmas.append('PRAGMA journal_mode=WAL')
+    sincronizacion = str(config.get('SQLITE_SYNCHRONOUS') or '').upper()
+    if sincronizacion:
+        if sincronizacion not in NIVELES_SYNCHRONOUS:
+            raise ValueError(f"SQLITE_SYNCHRONOUS inválido: {sincronizacion} (use {', '.join(NIVELES_SYNCHRONOUS)})")
+        pragmas.append(f"PRAGMA synchronous={sincronizacion}")
+    if config.get('SQLITE_BUSY_TIMEOUT_MS'):
+        pragmas.append(f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}")
+    if config.get('SQLITE_MMAP_MB'):
+        pragmas.append(f"PRAGMA mmap_size={int(config['SQLITE_MMAP_MB']) * 1024 * 1024}")
+    if config.get('SQLITE_CACHE_MB'):
+        # Negativo: tamaño en KiB en lugar de páginas
+        pragmas.append(f"PRAGMA cache_size=-{int(config['SQLITE_CACHE_MB']) * 1024}")
+    return pragmas
+
+
+def registrar_pragmas_sqlite(engine, pragmas: List[str]) -> None:
+    """Ejecuta ``pragmas`` en cada conexión nueva del engine (si es SQLite)."""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _aplicar_pragmas(conexion_dbapi, registro):
+        cursor = conexion_dbapi.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def configurar_conexiones(app) -> None:
+    """Registra los PRAGMA de SQLite en los engines de la app (después de ``db.init_app``)."""
+    from app.models import db
+
+    pragmas = pragmas_sqlite(app.config)
+    with app.app_context():
+        for engine in db.engines.values():
+            registrar_pragmas_sqlite(engine, pragmas)
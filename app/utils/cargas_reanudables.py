@@ -0,0 +1,251 @@
+"""
+Cargas reanudables por fragmentos (protocolo tus 1.0: núcleo, creation y termination).
+
+Flujo del cliente (ver ``static/js/cargas_reanudables.js``):
+
+1. ``POST /cargas`` con ``Upload-Length`` y ``Upload-Metadata`` (filename) →
+   201 con ``Location: /cargas/<id>``.
+2. ``PATCH /cargas/<id>`` con ``Upload-Offset`` y un fragmento del archivo,
+   tantas veces como haga falta. Si la conexión se cae, ``HEAD /cargas/<id>``
+   devuelve el offset recibido y el cliente continúa desde ahí.
+3. El formulario (``registrar`` o ``cargar-documentos-solicitados``) envía
+   ``<campo>_carga=<id>`` en lugar del archivo; el servidor toma el archivo
+   ensamblado y lo procesa como cualquier carga (staging en dos fases).
+
+Los fragmentos se escriben en ``UPLOAD_STAGING_FOLDER/cargas/<id>.part``; el
+estado es el tamaño de ese archivo, por lo que funciona con varios workers en
+el mismo servidor. Las cargas abandonadas las elimina ``barrer_staging``.
+"""
+
+import base64
+import json
+import os
+import re
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from werkzeug.datastructures import FileStorage
+
+from app.utils.validaciones import obtener_mime_type
+
+VERSION_TUS = '1.0.0'
+EXTENSIONES_TUS = 'creation,termination'
+SUBCARPETA = 'cargas'
+TAMAÑO_BLOQUE = 64 * 1024
+BLOQUEO_EXPIRA = 120  # segundos: un PATCH interrumpido no bloquea la carga para siempre
+
+_ID_VALIDO = re.compile(r'^[0-9a-f]{32}$')
+
+
+class ErrorCarga(Exception):
+    """Error del protocolo de cargas; ``codigo`` es el status HTTP a responder."""
+
+    def __init__(self, mensaje: str, codigo: int = 400):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+
+def _config(clave, default=None):
+    from flask import current_app
+    return current_app.config.get(clave, default)
+
+
+def tamaño_maximo() -> int:
+    return int(_config('CARGAS_MAX_MB', 50) * 1024 * 1024)
+
+
+def tamaño_maximo_fragmento() -> int:
+    return int(_config('CARGAS_FRAGMENTO_MB', 5) * 1024 * 1024)
+
+
+def _carpeta() -> str:
+    from app.utils.staging import carpeta_staging
+
+    carpeta = os.path.join(carpeta_staging(), SUBCARPETA)
+    os.makedirs(carpeta, exist_ok=True)
+    return carpeta
+
+
+def _rutas(id_carga: str):
+    if not _ID_VALIDO.match(id_carga or ''):
+        raise ErrorCarga('Carga no encontrada', 404)
+    base = os.path.join(_carpeta(), id_carga)
+    return f'{base}.part', f'{base}.json', f'{base}.lock'
+
+
+def leer_metadata_tus(cabecera: Optional[str]) -> Dict[str, str]:
+    """Decodifica ``Upload-Metadata``: pares 'clave valor_base64' separados por comas."""
+    metadata = {}
+    for par in (cabecera or '').split(','):
+        partes = par.strip().split(' ', 1)
+        if not partes[0]:
+            continue
+        try:
+            metadata[partes[0]] = base64.b64decode(partes[1]).decode('utf-8') if len(partes) > 1 else ''
+        except (ValueError, UnicodeDecodeError):
+            raise ErrorCarga(f"Upload-Metadata inválido en '{partes[0]}'")
+    return metadata
+
+
+def crear_carga(usuario_id: int, nombre_archivo: str, tamaño: int, campo: Optional[str] = None) -> Dict[str, Any]:
+    """Registra una carga nueva y reserva su archivo en staging."""
+    if not nombre_archivo:
+        raise ErrorCarga('Falta el nombre del archivo (Upload-Metadata: filename)')
+    extension = nombre_archivo.rsplit('.', 1)[1].lower() if '.' in nombre_archivo else ''
+    if extension not in _config('ALLOWED_EXTENSIONS', set()):
+        raise ErrorCarga(f'Formato no permitido: .{extension}. Use PDF, JPG, PNG', 415)
+    if tamaño < 0:
+        raise ErrorCarga('Upload-Length inválido')
+    if tamaño > tamaño_maximo():
+        raise ErrorCarga(
+            f"Archivo muy grande ({tamaño / (1024 * 1024):.1f} MB). Máximo: {_config('CARGAS_MAX_MB', 50)} MB", 413
+        )
+
+    id_carga = uuid.uuid4().hex
+    ruta, ruta_meta, _ = _rutas(id_carga)
+    meta = {
+        'id': id_carga,
+        'usuario_id': usuario_id,
+        'nombre_archivo': nombre_archivo,
+        'campo': campo,
+        'tamaño': tamaño,
+        'fecha_creacion': time.time(),
+    }
+    open(ruta, 'wb').close()
+    with open(ruta_meta, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    return dict(meta, offset=0)
+
+
+def obtener_carga(id_carga: str, usuario_id: int) -> Dict[str, Any]:
+    """Metadatos y offset actual; 404 si no existe o es de otro usuario."""
+    ruta, ruta_meta, _ = _rutas(id_carga)
+    try:
+        with open(ruta_meta, encoding='utf-8') as f:
+            meta = json.load(f)
+        meta['offset'] = os.path.getsize(ruta)
+    except (FileNotFoundError, ValueError):
+        raise ErrorCarga('Carga no encontrada', 404)
+    if meta['usuario_id'] != usuario_id:
+        raise ErrorCarga('Carga no encontrada', 404)
+    return meta
+
+
+def _bloquear(ruta_lock: str) -> None:
+    try:
+        os.close(os.open(ruta_lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        try:
+            expirado = time.time() - os.path.getmtime(ruta_lock) > BLOQUEO_EXPIRA
+        except FileNotFoundError:
+            expirado = True
+        if not expirado:
+            raise ErrorCarga('La carga está recibiendo otro fragmento', 423)
+        # Bloqueo de un PATCH que nunca terminó: se toma renovando su marca de tiempo
+        open(ruta_lock, 'a').close()
+        os.utime(ruta_lock)
+
+
+def escribir_fragmento(id_carga: str, usuario_id: int, offset: int, flujo) -> int:
+    """
+    Agrega un fragmento en ``offset``.
+
+    Lo recibido se conserva aunque el cliente se desconecte a mitad del
+    fragmento: el siguiente ``HEAD`` reporta exactamente hasta dónde llegó.
+
+    Returns:
+        int: Nuevo offset
+    """
+    meta = obtener_carga(id_carga, usuario_id)
+    ruta, ruta_meta, ruta_lock = _rutas(id_carga)
+    _bloquear(ruta_lock)
+    try:
+        actual = os.path.getsize(ruta)
+        if offset != actual:
+            raise ErrorCarga(f'Upload-Offset {offset} no coincide con el recibido ({actual})', 409)
+
+        restante = meta['tamaño'] - actual
+        limite = min(restante, tamaño_maximo_fragmento())
+        recibidos = 0
+        with open(ruta, 'ab') as destino:
+            while True:
+                bloque = flujo.read(TAMAÑO_BLOQUE)
+                if not bloque:
+                    break
+                if recibidos + len(bloque) > limite:
+                    destino.write(bloque[:limite - recibidos])
+                    raise ErrorCarga(
+                        'El fragmento supera el tamaño declarado de la carga'
+                        if limite == restante else 'Fragmento demasiado grande', 413
+                    )
+                destino.write(bloque)
+                recibidos += len(bloque)
+        os.utime(ruta_meta)  # La carga sigue activa para barrer_staging
+        return actual + recibidos
+    finally:
+        try:
+            os.remove(ruta_lock)
+        except FileNotFoundError:
+            pass
+
+
+def eliminar_carga(id_carga: str, usuario_id: int) -> None:
+    obtener_carga(id_carga, usuario_id)
+    for ruta in _rutas(id_carga):
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+
+
+class ArchivoCarga(FileStorage):
+    """
+    Archivo ensamblado de una carga reanudable, con la interfaz de FileStorage.
+
+    ``save`` mueve el archivo en lugar de copiarlo: ya está en staging.
+    """
+
+    def __init__(self, ruta: str, ruta_meta: str, nombre_archivo: str):
+        super().__init__(
+            stream=open(ruta, 'rb'),
+            filename=nombre_archivo,
+            content_type=obtener_mime_type(nombre_archivo),
+        )
+        self.ruta = ruta
+        self.ruta_meta = ruta_meta
+
+    def save(self, dst, buffer_size=16384):
+        if not isinstance(dst, (str, os.PathLike)):
+            return super().save(dst, buffer_size)
+        self.stream.close()
+        os.replace(self.ruta, dst)
+        try:
+            os.remove(self.ruta_meta)
+        except FileNotFoundError:
+            pass
+
+
+def archivo_de_carga(id_carga: str, usuario_id: int) -> ArchivoCarga:
+    """Archivo de una carga completa, listo para ``procesar_carga``."""
+    meta = obtener_carga(id_carga, usuario_id)
+    if meta['offset'] != meta['tamaño']:
+        raise ErrorCarga(
+            f"La carga de '{meta['nombre_archivo']}' está incompleta ({meta['offset']} de {meta['tamaño']} bytes)", 409
+        )
+    ruta, ruta_meta, _ = _rutas(id_carga)
+    return ArchivoCarga(ruta, ruta_meta, meta['nombre_archivo'])
+
+
+def archivo_de_formulario(files, form, campo: str, usuario_id: int):
+    """
+    Archivo de un campo del formulario: el adjunto directo o, si se envió
+    ``<campo>_carga``, la carga reanudable correspondiente.
+
+    Returns:
+        tuple: (archivo o None, tamaño máximo en MB que se le aplica)
+    """
+    id_carga = form.get(f'{campo}_carga') if form is not None else None
+    if id_carga:
+        return archivo_de_carga(id_carga, usuario_id), _config('CARGAS_MAX_MB', 50)
+    return files.get(campo), 10
@@ -0,0 +1,107 @@
+"""
+Directorio en caché de destinatarios de Gestión Humana (roles auxiliar y gestion_humana).
+
+Las notificaciones a RRHH se disparan en cada registro de incapacidad; en
+lugar de consultar la tabla de usuarios cada vez, el directorio se carga una
+vez por aplicación (solo las columnas necesarias) y se reutiliza.
+
+Invalidación:
+- Cualquier alta, cambio o baja de un Usuario marca la sesión; cuando esa
+  transacción termina (commit o rollback) el directorio se descarta y se
+  recarga en la siguiente consulta. No se invalida en el flush para no
+  cachear cambios que luego se revierten.
+- DIRECTORIO_RRHH_TTL (segundos) acota el tiempo que un proceso puede ver
+  cambios hechos por otro proceso (varios workers de gunicorn, scripts).
+"""
+
+import logging
+import time
+from threading import Lock
+from typing import NamedTuple, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.usuario import Usuario
+
+logger = logging.getLogger(__name__)
+
+ROLES_RRHH = ('auxiliar', 'gestion_humana')
+CLAVE_SUCIO = 'directorio_rrhh_sucio'
+
+_version = 0
+_lock = Lock()
+
+
+class DestinatarioRRHH(NamedTuple):
+    id: int
+    nombre: str
+    email: str
+    email_notificaciones: Optional[str]
+    rol: str
+    frecuencia_notificaciones: str = 'INMEDIATA'
+
+    @property
+    def email_envio(self) -> str:
+        """Email de notificaciones, con el de login como respaldo."""
+        return self.email_notificaciones or self.email
+
+
+def invalidar_directorio() -> None:
+    """Descarta el directorio en caché de todas las aplicaciones del proceso."""
+    global _version
+    with _lock:
+        _version += 1
+
+
+def destinatarios_rrhh() -> Tuple[DestinatarioRRHH, ...]:
+    """Destinatarios de Gestión Humana (desde caché si está vigente)."""
+    from flask import current_app
+    from app.models import db
+
+    ttl = current_app.config.get('DIRECTORIO_RRHH_TTL', 300)
+    cache = current_app.extensions.setdefault('directorio_rrhh', {})
+    entrada = cache.get('entrada')
+    if entrada and entrada[0] == _version and time.monotonic() - entrada[1] < ttl:
+        return entrada[2]
+
+    version = _version
+    filas = db.session.execute(
+        db.select(
+            Usuario.id, Usuario.nombre, Usuario.email, Usuario.email_notificaciones, Usuario.rol,
+            Usuario.frecuencia_notificaciones,
+        )
+        .where(Usuario.rol.in_(ROLES_RRHH))
+        .order_by(Usuario.id)
+    ).all()
+    destinatarios = tuple(DestinatarioRRHH(*fila) for fila in filas)
+    cache['entrada'] = (version, time.monotonic(), destinatarios)
+    logger.info('👥 Directorio RRHH cargado: %s destinatario(s)', len(destinatarios))
+    return destinatarios
+
+
+def buscar_destinatario(email: str) -> Optional[DestinatarioRRHH]:
+    """Destinatario de RRHH por email de login o de notificaciones."""
+    email = (email or '').lower()
+    for destinatario in destinatarios_rrhh():
+        if email in (destinatario.email.lower(), (destinatario.email_notificaciones or '').lower()):
+            return destinatario
+    return None
+
+
+@event.listens_for(Usuario, 'after_insert')
+@event.listens_for(Usuario, 'after_update')
+@event.listens_for(Usuario, 'after_delete')
+def _marcar_sucio(mapper, connection, target):
+    sesion = Session.object_session(target)
+    if sesion is not None:
+        sesion.info[CLAVE_SUCIO] = True
+    else:
+        invalidar_directorio()
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _invalidar_al_terminar(sesion, transaccion):
+    if transaccion.parent is None and sesion.info.pop(CLAVE_SUCIO, False):
+        invalidar_directorio()
+
@@ -3,7 +3,6 @@ UC2: Servicio de Notificaciones por Email
 Notifica a líder y Gestión Humana sobre eventos del sistema
 Incluye logging, reintentos y hooks de almacenamiento
 """
-from flask import render_template
 from flask_mail import Mail, Message
 from threading import Thread
 from config import Config
@@ -11,12 +10,10 @@ import time
 import logging
 from datetime import datetime
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+from app.utils.directorio_rrhh import buscar_destinatario, destinatarios_rrhh
+from app.utils.plantillas import renderizar_email
+from app.utils.unidad_trabajo import confirmar, despues_de_commit, unidad_de_trabajo
+
 logger = logging.getLogger(__name__)
 
 mail = Mail()
@@ -29,23 +26,21 @@ def get_usuarios_gestion_humana():
     """
     UC2-E4: Obtiene lista de usuarios activos del área de Gestión Humana
     
+    Usa el directorio en caché (app/utils/directorio_rrhh.py), que se
+    invalida al crear, modificar o eliminar usuarios.
+    
     Returns:
-        list: Lista de objetos Usuario con rol 'auxiliar' o 'gestion_humana'
+        tuple: DestinatarioRRHH (id, nombre, email, email_notificaciones, rol)
+               de los usuarios con rol 'auxiliar' o 'gestion_humana'
     """
-    from app.models.usuario import Usuario
-    from app.models import db
-    
     try:
-        usuarios = Usuario.query.filter(
-            Usuario.rol.in_(['auxiliar', 'gestion_humana'])
-        ).all()
-        
-        logger.info(f"👥 UC2-E4: Encontrados {len(usuarios)} usuarios de Gestión Humana activos")
+        usuarios = destinatarios_rrhh()
+        logger.info('👥 UC2-E4: Encontrados %s usuarios de Gestión Humana activos', len(usuarios))
         return usuarios
         
     except Exception as e:
-        logger.error(f"❌ UC2-E4: Error al obtener usuarios de Gestión Humana: {str(e)}")
-        return []
+        logger.error('❌ UC2-E4: Error al obtener usuarios de Gestión Humana: %s', e)
+        return ()
 
 
 def crear_notificacion_interna(tipo, destinatario_id, asunto, contenido, solicitud_documento_id=None):
@@ -86,20 +81,79 @@ def crear_notificacion_interna(tipo, destinatario_id, asunto, contenido, solicit
         db.session.add(notificacion)
         db.session.flush()  # Obtener ID sin commit
         
-        logger.info(
-            f"📬 UC2: Notificación interna creada #{notificacion.id} "
-            f"(tipo={tipo_str}, dest={destinatario_id})"
+        logger.debug(
+            '📬 UC2: Notificación interna creada #%s (tipo=%s, dest=%s)', notificacion.id, tipo_str, destinatario_id
         )
         
         return notificacion
         
     except Exception as e:
-        logger.error(f"❌ UC2: Error al crear notificación interna: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception('❌ UC2: Error al crear notificación interna: %s', e)
         return None
 
 
+def crear_notificaciones_masivas(tipo, destinatarios_ids, asunto, contenido, estado=None, en_resumen=False):
+    """
+    UC2: Crea la misma notificación interna para varios destinatarios con un solo INSERT
+    
+    Args:
+        tipo: TipoNotificacionEnum o string
+        destinatarios_ids: IDs de los usuarios destinatarios
+        asunto: Asunto de la notificación
+        contenido: Contenido ya renderizado (compartido por todas)
+        estado: EstadoNotificacionEnum inicial (default: PENDIENTE)
+        en_resumen: Si True, el email se difiere al resumen de cada destinatario
+        
+    Returns:
+        list: IDs de las notificaciones creadas (sin commit)
+    """
+    from app.models.notificacion import Notificacion
+    from app.models.enums import EstadoNotificacionEnum
+    from app.models.tipos import nuevo_id
+    from app.models import db
+    
+    if not destinatarios_ids:
+        return []
+    
+    tipo_str = tipo.value if hasattr(tipo, 'value') else str(tipo)
+    estado_str = (estado or EstadoNotificacionEnum.PENDIENTE).value
+    ahora = datetime.utcnow()
+    filas = [
+        {
+            'id': nuevo_id(),
+            'tipo': tipo_str,
+            'destinatario_id': destinatario_id,
+            'asunto': asunto[:150],
+            'contenido': contenido,
+            'fecha_envio': ahora,
+            'estado': estado_str,
+            'en_resumen': en_resumen,
+        }
+        for destinatario_id in destinatarios_ids
+    ]
+    db.session.execute(db.insert(Notificacion), filas)
+    
+    logger.info('📬 UC2: %s notificaciones internas creadas (tipo=%s)', len(filas), tipo_str)
+    return [fila['id'] for fila in filas]
+
+
+def _actualizar_notificaciones(notificacion_ids, estado):
+    """Actualiza el estado de varias notificaciones con un solo UPDATE y commit."""
+    from app.models.notificacion import Notificacion
+    from app.models import db
+    
+    try:
+        db.session.execute(
+            db.update(Notificacion)
+            .where(Notificacion.id.in_(notificacion_ids))
+            .values(estado=estado.value)
+        )
+        db.session.commit()
+    except Exception as e:
+        logger.error('❌ UC2: Error al actualizar %s notificaciones a %s: %s', len(notificacion_ids), estado.value, e)
+        db.session.rollback()
+
+
 def marcar_notificacion_enviada(notificacion_id):
     """
     UC2 (paso 9): Marca una notificación como enviada
@@ -118,13 +172,13 @@ def marcar_notificacion_enviada(notificacion_id):
         if notificacion:
             notificacion.marcar_enviada()
             db.session.commit()
-            logger.info(f"✅ UC2: Notificación #{notificacion_id} marcada como enviada")
+            logger.debug('✅ UC2: Notificación #%s marcada como enviada', notificacion_id)
             return True
         else:
-            logger.warning(f"⚠️ UC2: Notificación #{notificacion_id} no encontrada")
+            logger.warning('⚠️ UC2: Notificación #%s no encontrada', notificacion_id)
             return False
     except Exception as e:
-        logger.error(f"❌ UC2: Error al marcar notificación #{notificacion_id} como enviada: {str(e)}")
+        logger.error('❌ UC2: Error al marcar notificación #%s como enviada: %s', notificacion_id, e)
         db.session.rollback()
         return False
 
@@ -147,13 +201,13 @@ def marcar_notificacion_entregada(notificacion_id):
         if notificacion:
             notificacion.marcar_entregada()
             db.session.commit()
-            logger.info(f"✅ UC2: Notificación #{notificacion_id} marcada como entregada")
+            logger.debug('✅ UC2: Notificación #%s marcada como entregada', notificacion_id)
             return True
         else:
-            logger.warning(f"⚠️ UC2: Notificación #{notificacion_id} no encontrada")
+            logger.warning('⚠️ UC2: Notificación #%s no encontrada', notificacion_id)
             return False
     except Exception as e:
-        logger.error(f"❌ UC2: Error al marcar notificación #{notificacion_id} como entregada: {str(e)}")
+        logger.error('❌ UC2: Error al marcar notificación #%s como entregada: %s', notificacion_id, e)
         db.session.rollback()
         return False
 
@@ -172,6 +226,33 @@ def get_email_notificaciones(usuario):
         return None
     return usuario.email_notificaciones or usuario.email
 
+
+# Tipos cuyo email no espera al resumen: piden una acción inmediata del colaborador
+TIPOS_SIEMPRE_INMEDIATOS = {'SEGUNDA_NOTIFICACION_DOCUMENTOS', 'REQUERIMIENTO_CITACION'}
+
+
+def va_a_resumen(tipo, frecuencia):
+    """
+    Indica si el email de una notificación se difiere al resumen del destinatario
+    
+    Args:
+        tipo: TipoNotificacionEnum o string
+        frecuencia: Preferencia del destinatario (FrecuenciaNotificacionEnum o string)
+    
+    Returns:
+        bool: True si el email se envía en el próximo resumen HORARIA/DIARIA
+    """
+    from flask import current_app
+    from app.models.enums import FrecuenciaNotificacionEnum
+    
+    tipo_str = tipo.value if hasattr(tipo, 'value') else str(tipo)
+    return bool(
+        current_app.config.get('RESUMEN_NOTIFICACIONES_ENABLED', True)
+        and frecuencia
+        and frecuencia != FrecuenciaNotificacionEnum.INMEDIATA
+        and tipo_str not in TIPOS_SIEMPRE_INMEDIATOS
+    )
+
 # Configuración de reintentos (se puede sobrescribir desde Config)
 def get_max_reintentos():
     """Obtiene el número máximo de reintentos desde Config o usa default"""
@@ -192,7 +273,7 @@ def get_reintento_delay():
 MAX_REINTENTOS = get_max_reintentos()
 REINTENTO_DELAY = get_reintento_delay()
 
-def send_async_email(app, msg, reintentos=MAX_REINTENTOS, notificacion_id=None):
+def send_async_email(app, msg, reintentos=MAX_REINTENTOS, notificacion_id=None, notificacion_ids=None):
     """
     UC2-E3: Envía email de forma asíncrona con sistema de reintentos (3 veces, 5 min)
     UC2 (paso 8): Registra log completo de notificaciones enviadas
@@ -203,10 +284,13 @@ def send_async_email(app, msg, reintentos=MAX_REINTENTOS, notificacion_id=None):
         msg: Mensaje a enviar
         reintentos: Número máximo de reintentos (default: 3)
         notificacion_id: ID de notificación interna asociada (opcional)
+        notificacion_ids: IDs de notificaciones de un envío a varios destinatarios (opcional)
         
     Returns:
         bool: True si el envío fue exitoso
     """
+    from app.models.enums import EstadoNotificacionEnum
+    
     with app.app_context():
         intento = 1
         while intento <= reintentos:
@@ -215,16 +299,14 @@ def send_async_email(app, msg, reintentos=MAX_REINTENTOS, notificacion_id=None):
                 
                 # UC2 (paso 8): Log detallado de envío exitoso
                 logger.info(
-                    f"✅ UC2 (paso 8): Email enviado exitosamente "
-                    f"| Subject: {msg.subject} "
-                    f"| Recipients: {', '.join(msg.recipients)} "
-                    f"| Timestamp: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')} "
-                    f"| Intentos: {intento}/{reintentos}"
+                    '✅ UC2 (paso 8): Email enviado exitosamente | Subject: %s | Recipients: %s | Intentos: %s/%s', msg.subject, ', '.join(msg.recipients), intento, reintentos
                 )
                 
                 # UC2 (paso 9): Marcar notificación como entregada
                 if notificacion_id:
                     marcar_notificacion_entregada(notificacion_id)
+                if notificacion_ids:
+                    _actualizar_notificaciones(notificacion_ids, EstadoNotificacionEnum.ENTREGADA)
                 
                 return True
                 
@@ -232,21 +314,14 @@ def send_async_email(app, msg, reintentos=MAX_REINTENTOS, notificacion_id=None):
                 if intento < reintentos:
                     # UC2-E3: Reintento con delay de 5 minutos (300s)
                     logger.warning(
-                        f"⚠️ UC2-E3: Error en intento {intento}/{reintentos} "
-                        f"| Subject: {msg.subject} "
-                        f"| Error: {str(e)} "
-                        f"| Reintentando en {REINTENTO_DELAY}s..."
+                        '⚠️ UC2-E3: Error en intento %s/%s | Subject: %s | Error: %s | Reintentando en %ss...', intento, reintentos, msg.subject, e, REINTENTO_DELAY
                     )
                     time.sleep(REINTENTO_DELAY)
                     intento += 1
                 else:
                     # UC2-E3: Error definitivo después de 3 reintentos
                     logger.error(
-                        f"❌ UC2-E3: Error definitivo tras {reintentos} intentos "
-                        f"| Subject: {msg.subject} "
-                        f"| Recipients: {', '.join(msg.recipients)} "
-                        f"| Error: {str(e)} "
-                        f"| Timestamp: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}"
+                        '❌ UC2-E3: Error definitivo tras %s intentos | Subject: %s | Recipients: %s | Error: %s | Timestamp: %s', reintentos, msg.subject, ', '.join(msg.recipients), e, datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
                     )
                     
                     # Registrar error en notificación interna si existe
@@ -260,11 +335,14 @@ def send_async_email(app, msg, reintentos=MAX_REINTENTOS, notificacion_id=None):
                                 db.session.commit()
                         except:
                             pass
+                    if notificacion_ids:
+                        _actualizar_notificaciones(notificacion_ids, EstadoNotificacionEnum.ERROR)
                     
                     return False
 
 def send_email(subject, recipients, html_body, text_body=None, reintentos=MAX_REINTENTOS, 
-               crear_notificacion=False, tipo_notificacion=None, destinatario_id=None):
+               crear_notificacion=False, tipo_notificacion=None, destinatario_id=None,
+               notificacion_ids=None):
     """
     UC2: Envía un email con logging, manejo de errores y notificación interna opcional
     UC2-E2: Si el correo es inválido, solo envía notificación interna
@@ -278,17 +356,31 @@ def send_email(subject, recipients, html_body, text_body=None, reintentos=MAX_RE
         crear_notificacion: Si True, crea notificación interna en BD
         tipo_notificacion: TipoNotificacionEnum para notificación interna
         destinatario_id: ID de usuario para notificación interna
+        notificacion_ids: Notificaciones ya creadas (envío a varios) que se
+                          marcan como entregadas al enviarse el email
+    
+    Si el destinatario prefiere resúmenes (frecuencia HORARIA o DIARIA), la
+    notificación interna se crea igual pero el email queda para el próximo
+    resumen (enviar_resumenes_notificaciones).
     
     Returns:
-        dict: {'email_ok': bool, 'notificacion_id': str|None}
+        dict: {'email_ok': bool, 'notificacion_id': str|None, 'en_resumen': bool}
     """
     from flask import current_app
     import re
     
-    resultado = {'email_ok': False, 'notificacion_id': None}
+    resultado = {'email_ok': False, 'notificacion_id': None, 'en_resumen': False}
     
     # UC2 (paso 6-7): Crear notificación interna PRIMERO si se solicita
     if crear_notificacion and destinatario_id and tipo_notificacion:
+        from app.models import db
+        from app.models.usuario import Usuario
+        
+        destinatario = db.session.get(Usuario, destinatario_id)
+        diferir = destinatario is not None and va_a_resumen(
+            tipo_notificacion, destinatario.frecuencia_notificaciones
+        )
+        
         notificacion = crear_notificacion_interna(
             tipo=tipo_notificacion,
             destinatario_id=destinatario_id,
@@ -298,10 +390,21 @@ def send_email(subject, recipients, html_body, text_body=None, reintentos=MAX_RE
         if notificacion:
             notificacion_id = notificacion.id
             resultado['notificacion_id'] = notificacion_id
-            # Marcar como enviada inmediatamente
-            notificacion.marcar_enviada()
-            from app.models import db
-            db.session.commit()
+            if diferir:
+                # Queda PENDIENTE hasta el resumen del destinatario
+                notificacion.en_resumen = True
+            else:
+                # Marcar como enviada inmediatamente
+                notificacion.marcar_enviada()
+            confirmar()
+            
+            if diferir:
+                logger.info(
+                    '🗓️ UC2: Email diferido al resumen %s del usuario %s: %s', destinatario.frecuencia_notificaciones, destinatario_id, subject
+                )
+                resultado['email_ok'] = True
+                resultado['en_resumen'] = True
+                return resultado
     
     # UC2-E2: Validar formato de emails
     email_regex = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
@@ -309,24 +412,19 @@ def send_email(subject, recipients, html_body, text_body=None, reintentos=MAX_RE
     
     if emails_invalidos:
         logger.error(
-            f"❌ UC2-E2: Email(s) con formato inválido detectado(s): {', '.join(emails_invalidos)}. "
-            f"Solo se enviará notificación interna."
+            '❌ UC2-E2: Email(s) con formato inválido detectado(s): %s. Solo se enviará notificación interna.', ', '.join(emails_invalidos)
         )
         # Ya se creó la notificación interna arriba
         return resultado
     
     # Validar destinatarios
     if not recipients or not any(recipients):
-        logger.error(f"❌ UC2: No se puede enviar email sin destinatarios. Subject: {subject}")
+        logger.error('❌ UC2: No se puede enviar email sin destinatarios. Subject: %s', subject)
         return resultado
     
     # Verificar si el envío de emails está habilitado
     if not current_app.config.get('MAIL_ENABLED', True):
-        logger.info(f"📧 [SIMULADO] Email NO enviado (MAIL_ENABLED=False)")
-        logger.info(f"   Subject: {subject}")
-        logger.info(f"   To: {', '.join(recipients)}")
-        logger.info(f"   Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        logger.info(f"   💡 Cambia MAIL_ENABLED=True en .env para enviar emails reales")
+        logger.info('📧 [SIMULADO] Email NO enviado (MAIL_ENABLED=False): %s | To: %s', subject, ', '.join(recipients))
         resultado['email_ok'] = True
     else:
         try:
@@ -338,17 +436,20 @@ def send_email(subject, recipients, html_body, text_body=None, reintentos=MAX_RE
                 body=text_body or html_body
             )
             
-            # Enviar en segundo plano para no bloquear
-            Thread(
+            # Enviar en segundo plano para no bloquear, con las notificaciones ya
+            # confirmadas (dentro de una unidad de trabajo, al hacer su commit)
+            hilo = Thread(
                 target=send_async_email,
-                args=(current_app._get_current_object(), msg, reintentos, resultado.get('notificacion_id'))
-            ).start()
+                args=(current_app._get_current_object(), msg, reintentos, resultado.get('notificacion_id'),
+                      notificacion_ids)
+            )
+            despues_de_commit(hilo.start)
             
-            logger.info(f"📤 UC2: Email programado para envío: {subject}")
+            logger.debug('📤 UC2: Email programado para envío: %s', subject)
             resultado['email_ok'] = True
             
         except Exception as e:
-            logger.error(f"❌ UC2: Error al programar envío de email: {str(e)}")
+            logger.error('❌ UC2: Error al programar envío de email: %s', e)
     
     return resultado
 
@@ -372,21 +473,21 @@ def send_multiple_emails(emails_data, delay=1.0):
             enviados = 0
             fallidos = 0
             
-            logger.info(f"📬 Iniciando envío de batch: {len(emails_list)} emails")
+            logger.info('📬 Iniciando envío de batch: %s emails', len(emails_list))
             
             for i, email_data in enumerate(emails_list):
                 # Validar datos del email
                 if not email_data.get('recipients'):
-                    logger.warning(f"⚠️ Email {i+1}/{len(emails_list)} omitido: sin destinatarios")
+                    logger.warning('⚠️ Email %s/%s omitido: sin destinatarios', i + 1, len(emails_list))
                     fallidos += 1
                     continue
                 
                 # Verificar si el envío está habilitado
                 if not app.config.get('MAIL_ENABLED', True):
-                    logger.info(f"📧 [SIMULADO] Email {i+1}/{len(emails_list)}")
-                    logger.info(f"   Subject: {email_data['subject']}")
-                    logger.info(f"   To: {', '.join(email_data['recipients'])}")
-                    logger.info(f"   Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+                    logger.info('📧 [SIMULADO] Email %s/%s', i + 1, len(emails_list))
+                    logger.info('   Subject: %s', email_data['subject'])
+                    logger.info('   To: %s', ', '.join(email_data['recipients']))
+                    logger.info('   Timestamp: %s', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
                     enviados += 1
                 else:
                     # Enviar email real con reintentos
@@ -402,20 +503,19 @@ def send_multiple_emails(emails_data, delay=1.0):
                                 body=email_data.get('text_body', email_data['html_body'])
                             )
                             mail.send(msg)
-                            logger.info(f"✅ Email {i+1}/{len(emails_list)} enviado: {email_data['subject']}")
+                            logger.info('✅ Email %s/%s enviado: %s', i + 1, len(emails_list), email_data['subject'])
                             enviados += 1
                             exito = True
                         except Exception as e:
                             if intento < MAX_REINTENTOS:
                                 logger.warning(
-                                    f"⚠️ Error en intento {intento}/{MAX_REINTENTOS} "
-                                    f"(Email {i+1}/{len(emails_list)}): {str(e)}. Reintentando..."
+                                    '⚠️ Error en intento %s/%s (Email %s/%s): %s. Reintentando...', intento, MAX_REINTENTOS, i + 1, len(emails_list), e
                                 )
                                 time.sleep(REINTENTO_DELAY)
                                 intento += 1
                             else:
                                 logger.error(
-                                    f"❌ Error definitivo en email {i+1}/{len(emails_list)}: {str(e)}"
+                                    '❌ Error definitivo en email %s/%s: %s', i + 1, len(emails_list), e
                                 )
                                 fallidos += 1
                 
@@ -425,7 +525,7 @@ def send_multiple_emails(emails_data, delay=1.0):
             
             # Resumen del batch
             logger.info(
-                f"📊 Batch completado: {enviados} enviados, {fallidos} fallidos de {len(emails_list)} totales"
+                '📊 Batch completado: %s enviados, %s fallidos de %s totales', enviados, fallidos, len(emails_list)
             )
     
     # Enviar en thread separado
@@ -435,6 +535,78 @@ def send_multiple_emails(emails_data, delay=1.0):
     ).start()
 
 
+def notificar_rrhh(tipo, asunto, plantilla, contexto, destinatarios=None, reintentos=3):
+    """
+    UC2: Envía la misma notificación a todos los destinatarios de Gestión Humana
+    
+    La plantilla se renderiza una sola vez, las notificaciones internas se
+    crean con un solo INSERT y se programa un único email con todos los
+    destinatarios: agregar usuarios de RRHH no agrega consultas ni renders.
+    Las notificaciones se confirman (commit) como ENVIADA antes de programar
+    el email, para que el hilo de envío pueda marcarlas como entregadas; dentro
+    de una unidad de trabajo, el email sale después de su commit.
+    
+    Args:
+        tipo: TipoNotificacionEnum de las notificaciones internas
+        asunto: Asunto del email y de las notificaciones
+        plantilla: Template del email (ej. 'emails/notificacion_gestion_humana.html')
+        contexto: dict con las variables de la plantilla
+        destinatarios: DestinatarioRRHH a notificar (default: directorio completo)
+        reintentos: Número de reintentos del email
+        
+    Los destinatarios que prefieren resúmenes reciben la notificación interna
+    (PENDIENTE, en_resumen) y el email llega en su próximo resumen.
+    
+    Returns:
+        dict: {'email_ok': bool, 'notificaciones_internas': int, 'destinatarios': list de emails,
+               'en_resumen': int}
+    """
+    from app.models.enums import EstadoNotificacionEnum
+    from app.models import db
+    
+    if destinatarios is None:
+        destinatarios = destinatarios_rrhh()
+    
+    inmediatos = [d for d in destinatarios if not va_a_resumen(tipo, d.frecuencia_notificaciones)]
+    diferidos = [d for d in destinatarios if va_a_resumen(tipo, d.frecuencia_notificaciones)]
+    
+    html_body = renderizar_email(plantilla, **contexto)
+    notificacion_ids = crear_notificaciones_masivas(
+        tipo, [d.id for d in inmediatos], asunto, html_body, estado=EstadoNotificacionEnum.ENVIADA
+    )
+    diferidas_ids = crear_notificaciones_masivas(
+        tipo, [d.id for d in diferidos], asunto, html_body, en_resumen=True
+    )
+    if notificacion_ids or diferidas_ids:
+        confirmar()
+    
+    if destinatarios and not inmediatos:
+        logger.info('🗓️ UC2: Email a RRHH diferido al resumen de %s destinatario(s): %s', len(diferidos), asunto)
+        return {
+            'email_ok': True,
+            'notificaciones_internas': len(diferidas_ids),
+            'destinatarios': [],
+            'en_resumen': len(diferidas_ids),
+        }
+    
+    # Sin usuarios de RRHH: buzón genérico de Gestión Humana
+    emails = list(dict.fromkeys(d.email_envio for d in inmediatos)) or [Config.GESTION_HUMANA_EMAIL]
+    resultado = send_email(
+        subject=asunto,
+        recipients=emails,
+        html_body=html_body,
+        reintentos=reintentos,
+        notificacion_ids=notificacion_ids
+    )
+    
+    return {
+        'email_ok': resultado['email_ok'],
+        'notificaciones_internas': len(notificacion_ids) + len(diferidas_ids),
+        'destinatarios': emails,
+        'en_resumen': len(diferidas_ids),
+    }
+
+
 # ============================================================================
 # UC2: Notificaciones de Incapacidades
 # ============================================================================
@@ -461,132 +633,108 @@ def notificar_nueva_incapacidad(incapacidad):
     """
     from flask import current_app, url_for
     from app.models.enums import TipoNotificacionEnum
-    from app.models import db
     
-    logger.info(f"🔔 UC2: Iniciando notificaciones para incapacidad #{incapacidad.id} ({incapacidad.codigo_radicacion})")
+    logger.info('🔔 UC2: Iniciando notificaciones para incapacidad #%s (%s)', incapacidad.id, incapacidad.codigo_radicacion)
     
     resultado = {'email_ok': True, 'notificaciones_internas': 0}
     
     try:
-        # Validar datos necesarios
-        if not incapacidad.usuario or not incapacidad.usuario.email:
-            logger.error(f"❌ UC2: No se puede notificar incapacidad #{incapacidad.id}: usuario sin email")
-            return {'email_ok': False, 'notificaciones_internas': 0}
-        
-        # Obtener email de notificaciones (fallback a email de login si no existe)
-        email_colaborador = incapacidad.usuario.email_notificaciones or incapacidad.usuario.email
+        # Una sola transacción para todas las notificaciones (SAVEPOINT si el
+        # registro ya abrió una unidad de trabajo); los emails salen tras el commit
+        with unidad_de_trabajo():
+            # Validar datos necesarios
+            if not incapacidad.usuario or not incapacidad.usuario.email:
+                logger.error('❌ UC2: No se puede notificar incapacidad #%s: usuario sin email', incapacidad.id)
+                return {'email_ok': False, 'notificaciones_internas': 0}
+        
+            # Obtener email de notificaciones (fallback a email de login si no existe)
+            email_colaborador = incapacidad.usuario.email_notificaciones or incapacidad.usuario.email
+        
+            # UC2-E4: Verificar si hay usuarios de Gestión Humana activos (directorio en caché)
+            usuarios_rrhh = get_usuarios_gestion_humana()
+        
+            if not usuarios_rrhh:
+                # E4: No hay usuarios de Gestión Humana, notificar a administrador
+                logger.warning(
+                    '⚠️ UC2-E4: No hay usuarios de Gestión Humana activos. Notificando a administrador (%s)', Config.ADMIN_EMAIL
+                )
+            
+                # Enviar notificación urgente al administrador
+                admin_email_resultado = send_email(
+                    subject=f'🚨 URGENTE: Nueva incapacidad sin RRHH asignado - {incapacidad.codigo_radicacion}',
+                    recipients=[Config.ADMIN_EMAIL],
+                    html_body=renderizar_email(
+                        'emails/notificacion_admin_sin_rrhh.html',
+                        incapacidad=incapacidad,
+                        colaborador=incapacidad.usuario
+                    ),
+                    reintentos=3
+                )
+            
+                if not admin_email_resultado['email_ok']:
+                    logger.error('❌ UC2-E4: Error crítico - No se pudo notificar al administrador')
+            
+                # Verificar email genérico de Gestión Humana (fallback de notificar_rrhh)
+                if not Config.GESTION_HUMANA_EMAIL or Config.GESTION_HUMANA_EMAIL == 'gestionhumana@empresa.com':
+                    logger.warning(
+                        '⚠️ UC2: GESTION_HUMANA_EMAIL no configurado correctamente. Usando valor por defecto: %s', Config.GESTION_HUMANA_EMAIL
+                    )
         
-        # UC2-E4: Verificar si hay usuarios de Gestión Humana activos
-        usuarios_rrhh = get_usuarios_gestion_humana()
+            # === EMAIL 1: Confirmación al colaborador ===
+            logger.info('📤 UC2 (paso 4): Enviando confirmación a colaborador %s', email_colaborador)
         
-        if not usuarios_rrhh:
-            # E4: No hay usuarios de Gestión Humana, notificar a administrador
-            logger.warning(
-                f"⚠️ UC2-E4: No hay usuarios de Gestión Humana activos. "
-                f"Notificando a administrador ({Config.ADMIN_EMAIL})"
-            )
-            
-            # Enviar notificación urgente al administrador
-            admin_email_resultado = send_email(
-                subject=f'🚨 URGENTE: Nueva incapacidad sin RRHH asignado - {incapacidad.codigo_radicacion}',
-                recipients=[Config.ADMIN_EMAIL],
-                html_body=render_template(
-                    'emails/notificacion_admin_sin_rrhh.html',
+            email1_resultado = send_email(
+                subject=f'✅ Incapacidad {incapacidad.codigo_radicacion} registrada exitosamente',
+                recipients=[email_colaborador],
+                html_body=renderizar_email(
+                    'emails/confirmacion_registro.html',
                     incapacidad=incapacidad,
                     colaborador=incapacidad.usuario
                 ),
-                reintentos=3
-            )
-            
-            if not admin_email_resultado['email_ok']:
-                logger.error(f"❌ UC2-E4: Error crítico - No se pudo notificar al administrador")
-            
-            # Usar email genérico de RRHH como fallback
-            email_gestion = Config.GESTION_HUMANA_EMAIL
-        else:
-            # Usar primer usuario de RRHH disponible
-            email_gestion = usuarios_rrhh[0].email_notificaciones or usuarios_rrhh[0].email
-            logger.info(f"👤 UC2: Usuario RRHH seleccionado: {email_gestion}")
-        
-        # Verificar email de Gestión Humana
-        if not email_gestion or email_gestion == 'gestionhumana@empresa.com':
-            logger.warning(
-                f"⚠️ UC2: GESTION_HUMANA_EMAIL no configurado correctamente. "
-                f"Usando valor por defecto: {email_gestion}"
+                reintentos=3,
+                crear_notificacion=True,
+                tipo_notificacion=TipoNotificacionEnum.REGISTRO_INCAPACIDAD,
+                destinatario_id=incapacidad.usuario.id
             )
         
-        # === EMAIL 1: Confirmación al colaborador ===
-        logger.info(f"📤 UC2 (paso 4): Enviando confirmación a colaborador {email_colaborador}")
+            if email1_resultado['notificacion_id']:
+                resultado['notificaciones_internas'] += 1
+                logger.debug('✅ UC2 (pasos 6-7): Notificación interna creada para colaborador')
         
-        email1_resultado = send_email(
-            subject=f'✅ Incapacidad {incapacidad.codigo_radicacion} registrada exitosamente',
-            recipients=[email_colaborador],
-            html_body=render_template(
-                'emails/confirmacion_registro.html',
-                incapacidad=incapacidad,
-                colaborador=incapacidad.usuario
-            ),
-            reintentos=3,
-            crear_notificacion=True,
-            tipo_notificacion=TipoNotificacionEnum.REGISTRO_INCAPACIDAD,
-            destinatario_id=incapacidad.usuario.id
-        )
+            # === EMAIL 2: Notificación a Gestión Humana (todos los destinatarios) ===
+            logger.info('📤 UC2 (paso 5): Enviando notificación a RRHH (%s destinatario(s))', len(usuarios_rrhh))
         
-        if email1_resultado['notificacion_id']:
-            resultado['notificaciones_internas'] += 1
-            logger.info(f"✅ UC2 (pasos 6-7): Notificación interna creada para colaborador")
-        
-        # === EMAIL 2: Notificación a Gestión Humana ===
-        logger.info(f"📤 UC2 (paso 5): Enviando notificación a RRHH {email_gestion}")
-        
-        # Buscar ID del usuario de RRHH si existe
-        destinatario_rrhh_id = None
-        if usuarios_rrhh:
-            for usr in usuarios_rrhh:
-                if (usr.email_notificaciones == email_gestion or usr.email == email_gestion):
-                    destinatario_rrhh_id = usr.id
-                    break
-        
-        email2_resultado = send_email(
-            subject=f'🔔 Nueva incapacidad {incapacidad.codigo_radicacion} - {incapacidad.usuario.nombre}',
-            recipients=[email_gestion],
-            html_body=render_template(
+            email2_resultado = notificar_rrhh(
+                TipoNotificacionEnum.REGISTRO_INCAPACIDAD,
+                f'🔔 Nueva incapacidad {incapacidad.codigo_radicacion} - {incapacidad.usuario.nombre}',
                 'emails/notificacion_gestion_humana.html',
-                incapacidad=incapacidad,
-                colaborador=incapacidad.usuario,
-                tipo_notificacion='nueva'
-            ),
-            reintentos=3,
-            crear_notificacion=True if destinatario_rrhh_id else False,
-            tipo_notificacion=TipoNotificacionEnum.REGISTRO_INCAPACIDAD,
-            destinatario_id=destinatario_rrhh_id
-        )
-        
-        if email2_resultado['notificacion_id']:
-            resultado['notificaciones_internas'] += 1
-            logger.info(f"✅ UC2 (pasos 6-7): Notificación interna creada para RRHH")
+                {
+                    'incapacidad': incapacidad,
+                    'colaborador': incapacidad.usuario,
+                    'tipo_notificacion': 'nueva',
+                },
+                destinatarios=usuarios_rrhh
+            )
         
-        # Commit de notificaciones internas
-        db.session.commit()
+            if email2_resultado['notificaciones_internas']:
+                resultado['notificaciones_internas'] += email2_resultado['notificaciones_internas']
+                logger.info(
+                    '✅ UC2 (pasos 6-7): %s notificación(es) interna(s) creada(s) para RRHH', email2_resultado['notificaciones_internas']
+                )
         
         # Evaluar resultado final
         resultado['email_ok'] = email1_resultado['email_ok'] and email2_resultado['email_ok']
         
         logger.info(
-            f"✅ UC2: Proceso completo para incapacidad #{incapacidad.id} ({incapacidad.codigo_radicacion}) "
-            f"| Emails programados: {2 if resultado['email_ok'] else 'con errores'} "
-            f"| Notificaciones internas: {resultado['notificaciones_internas']}"
+            '✅ UC2: Proceso completo para incapacidad #%s (%s) | Emails programados: %s | Notificaciones internas: %s', incapacidad.id, incapacidad.codigo_radicacion, 2 if resultado['email_ok'] else 'con errores', resultado['notificaciones_internas']
         )
         
         return resultado
         
     except Exception as e:
-        logger.error(
-            f"❌ UC2: Error crítico al procesar notificaciones para incapacidad #{incapacidad.id}: {str(e)}"
+        logger.exception(
+            '❌ UC2: Error crítico al procesar notificaciones para incapacidad #%s: %s', incapacidad.id, e
         )
-        import traceback
-        logger.error(traceback.format_exc())
-        db.session.rollback()
         return {'email_ok': False, 'notificaciones_internas': 0}
 
 
@@ -604,12 +752,12 @@ def notificar_validacion_completada(incapacidad):
     from app.models.enums import TipoNotificacionEnum
     from app.models import db
     
-    logger.info(f"🔔 UC2: Notificando validación completada para #{incapacidad.id}")
+    logger.info('🔔 UC2: Notificando validación completada para #%s', incapacidad.id)
     
     email_colaborador = get_email_notificaciones(incapacidad.usuario)
     
     # Preparar contenido de notificación interna
-    contenido_html = render_template(
+    contenido_html = renderizar_email(
         'emails/validacion_completada.html',
         incapacidad=incapacidad,
         colaborador=incapacidad.usuario
@@ -626,15 +774,15 @@ def notificar_validacion_completada(incapacidad):
     )
     
     if resultado['email_ok']:
-        logger.info(f"✅ UC2: Notificación de validación enviada para #{incapacidad.id}")
+        logger.info('✅ UC2: Notificación de validación enviada para #%s', incapacidad.id)
         if resultado['notificacion_id']:
-            logger.info(f"📬 UC2: Notificación interna creada #{resultado['notificacion_id']}")
+            logger.debug('📬 UC2: Notificación interna creada #%s', resultado['notificacion_id'])
     
     # Commit de la notificación interna
     try:
         db.session.commit()
     except Exception as e:
-        logger.error(f"❌ Error al commit de notificación interna: {str(e)}")
+        logger.error('❌ Error al commit de notificación interna: %s', e)
         db.session.rollback()
     
     return resultado
@@ -655,12 +803,12 @@ def notificar_documentos_faltantes(incapacidad, observaciones):
     from app.models.enums import TipoNotificacionEnum
     from app.models import db
     
-    logger.info(f"🔔 UC2: Notificando documentos faltantes para #{incapacidad.id}")
+    logger.info('🔔 UC2: Notificando documentos faltantes para #%s', incapacidad.id)
     
     email_colaborador = get_email_notificaciones(incapacidad.usuario)
     
     # Preparar contenido de notificación interna
-    contenido_html = render_template(
+    contenido_html = renderizar_email(
         'emails/documentos_faltantes.html',
         incapacidad=incapacidad,
         colaborador=incapacidad.usuario,
@@ -678,15 +826,15 @@ def notificar_documentos_faltantes(incapacidad, observaciones):
     )
     
     if resultado['email_ok']:
-        logger.info(f"✅ UC2: Notificación de documentos faltantes enviada para #{incapacidad.id}")
+        logger.info('✅ UC2: Notificación de documentos faltantes enviada para #%s', incapacidad.id)
         if resultado['notificacion_id']:
-            logger.info(f"📬 UC2: Notificación interna creada #{resultado['notificacion_id']}")
+            logger.debug('📬 UC2: Notificación interna creada #%s', resultado['notificacion_id'])
     
     # Commit de la notificación interna
     try:
         db.session.commit()
     except Exception as e:
-        logger.error(f"❌ Error al commit de notificación interna: {str(e)}")
+        logger.error('❌ Error al commit de notificación interna: %s', e)
         db.session.rollback()
     
     return resultado
@@ -706,12 +854,12 @@ def notificar_aprobacion(incapacidad):
     from app.models.enums import TipoNotificacionEnum
     from app.models import db
     
-    logger.info(f"🔔 UC2: Notificando aprobación para #{incapacidad.id}")
+    logger.info('🔔 UC2: Notificando aprobación para #%s', incapacidad.id)
     
     email_colaborador = get_email_notificaciones(incapacidad.usuario)
     
     # Preparar contenido de notificación interna
-    contenido_html = render_template(
+    contenido_html = renderizar_email(
         'emails/incapacidad_aprobada.html',
         incapacidad=incapacidad,
         colaborador=incapacidad.usuario
@@ -728,15 +876,15 @@ def notificar_aprobacion(incapacidad):
     )
     
     if resultado['email_ok']:
-        logger.info(f"✅ UC2: Notificación de aprobación enviada para #{incapacidad.id}")
+        logger.info('✅ UC2: Notificación de aprobación enviada para #%s', incapacidad.id)
         if resultado['notificacion_id']:
-            logger.info(f"📬 UC2: Notificación interna creada #{resultado['notificacion_id']}")
+            logger.debug('📬 UC2: Notificación interna creada #%s', resultado['notificacion_id'])
     
     # Commit de la notificación interna
     try:
         db.session.commit()
     except Exception as e:
-        logger.error(f"❌ Error al commit de notificación interna: {str(e)}")
+        logger.error('❌ Error al commit de notificación interna: %s', e)
         db.session.rollback()
     
     return resultado
@@ -756,12 +904,12 @@ def notificar_rechazo(incapacidad):
     from app.models.enums import TipoNotificacionEnum
     from app.models import db
     
-    logger.info(f"🔔 UC2: Notificando rechazo para #{incapacidad.id}")
+    logger.info('🔔 UC2: Notificando rechazo para #%s', incapacidad.id)
     
     email_colaborador = get_email_notificaciones(incapacidad.usuario)
     
     # Preparar contenido de notificación interna
-    contenido_html = render_template(
+    contenido_html = renderizar_email(
         'emails/incapacidad_rechazada.html',
         incapacidad=incapacidad,
         colaborador=incapacidad.usuario
@@ -778,20 +926,58 @@ def notificar_rechazo(incapacidad):
     )
     
     if resultado['email_ok']:
-        logger.info(f"✅ UC2: Notificación de rechazo enviada para #{incapacidad.id}")
+        logger.info('✅ UC2: Notificación de rechazo enviada para #%s', incapacidad.id)
         if resultado['notificacion_id']:
-            logger.info(f"📬 UC2: Notificación interna creada #{resultado['notificacion_id']}")
+            logger.debug('📬 UC2: Notificación interna creada #%s', resultado['notificacion_id'])
     
     # Commit de la notificación interna
     try:
         db.session.commit()
     except Exception as e:
-        logger.error(f"❌ Error al commit de notificación interna: {str(e)}")
+        logger.error('❌ Error al commit de notificación interna: %s', e)
         db.session.rollback()
     
     return resultado
 
 
+def notificar_resumen_importacion(resumen, usuario_auxiliar=None):
+    """
+    Importación masiva: envía un único resumen a Gestión Humana
+    en lugar de una notificación por cada incapacidad importada.
+    
+    Args:
+        resumen: dict retornado por ImportacionIncapacidadesService.importar
+        usuario_auxiliar: Usuario que ejecutó la importación (opcional)
+        
+    Returns:
+        dict: {'email_ok': bool, 'notificaciones_internas': int}
+    """
+    from app.models.enums import TipoNotificacionEnum
+    from app.models import db
+    
+    logger.info('🔔 Enviando resumen de importación masiva (%s importadas)', resumen['importadas'])
+    
+    asunto = (
+        f"📥 Importación masiva: {resumen['importadas']} incapacidades importadas, "
+        f"{resumen['rechazadas']} rechazadas"
+    )
+    
+    try:
+        resultado = notificar_rrhh(
+            TipoNotificacionEnum.IMPORTACION_MASIVA,
+            asunto,
+            'emails/resumen_importacion.html',
+            {'resumen': resumen, 'usuario_auxiliar': usuario_auxiliar},
+            reintentos=MAX_REINTENTOS
+        )
+    except Exception as e:
+        logger.error('❌ Error al notificar resumen de importación: %s', e)
+        db.session.rollback()
+        return {'email_ok': False, 'notificaciones_internas': 0}
+    
+    return {'email_ok': resultado['email_ok'], 'notificaciones_internas': resultado['notificaciones_internas']}
+
+
 # ============================================================================
 # UC6: Notificaciones de Solicitud de Documentos
 # ============================================================================
@@ -811,20 +997,20 @@ def notificar_solicitud_documentos(incapacidad, solicitudes, usuario_auxiliar):
     from flask import current_app
     from app.utils.calendario import dias_habiles_restantes, formatar_fecha_legible
     
-    logger.info(f"🔔 UC6: Notificando solicitud de documentos para #{incapacidad.id} ({incapacidad.codigo_radicacion})")
+    logger.info('🔔 UC6: Notificando solicitud de documentos para #%s (%s)', incapacidad.id, incapacidad.codigo_radicacion)
     
     try:
         # Validar MAIL_ENABLED
         if not current_app.config.get('MAIL_ENABLED', True):
             email_colaborador = get_email_notificaciones(incapacidad.usuario)
-            logger.info(f"📧 [SIMULADO] Solicitud de documentos NO enviada (MAIL_ENABLED=False)")
-            logger.info(f"   Destinatario: {email_colaborador}")
-            logger.info(f"   Documentos solicitados: {len(solicitudes)}")
+            logger.info('📧 [SIMULADO] Solicitud de documentos NO enviada (MAIL_ENABLED=False)')
+            logger.info('   Destinatario: %s', email_colaborador)
+            logger.info('   Documentos solicitados: %s', len(solicitudes))
             return True
         
         # Validar email del colaborador
         if not incapacidad.usuario or not incapacidad.usuario.email:
-            logger.error(f"❌ UC6: No se puede notificar #{incapacidad.id}: colaborador sin email")
+            logger.error('❌ UC6: No se puede notificar #%s: colaborador sin email', incapacidad.id)
             return False
         
         # Obtener email de notificaciones
@@ -845,7 +1031,7 @@ def notificar_solicitud_documentos(incapacidad, solicitudes, usuario_auxiliar):
         dias_restantes = dias_habiles_restantes(datetime.utcnow().date(), fecha_vencimiento)
         
         # Renderizar template
-        html_body = render_template(
+        html_body = renderizar_email(
             'emails/solicitud_documentos.html',
             incapacidad=incapacidad,
             colaborador=incapacidad.usuario,
@@ -872,19 +1058,16 @@ def notificar_solicitud_documentos(incapacidad, solicitudes, usuario_auxiliar):
                 sol.ultima_notificacion = datetime.utcnow()
             
             logger.info(
-                f"✅ UC6: Solicitud de documentos enviada a {incapacidad.usuario.email} "
-                f"({len(solicitudes)} documentos, vence en {dias_restantes} días hábiles)"
+                '✅ UC6: Solicitud de documentos enviada a %s (%s documentos, vence en %s días hábiles)', incapacidad.usuario.email, len(solicitudes), dias_restantes
             )
             
             if resultado['notificacion_id']:
-                logger.info(f"📬 UC6: Notificación interna creada #{resultado['notificacion_id']}")
+                logger.debug('📬 UC6: Notificación interna creada #%s', resultado['notificacion_id'])
         
         return resultado['email_ok']
         
     except Exception as e:
-        logger.error(f"❌ UC6: Error al notificar solicitud de documentos para #{incapacidad.id}: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception('❌ UC6: Error al notificar solicitud de documentos para #%s: %s', incapacidad.id, e)
         return False
 
 
@@ -904,21 +1087,20 @@ def notificar_recordatorio_documentos(incapacidad, numero_recordatorio, solicitu
     from app.utils.calendario import formatar_fecha_legible
     
     logger.info(
-        f"🔔 UC6: Enviando recordatorio #{numero_recordatorio} para #{incapacidad.id} "
-        f"({incapacidad.codigo_radicacion})"
+        '🔔 UC6: Enviando recordatorio #%s para #%s (%s)', numero_recordatorio, incapacidad.id, incapacidad.codigo_radicacion
     )
     
     try:
         # Validar MAIL_ENABLED
         if not current_app.config.get('MAIL_ENABLED', True):
             email_colaborador = get_email_notificaciones(incapacidad.usuario)
-            logger.info(f"📧 [SIMULADO] Recordatorio #{numero_recordatorio} NO enviado (MAIL_ENABLED=False)")
-            logger.info(f"   Destinatario: {email_colaborador}")
+            logger.info('📧 [SIMULADO] Recordatorio #%s NO enviado (MAIL_ENABLED=False)', numero_recordatorio)
+            logger.info('   Destinatario: %s', email_colaborador)
             return True
         
         # Validar email
         if not incapacidad.usuario or not incapacidad.usuario.email:
-            logger.error(f"❌ UC6: No se puede enviar recordatorio para #{incapacidad.id}: sin email")
+            logger.error('❌ UC6: No se puede enviar recordatorio para #%s: sin email', incapacidad.id)
             return False
         
         # Obtener email de notificaciones
@@ -944,7 +1126,7 @@ def notificar_recordatorio_documentos(incapacidad, numero_recordatorio, solicitu
             asunto = f'🚨 URGENTE: Vencimiento de plazo - {incapacidad.codigo_radicacion}'
         
         # Renderizar template
-        html_body = render_template(
+        html_body = renderizar_email(
             template,
             incapacidad=incapacidad,
             colaborador=incapacidad.usuario,
@@ -975,21 +1157,18 @@ def notificar_recordatorio_documentos(incapacidad, numero_recordatorio, solicitu
                 sol.ultima_notificacion = datetime.utcnow()
             
             logger.info(
-                f"✅ UC6: Recordatorio #{numero_recordatorio} enviado a {incapacidad.usuario.email} "
-                f"({len(solicitudes_pendientes)} documentos pendientes)"
+                '✅ UC6: Recordatorio #%s enviado a %s (%s documentos pendientes)', numero_recordatorio, incapacidad.usuario.email, len(solicitudes_pendientes)
             )
             
             if resultado['notificacion_id']:
-                logger.info(f"📬 UC6: Notificación interna creada #{resultado['notificacion_id']}")
+                logger.debug('📬 UC6: Notificación interna creada #%s', resultado['notificacion_id'])
         
         return resultado['email_ok']
         
     except Exception as e:
-        logger.error(
-            f"❌ UC6: Error al enviar recordatorio #{numero_recordatorio} para #{incapacidad.id}: {str(e)}"
+        logger.exception(
+            '❌ UC6: Error al enviar recordatorio #%s para #%s: %s', numero_recordatorio, incapacidad.id, e
         )
-        import traceback
-        logger.error(traceback.format_exc())
         return False
 
 
@@ -999,77 +1178,138 @@ def notificar_documentacion_completada(incapacidad, email_auxiliar=None):
     
     Args:
         incapacidad: Instancia de Incapacidad
-        email_auxiliar: Email del auxiliar (opcional, usa Config.GESTION_HUMANA_EMAIL si no se provee)
+        email_auxiliar: Email del auxiliar (opcional; si no se provee se notifica
+                        a todo Gestión Humana, o a GESTION_HUMANA_EMAIL si no hay usuarios)
         
     Returns:
         bool: True si la notificación se envió exitosamente
     """
     from flask import current_app
-    from config import Config
+    from app.models.enums import TipoNotificacionEnum
     
-    logger.info(f"🔔 UC6: Notificando documentación completada para #{incapacidad.id} ({incapacidad.codigo_radicacion})")
+    logger.info('🔔 UC6: Notificando documentación completada para #%s (%s)', incapacidad.id, incapacidad.codigo_radicacion)
     
     try:
         # Validar MAIL_ENABLED
         if not current_app.config.get('MAIL_ENABLED', True):
-            logger.info(f"📧 [SIMULADO] Documentación completada NO enviada (MAIL_ENABLED=False)")
-            logger.info(f"   Destinatario: auxiliar/RRHH")
+            logger.info('📧 [SIMULADO] Documentación completada NO enviada (MAIL_ENABLED=False)')
+            logger.info('   Destinatario: auxiliar/RRHH')
             return True
         
-        # Determinar destinatario
-        destinatario = email_auxiliar or Config.GESTION_HUMANA_EMAIL
-        
-        if not destinatario:
-            logger.error(f"❌ UC6: No se puede notificar documentación completada: sin email de auxiliar")
-            return False
-        
-        # Buscar usuario auxiliar para crear notificación interna
-        from app.models.usuario import Usuario
-        destinatario_id = None
-        if email_auxiliar:
-            usuario_aux = Usuario.query.filter_by(email=email_auxiliar, rol='auxiliar').first()
-            if usuario_aux:
-                destinatario_id = usuario_aux.id
+        asunto = f'✅ Documentación completada - {incapacidad.codigo_radicacion}'
+        contexto = {'incapacidad': incapacidad, 'colaborador': incapacidad.usuario}
+        
+        # Destinatarios: el auxiliar que hizo la solicitud o, si no se conoce, todo RRHH
+        auxiliar = buscar_destinatario(email_auxiliar) if email_auxiliar else None
+        if email_auxiliar and auxiliar is None:
+            # Email sin usuario de RRHH asociado: solo email, sin notificación interna
+            resultado = send_email(
+                subject=asunto,
+                recipients=[email_auxiliar],
+                html_body=renderizar_email('emails/documentacion_completada.html', **contexto),
+                reintentos=3
+            )
+            email_ok, destinatarios = resultado['email_ok'], [email_auxiliar]
         else:
-            # Si no hay email específico, buscar primer usuario auxiliar
-            usuario_aux = Usuario.query.filter_by(rol='auxiliar').first()
-            if usuario_aux:
-                destinatario_id = usuario_aux.id
-        
-        # Renderizar template
-        html_body = render_template(
-            'emails/documentacion_completada.html',
-            incapacidad=incapacidad,
-            colaborador=incapacidad.usuario
-        )
-        
-        # Enviar email con notificación interna
-        resultado = send_email(
-            subject=f'✅ Documentación completada - {incapacidad.codigo_radicacion}',
-            recipients=[destinatario],
-            html_body=html_body,
-            reintentos=3,
-            crear_notificacion=True if destinatario_id else False,
-            tipo_notificacion='DOCUMENTACION_COMPLETADA',
-            destinatario_id=destinatario_id
-        )
+            resultado = notificar_rrhh(
+                TipoNotificacionEnum.DOCUMENTACION_COMPLETADA,
+                asunto,
+                'emails/documentacion_completada.html',
+                contexto,
+                destinatarios=[auxiliar] if auxiliar else None
+            )
+            email_ok, destinatarios = resultado['email_ok'], resultado['destinatarios']
         
-        if resultado['email_ok']:
+        if email_ok:
             logger.info(
-                f"✅ UC6: Notificación de documentación completada enviada a {destinatario}"
+                '✅ UC6: Notificación de documentación completada enviada a %s', ', '.join(destinatarios)
             )
-            if resultado['notificacion_id']:
-                logger.info(f"📬 UC6: Notificación interna creada #{resultado['notificacion_id']}")
         
-        return resultado['email_ok']
+        return email_ok
         
     except Exception as e:
-        logger.error(f"❌ UC6: Error al notificar documentación completada para #{incapacidad.id}: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception('❌ UC6: Error al notificar documentación completada para #%s: %s', incapacidad.id, e)
         return False
 
 
+# ============================================================================
+# UC2: Resúmenes de Notificaciones (frecuencia HORARIA / DIARIA)
+# ============================================================================
+
+def enviar_resumenes_notificaciones(frecuencias):
+    """
+    UC2: Envía un email de resumen por destinatario con sus notificaciones diferidas
+    
+    Agrupa las notificaciones PENDIENTES marcadas en_resumen de los usuarios
+    cuya preferencia está en ``frecuencias``, renderiza un email por usuario y
+    las marca ENVIADA antes de programarlo (el hilo de envío las marca
+    ENTREGADA o ERROR con un solo UPDATE).
+    
+    Args:
+        frecuencias: FrecuenciaNotificacionEnum (o strings) a procesar. Incluir
+                     INMEDIATA despacha lo que quedó pendiente de usuarios que
+                     volvieron al envío inmediato.
+    
+    Returns:
+        dict: {'resumenes': int, 'notificaciones': int}
+    """
+    from itertools import groupby
+    from app.models.notificacion import Notificacion
+    from app.models.usuario import Usuario
+    from app.models.enums import EstadoNotificacionEnum
+    from app.models import db
+    
+    from app.utils.plantillas import url_externa
+    
+    frecuencias = [f.value if hasattr(f, 'value') else str(f) for f in frecuencias]
+    conteo = {'resumenes': 0, 'notificaciones': 0}
+    
+    # Desde el scheduler no hay petición: sin SERVER_NAME el resumen va sin enlace
+    try:
+        url_notificaciones = url_externa('notificaciones.listar')
+    except RuntimeError:
+        url_notificaciones = None
+    
+    filas = db.session.execute(
+        db.select(Notificacion.id, Notificacion.tipo, Notificacion.asunto, Notificacion.fecha_envio, Usuario)
+        .join(Usuario, Notificacion.destinatario_id == Usuario.id)
+        .where(
+            Notificacion.en_resumen.is_(True),
+            Notificacion.estado == EstadoNotificacionEnum.PENDIENTE.value,
+            Usuario.frecuencia_notificaciones.in_(frecuencias),
+        )
+        .order_by(Notificacion.destinatario_id, Notificacion.fecha_envio)
+    ).all()
+    
+    for usuario, grupo in groupby(filas, key=lambda fila: fila.Usuario):
+        notificaciones = list(grupo)
+        ids = [n.id for n in notificaciones]
+        try:
+            html_body = renderizar_email(
+                'emails/resumen_notificaciones.html',
+                usuario=usuario,
+                notificaciones=notificaciones,
+                url_notificaciones=url_notificaciones
+            )
+            _actualizar_notificaciones(ids, EstadoNotificacionEnum.ENVIADA)
+            send_email(
+                subject=f'📬 Resumen: {len(ids)} notificación(es) de incapacidades',
+                recipients=[get_email_notificaciones(usuario)],
+                html_body=html_body,
+                notificacion_ids=ids
+            )
+            conteo['resumenes'] += 1
+            conteo['notificaciones'] += len(ids)
+        except Exception as e:
+            logger.error('❌ UC2: Error al enviar resumen al usuario %s: %s', usuario.id, e)
+            db.session.rollback()
+    
+    logger.info(
+        '📬 UC2: Resúmenes %s enviados: %s (%s notificaciones)', '/'.join(frecuencias), conteo['resumenes'], conteo['notificaciones']
+    )
+    return conteo
+
+
 # ============================================================================
 # UC15: Hook de Almacenamiento Definitivo
 # ============================================================================
@@ -1090,59 +1330,57 @@ def confirmar_almacenamiento_definitivo(incapacidad):
     Returns:
         bool: True si el almacenamiento se confirmó exitosamente
     """
-    import os
-    from config import Config
-    
     logger.info(
-        f"💾 UC15: Confirmando almacenamiento definitivo para incapacidad #{incapacidad.id} "
-        f"({incapacidad.codigo_radicacion})"
+        '💾 UC15: Confirmando almacenamiento definitivo para incapacidad #%s (%s)', incapacidad.id, incapacidad.codigo_radicacion
     )
     
     try:
         # Verificar que hay documentos
         if not incapacidad.documentos or len(incapacidad.documentos) == 0:
-            logger.warning(f"⚠️ UC15: No hay documentos para almacenar en #{incapacidad.id}")
+            logger.warning('⚠️ UC15: No hay documentos para almacenar en #%s', incapacidad.id)
             return True  # No es error, simplemente no hay nada que hacer
         
         # Log de documentos almacenados
-        logger.info(f"📄 UC15: Documentos a confirmar: {len(incapacidad.documentos)}")
+        logger.debug('📄 UC15: Documentos a confirmar: %s', len(incapacidad.documentos))
+        
+        from app.utils.almacenamiento import existe_documento
         
         for doc in incapacidad.documentos:
-            ruta_completa = os.path.join(Config.UPLOAD_FOLDER, doc.ruta)
-            
-            # Verificar que el archivo físico existe
-            if os.path.exists(ruta_completa):
-                tamaño_kb = doc.tamaño_bytes / 1024 if doc.tamaño_bytes else 0
-                logger.info(
-                    f"  ✅ {doc.tipo_documento}: {doc.nombre_unico} "
-                    f"({tamaño_kb:.2f} KB, MD5: {doc.checksum_md5[:8] if doc.checksum_md5 else 'N/A'}...)"
+            # Verificar que el archivo físico existe (en el nivel de almacenamiento donde esté)
+            if existe_documento(doc):
+                logger.debug(
+                    '  ✅ %s: %s (%.2f KB, MD5: %.8s...)', doc.tipo_documento, doc.nombre_unico,
+                    (doc.tamaño_bytes or 0) / 1024, doc.checksum_md5 or 'N/A'
                 )
             else:
                 logger.error(
-                    f"  ❌ Archivo físico NO encontrado: {ruta_completa} "
-                    f"(documento #{doc.id}, tipo: {doc.tipo_documento})"
+                    '  ❌ Archivo físico NO encontrado: %s (documento #%s, tipo: %s)', doc.ruta, doc.id, doc.tipo_documento
                 )
                 return False
         
+        # Inspección de contenido (tipo real, estructura PDF, antivirus) y luego
+        # miniaturas para las pantallas de revisión (en segundo plano)
+        try:
+            from app.utils.inspeccion_documentos import programar_inspeccion
+            programar_inspeccion(
+                doc for doc in incapacidad.documentos if doc.estado_inspeccion == 'PENDIENTE'
+            )
+        except Exception as e:
+            logger.warning('⚠️ UC15: No se pudo encolar la inspección de documentos: %s', e)
+        
         # TODO: Implementar lógica adicional de UC15 según necesidades
         # Por ejemplo:
-        # - Mover a carpeta de archivo definitivo
         # - Crear backup en storage externo (S3, Azure Blob, etc.)
         # - Indexar en sistema de búsqueda (Elasticsearch)
-        # - Generar thumbnails para PDFs
-        # - Escanear con antivirus
         
         logger.info(
-            f"✅ UC15: Almacenamiento definitivo confirmado para #{incapacidad.id} "
-            f"- {len(incapacidad.documentos)} documento(s) verificados"
+            '✅ UC15: Almacenamiento definitivo confirmado para #%s - %s documento(s) verificados', incapacidad.id, len(incapacidad.documentos)
         )
         
         return True
         
     except Exception as e:
-        logger.error(
-            f"❌ UC15: Error al confirmar almacenamiento definitivo para #{incapacidad.id}: {str(e)}"
+        logger.exception(
+            '❌ UC15: Error al confirmar almacenamiento definitivo para #%s: %s', incapacidad.id, e
         )
-        import traceback
-        logger.error(traceback.format_exc())
         return False
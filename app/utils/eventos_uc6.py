@@ -1,8 +1,11 @@
 """Eventos de dominio para UC6 - Solicitud de Documentos Faltantes."""
+import logging
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import List, Callable, Dict, Any, Optional
 
+logger = logging.getLogger(__name__)
+
 
 # ============================================
 # Eventos de dominio
@@ -129,7 +132,7 @@ class GestorEventos:
                     handler(evento)
                 except Exception as e:
                     # Log error pero no interrumpir otros handlers
-                    print(f"⚠️ Error en handler de evento {tipo_evento.__name__}: {e}")
+                    logger.exception('⚠️ Error en handler de evento %s: %s', tipo_evento.__name__, e)
     
     def limpiar_suscriptores(self, tipo_evento: Optional[type] = None) -> None:
         """
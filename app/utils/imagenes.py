@@ -0,0 +1,176 @@
+"""
+Optimización de imágenes cargadas.
+
+Las fotos de certificados tomadas con el celular llegan como JPEG/PNG de
+varios megabytes. Después de guardarlas, esta etapa:
+
+- Corrige la orientación según EXIF y elimina los metadatos (GPS, modelo de cámara)
+- Reduce la resolución a un lado máximo legible (IMAGENES_MAX_LADO)
+- Recomprime JPEG con calidad configurable
+- Opcionalmente convierte escaneos PNG a JPEG o WebP
+
+Solo se reemplaza el archivo si el resultado es más pequeño. El original se
+conserva en la subcarpeta ``originales/`` o se elimina según
+IMAGENES_CONSERVAR_ORIGINAL.
+
+Requiere la dependencia opcional Pillow; sin ella las imágenes se guardan
+tal como llegan. Pillow se importa con la primera imagen, no al arrancar.
+"""
+
+import logging
+import os
+from typing import Any, Dict, Optional
+
+Image = None
+ImageOps = None
+_pillow_cargado = False
+
+logger = logging.getLogger(__name__)
+
+CARPETA_ORIGINALES = 'originales'
+
+FORMATOS_SALIDA = {
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg'),
+    'webp': ('WEBP', 'webp', 'image/webp'),
+    'png': ('PNG', 'png', 'image/png'),
+}
+
+
+def opciones_optimizacion() -> Dict[str, Any]:
+    """Opciones de configuración (app actual o Config si no hay contexto)."""
+    try:
+        from flask import current_app
+        config = current_app.config
+        obtener = config.get
+    except RuntimeError:
+        from config import Config
+        obtener = lambda clave, default=None: getattr(Config, clave, default)  # noqa: E731
+
+    return {
+        'habilitado': obtener('IMAGENES_OPTIMIZAR', False),
+        'max_lado': obtener('IMAGENES_MAX_LADO', 2000),
+        'calidad': obtener('IMAGENES_CALIDAD', 80),
+        'convertir_png': obtener('IMAGENES_CONVERTIR_PNG', None),
+        'conservar_original': obtener('IMAGENES_CONSERVAR_ORIGINAL', False),
+    }
+
+
+def _cargar_pillow() -> bool:
+    """Importa Pillow una sola vez. Retorna False si no está instalado."""
+    global Image, ImageOps, _pillow_cargado
+    if not _pillow_cargado:
+        try:
+            from PIL import Image, ImageOps
+        except ImportError:  # pragma: no cover - depende del entorno
+            pass
+        _pillow_cargado = True
+    return Image is not None
+
+
+def _preparar(imagen, max_lado: int):
+    # La orientación de las fotos de celular viene en EXIF; se aplica antes de descartarlo
+    imagen = ImageOps.exif_transpose(imagen)
+    if max(imagen.size) > max_lado:
+        imagen.thumbnail((max_lado, max_lado), Image.LANCZOS)
+    return imagen
+
+
+def _a_rgb(imagen):
+    if imagen.mode in ('RGB', 'L'):
+        return imagen
+    if imagen.mode in ('RGBA', 'LA', 'P'):
+        rgba = imagen.convert('RGBA')
+        fondo = Image.new('RGB', rgba.size, (255, 255, 255))
+        fondo.paste(rgba, mask=rgba.split()[-1])
+        return fondo
+    return imagen.convert('RGB')
+
+
+def optimizar_imagen(
+    ruta: str,
+    mime_type: str,
+    max_lado: int = 2000,
+    calidad: int = 80,
+    convertir_png: Optional[str] = None,
+    conservar_original: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """
+    Optimiza una imagen guardada en disco.
+
+    Args:
+        ruta: Ruta del archivo ya guardado
+        mime_type: image/jpeg o image/png (otros tipos se ignoran)
+        max_lado: Lado máximo en píxeles
+        calidad: Calidad JPEG/WebP (1-95)
+        convertir_png: None, 'jpeg' o 'webp'
+        conservar_original: Mover el original a ``originales/`` en lugar de borrarlo
+
+    Returns:
+        dict con 'ruta', 'extension', 'mime_type', 'tamaño_bytes' y
+        'ruta_original' (o None) si el archivo fue reemplazado; None si no
+        se modificó (formato no soportado, sin Pillow o sin ahorro).
+    """
+    if mime_type not in ('image/jpeg', 'image/png') or not _cargar_pillow():
+        return None
+
+    if mime_type == 'image/png':
+        formato = FORMATOS_SALIDA.get(convertir_png or 'png', FORMATOS_SALIDA['png'])
+    else:
+        formato = FORMATOS_SALIDA['jpeg']
+    formato_pil, extension, mime_salida = formato
+
+    base, _ = os.path.splitext(ruta)
+    ruta_salida = f'{base}.{extension}'
+    temporal = f'{ruta_salida}.tmp'
+
+    try:
+        with Image.open(ruta) as original:
+            if mime_type == 'image/jpeg':
+                # Decodificar directamente a escala reducida cuando sea posible
+                original.draft('RGB', (max_lado, max_lado))
+            imagen = _preparar(original, max_lado)
+
+            if formato_pil == 'PNG':
+                imagen.save(temporal, 'PNG', optimize=True)
+            else:
+                imagen = _a_rgb(imagen)
+                opciones = {'quality': calidad}
+                if formato_pil == 'JPEG':
+                    opciones.update(optimize=True, progressive=True)
+                else:
+                    opciones.update(method=4)
+                # Sin exif=: los metadatos del original no se copian
+                imagen.save(temporal, formato_pil, **opciones)
+    except Exception as e:
+        logger.warning('⚠️ No se pudo optimizar la imagen %s: %s', ruta, e)
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        return None
+
+    tamaño_original = os.path.getsize(ruta)
+    tamaño_nuevo = os.path.getsize(temporal)
+    if tamaño_nuevo >= tamaño_original:
+        os.remove(temporal)
+        return None
+
+    ruta_original = None
+    if conservar_original:
+        carpeta = os.path.join(os.path.dirname(ruta), CARPETA_ORIGINALES)
+        os.makedirs(carpeta, exist_ok=True)
+        ruta_original = os.path.join(carpeta, os.path.basename(ruta))
+        os.replace(ruta, ruta_original)
+    elif ruta_salida != ruta:
+        os.remove(ruta)
+    os.replace(temporal, ruta_salida)
+
+    logger.info(
+        '🗜️ Imagen optimizada %s: %.0f KB → %.0f KB', os.path.basename(ruta_salida), tamaño_original / 1024, tamaño_nuevo / 1024
+    )
+
+    return {
+        'ruta': ruta_salida,
+        'extension': extension,
+        'mime_type': mime_salida,
+        'tamaño_bytes': tamaño_nuevo,
+        'ruta_original': ruta_original,
+    }
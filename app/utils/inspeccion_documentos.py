@@ -0,0 +1,445 @@
+"""
+Inspección de documentos cargados (en segundo plano, después del commit).
+
+La validación de la carga solo mira la extensión (``obtener_mime_type``).
+Esta etapa revisa el contenido real del archivo en un pool de hilos, fuera
+de la petición, y guarda el resultado en el Documento
+(``estado_inspeccion``, ``mime_detectado``, ``detalle_inspeccion``), que es
+lo que leen las pantallas de revisión:
+
+1. Tipo real por los primeros bytes (firma o "magic bytes"). Un .pdf que en
+   realidad es un ejecutable, un ZIP o un HTML queda como SOSPECHOSO; si es
+   otro tipo permitido (un PNG con extensión .jpg) se corrige ``mime_type``.
+2. Estructura del PDF: cabecera ``%PDF-``, marca final ``%%EOF`` y contenido
+   activo (/JavaScript, /Launch, archivos incrustados...). Con PyMuPDF
+   instalado también se abren los objetos comprimidos.
+3. Antivirus conectable (ESCANER_ANTIVIRUS): ``clamd`` usa el protocolo
+   INSTREAM del demonio de ClamAV por socket local (CLAMD_SOCKET) o TCP
+   (``tcp://host:3310``); también se acepta ``'modulo:funcion'``.
+
+Estados: PENDIENTE → LIMPIO | SOSPECHOSO | INFECTADO | ERROR (el antivirus
+no respondió). Los documentos INFECTADOS no se entregan; los SOSPECHOSOS y
+los INFECTADOS no se renderizan en miniaturas.
+"""
+
+import importlib
+import logging
+import os
+import re
+import shutil
+import socket
+import struct
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional
+
+from app.models.enums import EstadoInspeccionEnum
+
+try:
+    import pymupdf
+except ImportError:  # pragma: no cover - depende del entorno
+    try:
+        import fitz as pymupdf  # Versiones anteriores de PyMuPDF
+    except ImportError:
+        pymupdf = None
+
+logger = logging.getLogger(__name__)
+
+TAMAÑO_CABECERA = 2048
+TAMAÑO_BLOQUE = 64 * 1024
+MAX_DETALLE = 500
+
+MIME_PERMITIDOS = {'application/pdf', 'image/png', 'image/jpeg', 'image/webp'}
+
+# (firma, desplazamiento, tipo MIME)
+FIRMAS = [
+    (b'\x89PNG\r\n\x1a\n', 0, 'image/png'),
+    (b'\xff\xd8\xff', 0, 'image/jpeg'),
+    (b'WEBP', 8, 'image/webp'),  # RIFF....WEBP
+    (b'GIF87a', 0, 'image/gif'),
+    (b'GIF89a', 0, 'image/gif'),
+    (b'MZ', 0, 'application/x-msdownload'),
+    (b'\x7fELF', 0, 'application/x-executable'),
+    (b'PK\x03\x04', 0, 'application/zip'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 0, 'application/x-ole-storage'),  # Office antiguo (macros)
+]
+
+# Nombres PDF que ejecutan código o abren otros archivos al visualizar el documento
+_CONTENIDO_ACTIVO_PDF = re.compile(rb'/(JavaScript|JS|Launch|EmbeddedFile|RichMedia|XFA)(?![A-Za-z0-9])')
+_SOLAPE = 16  # bytes que se conservan entre bloques para no partir un nombre
+
+_PRIORIDAD = {
+    EstadoInspeccionEnum.LIMPIO: 0,
+    EstadoInspeccionEnum.ERROR: 1,
+    EstadoInspeccionEnum.SOSPECHOSO: 2,
+    EstadoInspeccionEnum.INFECTADO: 3,
+}
+
+_executor = None
+_executor_lock = Lock()
+
+
+class ErrorEscaner(Exception):
+    """El escáner antivirus no pudo revisar el archivo."""
+
+
+def _config(clave, default):
+    try:
+        from flask import current_app
+        return current_app.config.get(clave, default)
+    except RuntimeError:
+        from config import Config
+        return getattr(Config, clave, default)
+
+
+# ---------------------------------------------------------------------------
+# Tipo real y estructura
+# ---------------------------------------------------------------------------
+
+def detectar_mime(cabecera: bytes) -> Optional[str]:
+    """Tipo MIME según los primeros bytes del archivo, o None si no se reconoce."""
+    # La especificación PDF admite basura antes de la cabecera (dentro del primer KB)
+    if b'%PDF-' in cabecera[:1024]:
+        return 'application/pdf'
+    for firma, desplazamiento, mime_type in FIRMAS:
+        if cabecera[desplazamiento:desplazamiento + len(firma)] == firma:
+            if mime_type == 'image/webp' and not cabecera.startswith(b'RIFF'):
+                continue
+            return mime_type
+    inicio = cabecera[:256].lstrip().lower()
+    if inicio.startswith((b'<!doctype html', b'<html', b'<script', b'<svg', b'<?xml')):
+        return 'text/html'
+    return None
+
+
+def validar_pdf(ruta: str) -> List[str]:
+    """
+    Problemas de estructura o contenido activo del PDF.
+
+    Returns:
+        list: Descripciones de los hallazgos (vacía si el PDF está bien)
+    """
+    hallazgos = []
+    activos = set()
+    anterior = ventana = b''
+    with open(ruta, 'rb') as f:
+        while True:
+            bloque = f.read(TAMAÑO_BLOQUE)
+            if not bloque:
+                break
+            ventana = anterior + bloque
+            activos.update(m.group(1).decode() for m in _CONTENIDO_ACTIVO_PDF.finditer(ventana))
+            anterior = ventana[-_SOLAPE:]
+
+    if b'%%EOF' not in ventana[-1024:]:
+        hallazgos.append('PDF sin marca %%EOF (incompleto o alterado)')
+
+    if pymupdf is not None:
+        try:
+            with pymupdf.open(ruta) as pdf:
+                if pdf.page_count == 0:
+                    hallazgos.append('PDF sin páginas')
+                if pdf.embfile_count():
+                    activos.add('EmbeddedFile')
+                # Los objetos dentro de flujos comprimidos no aparecen en el recorrido de bytes
+                for xref in range(1, pdf.xref_length()):
+                    objeto = pdf.xref_object(xref, compressed=True).encode('latin-1', 'ignore')
+                    activos.update(m.group(1).decode() for m in _CONTENIDO_ACTIVO_PDF.finditer(objeto))
+        except Exception as e:
+            hallazgos.append(f'PDF dañado: {e}')
+
+    if activos:
+        hallazgos.append(f"PDF con contenido activo: {', '.join('/' + n for n in sorted(activos))}")
+    return hallazgos
+
+
+# ---------------------------------------------------------------------------
+# Antivirus
+# ---------------------------------------------------------------------------
+
+def escanear_clamd(ruta: str) -> Optional[str]:
+    """
+    Revisa el archivo con clamd (INSTREAM).
+
+    Returns:
+        str o None: Nombre de la firma detectada, o None si está limpio
+
+    Raises:
+        ErrorEscaner: clamd no disponible o respuesta de error
+    """
+    direccion = _config('CLAMD_SOCKET', '/var/run/clamav/clamd.ctl')
+    timeout = _config('CLAMD_TIMEOUT', 30)
+    try:
+        if direccion.startswith('tcp://'):
+            host, _, puerto = direccion[len('tcp://'):].rpartition(':')
+            conexion = socket.create_connection((host, int(puerto)), timeout=timeout)
+        else:
+            conexion = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conexion.settimeout(timeout)
+            try:
+                conexion.connect(direccion)
+            except OSError:
+                conexion.close()
+                raise
+
+        with conexion, open(ruta, 'rb') as f:
+            conexion.sendall(b'zINSTREAM\0')
+            while True:
+                bloque = f.read(TAMAÑO_BLOQUE)
+                if not bloque:
+                    break
+                conexion.sendall(struct.pack('!L', len(bloque)) + bloque)
+            conexion.sendall(struct.pack('!L', 0))
+
+            respuesta = b''
+            while not respuesta.endswith(b'\0'):
+                parte = conexion.recv(4096)
+                if not parte:
+                    break
+                respuesta += parte
+    except OSError as e:
+        raise ErrorEscaner(f'clamd no disponible en {direccion}: {e}')
+
+    # 'stream: OK' | 'stream: Eicar-Signature FOUND' | '... ERROR'
+    texto = respuesta.rstrip(b'\0').decode('utf-8', 'replace').strip()
+    if texto.endswith(' OK'):
+        return None
+    if texto.endswith(' FOUND'):
+        return texto.split(':', 1)[-1][:-len(' FOUND')].strip()
+    raise ErrorEscaner(f'Respuesta de clamd: {texto or "(vacía)"}')
+
+
+ESCANERES: Dict[str, Callable[[str], Optional[str]]] = {
+    'clamd': escanear_clamd,
+}
+
+
+def obtener_escaner() -> Optional[Callable[[str], Optional[str]]]:
+    """Escáner configurado en ESCANER_ANTIVIRUS (nombre registrado o 'modulo:funcion')."""
+    nombre = _config('ESCANER_ANTIVIRUS', None)
+    if not nombre:
+        return None
+    if nombre in ESCANERES:
+        return ESCANERES[nombre]
+    modulo, _, funcion = nombre.partition(':')
+    if not funcion:
+        raise ValueError(f"ESCANER_ANTIVIRUS desconocido: '{nombre}'")
+    return getattr(importlib.import_module(modulo), funcion)
+
+
+# ---------------------------------------------------------------------------
+# Inspección
+# ---------------------------------------------------------------------------
+
+def inspeccionar_archivo(ruta: str, mime_declarado: Optional[str], escaner=None) -> Dict:
+    """
+    Inspecciona un archivo en disco.
+
+    Returns:
+        dict: {'estado': EstadoInspeccionEnum, 'mime_detectado': str o None,
+               'detalle': list de hallazgos}
+    """
+    estado = EstadoInspeccionEnum.LIMPIO
+    detalle = []
+
+    def marcar(nuevo, mensaje):
+        nonlocal estado
+        if _PRIORIDAD[nuevo] > _PRIORIDAD[estado]:
+            estado = nuevo
+        detalle.append(mensaje)
+
+    with open(ruta, 'rb') as f:
+        mime_detectado = detectar_mime(f.read(TAMAÑO_CABECERA))
+
+    if mime_detectado is None:
+        marcar(EstadoInspeccionEnum.SOSPECHOSO, 'Tipo de archivo no reconocido por su contenido')
+    elif mime_detectado not in MIME_PERMITIDOS:
+        marcar(EstadoInspeccionEnum.SOSPECHOSO, f'El contenido es {mime_detectado}, no {mime_declarado}')
+    elif mime_detectado != mime_declarado:
+        detalle.append(f'Extensión no coincide con el contenido ({mime_detectado})')
+
+    if mime_detectado == 'application/pdf':
+        for hallazgo in validar_pdf(ruta):
+            marcar(EstadoInspeccionEnum.SOSPECHOSO, hallazgo)
+
+    if escaner is not None:
+        try:
+            firma = escaner(ruta)
+            if firma:
+                marcar(EstadoInspeccionEnum.INFECTADO, f'Antivirus: {firma}')
+        except Exception as e:
+            marcar(EstadoInspeccionEnum.ERROR, f'Antivirus: {e}')
+
+    return {'estado': estado, 'mime_detectado': mime_detectado, 'detalle': detalle}
+
+
+def inspeccionar_documento(documento, escaner=None) -> str:
+    """
+    Inspecciona un documento y guarda el resultado en sus columnas (sin commit).
+
+    Los documentos en almacenamiento remoto se copian a un temporal.
+
+    Returns:
+        str: Estado de la inspección
+    """
+    from app.utils.almacenamiento import abrir_documento, ruta_local_documento
+
+    if escaner is None:
+        escaner = obtener_escaner()
+
+    temporal = None
+    try:
+        ruta = ruta_local_documento(documento)
+        if ruta is None:
+            with abrir_documento(documento) as origen, tempfile.NamedTemporaryFile(
+                suffix=f'.{documento.extension or "bin"}', delete=False
+            ) as destino:
+                shutil.copyfileobj(origen, destino)
+                temporal = ruta = destino.name
+        resultado = inspeccionar_archivo(ruta, documento.mime_type, escaner)
+    except Exception as e:
+        resultado = {
+            'estado': EstadoInspeccionEnum.ERROR,
+            'mime_detectado': documento.mime_detectado,
+            'detalle': [f'No se pudo leer el archivo: {e}'],
+        }
+    finally:
+        if temporal:
+            os.remove(temporal)
+
+    estado = resultado['estado']
+    documento.estado_inspeccion = estado.value
+    documento.mime_detectado = resultado['mime_detectado']
+    documento.detalle_inspeccion = '; '.join(resultado['detalle'])[:MAX_DETALLE] or None
+    documento.fecha_inspeccion = datetime.utcnow()
+    if resultado['mime_detectado'] in MIME_PERMITIDOS and resultado['mime_detectado'] != documento.mime_type:
+        documento.mime_type = resultado['mime_detectado']
+
+    if estado == EstadoInspeccionEnum.INFECTADO:
+        logger.error('🦠 Documento #%s (%s) INFECTADO: %s', documento.id, documento.nombre_archivo, documento.detalle_inspeccion)
+    elif estado == EstadoInspeccionEnum.SOSPECHOSO:
+        logger.warning('⚠️ Documento #%s (%s) sospechoso: %s', documento.id, documento.nombre_archivo, documento.detalle_inspeccion)
+    elif estado == EstadoInspeccionEnum.ERROR:
+        logger.warning('⚠️ Documento #%s: inspección incompleta: %s', documento.id, documento.detalle_inspeccion)
+    return estado.value
+
+
+def permite_preview(estado: Optional[str]) -> bool:
+    """Los documentos sospechosos o infectados no se renderizan."""
+    return estado not in (EstadoInspeccionEnum.SOSPECHOSO, EstadoInspeccionEnum.INFECTADO)
+
+
+# ---------------------------------------------------------------------------
+# Pool de inspección
+# ---------------------------------------------------------------------------
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_config('INSPECCION_WORKERS', 2),
+                thread_name_prefix='inspeccion'
+            )
+        return _executor
+
+
+def _inspeccionar_en_segundo_plano(app, documento_id: int) -> None:
+    from app.models import db
+    from app.models.documento import Documento
+    from app.utils.almacenamiento import ruta_local_documento
+    from app.utils.previsualizaciones import generar_preview, puede_generar, ruta_preview
+
+    with app.app_context():
+        try:
+            documento = db.session.get(Documento, documento_id)
+            if documento is None:
+                return
+            estado = inspeccionar_documento(documento)
+            db.session.commit()
+
+            # La miniatura se genera después de la inspección, y solo si es seguro renderizar
+            if (app.config.get('PREVIEWS_ENABLED', True) and permite_preview(estado)
+                    and puede_generar(documento.mime_type)):
+                ruta = ruta_local_documento(documento)
+                if ruta:
+                    generar_preview(
+                        ruta,
+                        documento.mime_type,
+                        ruta_preview(documento.id, documento.checksum_md5, app.config.get('PREVIEWS_FOLDER')),
+                        app.config.get('PREVIEWS_ANCHO', 320),
+                    )
+        except Exception as e:
+            db.session.rollback()
+            logger.error('❌ Error inspeccionando documento #%s: %s', documento_id, e)
+        finally:
+            db.session.remove()
+
+
+def programar_inspeccion(documentos: Iterable) -> int:
+    """
+    Encola la inspección (y después la miniatura) de los documentos.
+
+    Llamar después del commit: los hilos leen el Documento de la BD con
+    su propia sesión. Con INSPECCION_ENABLED desactivado solo se encolan
+    las miniaturas; con ``tareas_sincronas()`` (TESTING) se inspecciona en
+    el hilo actual.
+
+    Returns:
+        int: Número de documentos encolados
+    """
+    if not _config('INSPECCION_ENABLED', True):
+        from app.utils.previsualizaciones import programar_previews
+        return programar_previews(documentos)
+
+    from flask import current_app
+    from app.utils.previsualizaciones import tareas_sincronas
+
+    app = current_app._get_current_object()
+    sincronas = tareas_sincronas()
+    encolados = 0
+    for doc in documentos:
+        if sincronas:
+            _inspeccionar_en_segundo_plano(app, doc.id)
+        else:
+            _get_executor().submit(_inspeccionar_en_segundo_plano, app, doc.id)
+        encolados += 1
+
+    if encolados:
+        logger.info('🔎 %s documento(s) encolado(s) para inspección', encolados)
+    return encolados
+
+
+def inspeccionar_pendientes(todos: bool = False, limite: Optional[int] = None, lote: int = 200) -> Dict[str, int]:
+    """
+    Inspecciona en este proceso los documentos PENDIENTES (o todos), por lotes.
+
+    Sirve para los documentos cargados antes de esta etapa y para volver a
+    revisar con firmas de antivirus actualizadas.
+
+    Returns:
+        dict: Conteo de documentos por estado resultante
+    """
+    from app.models import db
+    from app.models.documento import Documento
+
+    escaner = obtener_escaner()
+    conteo = {estado.value: 0 for estado in _PRIORIDAD}
+    ultimo_id = 0
+    revisados = 0
+    while limite is None or revisados < limite:
+        consulta = db.select(Documento).where(Documento.id > ultimo_id).order_by(Documento.id)
+        if not todos:
+            consulta = consulta.where(Documento.estado_inspeccion == EstadoInspeccionEnum.PENDIENTE.value)
+        tamaño = lote if limite is None else min(lote, limite - revisados)
+        documentos = db.session.execute(consulta.limit(tamaño)).scalars().all()
+        if not documentos:
+            break
+        for documento in documentos:
+            conteo[inspeccionar_documento(documento, escaner)] += 1
+        db.session.commit()
+        ultimo_id = documentos[-1].id
+        revisados += len(documentos)
+    return conteo
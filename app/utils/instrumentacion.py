@@ -0,0 +1,219 @@
+"""
+Instrumentación de peticiones: consultas SQL, tiempo en la base, render de
+plantillas y latencia por endpoint.
+
+- Los eventos ``before_cursor_execute``/``after_cursor_execute`` de los
+  engines de la app cuentan las consultas de la petición en curso y su
+  duración (las de hilos sin petición, como el envío de emails, no cuentan).
+- Las señales ``before_render_template``/``template_rendered`` de Flask miden
+  el render de plantillas.
+- Al terminar la petición los valores se acumulan por endpoint y, si tardó
+  más de METRICAS_PETICION_LENTA_MS, se registra con sus consultas.
+- ``/metrics`` expone los acumulados en el formato de texto de Prometheus.
+  Son del proceso: con varios workers de gunicorn cada uno tiene los suyos.
+  Exige ``Authorization: Bearer <METRICAS_TOKEN>``; sin token configurado
+  responde 403 (los nombres de endpoints y plantillas no son públicos).
+"""
+
+import hmac
+import logging
+import time
+from threading import Lock
+from typing import Dict
+
+from flask import Response, current_app, g, has_request_context, request
+from flask import before_render_template, template_rendered
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+PREFIJO = 'incapacidades'
+# Límites (segundos) del histograma de latencia
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Consultas guardadas por petición para el registro de peticiones lentas
+MAX_SENTENCIAS = 50
+
+_lock = Lock()
+
+
+def configurar_instrumentacion(app) -> None:
+    """Registra los eventos, las señales y la ruta /metrics (después de ``db.init_app``)."""
+    if not app.config.get('METRICAS_ENABLED', True):
+        return
+    from app.models import db
+
+    app.extensions['instrumentacion'] = {}
+    with app.app_context():
+        for engine in db.engines.values():
+            registrar_eventos_sql(engine)
+
+    before_render_template.connect(_inicio_render, app)
+    template_rendered.connect(_fin_render, app)
+    app.before_request(_inicio_peticion)
+    app.teardown_request(_fin_peticion)
+    app.add_url_rule('/metrics', 'metricas', metricas)
+
+
+def _peticion():
+    """Mediciones de la petición en curso (None fuera de una petición instrumentada)."""
+    if not has_request_context():
+        return None
+    return g.get('_instrumentacion')
+
+
+def registrar_eventos_sql(engine) -> None:
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _antes(conexion, cursor, sentencia, parametros, contexto, executemany):
+        if _peticion() is not None:
+            conexion.info.setdefault('instrumentacion_inicio', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _despues(conexion, cursor, sentencia, parametros, contexto, executemany):
+        medicion = _peticion()
+        inicios = conexion.info.get('instrumentacion_inicio')
+        if medicion is None or not inicios:
+            return
+        duracion = time.perf_counter() - inicios.pop()
+        medicion['sql'] += 1
+        medicion['sql_segundos'] += duracion
+        if len(medicion['sentencias']) < MAX_SENTENCIAS:
+            medicion['sentencias'].append((duracion, sentencia))
+
+
+def _inicio_render(app, template, context, **extra):
+    medicion = _peticion()
+    if medicion is not None:
+        medicion['renders'].append(time.perf_counter())
+
+
+def _fin_render(app, template, context, **extra):
+    medicion = _peticion()
+    if medicion is not None and medicion['renders']:
+        medicion['plantillas_segundos'] += time.perf_counter() - medicion['renders'].pop()
+
+
+def _inicio_peticion():
+    g._instrumentacion = {
+        'inicio': time.perf_counter(),
+        'sql': 0,
+        'sql_segundos': 0.0,
+        'plantillas_segundos': 0.0,
+        'renders': [],
+        'sentencias': [],
+    }
+
+
+def _fin_peticion(error=None):
+    medicion = g.pop('_instrumentacion', None)
+    if medicion is None:
+        return
+    duracion = time.perf_counter() - medicion['inicio']
+    endpoint = request.endpoint or 'sin_endpoint'
+    lenta = duracion * 1000 > current_app.config.get('METRICAS_PETICION_LENTA_MS', 500)
+
+    with _lock:
+        registro = current_app.extensions['instrumentacion'].setdefault(endpoint, {
+            'peticiones': 0,
+            'segundos': 0.0,
+            'sql': 0,
+            'sql_segundos': 0.0,
+            'plantillas_segundos': 0.0,
+            'lentas': 0,
+            'errores': 0,
+            'histograma': [0] * len(LIMITES_LATENCIA),
+        })
+        registro['peticiones'] += 1
+        registro['segundos'] += duracion
+        registro['sql'] += medicion['sql']
+        registro['sql_segundos'] += medicion['sql_segundos']
+        registro['plantillas_segundos'] += medicion['plantillas_segundos']
+        registro['lentas'] += lenta
+        registro['errores'] += error is not None
+        for i, limite in enumerate(LIMITES_LATENCIA):
+            if duracion <= limite:
+                registro['histograma'][i] += 1
+
+    if lenta:
+        _registrar_peticion_lenta(endpoint, duracion, medicion)
+
+
+def _registrar_peticion_lenta(endpoint, duracion, medicion) -> None:
+    lineas = [
+        f"🐢 Petición lenta {request.method} {request.path} ({endpoint}): {duracion * 1000:.0f} ms, "
+        f"{medicion['sql']} consultas SQL ({medicion['sql_segundos'] * 1000:.0f} ms), "
+        f"plantillas {medicion['plantillas_segundos'] * 1000:.0f} ms"
+    ]
+    for segundos, sentencia in medicion['sentencias']:
+        lineas.append(f"    {segundos * 1000:7.1f} ms  {' '.join(sentencia.split())[:300]}")
+    if medicion['sql'] > len(medicion['sentencias']):
+        lineas.append(f"    ... {medicion['sql'] - len(medicion['sentencias'])} consultas más")
+    logger.warning('\n'.join(lineas))
+
+
+def estadisticas_peticiones() -> Dict[str, Dict[str, float]]:
+    """Acumulados por endpoint (copia)."""
+    with _lock:
+        return {
+            endpoint: dict(registro, histograma=list(registro['histograma']))
+            for endpoint, registro in current_app.extensions.get('instrumentacion', {}).items()
+        }
+
+
+def _etiqueta(valor) -> str:
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def formato_prometheus(estadisticas, renders_email=None) -> str:
+    """Texto de exposición de Prometheus a partir de ``estadisticas_peticiones()``."""
+    lineas = []
+
+    def metrica(nombre, tipo, ayuda, muestras):
+        lineas.append(f"# HELP {PREFIJO}_{nombre} {ayuda}")
+        lineas.append(f"# TYPE {PREFIJO}_{nombre} {tipo}")
+        for sufijo, etiquetas, valor in muestras:
+            texto = ','.join(f'{clave}="{_etiqueta(v)}"' for clave, v in etiquetas)
+            lineas.append(f"{PREFIJO}_{nombre}{sufijo}{{{texto}}} {valor:g}")
+
+    endpoints = sorted(estadisticas.items())
+    histograma = []
+    for endpoint, registro in endpoints:
+        for limite, cantidad in zip(LIMITES_LATENCIA, registro['histograma']):
+            histograma.append(('_bucket', [('endpoint', endpoint), ('le', f'{limite:g}')], cantidad))
+        histograma.append(('_bucket', [('endpoint', endpoint), ('le', '+Inf')], registro['peticiones']))
+        histograma.append(('_sum', [('endpoint', endpoint)], registro['segundos']))
+        histograma.append(('_count', [('endpoint', endpoint)], registro['peticiones']))
+    metrica('peticion_duracion_segundos', 'histogram', 'Latencia total de las peticiones por endpoint.', histograma)
+
+    for nombre, campo, ayuda in (
+        ('sql_consultas_total', 'sql', 'Consultas SQL ejecutadas por endpoint.'),
+        ('sql_duracion_segundos_total', 'sql_segundos', 'Tiempo en consultas SQL por endpoint.'),
+        ('plantillas_duracion_segundos_total', 'plantillas_segundos', 'Tiempo de render de plantillas por endpoint.'),
+        ('peticiones_lentas_total', 'lentas', 'Peticiones más lentas que METRICAS_PETICION_LENTA_MS.'),
+        ('peticiones_error_total', 'errores', 'Peticiones terminadas con una excepción sin manejar.'),
+    ):
+        metrica(nombre, 'counter', ayuda,
+                [('', [('endpoint', endpoint)], registro[campo]) for endpoint, registro in endpoints])
+
+    if renders_email:
+        plantillas = sorted(renders_email.items())
+        metrica('email_renders_total', 'counter', 'Renders de plantillas de email.',
+                [('', [('plantilla', nombre)], registro['renders']) for nombre, registro in plantillas])
+        metrica('email_render_duracion_segundos_total', 'counter', 'Tiempo de render de plantillas de email.',
+                [('', [('plantilla', nombre)], registro['segundos']) for nombre, registro in plantillas])
+
+    return '\n'.join(lineas) + '\n'
+
+
+def metricas():
+    """GET /metrics: formato de texto de Prometheus (requiere ``Authorization: Bearer <METRICAS_TOKEN>``)."""
+    token = current_app.config.get('METRICAS_TOKEN')
+    if not token:
+        return Response('Defina METRICAS_TOKEN para habilitar /metrics\n', status=403, mimetype='text/plain')
+    autorizacion = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(autorizacion.encode(), f'Bearer {token}'.encode()):
+        return Response('No autorizado\n', status=401, mimetype='text/plain',
+                        headers={'WWW-Authenticate': 'Bearer'})
+
+    from app.utils.plantillas import estadisticas_render
+    texto = formato_prometheus(estadisticas_peticiones(), estadisticas_render())
+    return Response(texto, mimetype='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,93 @@
+"""
+Operaciones para las revisiones de Alembic (migrations/versions).
+
+Las bases existentes se crearon con ``db.create_all()`` y los scripts de
+``docs/archived-migrations/``, así que cada una puede estar en cualquier punto
+del historial. Estas operaciones revisan el esquema antes de actuar y una
+base así pasa a head con ``flask db upgrade``, sin ``stamp`` manual.
+
+- Las columnas de una tabla se agregan en un solo ``batch_alter_table``
+  (en SQLite, ALTER TABLE directo o una sola copia de la tabla si hace falta).
+- En PostgreSQL los índices se crean con ``CREATE INDEX CONCURRENTLY`` fuera
+  de la transacción de la revisión, sin bloquear escrituras en la tabla.
+- Todas tienen su inversa para ``downgrade``.
+"""
+
+from typing import Iterable, List
+
+import sqlalchemy as sa
+from alembic import op
+
+
+def _inspector():
+    return sa.inspect(op.get_bind())
+
+
+def tabla_existe(tabla: str) -> bool:
+    return _inspector().has_table(tabla)
+
+
+def columnas(tabla: str) -> List[str]:
+    return [columna['name'] for columna in _inspector().get_columns(tabla)]
+
+
+def tipo_columna(tabla: str, columna: str):
+    return next(c['type'] for c in _inspector().get_columns(tabla) if c['name'] == columna)
+
+
+def indice_existe(tabla: str, nombre: str) -> bool:
+    return any(indice['name'] == nombre for indice in _inspector().get_indexes(tabla))
+
+
+def crear_tabla(tabla: str, *elementos, **opciones) -> bool:
+    """``op.create_table`` si la tabla no existe. Retorna True si la creó."""
+    if tabla_existe(tabla):
+        return False
+    op.create_table(tabla, *elementos, **opciones)
+    return True
+
+
+def eliminar_tabla(tabla: str) -> None:
+    if tabla_existe(tabla):
+        op.drop_table(tabla)
+
+
+def agregar_columnas(tabla: str, nuevas: Iterable[sa.Column]) -> List[str]:
+    """Agrega en un solo lote las columnas que falten. Retorna sus nombres."""
+    existentes = set(columnas(tabla))
+    faltantes = [columna for columna in nuevas if columna.name not in existentes]
+    if faltantes:
+        with op.batch_alter_table(tabla) as lote:
+            for columna in faltantes:
+                lote.add_column(columna)
+    return [columna.name for columna in faltantes]
+
+
+def eliminar_columnas(tabla: str, nombres: Iterable[str]) -> None:
+    existentes = set(columnas(tabla))
+    presentes = [nombre for nombre in nombres if nombre in existentes]
+    if presentes:
+        with op.batch_alter_table(tabla) as lote:
+            for nombre in presentes:
+                lote.drop_column(nombre)
+
+
+def crear_indice(nombre: str, tabla: str, columnas_indice: List[str], unique: bool = False) -> None:
+    """Crea el índice si no existe; en PostgreSQL sin bloquear la tabla."""
+    if indice_existe(tabla, nombre):
+        return
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index(nombre, tabla, columnas_indice, unique=unique, postgresql_concurrently=True)
+    else:
+        op.create_index(nombre, tabla, columnas_indice, unique=unique)
+
+
+def eliminar_indice(nombre: str, tabla: str) -> None:
+    if not indice_existe(tabla, nombre):
+        return
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index(nombre, table_name=tabla, postgresql_concurrently=True)
+    else:
+        op.drop_index(nombre, table_name=tabla)
@@ -0,0 +1,125 @@
+"""
+Plantillas de email: precompilación, partes invariantes en caché y tiempos de render.
+
+- Al crear la aplicación se compilan las plantillas de ``emails/`` y se
+  guardan en la caché de plantillas de Jinja; con PLANTILLAS_BYTECODE_CACHE
+  el código compilado además queda en disco, de modo que los demás workers
+  y los reinicios no vuelven a compilar.
+- Las URLs absolutas de los emails se calculan una vez por aplicación:
+  ``url_externa()`` reemplaza a ``url_for(..., _external=True)`` en las
+  plantillas de email. Con SERVER_NAME no dependen del Host de la petición.
+- ``renderizar_email`` mide el tiempo de render por plantilla
+  (``estadisticas_render()``) y avisa de los renders lentos.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict
+
+from flask import current_app, has_request_context, render_template, request, url_for
+from jinja2 import FileSystemBytecodeCache
+
+logger = logging.getLogger(__name__)
+
+PREFIJO_EMAILS = 'emails/'
+URLS_MAX = 256  # Entradas de la caché LRU de url_externa
+
+_lock = Lock()
+
+
+def configurar_plantillas(app) -> int:
+    """
+    Configura la caché de bytecode y precompila las plantillas de email.
+
+    Returns:
+        int: Número de plantillas precompiladas
+    """
+    if app.config.get('PLANTILLAS_BYTECODE_CACHE', True):
+        # Sin carpeta configurada Jinja usa una carpeta privada del usuario en el temporal del sistema
+        carpeta = app.config.get('PLANTILLAS_BYTECODE_FOLDER')
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(carpeta) if carpeta else FileSystemBytecodeCache()
+
+    app.jinja_env.globals['url_externa'] = url_externa
+    app.extensions['plantillas'] = {'urls': OrderedDict(), 'estadisticas': {}}
+
+    if not app.config.get('PLANTILLAS_PRECOMPILAR', True):
+        return 0
+
+    inicio = time.perf_counter()
+    nombres = app.jinja_env.list_templates(filter_func=lambda nombre: nombre.startswith(PREFIJO_EMAILS))
+    for nombre in nombres:
+        app.jinja_env.get_template(nombre)
+    logger.debug(
+        '🧩 %s plantillas de email precompiladas en %.0f ms', len(nombres), (time.perf_counter() - inicio) * 1000
+    )
+    return len(nombres)
+
+
+def _estado():
+    return current_app.extensions.setdefault('plantillas', {'urls': OrderedDict(), 'estadisticas': {}})
+
+
+def url_externa(endpoint: str, **valores) -> str:
+    """
+    ``url_for(endpoint, _external=True)`` en una caché LRU de URLS_MAX entradas.
+
+    Con SERVER_NAME la URL se construye con SERVER_NAME y PREFERRED_URL_SCHEME,
+    como fuera de una petición; sin él depende del host de la petición actual.
+    """
+    servidor = current_app.config.get('SERVER_NAME')
+    if servidor:
+        origen = (current_app.config.get('PREFERRED_URL_SCHEME', 'http'), servidor)
+    else:
+        origen = request.host_url if has_request_context() else None
+    clave = (origen, endpoint, tuple(sorted(valores.items())))
+
+    urls = _estado()['urls']
+    with _lock:
+        url = urls.get(clave)
+        if url is not None:
+            urls.move_to_end(clave)
+            return url
+
+    if servidor:
+        url = current_app.create_url_adapter(None).build(endpoint, valores, force_external=True)
+    else:
+        url = url_for(endpoint, _external=True, **valores)
+
+    with _lock:
+        urls[clave] = url
+        if len(urls) > URLS_MAX:
+            urls.popitem(last=False)
+    return url
+
+
+def renderizar_email(plantilla: str, **contexto) -> str:
+    """``render_template`` con medición del tiempo por plantilla."""
+    inicio = time.perf_counter()
+    html = render_template(plantilla, **contexto)
+    duracion = time.perf_counter() - inicio
+
+    estadisticas = _estado()['estadisticas']
+    with _lock:
+        registro = estadisticas.setdefault(plantilla, {'renders': 0, 'segundos': 0.0, 'maximo': 0.0})
+        registro['renders'] += 1
+        registro['segundos'] += duracion
+        registro['maximo'] = max(registro['maximo'], duracion)
+
+    umbral = current_app.config.get('PLANTILLAS_RENDER_LENTO_MS', 200)
+    if duracion * 1000 > umbral:
+        logger.warning('🐢 Render lento de %s: %.0f ms', plantilla, duracion * 1000)
+    return html
+
+
+def estadisticas_render() -> Dict[str, Dict[str, float]]:
+    """Renders, tiempo total y máximo (segundos) y promedio (ms) por plantilla."""
+    with _lock:
+        return {
+            plantilla: dict(
+                registro,
+                promedio_ms=registro['segundos'] * 1000 / registro['renders'] if registro['renders'] else 0.0,
+            )
+            for plantilla, registro in _estado()['estadisticas'].items()
+        }
@@ -0,0 +1,198 @@
+"""
+Previsualizaciones (miniaturas) de documentos.
+
+Genera una imagen JPEG pequeña de la primera página de cada PDF o de cada
+imagen cargada, para que las pantallas de revisión descarguen kilobytes en
+lugar del documento completo. Las miniaturas se generan en segundo plano al
+confirmar el almacenamiento y se guardan en caché en disco con una clave que
+incluye el checksum: si el documento cambia, la miniatura anterior deja de
+usarse.
+
+Dependencias opcionales:
+    - Pillow: imágenes (JPG/PNG) y codificación del JPEG de salida
+    - PyMuPDF: renderizado de la primera página de PDFs
+Si no están instaladas, simplemente no se generan miniaturas.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Iterable, Optional
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - depende del entorno
+    Image = None
+
+try:
+    import pymupdf
+except ImportError:  # pragma: no cover - depende del entorno
+    try:
+        import fitz as pymupdf  # Versiones anteriores de PyMuPDF
+    except ImportError:
+        pymupdf = None
+
+logger = logging.getLogger(__name__)
+
+ANCHO_DEFAULT = 320
+CALIDAD_JPEG = 70
+
+_executor = None
+_executor_lock = Lock()
+
+# Miniaturas encoladas y aún no terminadas (ruta de destino)
+_en_curso = set()
+
+
+def _config(clave, default):
+    try:
+        from flask import current_app
+        return current_app.config.get(clave, default)
+    except RuntimeError:
+        from config import Config
+        return getattr(Config, clave, default)
+
+
+def puede_generar(mime_type: Optional[str]) -> bool:
+    """Indica si hay un renderizador disponible para el tipo de archivo."""
+    if Image is None or not mime_type:
+        return False
+    if mime_type == 'application/pdf':
+        return pymupdf is not None
+    return mime_type.startswith('image/')
+
+
+def ruta_preview(documento_id: int, checksum: Optional[str], carpeta: Optional[str] = None) -> str:
+    """Ruta en caché de la miniatura de un documento (clave: id + checksum)."""
+    carpeta = carpeta or _config('PREVIEWS_FOLDER', None)
+    return os.path.join(carpeta, f'{documento_id}_{checksum or "sin-checksum"}.jpg')
+
+
+def _imagen_desde_pdf(ruta: str, ancho: int):
+    with pymupdf.open(ruta) as pdf:
+        if pdf.page_count == 0:
+            raise ValueError('El PDF no tiene páginas')
+        pagina = pdf.load_page(0)
+        escala = ancho / pagina.rect.width if pagina.rect.width else 1
+        pixmap = pagina.get_pixmap(matrix=pymupdf.Matrix(escala, escala), alpha=False)
+        return Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+
+
+def _imagen_desde_imagen(ruta: str, ancho: int):
+    imagen = Image.open(ruta)
+    # draft() decodifica JPEG directamente a una escala reducida (mucho más rápido)
+    imagen.draft('RGB', (ancho, ancho * 4))
+    imagen.thumbnail((ancho, ancho * 4))
+    if imagen.mode not in ('RGB', 'L'):
+        fondo = Image.new('RGB', imagen.size, (255, 255, 255))
+        fondo.paste(imagen, mask=imagen.convert('RGBA').split()[-1])
+        imagen = fondo
+    return imagen
+
+
+def generar_preview(ruta_origen: str, mime_type: str, ruta_destino: str, ancho: int = ANCHO_DEFAULT) -> bool:
+    """
+    Genera la miniatura JPEG de un documento.
+
+    Returns:
+        bool: True si se generó (o ya existía), False si no hay renderizador
+              disponible o el archivo no se pudo procesar
+    """
+    if os.path.exists(ruta_destino):
+        return True
+    if not puede_generar(mime_type):
+        return False
+
+    try:
+        if mime_type == 'application/pdf':
+            imagen = _imagen_desde_pdf(ruta_origen, ancho)
+        else:
+            imagen = _imagen_desde_imagen(ruta_origen, ancho)
+
+        os.makedirs(os.path.dirname(ruta_destino), exist_ok=True)
+        temporal = f'{ruta_destino}.{os.getpid()}.tmp'
+        imagen.convert('RGB').save(temporal, 'JPEG', quality=CALIDAD_JPEG, optimize=True)
+        os.replace(temporal, ruta_destino)
+        return True
+    except Exception as e:
+        logger.warning('⚠️ No se pudo generar la previsualización de %s: %s', ruta_origen, e)
+        return False
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_config('PREVIEWS_WORKERS', 2),
+                thread_name_prefix='previews'
+            )
+        return _executor
+
+
+def tareas_sincronas() -> bool:
+    """
+    True si las etapas en segundo plano deben ejecutarse en el hilo actual.
+
+    TAREAS_SINCRONAS lo fuerza; si no está definida, se sigue TESTING para
+    que ningún hilo confirme en la base después de que el test terminó.
+    """
+    sincronas = _config('TAREAS_SINCRONAS', None)
+    return bool(_config('TESTING', False)) if sincronas is None else bool(sincronas)
+
+
+def _generar_y_liberar(ruta_origen: str, mime_type: str, ruta_destino: str, ancho: int) -> bool:
+    try:
+        return generar_preview(ruta_origen, mime_type, ruta_destino, ancho)
+    finally:
+        with _executor_lock:
+            _en_curso.discard(ruta_destino)
+
+
+def programar_preview(ruta_origen: str, mime_type: str, ruta_destino: str, ancho: Optional[int] = None) -> bool:
+    """
+    Encola la miniatura de un archivo si no existe ni está ya encolada.
+
+    Returns:
+        bool: True si se encoló (o se generó, con ``tareas_sincronas()``)
+    """
+    if not puede_generar(mime_type) or os.path.exists(ruta_destino):
+        return False
+    ancho = ancho or _config('PREVIEWS_ANCHO', ANCHO_DEFAULT)
+    if tareas_sincronas():
+        generar_preview(ruta_origen, mime_type, ruta_destino, ancho)
+        return True
+
+    with _executor_lock:
+        if ruta_destino in _en_curso:
+            return False
+        _en_curso.add(ruta_destino)
+    _get_executor().submit(_generar_y_liberar, ruta_origen, mime_type, ruta_destino, ancho)
+    return True
+
+
+def programar_previews(documentos: Iterable) -> int:
+    """
+    Encola la generación de miniaturas de los documentos en segundo plano.
+
+    Los datos necesarios se copian antes de encolar: los hilos no acceden
+    a la sesión de SQLAlchemy. Con ``tareas_sincronas()`` se generan en el
+    hilo actual.
+
+    Returns:
+        int: Número de miniaturas encoladas
+    """
+    if not _config('PREVIEWS_ENABLED', True):
+        return 0
+
+    carpeta = _config('PREVIEWS_FOLDER', None)
+    ancho = _config('PREVIEWS_ANCHO', ANCHO_DEFAULT)
+    encoladas = 0
+    for doc in documentos:
+        if programar_preview(doc.ruta, doc.mime_type, ruta_preview(doc.id, doc.checksum_md5, carpeta), ancho):
+            encoladas += 1
+
+    if encoladas:
+        logger.info('🖼️ %s previsualización(es) encolada(s)', encoladas)
+    return encoladas
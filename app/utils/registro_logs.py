@@ -0,0 +1,131 @@
+"""
+Logging de la aplicación: JSON estructurado, escritura fuera del hilo de la
+petición y niveles por módulo.
+
+- Un ``QueueHandler`` en el logger raíz solo encola el registro; un
+  ``QueueListener`` en su propio hilo lo formatea y lo escribe en stderr, así
+  una petición no espera a que la terminal, el pipe o journald acepten la línea.
+- LOG_FORMAT=json (por defecto) escribe una línea JSON por registro con los
+  campos pasados en ``extra={...}``; LOG_FORMAT=texto es más cómodo en desarrollo.
+- LOG_LEVEL acepta un nivel general y niveles por módulo:
+  ``INFO,app.utils.email_service=WARNING,sqlalchemy.engine=INFO``.
+
+Los mensajes usan formato diferido (``logger.info('Incapacidad #%s', id)``):
+los argumentos solo se interpolan si el nivel del logger deja pasar el registro.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+FORMATO_TEXTO = '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
+
+# Atributos propios de LogRecord: el resto llegó por extra={...}
+_CAMPOS_REGISTRO = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+_listener: Optional[QueueListener] = None
+
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro: fecha, nivel, logger, mensaje, origen, excepción y campos extra."""
+
+    def format(self, record):
+        datos = {
+            'fecha': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+            'modulo': record.module,
+            'linea': record.lineno,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            datos['excepcion'] = record.exc_text
+        if record.stack_info:
+            datos['pila'] = self.formatStack(record.stack_info)
+        for clave, valor in record.__dict__.items():
+            if clave not in _CAMPOS_REGISTRO and not clave.startswith('_'):
+                datos[clave] = valor
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class ColaHandler(QueueHandler):
+    """
+    Encola el registro con el mensaje ya interpolado y la excepción como texto
+    (los argumentos y el traceback pueden cambiar después de volver); el
+    formato final (JSON o texto) se aplica en el hilo del listener.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def niveles_log(valor: str) -> Dict[str, int]:
+    """
+    Interpreta LOG_LEVEL: ``'INFO'`` o ``'INFO,modulo=WARNING,...'``.
+
+    Returns:
+        {nombre_logger: nivel}; la clave '' es el logger raíz
+    """
+    niveles = {}
+    for parte in (valor or '').split(','):
+        parte = parte.strip()
+        if not parte:
+            continue
+        nombre, _, nivel = parte.rpartition('=')
+        numero = logging.getLevelName(nivel.strip().upper())
+        if not isinstance(numero, int):
+            raise ValueError(f"Nivel de log inválido en LOG_LEVEL: {parte!r}")
+        niveles[nombre.strip()] = numero
+    return niveles
+
+
+def crear_handler(formato: str = 'json', stream=None) -> logging.Handler:
+    """Handler de salida (stderr por defecto) con el formato de LOG_FORMAT."""
+    handler = logging.StreamHandler(stream or sys.stderr)
+    if formato == 'texto':
+        handler.setFormatter(logging.Formatter(FORMATO_TEXTO, datefmt='%Y-%m-%d %H:%M:%S'))
+    else:
+        handler.setFormatter(FormatoJSON())
+    return handler
+
+
+def iniciar_cola(destino: logging.Logger, *handlers: logging.Handler) -> QueueListener:
+    """Agrega a ``destino`` un ColaHandler y arranca el listener que escribe en ``handlers``."""
+    cola = queue.SimpleQueue()
+    destino.addHandler(ColaHandler(cola))
+    listener = QueueListener(cola, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def configurar_logs(app) -> None:
+    """
+    Aplica LOG_LEVEL y, una vez por proceso, instala la cola en el logger raíz.
+
+    Si el proceso ya configuró handlers (gunicorn con --log-config, pytest) se
+    respetan y solo se aplican los niveles.
+    """
+    global _listener
+    for nombre, nivel in niveles_log(app.config.get('LOG_LEVEL') or 'INFO').items():
+        logging.getLogger(nombre or None).setLevel(nivel)
+
+    raiz = logging.getLogger()
+    if _listener is not None or raiz.handlers:
+        return
+    _listener = iniciar_cola(raiz, crear_handler(app.config.get('LOG_FORMAT') or 'json'))
+    # Al salir se vacía la cola antes de cerrar el proceso
+    atexit.register(_listener.stop)
@@ -0,0 +1,219 @@
+"""
+Área de staging para cargas de documentos (escritura en dos fases).
+
+Las cargas ya no se escriben directamente en UPLOAD_FOLDER:
+
+1. ``procesar_carga`` guarda (y optimiza) el archivo en UPLOAD_STAGING_FOLDER
+   y registra en la sesión de BD el movimiento pendiente hacia su ruta
+   definitiva, que es la que queda en ``Documento.ruta``.
+2. Al confirmarse la transacción (``after_commit``) los archivos se mueven
+   a UPLOAD_FOLDER con ``os.replace`` (atómico en el mismo sistema de
+   archivos). Si la transacción termina sin commit (rollback, error o
+   cierre de la sesión), los archivos pendientes se eliminan del staging.
+   Dentro de un SAVEPOINT (``begin_nested``) que se revierte se eliminan
+   solo las cargas registradas después de abrirlo.
+
+La limpieza no depende de consultar filas que ya fueron revertidas. Lo que
+quede en staging por una caída del proceso lo recoge ``barrer_staging``
+(tarea periódica): elimina los archivos con más de UPLOAD_STAGING_TTL
+segundos, salvo que exista un documento confirmado cuyo archivo definitivo
+falte, en cuyo caso lo promueve.
+"""
+
+import errno
+import logging
+import os
+import shutil
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.utils.imagenes import CARPETA_ORIGINALES
+from app.utils.validaciones import procesar_archivo_completo
+
+logger = logging.getLogger(__name__)
+
+CLAVE_PENDIENTES = 'staging_pendientes'
+CLAVE_SAVEPOINTS = 'staging_savepoints'
+
+
+def carpeta_staging() -> str:
+    from flask import current_app
+
+    carpeta = current_app.config['UPLOAD_STAGING_FOLDER']
+    os.makedirs(carpeta, exist_ok=True)
+    return carpeta
+
+
+def registrar_promocion(ruta_staging: str, ruta_final: str, sesion=None) -> None:
+    """Programa el movimiento staging → definitivo para cuando la sesión confirme."""
+    if sesion is None:
+        from app.models import db
+        sesion = db.session
+    sesion.info.setdefault(CLAVE_PENDIENTES, []).append((ruta_staging, ruta_final))
+
+
+def promover(ruta_staging: str, ruta_final: str) -> None:
+    """Mueve un archivo de staging a su ruta definitiva sin dejarlo a medio escribir."""
+    os.makedirs(os.path.dirname(ruta_final), exist_ok=True)
+    try:
+        os.replace(ruta_staging, ruta_final)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # Staging en otro sistema de archivos: copiar junto al destino y renombrar
+        temporal = f'{ruta_final}.tmp'
+        shutil.copyfile(ruta_staging, temporal)
+        os.replace(temporal, ruta_final)
+        os.remove(ruta_staging)
+
+
+def _descartar(pendientes) -> None:
+    for ruta_staging, _ in pendientes:
+        try:
+            os.remove(ruta_staging)
+            logger.info('🗑️ Carga descartada (transacción sin commit): %s', os.path.basename(ruta_staging))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning('⚠️ No se pudo eliminar %s del staging: %s', ruta_staging, e)
+
+
+@event.listens_for(Session, 'after_transaction_create')
+def _marcar_savepoint(sesion, transaccion):
+    if transaccion.nested:
+        # Cargas registradas antes del SAVEPOINT: no se descartan si este se revierte
+        marcas = sesion.info.setdefault(CLAVE_SAVEPOINTS, {})
+        marcas[transaccion] = len(sesion.info.get(CLAVE_PENDIENTES, []))
+
+
+@event.listens_for(Session, 'after_commit')
+def _promover_pendientes(sesion):
+    savepoint = sesion.get_nested_transaction()
+    if savepoint is not None:
+        # RELEASE SAVEPOINT: sus cargas pasan a la transacción externa
+        sesion.info.get(CLAVE_SAVEPOINTS, {}).pop(savepoint, None)
+        return
+    for ruta_staging, ruta_final in sesion.info.pop(CLAVE_PENDIENTES, []):
+        try:
+            promover(ruta_staging, ruta_final)
+        except Exception as e:
+            # El archivo sigue en staging: barrer_staging lo promueve en su siguiente pasada
+            logger.error('❌ No se pudo mover %s a %s: %s', ruta_staging, ruta_final, e)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _descartar_pendientes(sesion, transaccion):
+    if transaccion.parent is None:
+        sesion.info.pop(CLAVE_SAVEPOINTS, None)
+        _descartar(sesion.info.pop(CLAVE_PENDIENTES, []))
+        return
+    marca = sesion.info.get(CLAVE_SAVEPOINTS, {}).pop(transaccion, None)
+    if marca is None:
+        return  # Savepoint confirmado (o sin cargas): la transacción externa decide
+    pendientes = sesion.info.get(CLAVE_PENDIENTES, [])
+    _descartar(pendientes[marca:])
+    del pendientes[marca:]
+
+
+def procesar_carga(
+    file,
+    tipo_documento,
+    incapacidad_id,
+    upload_folder: Optional[str] = None,
+    max_mb: int = 10,
+) -> Dict[str, Any]:
+    """
+    ``procesar_archivo_completo`` en dos fases.
+
+    El archivo se procesa en staging y ``metadatos['ruta']`` apunta a la ruta
+    definitiva en UPLOAD_FOLDER, donde estará después del commit.
+
+    Returns:
+        dict: Mismo formato que ``procesar_archivo_completo``; los metadatos
+              incluyen además ``ruta_staging``
+    """
+    from flask import current_app
+
+    destino = upload_folder or current_app.config['UPLOAD_FOLDER']
+    resultado = procesar_archivo_completo(file, tipo_documento, incapacidad_id, carpeta_staging(), max_mb)
+    if not resultado['exito']:
+        return resultado
+
+    metadatos = resultado['metadatos']
+    metadatos['ruta_staging'] = metadatos['ruta']
+    metadatos['ruta'] = os.path.join(destino, metadatos['nombre_unico'])
+    registrar_promocion(metadatos['ruta_staging'], metadatos['ruta'])
+
+    if metadatos.get('ruta_original'):
+        ruta_original = os.path.join(destino, CARPETA_ORIGINALES, os.path.basename(metadatos['ruta_original']))
+        registrar_promocion(metadatos['ruta_original'], ruta_original)
+        metadatos['ruta_original'] = ruta_original
+
+    return resultado
+
+
+def barrer_staging(max_edad: Optional[int] = None) -> Dict[str, int]:
+    """
+    Elimina del staging los archivos abandonados.
+
+    Args:
+        max_edad: Antigüedad mínima en segundos (default: UPLOAD_STAGING_TTL)
+
+    Returns:
+        dict: {'eliminados': int, 'rescatados': int, 'bytes_liberados': int}
+    """
+    from flask import current_app
+    from app.models import db
+    from app.models.documento import Documento
+    from app.utils.almacenamiento import NIVEL_CALIENTE
+
+    if max_edad is None:
+        max_edad = current_app.config.get('UPLOAD_STAGING_TTL', 3600)
+    carpeta = current_app.config['UPLOAD_STAGING_FOLDER']
+    resultado = {'eliminados': 0, 'rescatados': 0, 'bytes_liberados': 0}
+    if not os.path.isdir(carpeta):
+        return resultado
+
+    limite = time.time() - max_edad
+    for raiz, _, archivos in os.walk(carpeta):
+        for nombre in archivos:
+            ruta = os.path.join(raiz, nombre)
+            try:
+                estado = os.stat(ruta)
+            except FileNotFoundError:
+                continue  # Promovido o descartado mientras se recorría
+            if estado.st_mtime > limite:
+                continue
+
+            # Documento confirmado cuya promoción falló: se completa en lugar de borrar
+            documento = db.session.execute(
+                db.select(Documento).where(
+                    Documento.nombre_unico == nombre,
+                    Documento.nivel_almacenamiento == NIVEL_CALIENTE,
+                ).limit(1)
+            ).scalar_one_or_none()
+            if documento is not None and os.path.isabs(documento.ruta) and not os.path.exists(documento.ruta):
+                try:
+                    promover(ruta, documento.ruta)
+                    resultado['rescatados'] += 1
+                    logger.warning('⚠️ Staging: documento #%s promovido por el barrido', documento.id)
+                    continue
+                except OSError as e:
+                    logger.error('❌ Staging: no se pudo promover %s: %s', ruta, e)
+                    continue
+
+            try:
+                os.remove(ruta)
+                resultado['eliminados'] += 1
+                resultado['bytes_liberados'] += estado.st_size
+            except FileNotFoundError:
+                pass
+
+    if resultado['eliminados'] or resultado['rescatados']:
+        logger.info(
+            '🧹 Staging: %s archivo(s) abandonados eliminados (%.1f MB), %s rescatados', resultado['eliminados'], resultado['bytes_liberados'] / (1024 * 1024), resultado['rescatados']
+        )
+    return resultado
@@ -0,0 +1,109 @@
+"""
+Unidad de trabajo: un solo commit por operación.
+
+Los helpers que antes confirmaban por su cuenta (procesar_archivos,
+send_email, notificar_rrhh, notificar_nueva_incapacidad) llaman a
+``confirmar()``: fuera de una unidad de trabajo hace commit como siempre,
+dentro solo hace flush. Así un registro (incapacidad, documentos,
+notificaciones) se confirma con un único commit al salir del bloque (un
+fsync en SQLite) y una excepción revierte todo.
+
+- Una unidad de trabajo dentro de otra es un SAVEPOINT: si falla, se
+  revierte solo lo suyo y la excepción sigue hacia quien la abrió.
+- Los efectos externos (emails, inspección de documentos) se registran con
+  ``despues_de_commit`` y se ejecutan solo si el commit final se hizo, igual
+  que la promoción de archivos de app/utils/staging.py.
+
+Uso:
+    with unidad_de_trabajo():
+        db.session.add(incapacidad)
+        procesar_archivos(...)                      # flush, sin commit
+        despues_de_commit(programar_inspeccion, documentos)
+"""
+
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+CLAVE_UNIDAD = 'unidad_de_trabajo'
+CLAVE_CALLBACKS = 'despues_de_commit'
+
+
+def _sesion(sesion=None):
+    if sesion is None:
+        from app.models import db
+        sesion = db.session
+    return sesion
+
+
+def en_unidad_de_trabajo(sesion=None) -> bool:
+    return bool(_sesion(sesion).info.get(CLAVE_UNIDAD))
+
+
+def confirmar(sesion=None) -> None:
+    """Commit, o solo flush si hay una unidad de trabajo abierta (ella hará el commit)."""
+    sesion = _sesion(sesion)
+    if en_unidad_de_trabajo(sesion):
+        sesion.flush()
+    else:
+        sesion.commit()
+
+
+def despues_de_commit(funcion, *args, sesion=None, **kwargs) -> None:
+    """
+    Ejecuta ``funcion(*args, **kwargs)`` cuando la unidad de trabajo confirme.
+
+    Sin unidad de trabajo abierta se ejecuta de inmediato (el llamador ya
+    confirmó). Si la unidad de trabajo se revierte, no se ejecuta.
+    """
+    sesion = _sesion(sesion)
+    if en_unidad_de_trabajo(sesion):
+        sesion.info.setdefault(CLAVE_CALLBACKS, []).append((funcion, args, kwargs))
+    else:
+        funcion(*args, **kwargs)
+
+
+def _ejecutar_callbacks(callbacks) -> None:
+    for funcion, args, kwargs in callbacks:
+        try:
+            funcion(*args, **kwargs)
+        except Exception as e:
+            # El commit ya se hizo: un efecto externo fallido no lo revierte
+            logger.error('❌ Error después del commit en %s: %s', getattr(funcion, '__name__', funcion), e, exc_info=True)
+
+
+@contextmanager
+def unidad_de_trabajo(sesion=None):
+    """
+    Agrupa las escrituras del bloque en una sola transacción.
+
+    Al salir sin errores hace commit y ejecuta los callbacks de
+    ``despues_de_commit``; con una excepción hace rollback, descarta los
+    callbacks y relanza la excepción.
+    """
+    sesion = _sesion(sesion)
+
+    if en_unidad_de_trabajo(sesion):
+        # Anidada: SAVEPOINT. Sus callbacks se descartan si se revierte
+        callbacks = sesion.info.setdefault(CLAVE_CALLBACKS, [])
+        registrados = len(callbacks)
+        try:
+            with sesion.begin_nested():
+                yield sesion
+        except BaseException:
+            del callbacks[registrados:]
+            raise
+        return
+
+    sesion.info[CLAVE_UNIDAD] = True
+    try:
+        yield sesion
+        sesion.commit()
+    except BaseException:
+        sesion.rollback()
+        raise
+    finally:
+        sesion.info.pop(CLAVE_UNIDAD, None)
+        callbacks = sesion.info.pop(CLAVE_CALLBACKS, [])
+    _ejecutar_callbacks(callbacks)
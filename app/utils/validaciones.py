@@ -3,6 +3,8 @@ import os
 import uuid
 import hashlib
 
+from app.utils.imagenes import opciones_optimizacion, optimizar_imagen
+
 # Mapeo de documentos obligatorios según tipo de incapacidad (UC1 - Sección 5.1.2)
 # ACTUALIZADO: Usar valores del enum TipoDocumentoEnum para compatibilidad con UC6
 DOCUMENTOS_REQUERIDOS_POR_TIPO = {
@@ -165,8 +167,12 @@ def validar_rango_fechas(fecha_inicio, fecha_fin):
     
     return errores
 
-def validar_archivo(file):
-    """UC1-E3: Validar que el archivo cumpla requisitos (formato y tamaño)"""
+def validar_archivo(file, max_mb=10):
+    """
+    UC1-E3: Validar que el archivo cumpla requisitos (formato y tamaño).
+    
+    max_mb: tamaño máximo; las cargas por fragmentos usan CARGAS_MAX_MB.
+    """
     errores = []
     
     if not file or file.filename == '':
@@ -187,7 +193,7 @@ def validar_archivo(file):
     file.seek(0)
     
     tamaño_mb = tamaño / (1024 * 1024)
-    MAX_SIZE_MB = 10
+    MAX_SIZE_MB = max_mb
     
     if tamaño_mb > MAX_SIZE_MB:
         errores.append(
@@ -252,6 +258,9 @@ def obtener_mime_type(filename):
     """
     Obtener el tipo MIME basado en la extensión del archivo.
     
+    Es el tipo declarado; el real lo verifica después la inspección en
+    segundo plano (app/utils/inspeccion_documentos.py).
+    
     Args:
         filename (str): Nombre del archivo
     
@@ -264,12 +273,13 @@ def obtener_mime_type(filename):
         'pdf': 'application/pdf',
         'png': 'image/png',
         'jpg': 'image/jpeg',
-        'jpeg': 'image/jpeg'
+        'jpeg': 'image/jpeg',
+        'webp': 'image/webp'
     }
     
     return mime_types.get(extension, 'application/octet-stream')
 
-def procesar_archivo_completo(file, tipo_documento, incapacidad_id, upload_folder):
+def procesar_archivo_completo(file, tipo_documento, incapacidad_id, upload_folder, max_mb=10):
     """
     Procesar archivo completo: validar, generar nombre único, calcular metadatos y guardar.
     
@@ -278,6 +288,7 @@ def procesar_archivo_completo(file, tipo_documento, incapacidad_id, upload_folde
         tipo_documento (str): Tipo de documento
         incapacidad_id (int): ID de la incapacidad
         upload_folder (str): Carpeta de destino
+        max_mb (int): Tamaño máximo permitido en MB
     
     Returns:
         dict: {
@@ -293,9 +304,10 @@ def procesar_archivo_completo(file, tipo_documento, incapacidad_id, upload_folde
         - tamaño_bytes: Tamaño en bytes
         - checksum_md5: Hash MD5
         - mime_type: Tipo MIME
+        - ruta_original: Copia sin optimizar (solo imágenes, si se conserva)
     """
     # 1. Validar archivo
-    errores = validar_archivo(file)
+    errores = validar_archivo(file, max_mb)
     if errores:
         return {
             'exito': False,
@@ -332,14 +344,32 @@ def procesar_archivo_completo(file, tipo_documento, incapacidad_id, upload_folde
                 'metadatos': None
             }
         
-        # 9. Retornar metadatos
+        # 9. Optimizar imágenes (opcional: IMAGENES_OPTIMIZAR)
+        nombre_archivo = file.filename
+        ruta_original = None
+        opciones = opciones_optimizacion()
+        if opciones.pop('habilitado') and mime_type.startswith('image/'):
+            optimizada = optimizar_imagen(ruta_completa, mime_type, **opciones)
+            if optimizada:
+                ruta_completa = optimizada['ruta']
+                nombre_unico = os.path.basename(ruta_completa)
+                tamaño_bytes = optimizada['tamaño_bytes']
+                ruta_original = optimizada['ruta_original']
+                if optimizada['mime_type'] != mime_type:
+                    mime_type = optimizada['mime_type']
+                    nombre_archivo = f"{os.path.splitext(nombre_archivo)[0]}.{optimizada['extension']}"
+                with open(ruta_completa, 'rb') as archivo_optimizado:
+                    checksum_md5 = calcular_checksum_md5(archivo_optimizado)
+        
+        # 10. Retornar metadatos
         metadatos = {
-            'nombre_archivo': file.filename,
+            'nombre_archivo': nombre_archivo,
             'nombre_unico': nombre_unico,
             'ruta': ruta_completa,
             'tamaño_bytes': tamaño_bytes,
             'checksum_md5': checksum_md5,
-            'mime_type': mime_type
+            'mime_type': mime_type,
+            'ruta_original': ruta_original
         }
         
         return {
@@ -356,29 +386,44 @@ def procesar_archivo_completo(file, tipo_documento, incapacidad_id, upload_folde
         }
 
 def validar_integridad_sistema():
-    """Validar integridad del sistema"""
+    """
+    Validar integridad del sistema.
+    
+    El estado de los archivos se toma del último escaneo de integridad
+    completado (``flask escanear-integridad``), que recorre los documentos
+    de forma incremental en lugar de revisarlos todos en cada llamada.
+    """
+    from app.models import db
     from app.models.incapacidad import Incapacidad
     from app.models.documento import Documento
+    from app.services.integridad_service import IntegridadService
     
     problemas = []
     
-    # Verificar incapacidades sin documentos
-    incapacidades_sin_docs = Incapacidad.query.filter(
-        ~Incapacidad.documentos.any()
-    ).all()
+    # Verificar incapacidades sin documentos (conteo en BD, sin cargar filas)
+    tiene_documentos = db.select(Documento.id).where(Documento.incapacidad_id == Incapacidad.id).exists()
+    incapacidades_sin_docs = db.session.execute(
+        db.select(db.func.count(Incapacidad.id)).where(~tiene_documentos)
+    ).scalar_one()
     
     if incapacidades_sin_docs:
-        problemas.append(f'{len(incapacidades_sin_docs)} incapacidades sin documentos adjuntos')
-    
-    # Verificar documentos sin archivo fisico
-    documentos = Documento.query.all()
-    archivos_faltantes = []
-    
-    for doc in documentos:
-        if not os.path.exists(doc.ruta):
-            archivos_faltantes.append(doc.id)
-    
-    if archivos_faltantes:
-        problemas.append(f'{len(archivos_faltantes)} documentos sin archivo fisico')
-    
-    return problemas
\ No newline at end of file
+        problemas.append(f'{incapacidades_sin_docs} incapacidades sin documentos adjuntos')
+    
+    # Verificar archivos fisicos segun el ultimo escaneo completo
+    escaneo = IntegridadService.ultimo_escaneo_completado()
+    if escaneo is None:
+        problemas.append('No hay escaneos de integridad completados (flask escanear-integridad)')
+        return problemas
+    
+    if escaneo.faltantes:
+        problemas.append(f'{escaneo.faltantes} documentos sin archivo fisico')
+    if escaneo.tamaño_incorrecto:
+        problemas.append(f'{escaneo.tamaño_incorrecto} documentos con tamaño distinto al registrado')
+    if escaneo.checksum_incorrecto:
+        problemas.append(f'{escaneo.checksum_incorrecto} documentos con checksum MD5 distinto al registrado')
+    if escaneo.errores:
+        problemas.append(f'{escaneo.errores} documentos que no se pudieron verificar')
+    if escaneo.huerfanos:
+        problemas.append(f'{escaneo.huerfanos} archivos sin registro en la base de datos')
+    
+    return problemas
@@ -0,0 +1,135 @@
+"""
+Escritura incremental de archivos ZIP.
+
+``zipfile`` acepta destinos no posicionables (sin ``seek``): en ese caso
+escribe cada entrada con "data descriptor" y nunca vuelve atrás. Se usa un
+buffer de salida que se vacía después de cada bloque, de modo que el ZIP se
+puede enviar al cliente mientras se construye, sin archivo temporal ni el
+archivo completo en memoria.
+
+Los documentos (PDF, JPG, PNG) ya vienen comprimidos, así que se almacenan
+sin compresión (ZIP_STORED): el costo de CPU es mínimo y el tamaño casi igual.
+"""
+
+import io
+import logging
+import os
+import time
+import zipfile
+from typing import Iterable, Iterator, Optional, Tuple
+
+from app.utils.almacenamiento import ErrorAlmacenamiento
+
+logger = logging.getLogger(__name__)
+
+TAMAÑO_BLOQUE_LECTURA = 256 * 1024
+
+NOMBRE_ARCHIVO_FALTANTES = 'ARCHIVOS_NO_ENCONTRADOS.txt'
+
+
+class _BufferSalida(io.RawIOBase):
+    """Destino de escritura solo-añadir: acumula bytes hasta que se vacía."""
+
+    def __init__(self):
+        self._trozos = []
+        self._posicion = 0
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        datos = bytes(datos)
+        self._trozos.append(datos)
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self._posicion
+
+    def vaciar(self) -> bytes:
+        datos = b''.join(self._trozos)
+        self._trozos = []
+        return datos
+
+
+def nombre_unico_en_zip(nombre: str, usados: set) -> str:
+    """Evita entradas duplicadas agregando un sufijo numérico (doc.pdf → doc (2).pdf)."""
+    candidato = nombre
+    base, extension = os.path.splitext(nombre)
+    contador = 2
+    while candidato in usados:
+        candidato = f'{base} ({contador}){extension}'
+        contador += 1
+    usados.add(candidato)
+    return candidato
+
+
+def generar_zip(
+    entradas: Iterable[Tuple[str, str]],
+    al_agregar: Optional[callable] = None,
+) -> Iterator[bytes]:
+    """
+    Construye un ZIP y lo entrega por trozos.
+
+    Args:
+        entradas: Iterable de (nombre dentro del ZIP, origen). El origen es
+                  una ruta en disco o una función sin argumentos que abre el
+                  archivo (documentos en almacenamiento remoto)
+        al_agregar: Callback opcional llamado después de cada entrada con
+                    (nombre, agregado: bool) — útil para reportar progreso
+
+    Yields:
+        bytes: Trozos consecutivos del archivo ZIP
+
+    Las rutas que no existen se omiten y se listan en un archivo de texto
+    dentro del mismo ZIP.
+    """
+    buffer = _BufferSalida()
+    faltantes = []
+
+    with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_STORED) as archivo_zip:
+        for nombre, ruta in entradas:
+            try:
+                if callable(ruta):
+                    origen = ruta()
+                    # Tamaño desconocido de antemano: se reservan campos ZIP64
+                    info = zipfile.ZipInfo(nombre, date_time=time.localtime()[:6])
+                    forzar_zip64 = True
+                else:
+                    info = zipfile.ZipInfo.from_file(ruta, arcname=nombre)
+                    origen = open(ruta, 'rb')
+                    forzar_zip64 = False
+            except (FileNotFoundError, NotADirectoryError, ErrorAlmacenamiento):
+                logger.warning('⚠️ Archivo no encontrado para ZIP: %s', nombre)
+                faltantes.append(nombre)
+                if al_agregar:
+                    al_agregar(nombre, False)
+                continue
+
+            info.compress_type = zipfile.ZIP_STORED
+            with origen, archivo_zip.open(info, mode='w', force_zip64=forzar_zip64) as destino:
+                while True:
+                    bloque = origen.read(TAMAÑO_BLOQUE_LECTURA)
+                    if not bloque:
+                        break
+                    destino.write(bloque)
+                    datos = buffer.vaciar()
+                    if datos:
+                        yield datos
+
+            datos = buffer.vaciar()
+            if datos:
+                yield datos
+            if al_agregar:
+                al_agregar(nombre, True)
+
+        if faltantes:
+            archivo_zip.writestr(
+                NOMBRE_ARCHIVO_FALTANTES,
+                'Los siguientes documentos no se encontraron en el servidor:\n' + '\n'.join(faltantes) + '\n'
+            )
+
+    # Directorio central al cerrar el ZIP
+    datos = buffer.vaciar()
+    if datos:
+        yield datos
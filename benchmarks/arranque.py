@@ -0,0 +1,75 @@
+"""
+Benchmark de arranque en frío: tiempo de importación de la app y de create_app.
+
+Cada medición es un proceso nuevo de Python (como un worker de gunicorn o un
+script como crear_usuarios.py). Usa ``-X importtime`` para listar los módulos
+que más tardan en importarse.
+
+Uso:
+    python benchmarks/arranque.py
+    python benchmarks/arranque.py --repeticiones 10 --top 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ESCENARIOS = {
+    'import app': 'import app',
+    'create_app': 'from app import create_app; create_app()',
+    # Script de mantenimiento (como crear_usuarios.py): app + conexión a la base
+    'script': (
+        'from app import create_app, db; from sqlalchemy import text; '
+        'app = create_app(); app.app_context().push(); db.session.execute(text("SELECT 1"))'
+    ),
+}
+
+
+def ejecutar(codigo, importtime=False):
+    argumentos = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', codigo]
+    inicio = time.perf_counter()
+    resultado = subprocess.run(argumentos, cwd=RAIZ, capture_output=True, text=True)
+    duracion = time.perf_counter() - inicio
+    if resultado.returncode != 0:
+        raise SystemExit(resultado.stderr[-2000:])
+    return duracion, resultado.stderr
+
+
+def modulos_por_tiempo(salida_importtime):
+    """{modulo: tiempo acumulado en µs} a partir de la salida de -X importtime."""
+    modulos = {}
+    for linea in salida_importtime.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _, acumulado, nombre = linea[len('import time:'):].split('|')
+        modulos[nombre.strip()] = int(acumulado)
+    return modulos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeticiones', type=int, default=7)
+    parser.add_argument('--top', type=int, default=10, help='Paquetes más lentos a mostrar (create_app)')
+    args = parser.parse_args()
+
+    print(f"{'escenario':<12}{'mediana':>12}{'mínimo':>12}")
+    for nombre, codigo in ESCENARIOS.items():
+        ejecutar(codigo)  # Calentar la caché de bytecode y del sistema de archivos
+        tiempos = [ejecutar(codigo)[0] * 1000 for _ in range(args.repeticiones)]
+        print(f"{nombre:<12}{statistics.median(tiempos):>9.0f} ms{min(tiempos):>9.0f} ms")
+
+    _, salida = ejecutar(ESCENARIOS['create_app'], importtime=True)
+    modulos = modulos_por_tiempo(salida)
+    paquetes = {nombre: us for nombre, us in modulos.items() if '.' not in nombre and nombre != 'app'}
+    print("\nPaquetes más lentos de importar en create_app (tiempo acumulado):")
+    for nombre, us in sorted(paquetes.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {us / 1000:>8.1f} ms  {nombre}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,391 @@
+"""
+Benchmark de los recorridos principales sobre un conjunto de datos sintético.
+
+Siembra una base SQLite con miles de usuarios y 100k incapacidades (con
+documentos, notificaciones y solicitudes UC6) y mide, con el cliente de
+pruebas de Flask en el mismo proceso (sin red ni servidor), cada recorrido:
+
+- registrar: POST /incapacidades/registrar con un certificado adjunto
+- dashboard_auxiliar, mis_incapacidades
+- mis_notificaciones, contador_no_leidas (API de notificaciones)
+- cargar_documentos_solicitados: POST con el documento pedido por UC6
+- procesar_recordatorios: la tarea diaria de UC6 sobre las solicitudes vencidas
+
+Para cada uno reporta operaciones por segundo, p50 y p95. Con una línea base
+(benchmarks/linea_base_recorridos.json) marca como regresión un p95 que sube,
+o un throughput que baja, más que --tolerancia, y sale con código 1 (para CI).
+La línea base solo se compara si se generó con los mismos datos (--usuarios,
+--incapacidades) y conviene regenerarla en la misma máquina del CI.
+
+Uso:
+    python benchmarks/recorridos.py
+    python benchmarks/recorridos.py --base /tmp/bench.db        # siembra una vez y reutiliza
+    python benchmarks/recorridos.py --usuarios 200 --incapacidades 5000 --repeticiones 20
+    python benchmarks/recorridos.py --guardar-linea-base
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select, update  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models.documento import Documento  # noqa: E402
+from app.models.enums import EstadoIncapacidadEnum, EstadoSolicitudDocumentoEnum  # noqa: E402
+from app.models.incapacidad import TIPOS_VALIDOS, Incapacidad  # noqa: E402
+from app.models.notificacion import Notificacion  # noqa: E402
+from app.models.solicitud_documento import SolicitudDocumento  # noqa: E402
+from app.models.usuario import Usuario  # noqa: E402
+
+LINEA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'linea_base_recorridos.json')
+CLAVE = 'bench123'
+LOTE = 5000
+AUXILIARES = 5
+# Incapacidades en DOCUMENTACION_INCOMPLETA con una solicitud UC6 pendiente
+SOLICITUDES_VENCIDAS = 1000  # vencen hoy o hace 1-3 días: las recorre procesar_recordatorios
+SOLICITUDES_ABIERTAS = 2000  # vencen en 3 días: las responde cargar_documentos_solicitados
+# La mayoría del histórico está cerrado; el resto se reparte entre los estados del dashboard
+ESTADOS_CERRADOS = ('PAGADA', 'TRANSCRITA', 'COBRADA', 'RECHAZADA_ENTIDAD')
+ESTADOS_ABIERTOS = ('PENDIENTE_VALIDACION', 'DOCUMENTACION_COMPLETA', 'APROBADA_PENDIENTE_TRANSCRIPCION', 'RECHAZADA')
+PROPORCION_ABIERTAS = 0.02
+
+# PDF mínimo de una página (la inspección en segundo plano lo acepta)
+PDF = (
+    b'%PDF-1.4\n'
+    b'1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj\n'
+    b'2 0 obj << /Type /Pages /Kids [3 0 R] /Count 1 >> endobj\n'
+    b'3 0 obj << /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >> endobj\n'
+    b'trailer << /Root 1 0 R >>\n%%EOF\n'
+)
+
+# Repeticiones por defecto de cada recorrido (--repeticiones las reemplaza)
+REPETICIONES = {
+    'registrar': 100,
+    'dashboard_auxiliar': 20,
+    'mis_incapacidades': 200,
+    'mis_notificaciones': 200,
+    'contador_no_leidas': 500,
+    'cargar_documentos_solicitados': 100,
+    'procesar_recordatorios': 5,
+}
+
+
+def configuracion(carpeta, ruta_base):
+    return {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{ruta_base}',
+        'UPLOAD_FOLDER': os.path.join(carpeta, 'uploads'),
+        'UPLOAD_STAGING_FOLDER': os.path.join(carpeta, 'staging'),
+        'PREVIEWS_FOLDER': os.path.join(carpeta, 'previews'),
+        'ALMACENAMIENTO_FRIO_CARPETA': os.path.join(carpeta, 'archivo'),
+        'PAQUETES_FOLDER': os.path.join(carpeta, 'paquetes'),
+        'SECRET_KEY': 'bench',
+        'WTF_CSRF_ENABLED': False,
+        'MAIL_ENABLED': False,
+        'SCHEDULER_ENABLED': False,
+        'LOG_LEVEL': 'ERROR',
+    }
+
+
+def insertar_por_lotes(modelo, filas):
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) == LOTE:
+            db.session.execute(insert(modelo), lote)
+            lote = []
+    if lote:
+        db.session.execute(insert(modelo), lote)
+
+
+def sembrar(usuarios, incapacidades):
+    """Datos sintéticos con inserciones en bloque (sin eventos del ORM)."""
+    inicio = time.perf_counter()
+    db.create_all()
+    plantilla = Usuario(nombre='', email='', rol='colaborador')
+    plantilla.set_password(CLAVE)  # Un solo hash para todos: el login cuesta lo mismo
+    hoy = date.today()
+    ahora = datetime.utcnow()
+
+    def usuario(i, rol, email=None):
+        return {'nombre': f'Usuario {i}', 'email': email or f'usuario{i}@bench.com',
+                'password_hash': plantilla.password_hash, 'rol': rol}
+
+    filas = [usuario(i, 'auxiliar') for i in range(1, AUXILIARES + 1)]
+    # Colaboradores dedicados: los recorridos que escriben no alteran los datos de los demás
+    filas.append(usuario(AUXILIARES + 1, 'colaborador', 'registro@bench.com'))
+    filas.append(usuario(AUXILIARES + 2, 'colaborador', 'cargas@bench.com'))
+    filas += [usuario(i, 'colaborador') for i in range(AUXILIARES + 3, usuarios + 1)]
+    insertar_por_lotes(Usuario, filas)
+    colaboradores = db.session.scalars(
+        select(Usuario.id).where(Usuario.rol == 'colaborador', Usuario.email.like('usuario%'))
+    ).all()
+    cargas_id = db.session.scalar(select(Usuario.id).where(Usuario.email == 'cargas@bench.com'))
+
+    def incapacidad(i, usuario_id, estado):
+        fecha_inicio = hoy - timedelta(days=i % 1000)
+        return {'usuario_id': usuario_id, 'tipo': TIPOS_VALIDOS[i % len(TIPOS_VALIDOS)],
+                'fecha_inicio': fecha_inicio, 'fecha_fin': fecha_inicio + timedelta(days=i % 5),
+                'dias': i % 5 + 1, 'estado': estado, 'codigo_radicacion': f'INC-BENCH-{i:07d}',
+                'fecha_registro': ahora - timedelta(minutes=i)}
+
+    abiertas = int(1 / PROPORCION_ABIERTAS)
+    insertar_por_lotes(Incapacidad, (
+        incapacidad(i, colaboradores[i % len(colaboradores)],
+                    ESTADOS_ABIERTOS[i // abiertas % len(ESTADOS_ABIERTOS)] if i % abiertas == 0
+                    else ESTADOS_CERRADOS[i % len(ESTADOS_CERRADOS)])
+        for i in range(incapacidades)
+    ))
+    incompleta = EstadoIncapacidadEnum.DOCUMENTACION_INCOMPLETA.value
+    insertar_por_lotes(Incapacidad, (
+        incapacidad(incapacidades + i, colaboradores[i % len(colaboradores)], incompleta)
+        for i in range(SOLICITUDES_VENCIDAS)
+    ))
+    insertar_por_lotes(Incapacidad, (
+        incapacidad(incapacidades + SOLICITUDES_VENCIDAS + i, cargas_id, incompleta)
+        for i in range(SOLICITUDES_ABIERTAS)
+    ))
+
+    ids = db.session.execute(select(Incapacidad.id, Incapacidad.usuario_id, Incapacidad.estado)).all()
+    insertar_por_lotes(Documento, (
+        {'incapacidad_id': incapacidad_id, 'nombre_archivo': f'{tipo}.pdf',
+         'nombre_unico': f'{incapacidad_id}_{tipo}.pdf', 'ruta': f'/bench/{incapacidad_id}_{tipo}.pdf',
+         'tipo_documento': tipo, 'tamaño_bytes': len(PDF), 'mime_type': 'application/pdf',
+         'estado_inspeccion': 'LIMPIO'}
+        for incapacidad_id, _, estado in ids if estado != incompleta
+        for tipo in ('certificado', 'epicrisis')
+    ))
+    insertar_por_lotes(Notificacion, (
+        {'tipo': 'REGISTRO_INCAPACIDAD', 'destinatario_id': usuario_id, 'asunto': f'Incapacidad #{incapacidad_id}',
+         'contenido': '<p>Su incapacidad fue registrada.</p>',
+         'estado': 'LEIDA' if incapacidad_id % 3 else 'ENTREGADA', 'fecha_envio': ahora}
+        for incapacidad_id, usuario_id, _ in ids
+    ))
+    incompletas = [fila for fila in ids if fila.estado == incompleta]
+    insertar_por_lotes(SolicitudDocumento, (
+        {'incapacidad_id': incapacidad_id, 'tipo_documento': 'EPICRISIS',
+         'estado': EstadoSolicitudDocumentoEnum.PENDIENTE.value, 'fecha_solicitud': ahora - timedelta(days=3),
+         'fecha_vencimiento': datetime.combine(
+             hoy + timedelta(days=3) if usuario_id == cargas_id else hoy - timedelta(days=i % 4),
+             datetime.min.time()),
+         'intentos_notificacion': 0, 'numero_reintentos': 0, 'extension_solicitada': False}
+        for i, (incapacidad_id, usuario_id, _) in enumerate(incompletas)
+    ))
+    db.session.commit()
+    print(f"Datos sembrados en {time.perf_counter() - inicio:.0f} s")
+
+
+def contar_datos():
+    return {
+        'usuarios': db.session.scalar(select(func.count()).select_from(Usuario)),
+        'incapacidades': db.session.scalar(select(func.count()).select_from(Incapacidad)),
+        'documentos': db.session.scalar(select(func.count()).select_from(Documento)),
+        'notificaciones': db.session.scalar(select(func.count()).select_from(Notificacion)),
+    }
+
+
+def cliente(app, email):
+    client = app.test_client()
+    respuesta = client.post('/login', data={'email': email, 'password': CLAVE})
+    if respuesta.status_code != 302:
+        raise SystemExit(f'No se pudo iniciar sesión como {email}')
+    return client
+
+
+def medir(operacion, repeticiones, max_segundos, preparar=None):
+    """
+    Ejecuta ``operacion`` hasta ``repeticiones`` veces (o hasta ``max_segundos``).
+
+    ``preparar`` (opcional) corre antes de cada repetición, fuera de la medición,
+    y retorna el argumento de ``operacion`` (None: no quedan datos para seguir).
+    """
+    latencias = []
+    errores = 0
+    fin = time.monotonic() + max_segundos
+    while len(latencias) < repeticiones and (len(latencias) < 3 or time.monotonic() < fin):
+        argumento = preparar() if preparar else None
+        if preparar and argumento is None:
+            break
+        inicio = time.perf_counter()
+        correcto = operacion(argumento)
+        latencias.append(time.perf_counter() - inicio)
+        errores += not correcto
+    if not latencias:
+        return None
+    percentiles = statistics.quantiles(latencias, n=100, method='inclusive') if len(latencias) > 1 else latencias * 99
+    return {
+        'operaciones': len(latencias),
+        'errores': errores,
+        'por_segundo': round(len(latencias) / sum(latencias), 2),
+        'p50_ms': round(percentiles[49] * 1000, 2),
+        'p95_ms': round(percentiles[94] * 1000, 2),
+    }
+
+
+def recorridos(app):
+    """{nombre: (operacion, preparar)} de cada recorrido."""
+    registro = cliente(app, 'registro@bench.com')
+    cargas = cliente(app, 'cargas@bench.com')
+    colaborador = cliente(app, f'usuario{AUXILIARES + 3}@bench.com')
+    auxiliar = cliente(app, 'usuario1@bench.com')
+    ajax = {'X-Requested-With': 'XMLHttpRequest'}
+    secuencia = iter(range(1, 10 ** 6))
+
+    def get(client, ruta):
+        return lambda _: client.get(ruta).status_code == 200
+
+    def registrar(_):
+        fecha = date(2020, 1, 1) + timedelta(days=next(secuencia))
+        respuesta = registro.post('/incapacidades/registrar', headers=ajax, data={
+            'tipo': 'Enfermedad General',
+            'fecha_inicio': fecha.isoformat(),
+            'fecha_fin': (fecha + timedelta(days=2)).isoformat(),
+            'certificado': (io.BytesIO(PDF), 'certificado.pdf', 'application/pdf'),
+        }, content_type='multipart/form-data')
+        return respuesta.status_code == 200
+
+    def siguiente_solicitud():
+        with app.app_context():
+            return db.session.scalar(
+                select(SolicitudDocumento.incapacidad_id)
+                .join(Incapacidad).join(Usuario)
+                .where(Usuario.email == 'cargas@bench.com',
+                       SolicitudDocumento.estado == EstadoSolicitudDocumentoEnum.PENDIENTE.value)
+                .limit(1)
+            )
+
+    def cargar_documentos(incapacidad_id):
+        respuesta = cargas.post(f'/incapacidades/{incapacidad_id}/cargar-documentos-solicitados', headers=ajax, data={
+            'documento_EPICRISIS': (io.BytesIO(PDF), 'epicrisis.pdf', 'application/pdf'),
+        }, content_type='multipart/form-data')
+        return respuesta.status_code == 200
+
+    def reiniciar_recordatorios():
+        # Cada ejecución encuentra las solicitudes vencidas sin recordatorio enviado
+        with app.app_context():
+            db.session.execute(
+                update(SolicitudDocumento)
+                .where(SolicitudDocumento.fecha_vencimiento <= datetime.utcnow())
+                .values(intentos_notificacion=0, numero_reintentos=0, ultima_notificacion=None)
+            )
+            db.session.commit()
+        return True
+
+    def procesar_recordatorios(_):
+        from app.services.solicitud_documentos_service import SolicitudDocumentosService
+        with app.app_context():
+            return SolicitudDocumentosService.procesar_recordatorios()['errores'] == 0
+
+    return {
+        'registrar': (registrar, None),
+        'dashboard_auxiliar': (get(auxiliar, '/incapacidades/dashboard-auxiliar'), None),
+        'mis_incapacidades': (get(colaborador, '/incapacidades/mis-incapacidades'), None),
+        'mis_notificaciones': (get(colaborador, '/notificaciones/api/mis-notificaciones'), None),
+        'contador_no_leidas': (get(colaborador, '/notificaciones/api/contador-no-leidas'), None),
+        'cargar_documentos_solicitados': (cargar_documentos, siguiente_solicitud),
+        'procesar_recordatorios': (procesar_recordatorios, reiniciar_recordatorios),
+    }
+
+
+def comparar(resultados, linea_base, tolerancia):
+    """Lista de regresiones respecto a la línea base."""
+    regresiones = []
+    for nombre, actual in resultados['recorridos'].items():
+        base = linea_base['recorridos'].get(nombre)
+        if not base:
+            continue
+        if actual['p95_ms'] > base['p95_ms'] * (1 + tolerancia):
+            regresiones.append(f"{nombre}: p95 {base['p95_ms']:.1f} → {actual['p95_ms']:.1f} ms")
+        if actual['por_segundo'] < base['por_segundo'] * (1 - tolerancia):
+            regresiones.append(f"{nombre}: {base['por_segundo']:.1f} → {actual['por_segundo']:.1f} op/s")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--usuarios', type=int, default=2000)
+    parser.add_argument('--incapacidades', type=int, default=100000)
+    parser.add_argument('--base', help='Base SQLite a reutilizar (se siembra si no existe)')
+    parser.add_argument('--repeticiones', type=int, help='Repeticiones de cada recorrido (por defecto, según el recorrido)')
+    parser.add_argument('--max-segundos', type=float, default=30, help='Tiempo máximo por recorrido')
+    parser.add_argument('--solo', nargs='+', choices=list(REPETICIONES), help='Recorridos a medir')
+    parser.add_argument('--salida', help='Archivo JSON con los resultados')
+    parser.add_argument('--linea-base', default=LINEA_BASE)
+    parser.add_argument('--guardar-linea-base', action='store_true', help='Escribe los resultados como línea base')
+    parser.add_argument('--tolerancia', type=float, default=0.25, help='Empeoramiento admitido (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    carpeta = tempfile.mkdtemp(prefix='bench_recorridos_')
+    ruta_base = os.path.abspath(args.base) if args.base else os.path.join(carpeta, 'bench.db')
+    sembrada = os.path.exists(ruta_base)
+    app = create_app(configuracion(carpeta, ruta_base))
+    try:
+        with app.app_context():
+            if not sembrada:
+                sembrar(args.usuarios, args.incapacidades)
+            datos = contar_datos()
+        print(', '.join(f'{cantidad} {nombre}' for nombre, cantidad in datos.items()))
+
+        # Las peticiones corren fuera de un contexto de aplicación: cada una
+        # abre el suyo, como en el servidor (g no se comparte entre clientes)
+        medidos = {}
+        print(f"\n{'recorrido':<32}{'op':>6}{'op/s':>10}{'p50':>12}{'p95':>12}")
+        for nombre, (operacion, preparar) in recorridos(app).items():
+            if args.solo and nombre not in args.solo:
+                continue
+            resultado = medir(operacion, args.repeticiones or REPETICIONES[nombre], args.max_segundos, preparar)
+            if resultado is None:
+                print(f"{nombre:<32}sin datos (¿base reutilizada sin solicitudes pendientes?)")
+                continue
+            medidos[nombre] = resultado
+            nota = f"  {resultado['errores']} errores" if resultado['errores'] else ''
+            print(f"{nombre:<32}{resultado['operaciones']:>6}{resultado['por_segundo']:>10.1f}"
+                  f"{resultado['p50_ms']:>9.1f} ms{resultado['p95_ms']:>9.1f} ms{nota}")
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+    resultados = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'datos': {'usuarios': args.usuarios, 'incapacidades': args.incapacidades},
+        'recorridos': medidos,
+    }
+    if args.salida:
+        with open(args.salida, 'w') as f:
+            json.dump(resultados, f, indent=2)
+    if args.guardar_linea_base:
+        with open(args.linea_base, 'w') as f:
+            json.dump(resultados, f, indent=2)
+            f.write('\n')
+        print(f"\nLínea base guardada en {args.linea_base}")
+        return
+
+    if not os.path.exists(args.linea_base):
+        return
+    with open(args.linea_base) as f:
+        linea_base = json.load(f)
+    if linea_base['datos'] != resultados['datos']:
+        print(f"\nLínea base con otros datos ({linea_base['datos']}): no se compara")
+        return
+    errores = [f'{nombre}: {r["errores"]} errores' for nombre, r in medidos.items() if r['errores']]
+    regresiones = comparar(resultados, linea_base, args.tolerancia) + errores
+    if regresiones:
+        print(f"\nRegresiones respecto a la línea base ({linea_base['fecha']}):")
+        for regresion in regresiones:
+            print(f"  ❌ {regresion}")
+        sys.exit(1)
+    print(f"\n✅ Sin regresiones respecto a la línea base ({linea_base['fecha']}, tolerancia {args.tolerancia:.0%})")
+
+
+if __name__ == '__main__':
+    main()
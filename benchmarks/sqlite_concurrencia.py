@@ -0,0 +1,158 @@
+"""
+Benchmark de concurrencia en SQLite: lecturas y escrituras simultáneas
+con y sin los PRAGMA de la aplicación (WAL, synchronous=NORMAL, busy_timeout...).
+
+Simula workers que consultan incapacidades (dashboard, mis incapacidades)
+mientras otros registran incapacidades con sus notificaciones, con un commit
+por fila como en el registro. Cada modo usa una base nueva en una carpeta temporal.
+
+Uso:
+    python benchmarks/sqlite_concurrencia.py
+    python benchmarks/sqlite_concurrencia.py --lectores 8 --escritores 4 --segundos 10
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, insert, select  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from app.models import db  # noqa: E402
+from app.models.incapacidad import Incapacidad  # noqa: E402
+from app.models.notificacion import Notificacion  # noqa: E402
+from app.models.tipos import nuevo_id  # noqa: E402
+from app.models.usuario import Usuario  # noqa: E402
+from app.utils.base_datos import pragmas_sqlite, registrar_pragmas_sqlite  # noqa: E402
+from config import Config  # noqa: E402
+
+USUARIOS = 200
+INCAPACIDADES_INICIALES = 5000
+
+MODOS = {
+    # Valores por defecto de SQLite: rollback journal, synchronous=FULL, sin busy_timeout propio
+    'antes': {'SQLITE_WAL': False, 'SQLITE_SYNCHRONOUS': None, 'SQLITE_BUSY_TIMEOUT_MS': 0,
+              'SQLITE_MMAP_MB': 0, 'SQLITE_CACHE_MB': 0},
+    'despues': {nombre: getattr(Config, nombre) for nombre in (
+        'SQLITE_WAL', 'SQLITE_SYNCHRONOUS', 'SQLITE_BUSY_TIMEOUT_MS', 'SQLITE_MMAP_MB', 'SQLITE_CACHE_MB'
+    )},
+}
+
+
+def preparar(engine):
+    db.metadata.create_all(engine)
+    with engine.begin() as conexion:
+        conexion.execute(insert(Usuario), [
+            {'nombre': f'Usuario {i}', 'email': f'usuario{i}@bench.com', 'password_hash': 'x',
+             'rol': 'colaborador'}
+            for i in range(1, USUARIOS + 1)
+        ])
+        conexion.execute(insert(Incapacidad), [
+            {'usuario_id': i % USUARIOS + 1, 'tipo': 'Enfermedad General', 'fecha_inicio': date.today(),
+             'fecha_fin': date.today(), 'dias': 1, 'estado': 'PENDIENTE_VALIDACION',
+             'codigo_radicacion': f'INC-BENCH-{i:06d}'}
+            for i in range(INCAPACIDADES_INICIALES)
+        ])
+
+
+def ejecutar(modo, lectores, escritores, segundos):
+    carpeta = tempfile.mkdtemp(prefix='bench_sqlite_')
+    engine = create_engine(
+        f"sqlite:///{os.path.join(carpeta, 'bench.db')}",
+        pool_size=lectores + escritores,
+        # El driver espera 5 s por defecto; en 'antes' se deja así para medir lo que ve la app hoy
+    )
+    registrar_pragmas_sqlite(engine, pragmas_sqlite(MODOS[modo]))
+    preparar(engine)
+
+    contadores = {'lecturas': 0, 'escrituras': 0, 'bloqueos': 0}
+    latencias_escritura = []
+    lock = threading.Lock()
+    fin = time.monotonic() + segundos
+
+    def lector(indice):
+        usuario_id = indice % USUARIOS + 1
+        while time.monotonic() < fin:
+            try:
+                with engine.connect() as conexion:
+                    conexion.execute(
+                        select(Incapacidad.id, Incapacidad.estado).where(Incapacidad.usuario_id == usuario_id)
+                        .order_by(Incapacidad.fecha_registro.desc()).limit(20)
+                    ).all()
+                    conexion.execute(
+                        select(Incapacidad.estado, func.count()).group_by(Incapacidad.estado)
+                    ).all()
+                with lock:
+                    contadores['lecturas'] += 1
+            except OperationalError:
+                with lock:
+                    contadores['bloqueos'] += 1
+
+    def escritor(indice):
+        secuencia = 0
+        while time.monotonic() < fin:
+            secuencia += 1
+            inicio = time.perf_counter()
+            try:
+                # Registro: la incapacidad y su notificación en commits separados
+                with engine.begin() as conexion:
+                    incapacidad_id = conexion.execute(insert(Incapacidad).values(
+                        usuario_id=indice % USUARIOS + 1, tipo='Enfermedad General', fecha_inicio=date.today(),
+                        fecha_fin=date.today(), dias=1, estado='PENDIENTE_VALIDACION',
+                        codigo_radicacion=f'INC-W{indice}-{secuencia:08d}', fecha_registro=datetime.utcnow()
+                    )).inserted_primary_key[0]
+                with engine.begin() as conexion:
+                    conexion.execute(insert(Notificacion).values(
+                        id=nuevo_id(), tipo='REGISTRO_INCAPACIDAD', destinatario_id=1,
+                        asunto=f'Incapacidad {incapacidad_id}', contenido='<p>bench</p>', estado='ENVIADA'
+                    ))
+                with lock:
+                    contadores['escrituras'] += 1
+                    latencias_escritura.append(time.perf_counter() - inicio)
+            except OperationalError:
+                with lock:
+                    contadores['bloqueos'] += 1
+
+    hilos = [threading.Thread(target=lector, args=(i,)) for i in range(lectores)]
+    hilos += [threading.Thread(target=escritor, args=(i,)) for i in range(escritores)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    engine.dispose()
+
+    latencias_escritura.sort()
+    p95 = latencias_escritura[int(len(latencias_escritura) * 0.95)] * 1000 if latencias_escritura else 0.0
+    return {
+        'lecturas_s': contadores['lecturas'] / segundos,
+        'escrituras_s': contadores['escrituras'] / segundos,
+        'p95_escritura_ms': p95,
+        'bloqueos': contadores['bloqueos'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lectores', type=int, default=8)
+    parser.add_argument('--escritores', type=int, default=2)
+    parser.add_argument('--segundos', type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"Lectores: {args.lectores} | Escritores: {args.escritores} | Duración: {args.segundos}s por modo\n")
+    print(f"{'modo':<10}{'lecturas/s':>14}{'escrituras/s':>15}{'p95 escritura':>16}{'bloqueos':>10}")
+    for modo in MODOS:
+        r = ejecutar(modo, args.lectores, args.escritores, args.segundos)
+        print(
+            f"{modo:<10}{r['lecturas_s']:>14.1f}{r['escrituras_s']:>15.1f}"
+            f"{r['p95_escritura_ms']:>13.1f} ms{r['bloqueos']:>10}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,112 @@
 import os
 
+from dotenv import load_dotenv
+
 # Obtener la ruta base del proyecto
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
+# Cargar .env antes de leer las variables (Config se evalúa al importar este módulo)
+load_dotenv(os.path.join(BASE_DIR, '.env'))
+
+
+def _url_base_datos():
+	"""DATABASE_URL (o SQLALCHEMY_DATABASE_URI); por defecto SQLite en instance/."""
+	url = os.environ.get('DATABASE_URL') or os.environ.get('SQLALCHEMY_DATABASE_URI') or 'sqlite:///database.db'
+	# Heroku y otros proveedores entregan postgres://, que SQLAlchemy ya no acepta
+	if url.startswith('postgres://'):
+		url = 'postgresql://' + url[len('postgres://'):]
+	return url
+
+
 class Config:
 	SECRET_KEY = os.environ.get('SECRET_KEY') or 'clave-super-secreta-dev'
-	SQLALCHEMY_DATABASE_URI = 'sqlite:///database.db'
+	SQLALCHEMY_DATABASE_URI = _url_base_datos()
 	SQLALCHEMY_TRACK_MODIFICATIONS = False
+	SQLALCHEMY_ECHO = os.environ.get('SQLALCHEMY_ECHO', 'false').lower() in ['true', 'on', '1']
+	# Pool de conexiones para PostgreSQL/MySQL (por proceso: workers × (POOL_SIZE + MAX_OVERFLOW) < max_connections)
+	DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 5)
+	DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 10)
+	DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT') or 30)  # segundos esperando una conexión libre
+	DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE') or 1800)  # segundos, antes del timeout del servidor/proxy
+	DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ['true', 'on', '1']
+	DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS') or 0)  # PostgreSQL, 0 = sin límite
+	# SQLite: PRAGMA en cada conexión (despliegues de un solo nodo)
+	SQLITE_WAL = os.environ.get('SQLITE_WAL', 'true').lower() in ['true', 'on', '1']
+	SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS') or 'NORMAL'  # FULL para máxima durabilidad
+	SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS') or 5000)  # espera ante bloqueos de escritura
+	SQLITE_MMAP_MB = int(os.environ.get('SQLITE_MMAP_MB') or 64)  # 0 = sin mmap
+	SQLITE_CACHE_MB = int(os.environ.get('SQLITE_CACHE_MB') or 16)  # caché de páginas por conexión
 	UPLOAD_FOLDER = os.path.join(BASE_DIR, 'app', 'static', 'uploads')
 	MAX_CONTENT_LENGTH = 10 * 1024 * 1024 # 10MB max
 	ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg'}
 	
+	# Staging de cargas: los archivos pasan a UPLOAD_FOLDER solo si la transacción se confirma
+	# (usar el mismo sistema de archivos que UPLOAD_FOLDER para que el movimiento sea atómico)
+	UPLOAD_STAGING_FOLDER = os.environ.get('UPLOAD_STAGING_FOLDER') or os.path.join(BASE_DIR, 'instance', 'staging')
+	UPLOAD_STAGING_TTL = int(os.environ.get('UPLOAD_STAGING_TTL') or 3600)  # segundos antes de considerar abandonado un archivo
+	
+	# Cargas reanudables por fragmentos (protocolo tus en /cargas)
+	CARGAS_MAX_MB = int(os.environ.get('CARGAS_MAX_MB') or 50)  # tamaño máximo de un documento cargado por fragmentos
+	CARGAS_FRAGMENTO_MB = int(os.environ.get('CARGAS_FRAGMENTO_MB') or 5)  # debe ser menor que MAX_CONTENT_LENGTH
+	
+	# Paquetes ZIP de auditoría preparados en segundo plano
+	PAQUETES_FOLDER = os.environ.get('PAQUETES_FOLDER') or os.path.join(BASE_DIR, 'instance', 'paquetes')
+	PAQUETES_TTL = int(os.environ.get('PAQUETES_TTL') or 86400)  # segundos que un paquete queda disponible para descargar
+	
+	# Entrega de documentos (ver/descargar)
+	DOCUMENTOS_CACHE_MAX_AGE = int(os.environ.get('DOCUMENTOS_CACHE_MAX_AGE') or 3600)  # segundos, caché privado del navegador
+	# Con nginx: prefijo de la location interna que apunta a UPLOAD_FOLDER (ej. '/_documentos/')
+	DOCUMENTOS_X_ACCEL_PREFIX = os.environ.get('DOCUMENTOS_X_ACCEL_PREFIX')
+	# Con Apache mod_xsendfile: send_file responde con X-Sendfile en lugar de los bytes
+	USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', 'false').lower() in ['true', 'on', '1']
+	
+	# Previsualizaciones de documentos (requiere Pillow; PDFs además PyMuPDF)
+	PREVIEWS_ENABLED = os.environ.get('PREVIEWS_ENABLED', 'true').lower() in ['true', 'on', '1']
+	PREVIEWS_FOLDER = os.environ.get('PREVIEWS_FOLDER') or os.path.join(BASE_DIR, 'instance', 'previews')
+	PREVIEWS_ANCHO = int(os.environ.get('PREVIEWS_ANCHO') or 320)  # píxeles
+	PREVIEWS_WORKERS = int(os.environ.get('PREVIEWS_WORKERS') or 2)
+	
+	# Inspección de documentos después de la carga: tipo real, estructura PDF y antivirus (en segundo plano)
+	INSPECCION_ENABLED = os.environ.get('INSPECCION_ENABLED', 'true').lower() in ['true', 'on', '1']
+	INSPECCION_WORKERS = int(os.environ.get('INSPECCION_WORKERS') or 2)
+	# Inspección y miniaturas en el hilo que las programa (vacío: solo con TESTING)
+	TAREAS_SINCRONAS = os.environ.get('TAREAS_SINCRONAS', '').lower() in ['true', 'on', '1'] if os.environ.get('TAREAS_SINCRONAS') else None
+	# ESCANER_ANTIVIRUS: vacío (sin antivirus), 'clamd' o 'modulo:funcion' (recibe la ruta, retorna la firma o None)
+	ESCANER_ANTIVIRUS = os.environ.get('ESCANER_ANTIVIRUS') or None
+	CLAMD_SOCKET = os.environ.get('CLAMD_SOCKET') or '/var/run/clamav/clamd.ctl'  # o tcp://host:3310
+	CLAMD_TIMEOUT = int(os.environ.get('CLAMD_TIMEOUT') or 30)  # segundos
+	
+	# Optimización de imágenes al cargar (requiere Pillow); desactivada por defecto: recomprime el archivo recibido
+	IMAGENES_OPTIMIZAR = os.environ.get('IMAGENES_OPTIMIZAR', 'false').lower() in ['true', 'on', '1']
+	IMAGENES_MAX_LADO = int(os.environ.get('IMAGENES_MAX_LADO') or 2000)  # píxeles, legible para certificados
+	IMAGENES_CALIDAD = int(os.environ.get('IMAGENES_CALIDAD') or 80)
+	IMAGENES_CONVERTIR_PNG = os.environ.get('IMAGENES_CONVERTIR_PNG') or None  # None, 'jpeg' o 'webp'
+	IMAGENES_CONSERVAR_ORIGINAL = os.environ.get('IMAGENES_CONSERVAR_ORIGINAL', 'false').lower() in ['true', 'on', '1']
+	
+	# Almacenamiento frío para documentos de incapacidades cerradas (PAGADA/RECHAZADA)
+	# ALMACENAMIENTO_FRIO: vacío (deshabilitado), 'local' o 's3' (AWS, MinIO...; requiere boto3)
+	ALMACENAMIENTO_FRIO = os.environ.get('ALMACENAMIENTO_FRIO') or None
+	ALMACENAMIENTO_FRIO_DIAS = int(os.environ.get('ALMACENAMIENTO_FRIO_DIAS') or 90)
+	ALMACENAMIENTO_FRIO_CARPETA = os.environ.get('ALMACENAMIENTO_FRIO_CARPETA') or os.path.join(BASE_DIR, 'instance', 'archivo')
+	ALMACENAMIENTO_FRIO_BUCKET = os.environ.get('ALMACENAMIENTO_FRIO_BUCKET')
+	ALMACENAMIENTO_FRIO_PREFIJO = os.environ.get('ALMACENAMIENTO_FRIO_PREFIJO') or 'documentos'
+	ALMACENAMIENTO_FRIO_ENDPOINT = os.environ.get('ALMACENAMIENTO_FRIO_ENDPOINT')  # ej. http://minio:9000
+	ALMACENAMIENTO_FRIO_REGION = os.environ.get('ALMACENAMIENTO_FRIO_REGION')
+	ALMACENAMIENTO_FRIO_ACCESS_KEY = os.environ.get('ALMACENAMIENTO_FRIO_ACCESS_KEY')
+	ALMACENAMIENTO_FRIO_SECRET_KEY = os.environ.get('ALMACENAMIENTO_FRIO_SECRET_KEY')
+	ALMACENAMIENTO_FRIO_CLASE = os.environ.get('ALMACENAMIENTO_FRIO_CLASE')  # ej. STANDARD_IA
+	ALMACENAMIENTO_URL_EXPIRA = int(os.environ.get('ALMACENAMIENTO_URL_EXPIRA') or 300)  # segundos
+	
+	# Escaneo incremental de integridad de documentos (existencia, tamaño y MD5)
+	INTEGRIDAD_ESCANEO_PROGRAMADO = os.environ.get('INTEGRIDAD_ESCANEO_PROGRAMADO', 'true').lower() in ['true', 'on', '1']
+	INTEGRIDAD_MAX_POR_EJECUCION = int(os.environ.get('INTEGRIDAD_MAX_POR_EJECUCION') or 50000)  # documentos por noche
+	INTEGRIDAD_LOTE = int(os.environ.get('INTEGRIDAD_LOTE') or 500)  # documentos por consulta y commit del cursor
+	INTEGRIDAD_WORKERS = int(os.environ.get('INTEGRIDAD_WORKERS') or 4)
+	INTEGRIDAD_VERIFICAR_CHECKSUM = os.environ.get('INTEGRIDAD_VERIFICAR_CHECKSUM', 'true').lower() in ['true', 'on', '1']
+	INTEGRIDAD_DOCUMENTOS_POR_SEGUNDO = float(os.environ.get('INTEGRIDAD_DOCUMENTOS_POR_SEGUNDO') or 0)  # 0 = sin límite
+	INTEGRIDAD_MB_POR_SEGUNDO = float(os.environ.get('INTEGRIDAD_MB_POR_SEGUNDO') or 0)  # lectura para MD5, 0 = sin límite
+	INTEGRIDAD_MAX_HALLAZGOS = int(os.environ.get('INTEGRIDAD_MAX_HALLAZGOS') or 10000)  # filas de detalle por escaneo
+	
 	# Configuración de sesiones
 	SESSION_PERMANENT = False  # Las sesiones expiran al cerrar el navegador
 	SESSION_TYPE = 'filesystem'  # Almacenar sesiones en filesystem
@@ -29,10 +125,32 @@ class Config:
 	ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL') or 'admin@empresa.com'
 	GESTION_HUMANA_EMAIL = os.environ.get('GESTION_HUMANA_EMAIL') or 'gestionhumana@empresa.com'
 	COLABORADOR_EMAIL = os.environ.get('COLABORADOR_EMAIL') or 'colaborador@empresa.com'
+	# Directorio de destinatarios de Gestión Humana en caché (se invalida al cambiar usuarios)
+	DIRECTORIO_RRHH_TTL = int(os.environ.get('DIRECTORIO_RRHH_TTL') or 300)  # segundos, cambios hechos por otros procesos
+	
+	# Plantillas de email: precompilación al iniciar y caché de bytecode de Jinja en disco
+	PLANTILLAS_PRECOMPILAR = os.environ.get('PLANTILLAS_PRECOMPILAR', 'true').lower() in ['true', 'on', '1']
+	PLANTILLAS_BYTECODE_CACHE = os.environ.get('PLANTILLAS_BYTECODE_CACHE', 'true').lower() in ['true', 'on', '1']
+	PLANTILLAS_BYTECODE_FOLDER = os.environ.get('PLANTILLAS_BYTECODE_FOLDER')  # vacío: carpeta privada en el temporal del sistema
+	PLANTILLAS_RENDER_LENTO_MS = int(os.environ.get('PLANTILLAS_RENDER_LENTO_MS') or 200)  # avisar renders más lentos
+	# Dominio público de los enlaces de los emails (url_externa); sin él se usa el Host de la petición
+	SERVER_NAME = os.environ.get('SERVER_NAME') or None
+	PREFERRED_URL_SCHEME = os.environ.get('PREFERRED_URL_SCHEME') or 'http'
+	
+	# Instrumentación de peticiones: consultas SQL, tiempos y latencia por endpoint en /metrics (Prometheus)
+	METRICAS_ENABLED = os.environ.get('METRICAS_ENABLED', 'true').lower() in ['true', 'on', '1']
+	METRICAS_PETICION_LENTA_MS = int(os.environ.get('METRICAS_PETICION_LENTA_MS') or 500)  # registrar con sus consultas
+	METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN')  # /metrics exige "Authorization: Bearer <token>"; sin token responde 403
+	
+	# Resúmenes de notificaciones (usuarios con frecuencia HORARIA o DIARIA)
+	RESUMEN_NOTIFICACIONES_ENABLED = os.environ.get('RESUMEN_NOTIFICACIONES_ENABLED', 'true').lower() in ['true', 'on', '1']
+	RESUMEN_DIARIO_HORA = int(os.environ.get('RESUMEN_DIARIO_HORA') or 7)  # hora local del resumen diario
 	
 	# Configuración de reintentos para emails (UC2)
 	EMAIL_MAX_REINTENTOS = int(os.environ.get('EMAIL_MAX_REINTENTOS') or 3)
 	EMAIL_REINTENTO_DELAY = int(os.environ.get('EMAIL_REINTENTO_DELAY') or 5)  # segundos
 	
 	# Configuración de logging
-	LOG_LEVEL = os.environ.get('LOG_LEVEL') or 'INFO'
\ No newline at end of file
+	# Nivel general y por módulo: INFO,app.utils.email_service=WARNING,sqlalchemy.engine=INFO
+	LOG_LEVEL = os.environ.get('LOG_LEVEL') or 'INFO'
+	LOG_FORMAT = os.environ.get('LOG_FORMAT') or 'json'  # json | texto
\ No newline at end of file
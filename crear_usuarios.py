@@ -5,7 +5,9 @@ Usa COLABORADOR_EMAIL del .env para las notificaciones.
 
 import os
 from dotenv import load_dotenv
-from app import create_app
+from flask_migrate import upgrade
+from sqlalchemy import text
+from app import create_app, iniciar_migraciones
 from app.models import db
 from app.models.usuario import Usuario
 
@@ -14,15 +16,18 @@ load_dotenv()
 
 # Crear app
 app = create_app()
+iniciar_migraciones(app)
 
 with app.app_context():
     # Limpiar base de datos existente
     print("🗑️  Limpiando base de datos existente...")
     db.drop_all()
+    db.session.execute(text('DROP TABLE IF EXISTS alembic_version'))
+    db.session.commit()
     
-    # Crear las tablas
-    print("📦 Creando tablas de BD...")
-    db.create_all()
+    # Crear las tablas con las migraciones
+    print("📦 Aplicando migraciones de BD...")
+    upgrade()
     
     # Obtener email de notificaciones desde .env
     email_notificaciones = os.getenv('COLABORADOR_EMAIL', 'noreply@test.com')
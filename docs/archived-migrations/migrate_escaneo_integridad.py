@@ -0,0 +1,44 @@
+"""
+Script de migración para el escaneo incremental de integridad de documentos.
+
+Crea las tablas escaneos_integridad y hallazgos_integridad, y los índices
+sobre documentos.nombre_unico y documentos.clave_almacenamiento usados para
+detectar archivos huérfanos.
+
+Este script debe ejecutarse UNA SOLA VEZ para actualizar la base de datos existente.
+"""
+
+from app import create_app
+from app.models import db
+from app.models.escaneo_integridad import EscaneoIntegridad, HallazgoIntegridad
+
+INDICES = [
+    ('ix_documentos_nombre_unico', 'nombre_unico'),
+    ('ix_documentos_clave_almacenamiento', 'clave_almacenamiento'),
+]
+
+
+def migrar_escaneo_integridad():
+    """Crea las tablas de escaneo de integridad y los índices de documentos."""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            EscaneoIntegridad.__table__.create(db.engine, checkfirst=True)
+            HallazgoIntegridad.__table__.create(db.engine, checkfirst=True)
+            print("✅ Tablas 'escaneos_integridad' y 'hallazgos_integridad' listas")
+
+            with db.engine.connect() as conn:
+                for nombre, columna in INDICES:
+                    conn.execute(db.text(f"CREATE INDEX IF NOT EXISTS {nombre} ON documentos ({columna})"))
+                    print(f"✅ Índice '{nombre}' listo")
+                conn.commit()
+
+            print("✅ Migración completada")
+
+        except Exception as e:
+            print(f"❌ Error durante la migración: {str(e)}")
+            raise
+
+if __name__ == "__main__":
+    migrar_escaneo_integridad()
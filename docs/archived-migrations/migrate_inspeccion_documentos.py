@@ -0,0 +1,52 @@
+"""
+Script de migración para agregar los campos de inspección de contenido al modelo Documento.
+
+Los documentos existentes quedan PENDIENTES; se inspeccionan con
+``flask inspeccionar-documentos``.
+
+Este script debe ejecutarse UNA SOLA VEZ para actualizar la base de datos existente.
+"""
+
+from app import create_app
+from app.models import db
+
+COLUMNAS = [
+    ('mime_detectado', 'VARCHAR(100)'),
+    ('estado_inspeccion', "VARCHAR(20) NOT NULL DEFAULT 'PENDIENTE'"),
+    ('detalle_inspeccion', 'VARCHAR(500)'),
+    ('fecha_inspeccion', 'DATETIME'),
+]
+
+
+def migrar_documentos():
+    """Agrega mime_detectado, estado_inspeccion, detalle_inspeccion y fecha_inspeccion a documentos."""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            from sqlalchemy import inspect
+            inspector = inspect(db.engine)
+            existentes = [col['name'] for col in inspector.get_columns('documentos')]
+
+            with db.engine.connect() as conn:
+                for nombre, definicion in COLUMNAS:
+                    if nombre in existentes:
+                        print(f"✅ La columna '{nombre}' ya existe.")
+                        continue
+                    conn.execute(db.text(f"ALTER TABLE documentos ADD COLUMN {nombre} {definicion}"))
+                    print(f"✅ Columna '{nombre}' agregada")
+
+                conn.execute(db.text(
+                    "CREATE INDEX IF NOT EXISTS ix_documentos_estado_inspeccion "
+                    "ON documentos (estado_inspeccion)"
+                ))
+                conn.commit()
+
+            print("✅ Migración completada")
+
+        except Exception as e:
+            print(f"❌ Error durante la migración: {str(e)}")
+            raise
+
+if __name__ == "__main__":
+    migrar_documentos()
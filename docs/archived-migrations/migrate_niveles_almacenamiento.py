@@ -0,0 +1,48 @@
+"""
+Script de migración para agregar los campos de nivel de almacenamiento al modelo Documento.
+
+Este script debe ejecutarse UNA SOLA VEZ para actualizar la base de datos existente.
+"""
+
+from app import create_app
+from app.models import db
+
+COLUMNAS = [
+    ('nivel_almacenamiento', "VARCHAR(20) NOT NULL DEFAULT 'caliente'"),
+    ('clave_almacenamiento', 'VARCHAR(500)'),
+    ('fecha_archivado', 'DATETIME'),
+]
+
+
+def migrar_documentos():
+    """Agrega nivel_almacenamiento, clave_almacenamiento y fecha_archivado a documentos."""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            from sqlalchemy import inspect
+            inspector = inspect(db.engine)
+            existentes = [col['name'] for col in inspector.get_columns('documentos')]
+
+            with db.engine.connect() as conn:
+                for nombre, definicion in COLUMNAS:
+                    if nombre in existentes:
+                        print(f"✅ La columna '{nombre}' ya existe.")
+                        continue
+                    conn.execute(db.text(f"ALTER TABLE documentos ADD COLUMN {nombre} {definicion}"))
+                    print(f"✅ Columna '{nombre}' agregada")
+
+                conn.execute(db.text(
+                    "CREATE INDEX IF NOT EXISTS ix_documentos_nivel_almacenamiento "
+                    "ON documentos (nivel_almacenamiento)"
+                ))
+                conn.commit()
+
+            print("✅ Migración completada")
+
+        except Exception as e:
+            print(f"❌ Error durante la migración: {str(e)}")
+            raise
+
+if __name__ == "__main__":
+    migrar_documentos()
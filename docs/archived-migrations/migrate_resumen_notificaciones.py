@@ -0,0 +1,45 @@
+"""
+Script de migración para los resúmenes de notificaciones.
+
+Agrega la preferencia de entrega de emails a usuarios (todos quedan con
+envío INMEDIATA) y la marca en_resumen a notificaciones.
+
+Este script debe ejecutarse UNA SOLA VEZ para actualizar la base de datos existente.
+"""
+
+from app import create_app
+from app.models import db
+
+COLUMNAS = [
+    ('usuarios', 'frecuencia_notificaciones', "VARCHAR(10) NOT NULL DEFAULT 'INMEDIATA'"),
+    ('notificaciones', 'en_resumen', 'BOOLEAN NOT NULL DEFAULT 0'),
+]
+
+
+def migrar_resumenes():
+    """Agrega usuarios.frecuencia_notificaciones y notificaciones.en_resumen."""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            from sqlalchemy import inspect
+            inspector = inspect(db.engine)
+
+            with db.engine.connect() as conn:
+                for tabla, nombre, definicion in COLUMNAS:
+                    existentes = [col['name'] for col in inspector.get_columns(tabla)]
+                    if nombre in existentes:
+                        print(f"✅ La columna '{tabla}.{nombre}' ya existe.")
+                        continue
+                    conn.execute(db.text(f"ALTER TABLE {tabla} ADD COLUMN {nombre} {definicion}"))
+                    print(f"✅ Columna '{tabla}.{nombre}' agregada")
+                conn.commit()
+
+            print("✅ Migración completada")
+
+        except Exception as e:
+            print(f"❌ Error durante la migración: {str(e)}")
+            raise
+
+if __name__ == "__main__":
+    migrar_resumenes()
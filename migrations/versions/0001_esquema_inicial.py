@@ -0,0 +1,65 @@
+"""Esquema inicial: usuarios, incapacidades y documentos (UC1)
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-10-01 00:00:00
+
+"""
+import sqlalchemy as sa
+
+from app.utils.migraciones import crear_indice, crear_tabla, eliminar_tabla
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    crear_tabla(
+        'usuarios',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('nombre', sa.String(length=100), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('email_notificaciones', sa.String(length=120), nullable=True),
+        sa.Column('password_hash', sa.String(length=200), nullable=False),
+        sa.Column('rol', sa.String(length=20), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+    )
+    crear_tabla(
+        'incapacidades',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('tipo', sa.String(length=50), nullable=False),
+        sa.Column('fecha_inicio', sa.Date(), nullable=False),
+        sa.Column('fecha_fin', sa.Date(), nullable=False),
+        sa.Column('dias', sa.Integer(), nullable=False),
+        sa.Column('estado', sa.String(length=50), nullable=True),
+        sa.Column('motivo_rechazo', sa.Text(), nullable=True),
+        sa.Column('validacion_uc5', sa.JSON(), nullable=True),
+        sa.Column('fecha_registro', sa.DateTime(), nullable=True),
+        sa.Column('fecha_actualizacion', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    crear_indice('ix_incapacidades_estado', 'incapacidades', ['estado'])
+    crear_tabla(
+        'documentos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('incapacidad_id', sa.Integer(), nullable=False),
+        sa.Column('nombre_archivo', sa.String(length=255), nullable=False),
+        sa.Column('ruta', sa.String(length=500), nullable=False),
+        sa.Column('tipo_documento', sa.String(length=50), nullable=False),
+        sa.Column('fecha_carga', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['incapacidad_id'], ['incapacidades.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade():
+    eliminar_tabla('documentos')
+    eliminar_tabla('incapacidades')
+    eliminar_tabla('usuarios')
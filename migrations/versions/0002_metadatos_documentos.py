@@ -0,0 +1,58 @@
+"""Metadatos de documentos: nombre único, tamaño, MD5 y tipo MIME
+
+Antes docs/archived-migrations/migrate_documentos.py. Los documentos
+existentes toman como nombre único el nombre de su archivo en disco.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-10-08 00:00:00
+
+"""
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migraciones import agregar_columnas, eliminar_columnas
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+documentos = sa.table(
+    'documentos',
+    sa.column('id', sa.Integer),
+    sa.column('ruta', sa.String),
+    sa.column('nombre_unico', sa.String),
+)
+
+
+def upgrade():
+    agregar_columnas('documentos', [
+        sa.Column('nombre_unico', sa.String(length=255), nullable=True),
+        sa.Column('tamaño_bytes', sa.Integer(), nullable=True),
+        sa.Column('checksum_md5', sa.String(length=32), nullable=True),
+        sa.Column('mime_type', sa.String(length=100), nullable=True),
+    ])
+
+    conexion = op.get_bind()
+    sin_nombre = conexion.execute(
+        sa.select(documentos.c.id, documentos.c.ruta).where(documentos.c.nombre_unico.is_(None))
+    ).all()
+    if sin_nombre:
+        conexion.execute(
+            documentos.update().where(documentos.c.id == sa.bindparam('doc_id')),
+            [{'doc_id': doc_id, 'nombre_unico': os.path.basename(ruta)} for doc_id, ruta in sin_nombre],
+        )
+
+    nullable = {c['name']: c['nullable'] for c in sa.inspect(conexion).get_columns('documentos')}
+    if nullable['nombre_unico']:
+        with op.batch_alter_table('documentos') as lote:
+            lote.alter_column('nombre_unico', existing_type=sa.String(length=255), nullable=False)
+
+
+def downgrade():
+    eliminar_columnas('documentos', ['mime_type', 'checksum_md5', 'tamaño_bytes', 'nombre_unico'])
@@ -0,0 +1,62 @@
+"""Código de radicación único en incapacidades
+
+Antes docs/archived-migrations/migrate_codigo_radicacion.py. Las incapacidades
+sin código reciben INC-YYYYMMDD-LXXXX (L + id en hexadecimal): el prefijo L
+no es hexadecimal, así que no choca con el consecutivo diario.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-10-10 00:00:00
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migraciones import agregar_columnas, crear_indice, eliminar_columnas, eliminar_indice
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+incapacidades = sa.table(
+    'incapacidades',
+    sa.column('id', sa.Integer),
+    sa.column('codigo_radicacion', sa.String),
+    sa.column('fecha_registro', sa.DateTime),
+)
+
+
+def upgrade():
+    agregar_columnas('incapacidades', [
+        sa.Column('codigo_radicacion', sa.String(length=50), nullable=True),
+    ])
+
+    conexion = op.get_bind()
+    sin_codigo = conexion.execute(
+        sa.select(incapacidades.c.id, incapacidades.c.fecha_registro).where(
+            sa.or_(incapacidades.c.codigo_radicacion.is_(None), incapacidades.c.codigo_radicacion == '')
+        )
+    ).all()
+    if sin_codigo:
+        conexion.execute(
+            incapacidades.update().where(incapacidades.c.id == sa.bindparam('inc_id')),
+            [
+                {
+                    'inc_id': inc_id,
+                    'codigo_radicacion': f"INC-{(fecha or datetime.utcnow()):%Y%m%d}-L{inc_id:04X}",
+                }
+                for inc_id, fecha in sin_codigo
+            ],
+        )
+
+    crear_indice('ix_incapacidades_codigo_radicacion', 'incapacidades', ['codigo_radicacion'], unique=True)
+
+
+def downgrade():
+    eliminar_indice('ix_incapacidades_codigo_radicacion', 'incapacidades')
+    eliminar_columnas('incapacidades', ['codigo_radicacion'])
@@ -0,0 +1,37 @@
+"""Estados legacy de incapacidades a los valores de EstadoIncapacidadEnum
+
+Antes docs/archived-migrations/migrate_estados_legacy.py. Solo datos; el
+downgrade no restaura los textos anteriores.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-10-12 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+MAPEO_ESTADOS = {
+    'Pendiente': 'PENDIENTE_VALIDACION',
+    'En revision': 'DOCUMENTACION_COMPLETA',
+    'Aprobada': 'APROBADA_PENDIENTE_TRANSCRIPCION',
+    'Rechazada': 'RECHAZADA',
+}
+
+incapacidades = sa.table('incapacidades', sa.column('estado', sa.String))
+
+
+def upgrade():
+    for legacy, nuevo in MAPEO_ESTADOS.items():
+        op.execute(incapacidades.update().where(incapacidades.c.estado == legacy).values(estado=nuevo))
+
+
+def downgrade():
+    pass
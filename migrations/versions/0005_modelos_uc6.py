@@ -0,0 +1,95 @@
+"""Modelos UC6: solicitudes de documentos, historial de estados y notificaciones
+
+Antes docs/archived-migrations/migrate_uc6_modelos.py. En bases donde
+notificaciones ya existía se agregan las columnas de reintentos.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-10-15 00:00:00
+
+"""
+import sqlalchemy as sa
+
+from app.utils.migraciones import agregar_columnas, crear_indice, crear_tabla, eliminar_tabla
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+INDICES = [
+    ('ix_solicitudes_documento_incapacidad_id', 'solicitudes_documento', ['incapacidad_id']),
+    ('ix_solicitudes_documento_estado', 'solicitudes_documento', ['estado']),
+    ('ix_solicitudes_documento_fecha_vencimiento', 'solicitudes_documento', ['fecha_vencimiento']),
+    ('ix_historial_estados_incapacidad_id', 'historial_estados', ['incapacidad_id']),
+    ('ix_notificaciones_destinatario_id', 'notificaciones', ['destinatario_id']),
+    ('ix_notificaciones_estado', 'notificaciones', ['estado']),
+    ('ix_notificaciones_solicitud_documento_id', 'notificaciones', ['solicitud_documento_id']),
+]
+
+
+def upgrade():
+    crear_tabla(
+        'solicitudes_documento',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('incapacidad_id', sa.Integer(), nullable=False),
+        sa.Column('tipo_documento', sa.String(length=50), nullable=False),
+        sa.Column('estado', sa.String(length=30), nullable=False),
+        sa.Column('fecha_solicitud', sa.DateTime(), nullable=False),
+        sa.Column('fecha_vencimiento', sa.DateTime(), nullable=True),
+        sa.Column('fecha_entrega', sa.DateTime(), nullable=True),
+        sa.Column('observaciones_auxiliar', sa.Text(), nullable=True),
+        sa.Column('intentos_notificacion', sa.Integer(), nullable=False),
+        sa.Column('ultima_notificacion', sa.DateTime(), nullable=True),
+        sa.Column('extension_solicitada', sa.Boolean(), nullable=False),
+        sa.Column('motivo_extension', sa.Text(), nullable=True),
+        sa.Column('numero_reintentos', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['incapacidad_id'], ['incapacidades.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    crear_tabla(
+        'historial_estados',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('incapacidad_id', sa.Integer(), nullable=False),
+        sa.Column('estado_anterior', sa.String(length=50), nullable=True),
+        sa.Column('estado_nuevo', sa.String(length=50), nullable=False),
+        sa.Column('fecha_cambio', sa.DateTime(), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('observaciones', sa.Text(), nullable=True),
+        sa.Column('documento_soporte_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['documento_soporte_id'], ['documentos.id']),
+        sa.ForeignKeyConstraint(['incapacidad_id'], ['incapacidades.id']),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    creada = crear_tabla(
+        'notificaciones',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('tipo', sa.String(length=50), nullable=False),
+        sa.Column('destinatario_id', sa.Integer(), nullable=False),
+        sa.Column('asunto', sa.String(length=150), nullable=False),
+        sa.Column('contenido', sa.Text(), nullable=False),
+        sa.Column('fecha_envio', sa.DateTime(), nullable=False),
+        sa.Column('estado', sa.String(length=20), nullable=False),
+        sa.Column('solicitud_documento_id', sa.String(length=36), nullable=True),
+        sa.Column('numero_reintento', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['destinatario_id'], ['usuarios.id']),
+        sa.ForeignKeyConstraint(['solicitud_documento_id'], ['solicitudes_documento.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    if not creada:
+        agregar_columnas('notificaciones', [
+            sa.Column('solicitud_documento_id', sa.String(length=36), nullable=True),
+            sa.Column('numero_reintento', sa.Integer(), nullable=False, server_default='1'),
+        ])
+
+    for nombre, tabla, columnas_indice in INDICES:
+        crear_indice(nombre, tabla, columnas_indice)
+
+
+def downgrade():
+    eliminar_tabla('notificaciones')
+    eliminar_tabla('historial_estados')
+    eliminar_tabla('solicitudes_documento')
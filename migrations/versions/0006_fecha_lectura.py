@@ -0,0 +1,29 @@
+"""Fecha de lectura de notificaciones
+
+Antes docs/archived-migrations/migrate_fecha_lectura.py.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-10-20 00:00:00
+
+"""
+import sqlalchemy as sa
+
+from app.utils.migraciones import agregar_columnas, eliminar_columnas
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    agregar_columnas('notificaciones', [
+        sa.Column('fecha_lectura', sa.DateTime(), nullable=True),
+    ])
+
+
+def downgrade():
+    eliminar_columnas('notificaciones', ['fecha_lectura'])
@@ -0,0 +1,64 @@
+"""Consecutivo diario de códigos de radicación
+
+El consecutivo de cada día parte del mayor sufijo hexadecimal ya emitido ese
+día (los códigos aleatorios anteriores, INC-YYYYMMDD-XXXX), así el contador no
+repite un código existente el día del despliegue.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-11-03 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migraciones import crear_tabla, eliminar_tabla
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    crear_tabla(
+        'consecutivos_radicacion',
+        sa.Column('fecha', sa.String(length=8), nullable=False),
+        sa.Column('ultimo', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('fecha'),
+    )
+    sembrar_consecutivos()
+
+
+def sembrar_consecutivos():
+    """Sube el consecutivo de cada día al mayor sufijo hexadecimal emitido ese día."""
+    conexion = op.get_bind()
+    mayores = {}
+    codigos = conexion.execute(sa.text(
+        "SELECT codigo_radicacion FROM incapacidades WHERE codigo_radicacion LIKE 'INC-%'"
+    )).scalars()
+    for codigo in codigos:
+        _, fecha, sufijo = (codigo.split('-', 2) + ['', ''])[:3]
+        try:
+            numero = int(sufijo, 16)  # Los códigos legacy (L001A...) no son hexadecimales
+        except ValueError:
+            continue
+        if len(fecha) == 8 and fecha.isdigit():
+            mayores[fecha] = max(numero, mayores.get(fecha, 0))
+
+    existentes = dict(conexion.execute(sa.text('SELECT fecha, ultimo FROM consecutivos_radicacion')).all())
+    for fecha, ultimo in mayores.items():
+        if fecha not in existentes:
+            conexion.execute(sa.text(
+                'INSERT INTO consecutivos_radicacion (fecha, ultimo) VALUES (:fecha, :ultimo)'
+            ), {'fecha': fecha, 'ultimo': ultimo})
+        elif existentes[fecha] < ultimo:
+            conexion.execute(sa.text(
+                'UPDATE consecutivos_radicacion SET ultimo = :ultimo WHERE fecha = :fecha'
+            ), {'fecha': fecha, 'ultimo': ultimo})
+
+
+def downgrade():
+    eliminar_tabla('consecutivos_radicacion')
@@ -0,0 +1,33 @@
+"""Nivel de almacenamiento de documentos (caliente/frío)
+
+Antes docs/archived-migrations/migrate_niveles_almacenamiento.py.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-11-17 00:00:00
+
+"""
+import sqlalchemy as sa
+
+from app.utils.migraciones import agregar_columnas, crear_indice, eliminar_columnas, eliminar_indice
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    agregar_columnas('documentos', [
+        sa.Column('nivel_almacenamiento', sa.String(length=20), nullable=False, server_default='caliente'),
+        sa.Column('clave_almacenamiento', sa.String(length=500), nullable=True),
+        sa.Column('fecha_archivado', sa.DateTime(), nullable=True),
+    ])
+    crear_indice('ix_documentos_nivel_almacenamiento', 'documentos', ['nivel_almacenamiento'])
+
+
+def downgrade():
+    eliminar_indice('ix_documentos_nivel_almacenamiento', 'documentos')
+    eliminar_columnas('documentos', ['fecha_archivado', 'clave_almacenamiento', 'nivel_almacenamiento'])
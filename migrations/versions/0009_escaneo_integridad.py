@@ -0,0 +1,68 @@
+"""Escaneo incremental de integridad de documentos
+
+Antes docs/archived-migrations/migrate_escaneo_integridad.py. Incluye los
+índices de documentos por nombre único y clave de almacenamiento que usa
+la búsqueda de huérfanos.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2025-11-24 00:00:00
+
+"""
+import sqlalchemy as sa
+
+from app.utils.migraciones import crear_indice, crear_tabla, eliminar_indice, eliminar_tabla
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    crear_tabla(
+        'escaneos_integridad',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('estado', sa.String(length=20), nullable=False),
+        sa.Column('verificar_checksum', sa.Boolean(), nullable=False),
+        sa.Column('ultimo_documento_id', sa.Integer(), nullable=False),
+        sa.Column('fecha_inicio', sa.DateTime(), nullable=False),
+        sa.Column('fecha_actualizacion', sa.DateTime(), nullable=False),
+        sa.Column('fecha_fin', sa.DateTime(), nullable=True),
+        sa.Column('documentos_revisados', sa.Integer(), nullable=False),
+        sa.Column('bytes_verificados', sa.BigInteger(), nullable=False),
+        sa.Column('faltantes', sa.Integer(), nullable=False),
+        sa.Column('tamaño_incorrecto', sa.Integer(), nullable=False),
+        sa.Column('checksum_incorrecto', sa.Integer(), nullable=False),
+        sa.Column('checksums_registrados', sa.Integer(), nullable=False),
+        sa.Column('errores', sa.Integer(), nullable=False),
+        sa.Column('huerfanos', sa.Integer(), nullable=True),
+        sa.Column('incapacidades_sin_documentos', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    crear_tabla(
+        'hallazgos_integridad',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('escaneo_id', sa.Integer(), nullable=False),
+        sa.Column('tipo', sa.String(length=30), nullable=False),
+        sa.Column('documento_id', sa.Integer(), nullable=True),
+        sa.Column('nivel_almacenamiento', sa.String(length=20), nullable=True),
+        sa.Column('clave', sa.String(length=500), nullable=True),
+        sa.Column('detalle', sa.String(length=500), nullable=True),
+        sa.Column('fecha', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['escaneo_id'], ['escaneos_integridad.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    crear_indice('ix_escaneos_integridad_estado', 'escaneos_integridad', ['estado'])
+    crear_indice('ix_hallazgos_integridad_escaneo_id', 'hallazgos_integridad', ['escaneo_id'])
+    crear_indice('ix_documentos_nombre_unico', 'documentos', ['nombre_unico'])
+    crear_indice('ix_documentos_clave_almacenamiento', 'documentos', ['clave_almacenamiento'])
+
+
+def downgrade():
+    eliminar_indice('ix_documentos_clave_almacenamiento', 'documentos')
+    eliminar_indice('ix_documentos_nombre_unico', 'documentos')
+    eliminar_tabla('hallazgos_integridad')
+    eliminar_tabla('escaneos_integridad')
@@ -0,0 +1,36 @@
+"""Inspección de documentos: tipo real, estructura PDF y antivirus
+
+Antes docs/archived-migrations/migrate_inspeccion_documentos.py.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2025-12-09 00:00:00
+
+"""
+import sqlalchemy as sa
+
+from app.utils.migraciones import agregar_columnas, crear_indice, eliminar_columnas, eliminar_indice
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    agregar_columnas('documentos', [
+        sa.Column('mime_detectado', sa.String(length=100), nullable=True),
+        sa.Column('estado_inspeccion', sa.String(length=20), nullable=False, server_default='PENDIENTE'),
+        sa.Column('detalle_inspeccion', sa.String(length=500), nullable=True),
+        sa.Column('fecha_inspeccion', sa.DateTime(), nullable=True),
+    ])
+    crear_indice('ix_documentos_estado_inspeccion', 'documentos', ['estado_inspeccion'])
+
+
+def downgrade():
+    eliminar_indice('ix_documentos_estado_inspeccion', 'documentos')
+    eliminar_columnas(
+        'documentos', ['fecha_inspeccion', 'detalle_inspeccion', 'estado_inspeccion', 'mime_detectado']
+    )
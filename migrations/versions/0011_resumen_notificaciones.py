@@ -0,0 +1,33 @@
+"""Resúmenes de notificaciones: frecuencia por usuario y notificaciones diferidas
+
+Antes docs/archived-migrations/migrate_resumen_notificaciones.py.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-01-12 00:00:00
+
+"""
+import sqlalchemy as sa
+
+from app.utils.migraciones import agregar_columnas, eliminar_columnas
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    agregar_columnas('usuarios', [
+        sa.Column('frecuencia_notificaciones', sa.String(length=10), nullable=False, server_default='INMEDIATA'),
+    ])
+    agregar_columnas('notificaciones', [
+        sa.Column('en_resumen', sa.Boolean(), nullable=False, server_default=sa.false()),
+    ])
+
+
+def downgrade():
+    eliminar_columnas('notificaciones', ['en_resumen'])
+    eliminar_columnas('usuarios', ['frecuencia_notificaciones'])
@@ -0,0 +1,113 @@
+"""Claves UUID en 16 bytes para notificaciones, historial_estados y solicitudes_documento
+
+Las claves pasan de VARCHAR(36) a ``uuid`` nativo en PostgreSQL y a BLOB de
+16 bytes en SQLite (tipo UUIDBinario de app/models/tipos.py), igual que
+notificaciones.solicitud_documento_id. Los valores se convierten sin cambiar
+el UUID, así que los ids expuestos en URLs (/api/marcar-leida/<id>) siguen
+siendo los mismos; las filas nuevas usan UUIDv7.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-02-02 00:00:00
+
+"""
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.tipos import UUIDBinario
+from app.utils.migraciones import tipo_columna
+
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+# Primero la tabla referenciada por la llave foránea
+COLUMNAS = [
+    ('solicitudes_documento', ['id']),
+    ('historial_estados', ['id']),
+    ('notificaciones', ['id', 'solicitud_documento_id']),
+]
+
+
+def _pendientes(hacia_binario):
+    """Columnas de COLUMNAS que aún no tienen el tipo destino (revisión idempotente)."""
+    pendientes = []
+    for tabla, nombres in COLUMNAS:
+        nombres = [nombre for nombre in nombres
+                   if isinstance(tipo_columna(tabla, nombre), sa.String) == hacia_binario]
+        if nombres:
+            pendientes.append((tabla, nombres))
+    return pendientes
+
+
+def _llave_foranea_solicitud():
+    for llave in sa.inspect(op.get_bind()).get_foreign_keys('notificaciones'):
+        if llave['constrained_columns'] == ['solicitud_documento_id']:
+            return llave['name']
+    return None
+
+
+def _cambiar_tipo_postgresql(pendientes, tipo, conversion):
+    # La llave foránea impide cambiar el tipo de solo uno de sus extremos
+    llave = _llave_foranea_solicitud()
+    if llave:
+        op.drop_constraint(llave, 'notificaciones', type_='foreignkey')
+    for tabla, nombres in pendientes:
+        for nombre in nombres:
+            op.alter_column(tabla, nombre, type_=tipo, postgresql_using=f'{nombre}::{conversion}')
+    op.create_foreign_key(
+        llave or 'notificaciones_solicitud_documento_id_fkey',
+        'notificaciones', 'solicitudes_documento', ['solicitud_documento_id'], ['id']
+    )
+
+
+def _convertir_valores(tabla, columna, convertir):
+    """Reescribe cada valor con convertir(valor) en un solo executemany."""
+    conexion = op.get_bind()
+    t = sa.table(tabla, sa.column(columna))
+    valores = conexion.execute(
+        sa.select(t.c[columna]).where(t.c[columna].isnot(None)).distinct()
+    ).scalars().all()
+    if valores:
+        conexion.execute(
+            t.update().where(t.c[columna] == sa.bindparam('viejo')).values({columna: sa.bindparam('nuevo')}),
+            [{'viejo': valor, 'nuevo': convertir(valor)} for valor in valores]
+        )
+
+
+def _cambiar_tipo_por_copia(pendientes, tipo, tipo_anterior, convertir):
+    # SQLite guarda cualquier valor en cualquier columna: se convierten los
+    # valores primero y la copia de batch_alter_table solo cambia el tipo declarado
+    for tabla, nombres in pendientes:
+        for nombre in nombres:
+            _convertir_valores(tabla, nombre, convertir)
+        with op.batch_alter_table(tabla) as lote:
+            for nombre in nombres:
+                lote.alter_column(nombre, type_=tipo, existing_type=tipo_anterior)
+
+
+def upgrade():
+    pendientes = _pendientes(hacia_binario=True)
+    if not pendientes:
+        return
+    if op.get_bind().dialect.name == 'postgresql':
+        _cambiar_tipo_postgresql(pendientes, UUIDBinario(), 'uuid')
+    else:
+        _cambiar_tipo_por_copia(pendientes, UUIDBinario(), sa.String(length=36),
+                                lambda texto: uuid.UUID(texto).bytes)
+
+
+def downgrade():
+    pendientes = _pendientes(hacia_binario=False)
+    if not pendientes:
+        return
+    if op.get_bind().dialect.name == 'postgresql':
+        _cambiar_tipo_postgresql(pendientes, sa.String(length=36), 'text')
+    else:
+        _cambiar_tipo_por_copia(pendientes, sa.String(length=36), UUIDBinario(),
+                                lambda binario: str(uuid.UUID(bytes=bytes(binario))))
@@ -0,0 +1,302 @@
+"""
+Tests para los backends de almacenamiento y el archivado en frío
+
+Cobertura:
+1. Driver local (guardar, abrir, listar, eliminar, claves fuera de la carpeta)
+2. Driver S3 contra un cliente simulado en memoria (y contra moto si está instalado)
+3. Archivado de documentos de incapacidades PAGADA/RECHAZADA antiguas
+4. Entrega transparente de documentos archivados (local y S3)
+"""
+
+import io
+import zipfile
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models.usuario import Usuario
+from app.models.incapacidad import Incapacidad
+from app.models.documento import Documento
+from app.services.almacenamiento_service import AlmacenamientoService
+from app.utils.almacenamiento import (
+    AlmacenamientoLocal,
+    AlmacenamientoS3,
+    ErrorAlmacenamiento,
+    NIVEL_CALIENTE,
+    NIVEL_FRIO,
+)
+
+
+class ErrorClienteS3(Exception):
+    def __init__(self, codigo):
+        super().__init__(codigo)
+        self.response = {'Error': {'Code': codigo}}
+
+
+class ClienteS3Falso:
+    """Bucket en memoria con la parte de la API de boto3 que usa AlmacenamientoS3."""
+
+    def __init__(self):
+        self.objetos = {}
+
+    def _objeto(self, Bucket, Key):
+        try:
+            return self.objetos[(Bucket, Key)]
+        except KeyError:
+            raise ErrorClienteS3('NoSuchKey')
+
+    def upload_fileobj(self, origen, bucket, clave, ExtraArgs=None):
+        self.objetos[(bucket, clave)] = {'datos': origen.read(), 'extra': ExtraArgs or {}}
+
+    def get_object(self, Bucket, Key):
+        return {'Body': io.BytesIO(self._objeto(Bucket, Key)['datos'])}
+
+    def head_object(self, Bucket, Key):
+        return {'ContentLength': len(self._objeto(Bucket, Key)['datos'])}
+
+    def delete_object(self, Bucket, Key):
+        self.objetos.pop((Bucket, Key), None)
+
+    def get_paginator(self, operacion):
+        assert operacion == 'list_objects_v2'
+        cliente = self
+
+        class Paginador:
+            def paginate(self, Bucket, Prefix):
+                claves = sorted(k for b, k in cliente.objetos if b == Bucket and k.startswith(Prefix))
+                yield {'Contents': [{'Key': k} for k in claves]} if claves else {}
+
+        return Paginador()
+
+    def generate_presigned_url(self, operacion, Params, ExpiresIn):
+        self._objeto(Params['Bucket'], Params['Key'])
+        return f"https://{Params['Bucket']}.s3.test/{Params['Key']}?X-Amz-Expires={ExpiresIn}&X-Amz-Signature=firma"
+
+
+@pytest.fixture
+def app(crear_app, tmp_path):
+    """Crear aplicación de prueba con almacenamiento frío local."""
+    app = crear_app(
+        ALMACENAMIENTO_FRIO='local',
+        ALMACENAMIENTO_FRIO_CARPETA=str(tmp_path / 'archivo'),
+        ALMACENAMIENTO_FRIO_DIAS=30,
+    )
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def documentos(app, tmp_path):
+    """Documentos de una incapacidad PAGADA antigua y de una PENDIENTE reciente."""
+    colaborador = Usuario(nombre='Colaborador Test', email='colaborador@test.com', rol='colaborador')
+    colaborador.set_password('test123')
+    db.session.add(colaborador)
+    db.session.commit()
+
+    carpeta = tmp_path / 'uploads'
+    carpeta.mkdir(exist_ok=True)
+    ids = {}
+    for clave, estado, dias_atras in [('pagada', 'PAGADA', 120), ('pendiente', 'PENDIENTE_VALIDACION', 120)]:
+        incapacidad = Incapacidad(
+            usuario_id=colaborador.id,
+            codigo_radicacion=f'INC-20250101-{clave.upper()}',
+            tipo='Enfermedad General',
+            fecha_inicio=date.today() - timedelta(days=150),
+            fecha_fin=date.today() - timedelta(days=146),
+            dias=5,
+            estado=estado
+        )
+        db.session.add(incapacidad)
+        db.session.commit()
+        db.session.execute(
+            db.update(Incapacidad)
+            .where(Incapacidad.id == incapacidad.id)
+            .values(fecha_actualizacion=datetime.utcnow() - timedelta(days=dias_atras))
+        )
+
+        ruta = carpeta / f'INC{incapacidad.id}_certificado_{clave}.pdf'
+        ruta.write_bytes(f'%PDF-1.4 {clave}'.encode() * 100)
+        documento = Documento(
+            incapacidad_id=incapacidad.id,
+            nombre_archivo='certificado.pdf',
+            nombre_unico=ruta.name,
+            ruta=str(ruta),
+            tipo_documento='certificado',
+            tamaño_bytes=ruta.stat().st_size,
+            mime_type='application/pdf',
+            fecha_carga=datetime(2025, 1, 15)
+        )
+        db.session.add(documento)
+        db.session.commit()
+        ids[clave] = documento.id
+        ids[f'{clave}_ruta'] = ruta
+        ids[f'{clave}_incapacidad'] = incapacidad.id
+    return ids
+
+
+def login(client, email='colaborador@test.com', password='test123'):
+    """Helper para hacer login."""
+    return client.post('/login', data={'email': email, 'password': password}, follow_redirects=True)
+
+
+def test_driver_local(tmp_path):
+    driver = AlmacenamientoLocal(str(tmp_path))
+
+    assert driver.guardar('2025/01/a.pdf', io.BytesIO(b'hola')) == 4
+    assert driver.existe('2025/01/a.pdf')
+    assert driver.tamaño('2025/01/a.pdf') == 4
+    with driver.abrir('2025/01/a.pdf') as f:
+        assert f.read() == b'hola'
+    assert list(driver.listar('2025')) == ['2025/01/a.pdf']
+    assert driver.clave_de_ruta(str(tmp_path / '2025' / '01' / 'a.pdf')) == '2025/01/a.pdf'
+
+    driver.eliminar('2025/01/a.pdf')
+    assert not driver.existe('2025/01/a.pdf')
+
+    with pytest.raises(ErrorAlmacenamiento):
+        driver.abrir('../fuera.pdf')
+
+
+def test_driver_s3_cliente_simulado():
+    cliente = ClienteS3Falso()
+    driver = AlmacenamientoS3('incapacidades', prefijo='/documentos/', clase_almacenamiento='GLACIER_IR', cliente=cliente)
+
+    assert driver.guardar('2025/01/a.pdf', io.BytesIO(b'%PDF'), 'application/pdf') == 4
+    assert cliente.objetos[('incapacidades', 'documentos/2025/01/a.pdf')]['extra'] == {
+        'ContentType': 'application/pdf', 'StorageClass': 'GLACIER_IR'
+    }
+    assert driver.existe('2025/01/a.pdf')
+    assert not driver.existe('2025/01/b.pdf')
+    assert driver.ruta_local('2025/01/a.pdf') is None
+    assert driver.abrir('2025/01/a.pdf').read() == b'%PDF'
+    assert list(driver.listar('2025')) == ['2025/01/a.pdf']
+    url = driver.url_temporal('2025/01/a.pdf', 'certificado médico.pdf', como_adjunto=False)
+    assert 'documentos/2025/01/a.pdf' in url and 'X-Amz-Expires=300' in url
+
+    driver.eliminar('2025/01/a.pdf')
+    with pytest.raises(FileNotFoundError):
+        driver.abrir('2025/01/a.pdf')
+    with pytest.raises(FileNotFoundError):
+        driver.tamaño('2025/01/a.pdf')
+
+
+def test_driver_s3():
+    boto3 = pytest.importorskip('boto3')
+    moto = pytest.importorskip('moto')
+    from app.utils.almacenamiento import AlmacenamientoS3
+
+    with moto.mock_aws():
+        cliente = boto3.client('s3', region_name='us-east-1')
+        cliente.create_bucket(Bucket='incapacidades')
+        driver = AlmacenamientoS3('incapacidades', prefijo='documentos', cliente=cliente)
+
+        assert driver.guardar('2025/01/a.pdf', io.BytesIO(b'%PDF'), 'application/pdf') == 4
+        assert driver.existe('2025/01/a.pdf')
+        assert not driver.existe('2025/01/b.pdf')
+        assert driver.abrir('2025/01/a.pdf').read() == b'%PDF'
+        assert list(driver.listar()) == ['2025/01/a.pdf']
+        assert 'documentos/2025/01/a.pdf' in driver.url_temporal('2025/01/a.pdf', 'certificado.pdf')
+
+        driver.eliminar('2025/01/a.pdf')
+        with pytest.raises(FileNotFoundError):
+            driver.abrir('2025/01/a.pdf')
+
+
+def test_archiva_solo_incapacidades_cerradas_antiguas(app, documentos, tmp_path):
+    resultado = AlmacenamientoService.archivar_documentos_antiguos()
+
+    assert resultado['movidos'] == 1
+    assert resultado['errores'] == 0
+
+    pagada = db.session.get(Documento, documentos['pagada'])
+    assert pagada.nivel_almacenamiento == NIVEL_FRIO
+    assert pagada.clave_almacenamiento == f'2025/01/{pagada.nombre_unico}'
+    assert pagada.fecha_archivado is not None
+    assert not documentos['pagada_ruta'].exists()
+    assert (tmp_path / 'archivo' / '2025' / '01' / pagada.nombre_unico).exists()
+
+    pendiente = db.session.get(Documento, documentos['pendiente'])
+    assert pendiente.nivel_almacenamiento == NIVEL_CALIENTE
+    assert documentos['pendiente_ruta'].exists()
+
+
+def test_respeta_antiguedad_minima(app, documentos):
+    assert AlmacenamientoService.archivar_documentos_antiguos(dias=365)['movidos'] == 0
+
+
+def test_documento_archivado_se_sirve_igual(app, documentos):
+    contenido = documentos['pagada_ruta'].read_bytes()
+    AlmacenamientoService.archivar_documentos_antiguos()
+    client = app.test_client()
+    login(client)
+
+    response = client.get(f"/documentos/descargar/{documentos['pagada']}")
+    assert response.status_code == 200
+    assert response.data == contenido
+
+    response = client.get(f"/documentos/incapacidad/{documentos['pagada_incapacidad']}/zip")
+    with zipfile.ZipFile(io.BytesIO(response.data)) as archivo_zip:
+        assert archivo_zip.read('certificado_certificado.pdf') == contenido
+
+
+def test_documento_archivado_en_s3_cliente_simulado(app, documentos):
+    cliente = ClienteS3Falso()
+    app.extensions['almacenamiento'] = {
+        NIVEL_FRIO: AlmacenamientoS3('incapacidades', prefijo='documentos', cliente=cliente)
+    }
+    contenido = documentos['pagada_ruta'].read_bytes()
+
+    assert AlmacenamientoService.archivar_documentos_antiguos()['movidos'] == 1
+
+    pagada = db.session.get(Documento, documentos['pagada'])
+    assert pagada.nivel_almacenamiento == NIVEL_FRIO
+    assert cliente.objetos[('incapacidades', f'documentos/{pagada.clave_almacenamiento}')]['datos'] == contenido
+    assert not documentos['pagada_ruta'].exists()
+
+    client = app.test_client()
+    login(client)
+
+    # Entrega directa desde el bucket con URL prefirmada
+    response = client.get(f"/documentos/ver/{documentos['pagada']}")
+    assert response.status_code == 302
+    assert 'X-Amz-Signature' in response.headers['Location']
+
+    response = client.get(f"/documentos/incapacidad/{documentos['pagada_incapacidad']}/zip")
+    with zipfile.ZipFile(io.BytesIO(response.data)) as archivo_zip:
+        assert archivo_zip.read('certificado_certificado.pdf') == contenido
+
+
+def test_documento_archivado_en_s3(app, documentos):
+    boto3 = pytest.importorskip('boto3')
+    moto = pytest.importorskip('moto')
+
+    app.config.update(
+        ALMACENAMIENTO_FRIO='s3',
+        ALMACENAMIENTO_FRIO_BUCKET='incapacidades',
+        ALMACENAMIENTO_FRIO_REGION='us-east-1',
+    )
+    contenido = documentos['pagada_ruta'].read_bytes()
+
+    with moto.mock_aws():
+        boto3.client('s3', region_name='us-east-1').create_bucket(Bucket='incapacidades')
+        assert AlmacenamientoService.archivar_documentos_antiguos()['movidos'] == 1
+
+        client = app.test_client()
+        login(client)
+
+        # Entrega directa desde el bucket con URL prefirmada
+        response = client.get(f"/documentos/ver/{documentos['pagada']}")
+        assert response.status_code == 302
+        assert 'X-Amz-Signature' in response.headers['Location']
+
+        response = client.get(f"/documentos/incapacidad/{documentos['pagada_incapacidad']}/zip")
+        with zipfile.ZipFile(io.BytesIO(response.data)) as archivo_zip:
+            assert archivo_zip.read('certificado_certificado.pdf') == contenido
+
+
+def test_comando_archivar(app, documentos):
+    resultado = app.test_cli_runner().invoke(args=['archivar-documentos', '--dias', '30'])
+
+    assert resultado.exit_code == 0, resultado.output
+    assert '1 documentos movidos' in resultado.output
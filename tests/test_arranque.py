@@ -0,0 +1,94 @@
+"""
+Tests del arranque de la aplicación (imports diferidos)
+
+Cobertura:
+1. create_app no importa subsistemas de uso ocasional (perfil de -X importtime)
+2. Los subsistemas diferidos siguen disponibles al usarse (flask db, Pillow)
+3. Aviso al iniciar cuando falta Pillow o PyMuPDF para una etapa habilitada
+"""
+
+import importlib.util
+import logging
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app import DIRECTORIO_MIGRACIONES, create_app
+from benchmarks.arranque import modulos_por_tiempo
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Paquetes que create_app no debe cargar: se importan al usarse
+MODULOS_DIFERIDOS = (
+    'alembic',
+    'flask_migrate',
+    'PIL',
+    'apscheduler',
+    'pymupdf',
+    'boto3',
+    'openpyxl',
+    'app.services.importacion_service',
+    'app.services.exportacion_service',
+    'app.utils.previsualizaciones',
+)
+
+
+def perfil_importacion(codigo):
+    entorno = {**os.environ, 'SCHEDULER_ENABLED': 'false'}
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo],
+        cwd=RAIZ, env=entorno, capture_output=True, text=True
+    )
+    assert resultado.returncode == 0, resultado.stderr[-2000:]
+    return modulos_por_tiempo(resultado.stderr)
+
+
+def test_create_app_no_importa_subsistemas_diferidos():
+    modulos = perfil_importacion('from app import create_app; create_app()')
+
+    assert 'app.routes.incapacidades' in modulos
+    assert [nombre for nombre in MODULOS_DIFERIDOS if nombre in modulos] == []
+
+
+def test_comando_db_carga_migraciones_al_usarse(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'arranque.db'}"})
+    assert 'migrate' not in app.extensions
+
+    resultado = app.test_cli_runner().invoke(args=['db', 'heads'])
+
+    assert resultado.exit_code == 0, resultado.output
+    assert app.extensions['migrate'].directory == DIRECTORIO_MIGRACIONES
+
+
+def test_pillow_se_carga_con_la_primera_imagen(tmp_path):
+    pytest.importorskip('PIL')
+    from app.utils import imagenes
+
+    ruta = tmp_path / 'vacia.jpg'
+    ruta.write_bytes(b'')
+    assert imagenes.optimizar_imagen(str(ruta), 'image/jpeg') is None
+    assert imagenes.Image is not None
+
+
+def test_aviso_si_faltan_dependencias_de_imagen(tmp_path, monkeypatch, caplog):
+    buscar = importlib.util.find_spec
+    monkeypatch.setattr(
+        importlib.util, 'find_spec',
+        lambda nombre, *args: None if nombre in ('PIL', 'pymupdf', 'fitz') else buscar(nombre, *args)
+    )
+
+    with caplog.at_level(logging.WARNING, logger='app'):
+        create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'arranque.db'}",
+            'PREVIEWS_ENABLED': False,
+            'IMAGENES_OPTIMIZAR': True,
+            'INSPECCION_ENABLED': True,
+        })
+
+    avisos = [r.getMessage() for r in caplog.records if 'no está instalado' in r.getMessage()]
+    assert avisos == [
+        '⚠️ Pillow no está instalado: sin optimización de imágenes cargadas (pip install -r requirements.txt)',
+        '⚠️ PyMuPDF no está instalado: sin inspección de la estructura de PDFs (pip install -r requirements.txt)',
+    ]
@@ -0,0 +1,128 @@
+"""
+Tests para la configuración del motor de base de datos
+
+Cobertura:
+1. URL desde el entorno (DATABASE_URL, postgres:// normalizado)
+2. Opciones del pool según el motor (SQLite sin cambios, PostgreSQL con pool)
+3. PRAGMA de SQLite en cada conexión (WAL, busy_timeout, caché)
+4. Esquema (migraciones) y operaciones básicas en SQLite y en PostgreSQL
+
+El caso PostgreSQL se ejecuta solo con TEST_POSTGRES_URL configurada (ver
+``url_base_datos`` en conftest.py).
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from flask_migrate import upgrade
+
+from app import create_app, db, iniciar_migraciones
+from app.models.usuario import Usuario
+from app.models.incapacidad import Incapacidad, generar_codigos_radicacion
+from app.models.notificacion import Notificacion
+from app.utils.base_datos import opciones_motor, pragmas_sqlite
+
+
+def test_url_desde_entorno(monkeypatch):
+    from config import _url_base_datos
+
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    monkeypatch.delenv('SQLALCHEMY_DATABASE_URI', raising=False)
+    assert _url_base_datos() == 'sqlite:///database.db'
+
+    monkeypatch.setenv('DATABASE_URL', 'postgres://app:clave@db:5432/incapacidades')
+    assert _url_base_datos() == 'postgresql://app:clave@db:5432/incapacidades'
+
+
+def test_opciones_del_pool():
+    assert opciones_motor({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'}) == {}
+
+    opciones = opciones_motor({
+        'SQLALCHEMY_DATABASE_URI': 'postgresql+psycopg://app@db/incapacidades',
+        'DB_POOL_SIZE': 8,
+        'DB_MAX_OVERFLOW': 4,
+        'DB_POOL_RECYCLE': 600,
+        'DB_STATEMENT_TIMEOUT_MS': 15000,
+    })
+    assert opciones['pool_size'] == 8
+    assert opciones['max_overflow'] == 4
+    assert opciones['pool_recycle'] == 600
+    assert opciones['pool_pre_ping'] is True
+    assert opciones['connect_args'] == {
+        'application_name': 'incapacidades', 'options': '-c statement_timeout=15000'
+    }
+
+    # Opciones explícitas tienen prioridad
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'SQLALCHEMY_ENGINE_OPTIONS': {'echo_pool': True},
+    })
+    assert app.config['SQLALCHEMY_ENGINE_OPTIONS'] == {'echo_pool': True}
+
+
+def test_pragmas_sqlite(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'wal.db'}"})
+    with app.app_context():
+        with db.engine.connect() as conexion:
+            def pragma(nombre):
+                return conexion.exec_driver_sql(f'PRAGMA {nombre}').scalar()
+
+            assert pragma('journal_mode') == 'wal'
+            assert pragma('synchronous') == 1  # NORMAL
+            assert pragma('busy_timeout') == 5000
+            assert pragma('cache_size') == -16 * 1024
+        db.engine.dispose()
+
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'rollback.db'}",
+        'SQLITE_WAL': False,
+        'SQLITE_SYNCHRONOUS': 'full',
+    })
+    with app.app_context():
+        with db.engine.connect() as conexion:
+            assert conexion.exec_driver_sql('PRAGMA journal_mode').scalar() == 'delete'
+            assert conexion.exec_driver_sql('PRAGMA synchronous').scalar() == 2  # FULL
+        db.engine.dispose()
+
+    with pytest.raises(ValueError):
+        pragmas_sqlite({'SQLITE_SYNCHRONOUS': 'NORMAL; DROP TABLE usuarios'})
+
+
+@pytest.mark.todos_los_motores
+def test_esquema_y_operaciones(url_base_datos):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': url_base_datos, 'MAIL_ENABLED': False})
+    iniciar_migraciones(app)
+
+    with app.app_context():
+        try:
+            upgrade()
+            assert db.engine.url.get_backend_name() == url_base_datos.split(':')[0].split('+')[0]
+
+            usuario = Usuario(nombre='Juan Pérez', email='juan@test.com', rol='colaborador')
+            usuario.set_password('test123')
+            db.session.add(usuario)
+            db.session.commit()
+
+            codigos = generar_codigos_radicacion(3)
+            for codigo in codigos:
+                db.session.add(Incapacidad(
+                    usuario_id=usuario.id,
+                    tipo='Enfermedad General',
+                    fecha_inicio=date.today(),
+                    fecha_fin=date.today() + timedelta(days=2),
+                    dias=3,
+                    codigo_radicacion=codigo,
+                    estado='PENDIENTE_VALIDACION'
+                ))
+            db.session.add(Notificacion(
+                tipo='REGISTRO_INCAPACIDAD', destinatario_id=usuario.id, asunto='Registro', contenido='<p>ok</p>'
+            ))
+            db.session.commit()
+
+            assert len(set(codigos)) == 3
+            assert Incapacidad.query.filter_by(usuario_id=usuario.id).count() == 3
+            assert db.session.get(Usuario, usuario.id).frecuencia_notificaciones == 'INMEDIATA'
+            assert Notificacion.query.one().en_resumen is False
+        finally:
+            db.session.remove()
+            db.engine.dispose()
@@ -19,7 +19,9 @@ def test_crear_app():
     from app import create_app
     app = create_app()
     assert app is not None
-    assert app.config['SQLALCHEMY_DATABASE_URI'] == 'sqlite:///database.db'
+    from config import Config
+    assert app.config['SQLALCHEMY_DATABASE_URI'] == Config.SQLALCHEMY_DATABASE_URI
+    assert isinstance(app.config['SQLALCHEMY_ENGINE_OPTIONS'], dict)
 
 def test_modelos():
     """Verificar que los modelos esten bien definidos"""
@@ -0,0 +1,182 @@
+"""
+Tests para las cargas reanudables por fragmentos (protocolo tus en /cargas)
+
+Cobertura:
+1. Creación, fragmentos, consulta de offset y reanudación tras un corte
+2. Validaciones del protocolo (offset, tamaño, formato, propietario)
+3. Uso de una carga completa en cargar-documentos-solicitados (UC6)
+"""
+
+import base64
+import os
+from datetime import date, timedelta
+
+import pytest
+
+from app import db
+from app.models.usuario import Usuario
+from app.models.incapacidad import Incapacidad
+from app.models.documento import Documento
+from app.models.solicitud_documento import SolicitudDocumento
+from app.models.enums import EstadoSolicitudDocumentoEnum, TipoDocumentoEnum
+
+
+@pytest.fixture
+def app(crear_app):
+    """Crear aplicación de prueba con carpetas temporales."""
+    app = crear_app(
+        CARGAS_MAX_MB=1,
+        CARGAS_FRAGMENTO_MB=0.25,
+    )
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def usuarios(app):
+    for nombre, email in [('Colaborador Test', 'colaborador@test.com'), ('Otro Colaborador', 'otro@test.com')]:
+        usuario = Usuario(nombre=nombre, email=email, rol='colaborador')
+        usuario.set_password('test123')
+        db.session.add(usuario)
+    db.session.commit()
+
+
+@pytest.fixture
+def client(app, usuarios):
+    client = app.test_client()
+    login(client)
+    return client
+
+
+def login(client, email='colaborador@test.com', password='test123'):
+    """Helper para hacer login."""
+    return client.post('/login', data={'email': email, 'password': password}, follow_redirects=True)
+
+
+def metadata(**valores):
+    return ','.join(f"{clave} {base64.b64encode(valor.encode()).decode()}" for clave, valor in valores.items())
+
+
+def crear(client, tamaño, nombre='epicrisis.pdf'):
+    return client.post('/cargas', headers={
+        'Tus-Resumable': '1.0.0',
+        'Upload-Length': str(tamaño),
+        'Upload-Metadata': metadata(filename=nombre),
+    })
+
+
+def patch(client, url, offset, datos):
+    return client.patch(url, data=datos, headers={
+        'Tus-Resumable': '1.0.0',
+        'Upload-Offset': str(offset),
+        'Content-Type': 'application/offset+octet-stream',
+    })
+
+
+def test_carga_por_fragmentos_y_reanudacion(app, client):
+    contenido = b'%PDF-1.4 ' + os.urandom(300 * 1024)
+    response = crear(client, len(contenido))
+    assert response.status_code == 201
+    url = response.headers['Location']
+
+    assert patch(client, url, 0, contenido[:100000]).headers['Upload-Offset'] == '100000'
+
+    # Tras un corte el cliente consulta el offset y continúa
+    response = client.head(url)
+    assert response.headers['Upload-Offset'] == '100000'
+    assert response.headers['Upload-Length'] == str(len(contenido))
+
+    assert patch(client, url, 0, contenido[:10]).status_code == 409
+
+    offset = 100000
+    while offset < len(contenido):
+        response = patch(client, url, offset, contenido[offset:offset + 200000])
+        assert response.status_code == 204
+        offset = int(response.headers['Upload-Offset'])
+    assert offset == len(contenido)
+
+    id_carga = url.rsplit('/', 1)[-1]
+    with open(os.path.join(app.config['UPLOAD_STAGING_FOLDER'], 'cargas', f'{id_carga}.part'), 'rb') as f:
+        assert f.read() == contenido
+
+
+def test_validaciones_del_protocolo(app, client):
+    assert crear(client, 2 * 1024 * 1024).status_code == 413
+    assert crear(client, 10, 'virus.exe').status_code == 415
+
+    url = crear(client, 10).headers['Location']
+    assert patch(client, url, 0, b'x' * 11).status_code == 413
+    assert client.patch(url, data=b'x', headers={'Upload-Offset': '0'}).status_code == 415
+
+    response = client.options('/cargas')
+    assert response.headers['Tus-Version'] == '1.0.0'
+    assert response.headers['Tus-Max-Size'] == str(1024 * 1024)
+
+    assert client.delete(url).status_code == 204
+    assert client.head(url).status_code == 404
+
+    # Otro usuario no puede ver ni continuar la carga
+    url = crear(client, 10).headers['Location']
+    otro = app.test_client()
+    login(otro, 'otro@test.com')
+    assert otro.head(url).status_code == 404
+    assert patch(otro, url, 0, b'x').status_code == 404
+
+
+def test_carga_completa_en_documentos_solicitados(app, client):
+    colaborador = Usuario.query.filter_by(email='colaborador@test.com').first()
+    incapacidad = Incapacidad(
+        usuario_id=colaborador.id,
+        tipo='Enfermedad General',
+        fecha_inicio=date.today(),
+        fecha_fin=date.today() + timedelta(days=2),
+        dias=3,
+        estado='DOCUMENTACION_INCOMPLETA'
+    )
+    db.session.add(incapacidad)
+    db.session.commit()
+    db.session.add(SolicitudDocumento(
+        incapacidad_id=incapacidad.id,
+        tipo_documento=TipoDocumentoEnum.EPICRISIS.value,
+        estado=EstadoSolicitudDocumentoEnum.PENDIENTE.value,
+        fecha_solicitud=date.today(),
+        fecha_vencimiento=date.today() + timedelta(days=3),
+    ))
+    db.session.commit()
+
+    # Más grande que un fragmento (CARGAS_FRAGMENTO_MB): se envía en dos PATCH
+    contenido = b'%PDF-1.4 ' + b'0' * (400 * 1024)
+    url = crear(client, len(contenido)).headers['Location']
+    offset = 0
+    while offset < len(contenido):
+        offset = int(patch(client, url, offset, contenido[offset:offset + 256 * 1024]).headers['Upload-Offset'])
+
+    campo = f'documento_{TipoDocumentoEnum.EPICRISIS.value}'
+    response = client.post(
+        f'/incapacidades/{incapacidad.id}/cargar-documentos-solicitados',
+        data={f'{campo}_carga': url.rsplit('/', 1)[-1]},
+        headers={'X-Requested-With': 'XMLHttpRequest'}
+    )
+
+    assert response.status_code == 200, response.get_json()
+    documento = Documento.query.filter_by(incapacidad_id=incapacidad.id).one()
+    assert documento.nombre_archivo == 'epicrisis.pdf'
+    assert documento.tamaño_bytes == len(contenido)
+    with open(documento.ruta, 'rb') as f:
+        assert f.read() == contenido
+    assert os.listdir(os.path.join(app.config['UPLOAD_STAGING_FOLDER'], 'cargas')) == []
+
+
+def test_carga_incompleta_se_rechaza(app, client):
+    url = crear(client, 100).headers['Location']
+    patch(client, url, 0, b'%PDF' * 5)
+
+    colaborador = Usuario.query.filter_by(email='colaborador@test.com').first()
+    from app.routes.incapacidades import procesar_archivos
+    with app.test_request_context():
+        from flask_login import login_user
+        login_user(colaborador)
+        guardados, errores = procesar_archivos({}, 1, {'certificado_carga': url.rsplit('/', 1)[-1]})
+
+    assert guardados == 0
+    assert 'incompleta' in errores[0]
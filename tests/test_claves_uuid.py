@@ -0,0 +1,88 @@
+"""
+Tests para las claves UUID compactas (app/models/tipos.py)
+
+Cobertura:
+1. uuid7: versión, variante y orden por tiempo
+2. Las claves se guardan en 16 bytes y se leen como texto canónico
+3. Un id de notificación existente (UUIDv4) sigue funcionando en la URL
+4. Un id inválido en la URL retorna 404
+
+Cada test se ejecuta en SQLite y, con TEST_POSTGRES_URL, en PostgreSQL.
+"""
+
+import time
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from app import db
+from app.models.notificacion import Notificacion
+from app.models.usuario import Usuario
+from app.models.tipos import uuid7
+
+
+pytestmark = pytest.mark.todos_los_motores
+
+
+@pytest.fixture
+def app(crear_app):
+    app = crear_app()
+    with app.app_context():
+        usuario = Usuario(nombre='Juan Pérez', email='juan@test.com', rol='colaborador')
+        usuario.set_password('test123')
+        db.session.add(usuario)
+        db.session.commit()
+        yield app
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    client.post('/login', data={'email': 'juan@test.com', 'password': 'test123'})
+    return client
+
+
+def crear_notificacion(**campos):
+    notificacion = Notificacion(
+        tipo='REGISTRO_INCAPACIDAD', destinatario_id=1, asunto='Registro', contenido='...',
+        estado='ENTREGADA', **campos
+    )
+    db.session.add(notificacion)
+    db.session.commit()
+    return notificacion
+
+
+def test_uuid7():
+    primero = uuid7()
+    time.sleep(0.002)
+    segundo = uuid7()
+
+    assert primero.version == 7
+    assert primero.variant == uuid.RFC_4122
+    assert primero.bytes < segundo.bytes
+    assert abs((primero.int >> 80) - time.time() * 1000) < 1000
+
+
+def test_clave_en_16_bytes(app):
+    notificacion = crear_notificacion()
+
+    assert uuid.UUID(notificacion.id).version == 7
+    assert db.session.execute(text('SELECT length(id) FROM notificaciones')).scalar() == 16
+    db.session.expire_all()
+    assert db.session.get(Notificacion, notificacion.id).id == notificacion.id
+
+
+def test_id_existente_en_url(app, client):
+    existente = str(uuid.uuid4())
+    crear_notificacion(id=existente)
+
+    response = client.post(f'/notificaciones/api/marcar-leida/{existente}')
+
+    assert response.status_code == 200
+    assert response.get_json()['notificacion_id'] == existente
+    assert db.session.get(Notificacion, existente).estado == 'LEIDA'
+
+
+def test_id_invalido_en_url(client):
+    assert client.post('/notificaciones/api/marcar-leida/no-es-un-uuid').status_code == 404
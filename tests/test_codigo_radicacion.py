@@ -9,7 +9,8 @@ from app.models.incapacidad import (
     Incapacidad, 
     generar_codigo_radicacion, 
     verificar_codigo_unico,
-    generar_codigo_radicacion_unico
+    generar_codigo_radicacion_unico,
+    generar_codigos_radicacion
 )
 from app.models.usuario import Usuario
 import re
@@ -49,7 +50,8 @@ class TestCodigoRadicacion(unittest.TestCase):
     # ========================================
     def test_formato_codigo_radicacion(self):
         """Test: El código debe tener formato INC-YYYYMMDD-XXXX"""
-        codigo = generar_codigo_radicacion()
+        with self.assertWarns(DeprecationWarning):
+            codigo = generar_codigo_radicacion()
         
         # Verificar formato con regex
         patron = r'^INC-\d{8}-[A-F0-9]{4}$'
@@ -83,7 +85,8 @@ class TestCodigoRadicacion(unittest.TestCase):
         
         # Generar 100 códigos
         for _ in range(100):
-            codigo = generar_codigo_radicacion()
+            with self.assertWarns(DeprecationWarning):
+                codigo = generar_codigo_radicacion()
             codigos.add(codigo)
         
         # Todos deben ser únicos (aunque UUID corto puede colisionar, es muy raro)
@@ -307,5 +310,61 @@ class TestCodigoRadicacion(unittest.TestCase):
             "Código debe estar disponible después de rollback"
         )
 
+    # ========================================
+    # TEST 10: Reserva en bloque del consecutivo diario
+    # ========================================
+    def test_generar_codigos_en_bloque_consecutivos(self):
+        """Test: La reserva en bloque entrega códigos consecutivos sin repetir"""
+        primer_bloque = generar_codigos_radicacion(3)
+        segundo_bloque = generar_codigos_radicacion(2)
+        
+        codigos = primer_bloque + segundo_bloque
+        self.assertEqual(len(codigos), 5)
+        self.assertEqual(len(set(codigos)), 5, "No debe haber códigos repetidos")
+        
+        sufijos = [int(codigo.rsplit('-', 1)[1], 16) for codigo in codigos]
+        self.assertEqual(sufijos, list(range(sufijos[0], sufijos[0] + 5)))
+        
+        for codigo in codigos:
+            self.assertRegex(codigo, r'^INC-\d{8}-[A-F0-9]{4,}$')
+    
+    # ========================================
+    # TEST 11: Consecutivo independiente por día
+    # ========================================
+    def test_consecutivo_por_dia(self):
+        """Test: Cada día tiene su propio consecutivo"""
+        ayer = datetime.now() - timedelta(days=1)
+        
+        codigo_hoy = generar_codigos_radicacion(1)[0]
+        codigo_ayer = generar_codigos_radicacion(1, fecha=ayer)[0]
+        
+        self.assertTrue(codigo_ayer.startswith(f"INC-{ayer.strftime('%Y%m%d')}-"))
+        self.assertNotEqual(codigo_hoy.split('-')[1], codigo_ayer.split('-')[1])
+    
+    # ========================================
+    # TEST 12: Sin consultas de verificación
+    # ========================================
+    def test_generacion_sin_consultas_de_unicidad(self):
+        """Test: Generar un código no consulta la tabla de incapacidades"""
+        from sqlalchemy import event
+        
+        sentencias = []
+        
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            sentencias.append(statement)
+        
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            for _ in range(20):
+                generar_codigo_radicacion_unico()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+        
+        self.assertEqual(len(sentencias), 20, "Debe ejecutarse una sola sentencia por código")
+        self.assertFalse(
+            any('FROM incapacidades' in sentencia for sentencia in sentencias),
+            "No debe consultarse la tabla de incapacidades"
+        )
+
 if __name__ == '__main__':
     unittest.main()
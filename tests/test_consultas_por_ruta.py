@@ -0,0 +1,149 @@
+"""
+Tests de consultas SQL por ruta (perfiles de carga, app/models/perfiles_carga.py)
+
+Cada ruta tiene un presupuesto de consultas. Se mide con pocos datos y de
+nuevo con más filas: si el número crece con los datos hay un N+1, y si
+supera el presupuesto alguien agregó consultas (o quitó una precarga).
+Al mejorar una ruta, baje su presupuesto.
+
+Cobertura:
+1. Listados, detalle e historial de incapacidades
+2. API de notificaciones (lista y contador)
+3. Perfil 'conteo' sin relaciones
+"""
+
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+
+from app import db
+from app.models.documento import Documento
+from app.models.historial_estado import HistorialEstado
+from app.models.incapacidad import Incapacidad
+from app.models.notificacion import Notificacion
+from app.models.perfiles_carga import opciones_carga
+from app.models.usuario import Usuario
+
+# (rol, ruta): consultas máximas por petición, incluida la carga del usuario de la sesión
+PRESUPUESTOS = {
+    ('colaborador', '/incapacidades/mis-incapacidades'): 2,
+    ('auxiliar', '/incapacidades/dashboard-auxiliar'): 3,
+    ('auxiliar', '/incapacidades/detalle/{id}'): 3,
+    ('auxiliar', '/incapacidades/validar/{id}'): 3,
+    ('auxiliar', '/incapacidades/{id}/historial-estados'): 4,
+    ('colaborador', '/notificaciones/api/mis-notificaciones'): 4,
+    ('colaborador', '/notificaciones/api/contador-no-leidas'): 2,
+}
+
+
+@pytest.fixture
+def app(crear_app):
+    app = crear_app()
+    with app.app_context():
+        for nombre, email, rol in (('Juan Pérez', 'juan@test.com', 'colaborador'),
+                                   ('Ana García', 'ana@test.com', 'auxiliar')):
+            usuario = Usuario(nombre=nombre, email=email, rol=rol)
+            usuario.set_password('test123')
+            db.session.add(usuario)
+        db.session.commit()
+        yield app
+
+
+ESTADOS = ('PENDIENTE_VALIDACION', 'DOCUMENTACION_COMPLETA', 'APROBADA_PENDIENTE_TRANSCRIPCION', 'RECHAZADA')
+
+
+def sembrar(cantidad):
+    """
+    Agrega incapacidades (repartidas entre los estados del dashboard, la mitad
+    de otros colaboradores) con documentos e historial, y notificaciones.
+    """
+    colaborador = Usuario.query.filter_by(email='juan@test.com').one()
+    auxiliar = Usuario.query.filter_by(rol='auxiliar').one()
+    for i in range(cantidad):
+        propietario = colaborador
+        if i % 2:
+            numero = Usuario.query.count()
+            propietario = Usuario(nombre=f'Colaborador {numero}', email=f'c{numero}@test.com',
+                                  password_hash='x', rol='colaborador')
+            db.session.add(propietario)
+            db.session.flush()
+        incapacidad = Incapacidad(
+            usuario_id=propietario.id, tipo='Enfermedad General',
+            fecha_inicio=date(2025, 3, 3), fecha_fin=date(2025, 3, 5), dias=3,
+            estado=ESTADOS[i % len(ESTADOS)],
+        )
+        db.session.add(incapacidad)
+        db.session.flush()
+        for tipo in ('certificado', 'epicrisis'):
+            db.session.add(Documento(
+                incapacidad_id=incapacidad.id, nombre_archivo=f'{tipo}.pdf',
+                nombre_unico=f'{incapacidad.id}_{tipo}.pdf',
+                ruta=f'/tmp/{incapacidad.id}_{tipo}.pdf', tipo_documento=tipo,
+            ))
+        db.session.add(Notificacion(
+            tipo='REGISTRO_INCAPACIDAD', destinatario_id=colaborador.id,
+            asunto='Registro', contenido='...', estado='ENTREGADA',
+        ))
+    db.session.flush()
+    # El historial se agrega a todas, también a la primera (la del detalle)
+    documento = Documento.query.first()
+    for incapacidad in Incapacidad.query.all():
+        db.session.add(HistorialEstado(
+            incapacidad_id=incapacidad.id, estado_anterior='PENDIENTE_VALIDACION',
+            estado_nuevo='EN_REVISION', usuario_id=auxiliar.id,
+            documento_soporte_id=documento.id,
+        ))
+    db.session.commit()
+
+
+@contextmanager
+def contar_consultas():
+    consultas = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', registrar)
+    try:
+        yield consultas
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', registrar)
+
+
+def consultas_de(client, ruta):
+    ruta = ruta.format(id=Incapacidad.query.first().id)
+    db.session.expire_all()
+    with contar_consultas() as consultas:
+        response = client.get(ruta)
+    assert response.status_code == 200, ruta
+    return len(consultas)
+
+
+@pytest.mark.parametrize('rol,ruta', list(PRESUPUESTOS), ids=[ruta for _, ruta in PRESUPUESTOS])
+def test_consultas_por_ruta(app, rol, ruta):
+    email = 'juan@test.com' if rol == 'colaborador' else 'ana@test.com'
+    client = app.test_client()
+    client.post('/login', data={'email': email, 'password': 'test123'})
+
+    sembrar(4)
+    pocas = consultas_de(client, ruta)
+    sembrar(8)
+    muchas = consultas_de(client, ruta)
+
+    assert muchas == pocas, f'{ruta}: {pocas} consultas con 4 incapacidades y {muchas} con 12 (N+1)'
+    assert muchas <= PRESUPUESTOS[(rol, ruta)], f'{ruta}: {muchas} consultas'
+
+
+def test_perfil_conteo_sin_relaciones(app):
+    sembrar(1)
+    db.session.expire_all()
+
+    notificacion = Notificacion.query.options(*opciones_carga(Notificacion, 'conteo')).first()
+
+    with pytest.raises(InvalidRequestError):
+        notificacion.destinatario
+    with pytest.raises(ValueError):
+        opciones_carga(Notificacion, 'detalle')
@@ -0,0 +1,195 @@
+"""
+Tests para la descarga de documentos en ZIP
+
+Cobertura:
+1. generar_zip - escritura incremental por trozos
+2. GET /documentos/incapacidad/<id>/zip - Todos los documentos
+3. Permisos del colaborador
+4. Paquetes de auditoría en segundo plano con progreso
+5. Estado compartido en disco y barrido de paquetes expirados
+"""
+
+import io
+import os
+import time
+import zipfile
+from datetime import date, timedelta
+
+import pytest
+
+from app import db
+from app.models.usuario import Usuario
+from app.models.incapacidad import Incapacidad
+from app.models.documento import Documento
+from app.utils.zip_stream import generar_zip, NOMBRE_ARCHIVO_FALTANTES, TAMAÑO_BLOQUE_LECTURA
+from app.tasks.paquetes_auditoria import iniciar_paquete, obtener_trabajo, barrer_paquetes, ESTADO_LISTO
+
+
+@pytest.fixture
+def client(app):
+    """Cliente de prueba."""
+    return app.test_client()
+
+
+@pytest.fixture
+def datos(app, tmp_path):
+    """Usuarios, dos incapacidades y sus documentos en disco."""
+    auxiliar = Usuario(nombre='Auxiliar Test', email='auxiliar@test.com', rol='auxiliar')
+    auxiliar.set_password('test123')
+    colaborador = Usuario(nombre='Colaborador Test', email='colaborador@test.com', rol='colaborador')
+    colaborador.set_password('test123')
+    otro = Usuario(nombre='Otro Colaborador', email='otro@test.com', rol='colaborador')
+    otro.set_password('test123')
+    db.session.add_all([auxiliar, colaborador, otro])
+    db.session.commit()
+
+    incapacidades = []
+    for i, estado in enumerate(['APROBADA', 'PENDIENTE_VALIDACION']):
+        incapacidad = Incapacidad(
+            usuario_id=colaborador.id,
+            codigo_radicacion=f'INC-20250101-{i:04X}',
+            tipo='Licencia de Maternidad',
+            fecha_inicio=date.today() - timedelta(days=30),
+            fecha_fin=date.today() - timedelta(days=1),
+            dias=30,
+            estado=estado
+        )
+        db.session.add(incapacidad)
+        incapacidades.append(incapacidad)
+    db.session.commit()
+
+    for incapacidad in incapacidades:
+        for tipo in ('certificado', 'epicrisis', 'certificado'):
+            ruta = tmp_path / f'{incapacidad.id}_{tipo}_{time.time_ns()}.pdf'
+            ruta.write_bytes(f'%PDF-1.4 {incapacidad.codigo_radicacion} {tipo}'.encode())
+            db.session.add(Documento(
+                incapacidad_id=incapacidad.id,
+                nombre_archivo='soporte.pdf',
+                nombre_unico=ruta.name,
+                ruta=str(ruta),
+                tipo_documento=tipo,
+                tamaño_bytes=ruta.stat().st_size
+            ))
+    db.session.commit()
+
+    return {
+        'auxiliar_id': auxiliar.id,
+        'incapacidad_id': incapacidades[0].id,
+    }
+
+
+def login(client, email, password='test123'):
+    """Helper para hacer login."""
+    return client.post('/login', data={'email': email, 'password': password}, follow_redirects=True)
+
+
+def test_generar_zip_por_trozos(tmp_path):
+    grande = tmp_path / 'grande.bin'
+    grande.write_bytes(b'x' * (TAMAÑO_BLOQUE_LECTURA * 3 + 10))
+    pequeño = tmp_path / 'pequeño.pdf'
+    pequeño.write_bytes(b'%PDF')
+
+    trozos = list(generar_zip([
+        ('grande.bin', str(grande)),
+        ('pequeño.pdf', str(pequeño)),
+        ('faltante.pdf', str(tmp_path / 'no-existe.pdf')),
+    ]))
+
+    # El ZIP se entrega por bloques, nunca como un único buffer
+    assert len(trozos) > 4
+    assert max(len(t) for t in trozos) < TAMAÑO_BLOQUE_LECTURA * 2
+
+    with zipfile.ZipFile(io.BytesIO(b''.join(trozos))) as archivo_zip:
+        assert archivo_zip.testzip() is None
+        assert archivo_zip.read('grande.bin') == grande.read_bytes()
+        assert archivo_zip.read('pequeño.pdf') == b'%PDF'
+        assert 'faltante.pdf' in archivo_zip.read(NOMBRE_ARCHIVO_FALTANTES).decode()
+
+
+def test_descargar_todos_los_documentos(client, datos):
+    login(client, 'colaborador@test.com')
+
+    response = client.get(f"/documentos/incapacidad/{datos['incapacidad_id']}/zip")
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/zip'
+    assert 'INC-20250101-0000_documentos.zip' in response.headers['Content-Disposition']
+    with zipfile.ZipFile(io.BytesIO(response.data)) as archivo_zip:
+        assert sorted(archivo_zip.namelist()) == [
+            'certificado_soporte (2).pdf', 'certificado_soporte.pdf', 'epicrisis_soporte.pdf'
+        ]
+
+
+def test_colaborador_no_descarga_zip_ajeno(client, datos):
+    login(client, 'otro@test.com')
+
+    response = client.get(f"/documentos/incapacidad/{datos['incapacidad_id']}/zip")
+
+    assert response.status_code == 302
+
+
+def test_paquete_auditoria_sincrono(app, datos):
+    trabajo_id = iniciar_paquete(app, datos['auxiliar_id'], {'estado': 'APROBADA'}, en_segundo_plano=False)
+
+    trabajo = obtener_trabajo(trabajo_id)
+    assert trabajo['estado'] == ESTADO_LISTO
+    assert trabajo['total'] == trabajo['procesados'] == 3
+    with zipfile.ZipFile(trabajo['ruta']) as archivo_zip:
+        assert all(n.startswith('INC-20250101-0000/') for n in archivo_zip.namelist())
+
+
+def test_paquete_auditoria_por_rutas(client, datos):
+    login(client, 'auxiliar@test.com')
+
+    response = client.post('/documentos/paquetes', json={})
+    assert response.status_code == 202
+    url_estado = response.get_json()['url_estado']
+
+    for _ in range(50):
+        estado = client.get(url_estado).get_json()
+        if estado['estado'] == ESTADO_LISTO:
+            break
+        time.sleep(0.1)
+
+    assert estado['estado'] == ESTADO_LISTO
+    assert estado['progreso'] == 100.0
+    descarga = client.get(estado['url_descarga'])
+    assert descarga.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(descarga.data)) as archivo_zip:
+        assert len(archivo_zip.namelist()) == 6
+
+
+def test_paquete_solo_auxiliar(client, datos):
+    login(client, 'colaborador@test.com')
+
+    response = client.post('/documentos/paquetes', json={})
+
+    assert response.status_code == 403
+
+
+def test_paquete_estado_en_disco(app, datos, tmp_path):
+    trabajo_id = iniciar_paquete(app, datos['auxiliar_id'], {}, en_segundo_plano=False)
+
+    carpeta = tmp_path / 'paquetes'
+    assert sorted(os.listdir(carpeta)) == [f'{trabajo_id}.json', f'{trabajo_id}.zip']
+    # Otro worker solo ve el disco: el estado se reconstruye desde el JSON
+    trabajo = obtener_trabajo(trabajo_id)
+    assert trabajo['estado'] == ESTADO_LISTO
+    assert trabajo['fecha_inicio'] <= trabajo['fecha_fin']
+    assert obtener_trabajo('../' + trabajo_id) is None
+
+
+def test_barrer_paquetes_expirados(app, datos, tmp_path):
+    viejo = iniciar_paquete(app, datos['auxiliar_id'], {}, en_segundo_plano=False)
+    reciente = iniciar_paquete(app, datos['auxiliar_id'], {}, en_segundo_plano=False)
+    carpeta = tmp_path / 'paquetes'
+    hace_dos_dias = time.time() - 2 * 86400
+    for nombre in (f'{viejo}.json', f'{viejo}.zip'):
+        os.utime(carpeta / nombre, (hace_dos_dias, hace_dos_dias))
+
+    resultado = barrer_paquetes()
+
+    assert resultado['eliminados'] == 2
+    assert obtener_trabajo(viejo) is None
+    assert obtener_trabajo(reciente)['estado'] == ESTADO_LISTO
+    assert os.path.exists(carpeta / f'{reciente}.zip')
@@ -0,0 +1,157 @@
+"""
+Tests para el directorio en caché de Gestión Humana y el envío a todos sus destinatarios
+
+Cobertura:
+1. Caché del directorio e invalidación al confirmar cambios de usuarios
+2. notificar_rrhh: un render, un INSERT y un email para todos los destinatarios
+3. Registro de incapacidad y documentación completada notifican a todo RRHH
+"""
+
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+from flask import template_rendered
+from sqlalchemy import event
+
+from app import db
+from app.models.usuario import Usuario
+from app.models.incapacidad import Incapacidad
+from app.models.notificacion import Notificacion
+from app.models.enums import EstadoNotificacionEnum, TipoNotificacionEnum
+from app.utils.directorio_rrhh import destinatarios_rrhh
+from app.utils.email_service import (
+    notificar_documentacion_completada,
+    notificar_nueva_incapacidad,
+    notificar_rrhh,
+)
+
+
+def crear_usuario(nombre, email, rol, email_notificaciones=None):
+    usuario = Usuario(nombre=nombre, email=email, rol=rol, email_notificaciones=email_notificaciones)
+    usuario.set_password('test123')
+    db.session.add(usuario)
+    db.session.commit()
+    return usuario
+
+
+@pytest.fixture
+def rrhh(app):
+    return [
+        crear_usuario('Ana García', 'ana@test.com', 'auxiliar', 'ana.notif@test.com'),
+        crear_usuario('Luis Mora', 'luis@test.com', 'auxiliar'),
+        crear_usuario('Marta Ruiz', 'marta@test.com', 'gestion_humana'),
+    ]
+
+
+@pytest.fixture
+def incapacidad(app):
+    colaborador = crear_usuario('Juan Pérez', 'juan@test.com', 'colaborador')
+    incapacidad = Incapacidad(
+        usuario_id=colaborador.id,
+        tipo='Enfermedad General',
+        fecha_inicio=date.today(),
+        fecha_fin=date.today() + timedelta(days=2),
+        dias=3,
+        codigo_radicacion='INC-20250101-0001',
+        estado='PENDIENTE_VALIDACION'
+    )
+    db.session.add(incapacidad)
+    db.session.commit()
+    return incapacidad
+
+
+class ContadorConsultas:
+    def __init__(self):
+        self.consultas = []
+
+    def __enter__(self):
+        event.listen(db.engine, 'before_cursor_execute', self._registrar)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(db.engine, 'before_cursor_execute', self._registrar)
+
+    def _registrar(self, conn, cursor, sentencia, parametros, contexto, executemany):
+        self.consultas.append(sentencia)
+
+
+def test_directorio_en_cache_e_invalidacion(app, rrhh):
+    assert [d.email_envio for d in destinatarios_rrhh()] == ['ana.notif@test.com', 'luis@test.com', 'marta@test.com']
+
+    with ContadorConsultas() as contador:
+        destinatarios_rrhh()
+    assert contador.consultas == []
+
+    # Un cambio revertido no invalida con datos que nunca existieron
+    nuevo = Usuario(nombre='Temporal', email='temporal@test.com', rol='auxiliar')
+    nuevo.set_password('x')
+    db.session.add(nuevo)
+    db.session.flush()
+    db.session.rollback()
+    assert len(destinatarios_rrhh()) == 3
+
+    crear_usuario('Pedro Gil', 'pedro@test.com', 'auxiliar')
+    assert len(destinatarios_rrhh()) == 4
+
+    rrhh[1].rol = 'colaborador'
+    db.session.commit()
+    assert 'luis@test.com' not in [d.email for d in destinatarios_rrhh()]
+
+
+def test_notificar_rrhh_un_render_y_un_insert(app, rrhh, incapacidad):
+    renders = []
+
+    def registrar_render(sender, template, context, **kwargs):
+        renders.append(template.name)
+
+    template_rendered.connect(registrar_render, app)
+
+    with patch('app.utils.email_service.send_email') as mock_send:
+        mock_send.return_value = {'email_ok': True, 'notificacion_id': None}
+        with ContadorConsultas() as contador:
+            resultado = notificar_rrhh(
+                TipoNotificacionEnum.REGISTRO_INCAPACIDAD,
+                'Nueva incapacidad',
+                'emails/notificacion_gestion_humana.html',
+                {'incapacidad': incapacidad, 'colaborador': incapacidad.usuario, 'tipo_notificacion': 'nueva'},
+            )
+
+    assert resultado['notificaciones_internas'] == 3
+    assert renders == ['emails/notificacion_gestion_humana.html']
+    assert len([c for c in contador.consultas if c.lstrip().upper().startswith('INSERT')]) == 1
+
+    mock_send.assert_called_once()
+    kwargs = mock_send.call_args.kwargs
+    assert kwargs['recipients'] == ['ana.notif@test.com', 'luis@test.com', 'marta@test.com']
+    assert len(kwargs['notificacion_ids']) == 3
+
+    notificaciones = Notificacion.query.all()
+    assert sorted(n.destinatario_id for n in notificaciones) == sorted(u.id for u in rrhh)
+    assert {n.estado for n in notificaciones} == {EstadoNotificacionEnum.ENVIADA.value}
+
+
+def test_registro_notifica_a_todo_rrhh(app, rrhh, incapacidad):
+    resultado = notificar_nueva_incapacidad(incapacidad)
+
+    assert resultado['email_ok']
+    assert resultado['notificaciones_internas'] == 4  # colaborador + 3 de RRHH
+    assert Notificacion.query.filter(
+        Notificacion.destinatario_id.in_([u.id for u in rrhh])
+    ).count() == 3
+
+
+def test_documentacion_completada(app, rrhh, incapacidad):
+    app.config['MAIL_ENABLED'] = True
+    with app.test_request_context(), patch('app.utils.email_service.send_email') as mock_send:
+        mock_send.return_value = {'email_ok': True, 'notificacion_id': None}
+
+        # Auxiliar conocido (por su email de notificaciones): solo él
+        assert notificar_documentacion_completada(incapacidad, email_auxiliar='ana.notif@test.com')
+        assert mock_send.call_args.kwargs['recipients'] == ['ana.notif@test.com']
+        assert Notificacion.query.filter_by(destinatario_id=rrhh[0].id).count() == 1
+
+        # Sin auxiliar: todo RRHH
+        assert notificar_documentacion_completada(incapacidad)
+        assert len(mock_send.call_args.kwargs['recipients']) == 3
+        assert Notificacion.query.filter_by(tipo='DOCUMENTACION_COMPLETADA').count() == 4
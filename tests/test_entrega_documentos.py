@@ -0,0 +1,144 @@
+"""
+Tests para la entrega de documentos (ver / descargar)
+
+Cobertura:
+1. ETag desde checksum_md5 y 304 con If-None-Match
+2. Rangos HTTP (206 Partial Content)
+3. Mimetype según el documento (imágenes en /ver)
+4. Delegación a nginx con X-Accel-Redirect
+5. Archivo inexistente
+"""
+
+import hashlib
+
+import pytest
+
+from app import db
+from app.models.usuario import Usuario
+from app.models.incapacidad import Incapacidad
+from app.models.documento import Documento
+from datetime import date, timedelta
+
+
+@pytest.fixture
+def app(crear_app, tmp_path):
+    """Crear aplicación de prueba."""
+    app = crear_app(
+        UPLOAD_FOLDER=str(tmp_path),
+    )
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def client(app):
+    """Cliente de prueba."""
+    return app.test_client()
+
+
+@pytest.fixture
+def documentos(app, tmp_path):
+    """Un PDF y una imagen PNG de un colaborador."""
+    colaborador = Usuario(nombre='Colaborador Test', email='colaborador@test.com', rol='colaborador')
+    colaborador.set_password('test123')
+    db.session.add(colaborador)
+    db.session.commit()
+
+    incapacidad = Incapacidad(
+        usuario_id=colaborador.id,
+        codigo_radicacion='INC-20250101-0001',
+        tipo='Enfermedad General',
+        fecha_inicio=date.today() - timedelta(days=3),
+        fecha_fin=date.today(),
+        dias=4,
+        estado='PENDIENTE_VALIDACION'
+    )
+    db.session.add(incapacidad)
+    db.session.commit()
+
+    ids = {}
+    for clave, nombre, contenido, mime in [
+        ('pdf', 'certificado.pdf', b'%PDF-1.4 ' + b'0123456789' * 100, 'application/pdf'),
+        ('png', 'epicrisis.png', b'\x89PNG\r\n\x1a\n' + b'\x00' * 64, 'image/png'),
+    ]:
+        ruta = tmp_path / f'unico_{nombre}'
+        ruta.write_bytes(contenido)
+        documento = Documento(
+            incapacidad_id=incapacidad.id,
+            nombre_archivo=nombre,
+            nombre_unico=ruta.name,
+            ruta=str(ruta),
+            tipo_documento='certificado',
+            tamaño_bytes=len(contenido),
+            checksum_md5=hashlib.md5(contenido).hexdigest(),
+            mime_type=mime
+        )
+        db.session.add(documento)
+        db.session.commit()
+        ids[clave] = documento.id
+        ids[f'{clave}_md5'] = documento.checksum_md5
+        ids[f'{clave}_ruta'] = ruta
+    return ids
+
+
+@pytest.fixture
+def sesion(client, documentos):
+    client.post('/login', data={'email': 'colaborador@test.com', 'password': 'test123'}, follow_redirects=True)
+    return client
+
+
+def test_etag_desde_checksum_y_304(sesion, documentos):
+    response = sesion.get(f"/documentos/descargar/{documentos['pdf']}")
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] == f'"{documentos["pdf_md5"]}"'
+    assert 'private' in response.headers['Cache-Control']
+    assert 'attachment' in response.headers['Content-Disposition']
+
+    response = sesion.get(
+        f"/documentos/descargar/{documentos['pdf']}",
+        headers={'If-None-Match': f'"{documentos["pdf_md5"]}"'}
+    )
+    assert response.status_code == 304
+    assert response.data == b''
+
+
+def test_rango_parcial(sesion, documentos):
+    response = sesion.get(f"/documentos/ver/{documentos['pdf']}", headers={'Range': 'bytes=0-7'})
+
+    assert response.status_code == 206
+    assert response.data == b'%PDF-1.4'
+    assert response.headers['Accept-Ranges'] == 'bytes'
+
+
+def test_ver_imagen_con_su_mimetype(sesion, documentos):
+    response = sesion.get(f"/documentos/ver/{documentos['png']}")
+
+    assert response.status_code == 200
+    assert response.mimetype == 'image/png'
+    assert response.headers['Content-Disposition'].startswith('inline')
+
+
+def test_x_accel_redirect(app, sesion, documentos):
+    app.config['DOCUMENTOS_X_ACCEL_PREFIX'] = '/_documentos/'
+
+    response = sesion.get(f"/documentos/ver/{documentos['pdf']}")
+
+    assert response.status_code == 200
+    assert response.headers['X-Accel-Redirect'] == f"/_documentos/{documentos['pdf_ruta'].name}"
+    assert response.data == b''
+    assert response.mimetype == 'application/pdf'
+
+    response = sesion.get(
+        f"/documentos/ver/{documentos['pdf']}",
+        headers={'If-None-Match': f'"{documentos["pdf_md5"]}"'}
+    )
+    assert response.status_code == 304
+
+
+def test_archivo_inexistente(sesion, documentos):
+    documentos['pdf_ruta'].unlink()
+
+    response = sesion.get(f"/documentos/descargar/{documentos['pdf']}")
+
+    assert response.status_code == 302
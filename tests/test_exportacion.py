@@ -0,0 +1,175 @@
+"""
+Tests para la exportación de incapacidades (CSV / NDJSON en streaming)
+
+Cobertura:
+1. CSV con historial y documentos serializados como JSON
+2. NDJSON comprimido con gzip
+3. Consultas por bloque (no por fila)
+4. GET /incapacidades/exportar - Solo auxiliar
+5. Comando flask exportar-incapacidades
+
+Cada test se ejecuta en SQLite y, con TEST_POSTGRES_URL, en PostgreSQL.
+"""
+
+import csv
+import gzip
+import io
+import json
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models.usuario import Usuario
+from app.models.incapacidad import Incapacidad
+from app.models.documento import Documento
+from app.models.historial_estado import HistorialEstado
+from app.services.exportacion_service import ExportacionIncapacidadesService
+
+
+pytestmark = pytest.mark.todos_los_motores
+
+
+@pytest.fixture
+def client(app):
+    """Cliente de prueba."""
+    return app.test_client()
+
+
+@pytest.fixture
+def datos(app):
+    """Usuarios y 5 incapacidades; la primera con historial y documento."""
+    auxiliar = Usuario(nombre='Auxiliar Test', email='auxiliar@test.com', rol='auxiliar')
+    auxiliar.set_password('test123')
+    colaborador = Usuario(nombre='Colaborador Test', email='colaborador@test.com', rol='colaborador')
+    colaborador.set_password('test123')
+    db.session.add_all([auxiliar, colaborador])
+    db.session.commit()
+
+    for i in range(5):
+        db.session.add(Incapacidad(
+            usuario_id=colaborador.id,
+            codigo_radicacion=f'INC-20250101-{i:04X}',
+            tipo='Enfermedad General',
+            fecha_inicio=date.today() - timedelta(days=10 + i),
+            fecha_fin=date.today() - timedelta(days=5 + i),
+            dias=6,
+            estado='PENDIENTE_VALIDACION' if i else 'APROBADA'
+        ))
+    db.session.commit()
+
+    primera = Incapacidad.query.filter_by(codigo_radicacion='INC-20250101-0000').one()
+    db.session.add(Documento(
+        incapacidad_id=primera.id,
+        nombre_archivo='certificado.pdf',
+        nombre_unico='abc.pdf',
+        ruta='/tmp/abc.pdf',
+        tipo_documento='certificado',
+        tamaño_bytes=1234,
+        checksum_md5='d41d8cd98f00b204e9800998ecf8427e',
+        mime_type='application/pdf'
+    ))
+    db.session.add(HistorialEstado(
+        incapacidad_id=primera.id,
+        estado_anterior='PENDIENTE_VALIDACION',
+        estado_nuevo='APROBADA',
+        usuario_id=auxiliar.id,
+        observaciones='Todo en orden'
+    ))
+    db.session.commit()
+    return {'primera_id': primera.id}
+
+
+def login(client, email, password='test123'):
+    """Helper para hacer login."""
+    return client.post('/login', data={'email': email, 'password': password}, follow_redirects=True)
+
+
+def test_csv_incluye_historial_y_documentos(app, datos):
+    contenido = ''.join(ExportacionIncapacidadesService.exportar(formato='csv', comprimir=False, tamaño_bloque=2))
+    filas = list(csv.DictReader(io.StringIO(contenido)))
+
+    assert len(filas) == 5
+    primera = next(f for f in filas if int(f['id']) == datos['primera_id'])
+    assert primera['email_colaborador'] == 'colaborador@test.com'
+    assert primera['estado'] == 'APROBADA'
+
+    historial = json.loads(primera['historial_estados'])
+    assert historial[0]['estado_nuevo'] == 'APROBADA'
+    assert historial[0]['observaciones'] == 'Todo en orden'
+
+    documentos = json.loads(primera['documentos'])
+    assert documentos[0]['checksum_md5'] == 'd41d8cd98f00b204e9800998ecf8427e'
+    assert all(json.loads(f['documentos']) == [] for f in filas if f is not primera)
+
+
+def test_ndjson_gzip_y_filtro_estado(app, datos):
+    contenido = b''.join(ExportacionIncapacidadesService.exportar(formato='ndjson', estado='PENDIENTE_VALIDACION'))
+    lineas = gzip.decompress(contenido).decode('utf-8').splitlines()
+
+    registros = [json.loads(linea) for linea in lineas]
+    assert len(registros) == 4
+    assert all(r['estado'] == 'PENDIENTE_VALIDACION' for r in registros)
+
+
+def test_consultas_por_bloque_y_no_por_fila(app, datos):
+    consultas = []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            consultas.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', contar)
+    try:
+        list(ExportacionIncapacidadesService.exportar(formato='ndjson', comprimir=False, tamaño_bloque=2))
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', contar)
+
+    # 1 consulta principal + (historial + documentos) × 3 bloques
+    assert len(consultas) == 7
+
+
+def test_formato_no_soportado(app):
+    with pytest.raises(ValueError):
+        ExportacionIncapacidadesService.exportar(formato='xml')
+
+
+def test_ruta_exportar_auxiliar(client, datos):
+    login(client, 'auxiliar@test.com')
+
+    response = client.get('/incapacidades/exportar?formato=csv')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/gzip'
+    assert '.csv.gz' in response.headers['Content-Disposition']
+    filas = list(csv.DictReader(io.StringIO(gzip.decompress(response.data).decode('utf-8'))))
+    assert len(filas) == 5
+
+
+def test_ruta_exportar_sin_comprimir_con_rango(client, datos):
+    login(client, 'auxiliar@test.com')
+    desde = (date.today() - timedelta(days=11)).isoformat()
+
+    response = client.get(f'/incapacidades/exportar?formato=ndjson&gzip=0&desde={desde}')
+
+    assert response.status_code == 200
+    assert len(response.data.decode('utf-8').splitlines()) == 2
+
+
+def test_ruta_exportar_solo_auxiliar(client, datos):
+    login(client, 'colaborador@test.com')
+
+    response = client.get('/incapacidades/exportar')
+
+    assert response.status_code == 403
+
+
+def test_comando_exportar(app, datos, tmp_path):
+    salida = tmp_path / 'auditoria.ndjson.gz'
+
+    resultado = app.test_cli_runner().invoke(args=['exportar-incapacidades', str(salida), '--formato', 'ndjson'])
+
+    assert resultado.exit_code == 0, resultado.output
+    with gzip.open(salida, 'rt', encoding='utf-8') as f:
+        assert len(f.readlines()) == 5
@@ -0,0 +1,261 @@
+"""
+Tests para la importación masiva de incapacidades (CSV / Excel)
+
+Cobertura:
+1. Filas válidas e inválidas (tipo, fechas, email inexistente)
+2. CSV con separador ';' y fechas DD/MM/AAAA
+3. Códigos de radicación únicos y consecutivos
+4. Inserción por lotes con executemany
+5. Un único resumen para Gestión Humana
+6. POST /incapacidades/importar - Solo auxiliar
+7. CSV en cp1252 (Excel es-CO) y errores de formato a mitad del archivo
+8. Tamaño de lote acotado en la ruta y en la CLI
+
+Cada test se ejecuta en SQLite y, con TEST_POSTGRES_URL, en PostgreSQL.
+"""
+
+import io
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models.usuario import Usuario
+from app.models.incapacidad import Incapacidad
+from app.models.notificacion import Notificacion
+from app.models.enums import TipoNotificacionEnum
+from app.services.importacion_service import (
+    ImportacionIncapacidadesService,
+    ArchivoImportacionInvalido,
+    TAMAÑO_LOTE_MAX,
+    detectar_codificacion,
+    leer_filas_csv,
+)
+
+
+pytestmark = pytest.mark.todos_los_motores
+
+
+@pytest.fixture
+def client(app):
+    """Cliente de prueba."""
+    return app.test_client()
+
+
+@pytest.fixture
+def usuarios(app):
+    """Crear usuarios de prueba."""
+    auxiliar = Usuario(nombre='Auxiliar Test', email='auxiliar@test.com', rol='auxiliar')
+    auxiliar.set_password('test123')
+    colaborador = Usuario(nombre='Colaborador Test', email='colaborador@test.com', rol='colaborador')
+    colaborador.set_password('test123')
+    db.session.add_all([auxiliar, colaborador])
+    db.session.commit()
+    return {'auxiliar_id': auxiliar.id, 'colaborador_id': colaborador.id}
+
+
+def login(client, email, password='test123'):
+    """Helper para hacer login."""
+    return client.post('/login', data={'email': email, 'password': password}, follow_redirects=True)
+
+
+def _fecha(dias_atras):
+    return (date.today() - timedelta(days=dias_atras)).isoformat()
+
+
+def _csv(filas, separador=','):
+    encabezado = separador.join(['email', 'tipo', 'fecha_inicio', 'fecha_fin'])
+    return '\n'.join([encabezado] + [separador.join(f) for f in filas]) + '\n'
+
+
+def test_importa_filas_validas_y_reporta_invalidas(app, usuarios):
+    contenido = _csv([
+        ['colaborador@test.com', 'Enfermedad General', _fecha(5), _fecha(2)],
+        ['COLABORADOR@test.com', 'accidente_laboral', _fecha(10), _fecha(8)],
+        ['noexiste@test.com', 'Enfermedad General', _fecha(5), _fecha(2)],
+        ['colaborador@test.com', 'Gripa', _fecha(5), _fecha(2)],
+        ['colaborador@test.com', 'Enfermedad General', _fecha(2), _fecha(5)],
+    ])
+
+    resumen = ImportacionIncapacidadesService.importar(
+        leer_filas_csv(io.StringIO(contenido)), notificar=False
+    )
+
+    assert resumen['total'] == 5
+    assert resumen['importadas'] == 2
+    assert resumen['rechazadas'] == 3
+    assert sorted(e['linea'] for e in resumen['errores']) == [4, 5, 6]
+
+    incapacidades = Incapacidad.query.filter_by(usuario_id=usuarios['colaborador_id']).all()
+    assert len(incapacidades) == 2
+    assert {i.tipo for i in incapacidades} == {'Enfermedad General', 'Accidente Laboral'}
+    assert all(i.estado == 'PENDIENTE_VALIDACION' for i in incapacidades)
+    assert sorted(i.dias for i in incapacidades) == [3, 4]
+
+
+def test_csv_con_punto_y_coma_y_fechas_locales(app, usuarios):
+    inicio = date.today() - timedelta(days=3)
+    contenido = _csv(
+        [['colaborador@test.com', 'Enfermedad General', inicio.strftime('%d/%m/%Y'), date.today().strftime('%d/%m/%Y')]],
+        separador=';'
+    )
+
+    resumen = ImportacionIncapacidadesService.importar(
+        leer_filas_csv(io.StringIO(contenido)), notificar=False
+    )
+
+    assert resumen['importadas'] == 1
+    assert Incapacidad.query.one().fecha_inicio == inicio
+
+
+def test_csv_sin_columnas_obligatorias(app):
+    with pytest.raises(ArchivoImportacionInvalido):
+        list(leer_filas_csv(io.StringIO('email,tipo\nx@test.com,Enfermedad General\n')))
+
+
+def test_codigos_unicos_e_insercion_por_lotes(app, usuarios):
+    filas = [
+        {'email': 'colaborador@test.com', 'tipo': 'Enfermedad General',
+         'fecha_inicio': _fecha(i + 1), 'fecha_fin': _fecha(i)}
+        for i in range(5)
+    ]
+
+    inserciones = []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('INSERT INTO INCAPACIDADES'):
+            inserciones.append(executemany)
+
+    event.listen(db.engine, 'before_cursor_execute', contar)
+    try:
+        resumen = ImportacionIncapacidadesService.importar(filas, tamaño_lote=2, notificar=False)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', contar)
+
+    assert resumen['importadas'] == 5
+    # 5 filas en lotes de 2 → 3 sentencias, no 5
+    assert len(inserciones) == 3
+
+    codigos = [i.codigo_radicacion for i in Incapacidad.query.order_by(Incapacidad.id).all()]
+    assert len(set(codigos)) == 5
+    assert resumen['codigos'] == [codigos[0], codigos[-1]]
+
+
+def test_un_solo_resumen_para_gestion_humana(app, usuarios):
+    filas = [
+        {'email': 'colaborador@test.com', 'tipo': 'Enfermedad General',
+         'fecha_inicio': _fecha(i + 1), 'fecha_fin': _fecha(i)}
+        for i in range(4)
+    ]
+
+    ImportacionIncapacidadesService.importar(filas, tamaño_lote=2)
+
+    notificaciones = Notificacion.query.all()
+    assert len(notificaciones) == 1
+    assert notificaciones[0].destinatario_id == usuarios['auxiliar_id']
+    assert notificaciones[0].tipo == TipoNotificacionEnum.IMPORTACION_MASIVA.value
+
+
+def test_ruta_importar_auxiliar(client, usuarios):
+    login(client, 'auxiliar@test.com')
+    contenido = _csv([['colaborador@test.com', 'Enfermedad General', _fecha(3), _fecha(1)]])
+
+    response = client.post('/incapacidades/importar', data={
+        'archivo': (io.BytesIO(contenido.encode('utf-8')), 'incapacidades.csv')
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 200
+    datos = response.get_json()
+    assert datos['success'] is True
+    assert datos['importadas'] == 1
+
+
+def test_detectar_codificacion():
+    assert detectar_codificacion(io.BytesIO('\ufeffemail,tipo\nañ,b\n'.encode('utf-8'))) == 'utf-8-sig'
+    archivo = io.BytesIO('email,tipo\nañ,b\n'.encode('cp1252'))
+    assert detectar_codificacion(archivo) == 'cp1252'
+    assert archivo.tell() == 0
+
+
+def test_ruta_importar_csv_cp1252(client, usuarios):
+    login(client, 'auxiliar@test.com')
+    # El byte no UTF-8 aparece en la última fila, después del primer lote
+    filas = [['colaborador@test.com', 'Enfermedad General', _fecha(3), _fecha(1), 'sin novedad']] * 3
+    filas.append(['colaborador@test.com', 'Enfermedad General', _fecha(3), _fecha(1), 'Radicó en Bogotá'])
+    contenido = 'email,tipo,fecha_inicio,fecha_fin,observaciones\n' + '\n'.join(','.join(f) for f in filas) + '\n'
+
+    response = client.post('/incapacidades/importar', data={
+        'archivo': (io.BytesIO(contenido.encode('cp1252')), 'incapacidades.csv'),
+        'lote': '1',
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 200
+    assert response.get_json()['importadas'] == 4
+
+
+def test_ruta_importar_csv_mal_formado(client, usuarios):
+    login(client, 'auxiliar@test.com')
+    contenido = _csv([
+        ['colaborador@test.com', 'Enfermedad General', _fecha(3), _fecha(1)],
+        ['colaborador@test.com', 'x' * 200_000, _fecha(3), _fecha(1)],
+    ])
+
+    response = client.post('/incapacidades/importar', data={
+        'archivo': (io.BytesIO(contenido.encode('utf-8')), 'incapacidades.csv'),
+        'lote': '1',
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 400
+    error = response.get_json()['errors'][0]
+    assert 'línea 3' in error
+    assert 'Ya se habían importado 1 filas' in error
+
+
+def test_tamaño_de_lote_acotado(app, client, usuarios, monkeypatch, tmp_path):
+    importar = ImportacionIncapacidadesService.importar
+    lotes = []
+
+    def registrar(filas, **kwargs):
+        lotes.append(kwargs['tamaño_lote'])
+        return importar(filas, **kwargs)
+
+    monkeypatch.setattr(ImportacionIncapacidadesService, 'importar', registrar)
+    contenido = _csv([['colaborador@test.com', 'Enfermedad General', _fecha(3), _fecha(1)]])
+
+    login(client, 'auxiliar@test.com')
+    for lote in ('1000000000', '-5'):
+        response = client.post('/incapacidades/importar', data={
+            'archivo': (io.BytesIO(contenido.encode('utf-8')), 'incapacidades.csv'),
+            'lote': lote,
+        }, content_type='multipart/form-data')
+        assert response.status_code == 200
+
+    archivo = tmp_path / 'incapacidades.csv'
+    archivo.write_text(contenido, encoding='utf-8')
+    resultado = app.test_cli_runner().invoke(
+        args=['importar-incapacidades', str(archivo), '--lote', '1000000000', '--sin-notificar']
+    )
+    assert resultado.exit_code == 0, resultado.output
+
+    assert lotes == [TAMAÑO_LOTE_MAX, 1, TAMAÑO_LOTE_MAX]
+
+
+def test_ruta_importar_formato_no_soportado(client, usuarios):
+    login(client, 'auxiliar@test.com')
+
+    response = client.post('/incapacidades/importar', data={
+        'archivo': (io.BytesIO(b'x'), 'incapacidades.pdf')
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 400
+
+
+def test_ruta_importar_solo_auxiliar(client, usuarios):
+    login(client, 'colaborador@test.com')
+
+    response = client.post('/incapacidades/importar', data={
+        'archivo': (io.BytesIO(b'email,tipo,fecha_inicio,fecha_fin\n'), 'incapacidades.csv')
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 403
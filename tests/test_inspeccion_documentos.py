@@ -0,0 +1,251 @@
+"""
+Tests para la inspección de documentos después de la carga
+
+Cobertura:
+1. Tipo real por magic bytes y estructura de PDFs
+2. Antivirus clamd (INSTREAM) contra un servidor local de prueba
+3. Inspección en segundo plano (programar_inspeccion) y por lotes (CLI)
+3. Inspección en segundo plano (síncrona con TESTING) y por lotes (CLI)
+"""
+
+import os
+import socket
+import struct
+import threading
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from app import db
+from app.models.usuario import Usuario
+from app.models.incapacidad import Incapacidad
+from app.models.documento import Documento
+from app.utils.inspeccion_documentos import (
+    detectar_mime,
+    escanear_clamd,
+    inspeccionar_archivo,
+    inspeccionar_pendientes,
+    programar_inspeccion,
+    pymupdf,
+)
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 64
+EICAR = b'X5O!P%@AP[4\\PZX54(P^)7CC)7}$EICAR-STANDARD-ANTIVIRUS-TEST-FILE!$H+H*'
+PDF_CON_JAVASCRIPT = (
+    b'%PDF-1.4\n1 0 obj\n<< /Type /Catalog /OpenAction << /S /JavaScript /JS (app.alert\\(1\\)) >> >>\n'
+    b'endobj\ntrailer\n<< /Root 1 0 R >>\n%%EOF\n'
+)
+
+
+def servidor_clamd(ruta_socket):
+    """clamd de prueba: responde FOUND si el flujo contiene la firma EICAR."""
+    servidor = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    servidor.bind(ruta_socket)
+    servidor.listen()
+
+    def leer(conexion, n):
+        datos = b''
+        while len(datos) < n:
+            datos += conexion.recv(n - len(datos))
+        return datos
+
+    def atender():
+        while True:
+            try:
+                conexion, _ = servidor.accept()
+            except OSError:
+                return
+            with conexion:
+                comando = b''
+                while not comando.endswith(b'\0'):
+                    comando += conexion.recv(1)
+                contenido = b''
+                while True:
+                    (longitud,) = struct.unpack('!L', leer(conexion, 4))
+                    if longitud == 0:
+                        break
+                    contenido += leer(conexion, longitud)
+                if EICAR in contenido:
+                    conexion.sendall(b'stream: Eicar-Test-Signature FOUND\0')
+                else:
+                    conexion.sendall(b'stream: OK\0')
+
+    threading.Thread(target=atender, daemon=True).start()
+    return servidor
+
+
+@pytest.fixture
+def app(crear_app, tmp_path):
+    """Crear aplicación de prueba."""
+    app = crear_app(
+        UPLOAD_FOLDER=str(tmp_path),
+        INSPECCION_ENABLED=True,
+        ESCANER_ANTIVIRUS=None,
+    )
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def incapacidad(app):
+    colaborador = Usuario(nombre='Colaborador Test', email='colaborador@test.com', rol='colaborador')
+    colaborador.set_password('test123')
+    db.session.add(colaborador)
+    db.session.commit()
+
+    incapacidad = Incapacidad(
+        usuario_id=colaborador.id,
+        tipo='Enfermedad General',
+        fecha_inicio=date.today() - timedelta(days=3),
+        fecha_fin=date.today(),
+        dias=4,
+        estado='PENDIENTE_VALIDACION'
+    )
+    db.session.add(incapacidad)
+    db.session.commit()
+    return incapacidad
+
+
+def crear_documento(incapacidad, ruta, contenido, mime_type):
+    ruta.write_bytes(contenido)
+    documento = Documento(
+        incapacidad_id=incapacidad.id,
+        nombre_archivo=ruta.name,
+        nombre_unico=ruta.name,
+        ruta=str(ruta),
+        tipo_documento='epicrisis',
+        tamaño_bytes=len(contenido),
+        mime_type=mime_type
+    )
+    db.session.add(documento)
+    db.session.commit()
+    return documento
+
+
+def test_tipo_real_por_contenido(tmp_path):
+    assert detectar_mime(b'%PDF-1.7\n...') == 'application/pdf'
+    assert detectar_mime(PNG) == 'image/png'
+    assert detectar_mime(b'RIFF\x10\x00\x00\x00WEBPVP8 ') == 'image/webp'
+    assert detectar_mime(b'MZ\x90\x00') == 'application/x-msdownload'
+    assert detectar_mime(b'  <!DOCTYPE html><html>') == 'text/html'
+    assert detectar_mime(b'hola') is None
+
+    ejecutable = tmp_path / 'certificado.pdf'
+    ejecutable.write_bytes(b'MZ\x90\x00' + b'\x00' * 100)
+    resultado = inspeccionar_archivo(str(ejecutable), 'application/pdf')
+    assert resultado['estado'] == 'SOSPECHOSO'
+    assert 'application/x-msdownload' in resultado['detalle'][0]
+
+
+def test_estructura_pdf(tmp_path):
+    activo = tmp_path / 'activo.pdf'
+    activo.write_bytes(PDF_CON_JAVASCRIPT)
+    resultado = inspeccionar_archivo(str(activo), 'application/pdf')
+    assert resultado['estado'] == 'SOSPECHOSO'
+    assert any('/JavaScript' in hallazgo and '/JS' in hallazgo for hallazgo in resultado['detalle'])
+
+    truncado = tmp_path / 'truncado.pdf'
+    truncado.write_bytes(PDF_CON_JAVASCRIPT.replace(b'%%EOF', b''))
+    assert any('%%EOF' in h for h in inspeccionar_archivo(str(truncado), 'application/pdf')['detalle'])
+
+    if pymupdf is None:
+        pytest.skip('PyMuPDF no instalado')
+    limpio = tmp_path / 'limpio.pdf'
+    pdf = pymupdf.open()
+    pdf.new_page().insert_text((72, 72), 'Certificado de incapacidad')
+    pdf.save(str(limpio))
+    pdf.close()
+    assert inspeccionar_archivo(str(limpio), 'application/pdf') == {
+        'estado': 'LIMPIO', 'mime_detectado': 'application/pdf', 'detalle': []
+    }
+
+
+def test_antivirus_clamd(app, tmp_path):
+    ruta_socket = str(tmp_path / 'clamd.sock')
+    servidor = servidor_clamd(ruta_socket)
+    app.config['CLAMD_SOCKET'] = ruta_socket
+    try:
+        infectado = tmp_path / 'epicrisis.png'
+        infectado.write_bytes(PNG + EICAR)
+        limpio = tmp_path / 'certificado.png'
+        limpio.write_bytes(PNG)
+
+        assert escanear_clamd(str(infectado)) == 'Eicar-Test-Signature'
+        assert escanear_clamd(str(limpio)) is None
+
+        resultado = inspeccionar_archivo(str(infectado), 'image/png', escaner=escanear_clamd)
+        assert resultado['estado'] == 'INFECTADO'
+        assert resultado['detalle'] == ['Antivirus: Eicar-Test-Signature']
+    finally:
+        servidor.close()
+        os.remove(ruta_socket)
+
+    # clamd caído: la inspección queda con ERROR, no como limpia
+    resultado = inspeccionar_archivo(str(limpio), 'image/png', escaner=escanear_clamd)
+    assert resultado['estado'] == 'ERROR'
+
+
+def test_inspeccion_en_segundo_plano(app, incapacidad, tmp_path):
+    app.config['TAREAS_SINCRONAS'] = False  # El test espera a que el pool termine
+    # PNG cargado con extensión .jpg: tipo permitido, se corrige mime_type
+    documento = crear_documento(incapacidad, tmp_path / 'epicrisis.jpg', PNG, 'image/jpeg')
+    sospechoso = crear_documento(incapacidad, tmp_path / 'certificado.pdf', b'PK\x03\x04' + b'\x00' * 60, 'application/pdf')
+    assert documento.estado_inspeccion == 'PENDIENTE'
+
+    assert programar_inspeccion([documento, sospechoso]) == 2
+
+    for _ in range(50):
+        db.session.expire_all()
+        if db.session.get(Documento, sospechoso.id).estado_inspeccion != 'PENDIENTE' and \
+                db.session.get(Documento, documento.id).estado_inspeccion != 'PENDIENTE':
+            break
+        time.sleep(0.1)
+
+    documento = db.session.get(Documento, documento.id)
+    assert documento.estado_inspeccion == 'LIMPIO'
+    assert documento.mime_detectado == documento.mime_type == 'image/png'
+    assert documento.fecha_inspeccion is not None
+    assert db.session.get(Documento, sospechoso.id).estado_inspeccion == 'SOSPECHOSO'
+
+
+def test_inspeccion_sincrona_con_testing(app, incapacidad, tmp_path):
+    documento = crear_documento(incapacidad, tmp_path / 'epicrisis.png', PNG, 'image/png')
+
+    assert programar_inspeccion([documento]) == 1
+
+    # Sin esperar: con TESTING la inspección ya terminó en este hilo
+    db.session.expire_all()
+    assert db.session.get(Documento, documento.id).estado_inspeccion == 'LIMPIO'
+
+
+def test_inspeccion_por_lotes(app, incapacidad, tmp_path):
+    for i in range(3):
+        crear_documento(incapacidad, tmp_path / f'doc{i}.png', PNG, 'image/png')
+    crear_documento(incapacidad, tmp_path / 'activo.pdf', PDF_CON_JAVASCRIPT, 'application/pdf')
+
+    conteo = inspeccionar_pendientes(lote=2)
+
+    assert conteo['LIMPIO'] == 3
+    assert conteo['SOSPECHOSO'] == 1
+    assert inspeccionar_pendientes() == {'LIMPIO': 0, 'ERROR': 0, 'SOSPECHOSO': 0, 'INFECTADO': 0}
+    assert sum(inspeccionar_pendientes(todos=True, limite=2).values()) == 2
+
+
+def test_documento_infectado_no_se_entrega(app, incapacidad, tmp_path):
+    documento = crear_documento(incapacidad, tmp_path / 'epicrisis.png', PNG + EICAR, 'image/png')
+    documento.estado_inspeccion = 'INFECTADO'
+    documento.detalle_inspeccion = 'Antivirus: Eicar-Test-Signature'
+    db.session.commit()
+
+    client = app.test_client()
+    client.post('/login', data={'email': 'colaborador@test.com', 'password': 'test123'}, follow_redirects=True)
+
+    for ruta in ('descargar', 'ver'):
+        response = client.get(f'/documentos/{ruta}/{documento.id}')
+        assert response.status_code == 302
+        assert f'/incapacidades/detalle/{incapacidad.id}' in response.headers['Location']
+    assert client.get(f'/documentos/preview/{documento.id}').status_code == 302
+
+    response = client.get(f'/documentos/incapacidad/{incapacidad.id}/zip')
+    assert EICAR not in response.data
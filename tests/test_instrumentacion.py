@@ -0,0 +1,113 @@
+"""
+Tests para la instrumentación de peticiones (app/utils/instrumentacion.py)
+
+Cobertura:
+1. Consultas SQL, render y latencia acumulados por endpoint en /metrics
+2. Peticiones lentas registradas con sus consultas
+3. /metrics exige METRICAS_TOKEN (cerrado sin token) y METRICAS_ENABLED la desactiva
+"""
+
+import logging
+import re
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models.usuario import Usuario
+from app.utils.instrumentacion import estadisticas_peticiones
+
+
+AUTORIZACION = {'Authorization': 'Bearer secreto'}
+
+
+@pytest.fixture
+def app(crear_app):
+    app = crear_app(METRICAS_TOKEN='secreto')
+    with app.app_context():
+        usuario = Usuario(nombre='Juan Pérez', email='juan@test.com', rol='colaborador')
+        usuario.set_password('test123')
+        db.session.add(usuario)
+        db.session.commit()
+        yield app
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    client.post('/login', data={'email': 'juan@test.com', 'password': 'test123'})
+    return client
+
+
+def muestra(texto, nombre, **etiquetas):
+    patron = re.escape(nombre) + r'\{' + ','.join(
+        f'{clave}="{re.escape(valor)}"' for clave, valor in etiquetas.items()
+    ) + r'\} (\S+)'
+    return float(re.search(patron, texto).group(1))
+
+
+def test_metricas_por_endpoint(app, client):
+    consultas = []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', contar)
+    try:
+        client.get('/notificaciones/api/contador-no-leidas')
+        client.get('/notificaciones/api/contador-no-leidas')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', contar)
+    client.get('/incapacidades/mis-incapacidades')
+    # Consultas fuera de una petición no cuentan
+    Usuario.query.count()
+
+    texto = client.get('/metrics', headers=AUTORIZACION).get_data(as_text=True)
+
+    endpoint = 'notificaciones.contador_no_leidas'
+    assert muestra(texto, 'incapacidades_peticion_duracion_segundos_count', endpoint=endpoint) == 2
+    assert muestra(texto, 'incapacidades_sql_consultas_total', endpoint=endpoint) == len(consultas)
+    assert muestra(texto, 'incapacidades_peticion_duracion_segundos_bucket', endpoint=endpoint, le='+Inf') == 2
+    assert muestra(texto, 'incapacidades_plantillas_duracion_segundos_total',
+                   endpoint='incapacidades.mis_incapacidades') > 0
+    assert '# TYPE incapacidades_peticion_duracion_segundos histogram' in texto
+
+    estadisticas = estadisticas_peticiones()
+    assert estadisticas[endpoint]['sql_segundos'] > 0
+    assert estadisticas[endpoint]['plantillas_segundos'] == 0
+
+
+def test_peticion_lenta_con_consultas(app, client, caplog):
+    app.config['METRICAS_PETICION_LENTA_MS'] = 0
+
+    with caplog.at_level(logging.WARNING, logger='app.utils.instrumentacion'):
+        client.get('/notificaciones/api/contador-no-leidas')
+
+    mensaje = next(r.getMessage() for r in caplog.records if 'Petición lenta' in r.getMessage())
+    assert 'GET /notificaciones/api/contador-no-leidas' in mensaje
+    assert 'consultas SQL' in mensaje
+    assert 'SELECT count(*)' in mensaje
+
+
+def test_token_de_metricas(crear_app):
+    client = crear_app(METRICAS_TOKEN='secreto').test_client()
+
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 401
+    response = client.get('/metrics', headers=AUTORIZACION)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+
+
+def test_metricas_cerradas_sin_token(crear_app):
+    client = crear_app(METRICAS_TOKEN=None).test_client()
+
+    assert client.get('/metrics').status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer '}).status_code == 403
+
+
+def test_metricas_desactivadas(crear_app):
+    app = crear_app(METRICAS_ENABLED=False)
+
+    assert app.test_client().get('/metrics').status_code == 404
+    assert 'instrumentacion' not in app.extensions
@@ -20,6 +20,7 @@ def test_integracion_uc1_uc5():
     app = create_app()
     
     with app.app_context():
+        db.create_all()
         print("🧪 Iniciando test de integración UC1 + UC5...")
         
         # 1. Crear usuario de prueba
@@ -0,0 +1,193 @@
+"""
+Tests para el escaneo incremental de integridad de documentos
+
+Cobertura:
+1. Detección de archivos faltantes, con tamaño distinto y con checksum distinto
+2. Registro del MD5 de documentos que no lo tenían
+3. Cursor persistido: el escaneo se reanuda donde quedó
+4. Detección de archivos huérfanos e incapacidades sin documentos
+5. Limitador de tasa y comando CLI
+"""
+
+import hashlib
+import time
+from datetime import date, datetime
+
+import pytest
+
+from app import db
+from app.models.usuario import Usuario
+from app.models.incapacidad import Incapacidad
+from app.models.documento import Documento
+from app.models.escaneo_integridad import HallazgoIntegridad
+from app.services.integridad_service import IntegridadService, LimitadorTasa
+from app.utils.validaciones import validar_integridad_sistema
+
+
+@pytest.fixture
+def app(crear_app):
+    """Crear aplicación de prueba con UPLOAD_FOLDER temporal."""
+    app = crear_app(
+        INTEGRIDAD_WORKERS=2,
+        INTEGRIDAD_LOTE=2,
+    )
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def documentos(app, tmp_path):
+    """Cinco documentos: íntegro, sin MD5, faltante, tamaño distinto y checksum distinto."""
+    colaborador = Usuario(nombre='Colaborador Test', email='colaborador@test.com', rol='colaborador')
+    colaborador.set_password('test123')
+    db.session.add(colaborador)
+    db.session.commit()
+
+    incapacidad = Incapacidad(
+        usuario_id=colaborador.id,
+        codigo_radicacion='INC-20250101-0001',
+        tipo='Enfermedad General',
+        fecha_inicio=date(2025, 1, 1),
+        fecha_fin=date(2025, 1, 5),
+        dias=5,
+        estado='PENDIENTE_VALIDACION'
+    )
+    db.session.add_all([incapacidad, Incapacidad(
+        usuario_id=colaborador.id,
+        codigo_radicacion='INC-20250101-0002',
+        tipo='Enfermedad General',
+        fecha_inicio=date(2025, 1, 1),
+        fecha_fin=date(2025, 1, 2),
+        dias=2,
+        estado='PENDIENTE_VALIDACION'
+    )])
+    db.session.commit()
+
+    carpeta = tmp_path / 'uploads'
+    carpeta.mkdir(exist_ok=True)
+    ids = {}
+    for nombre in ['integro', 'sin_md5', 'faltante', 'tamano', 'checksum']:
+        contenido = f'%PDF-1.4 {nombre}'.encode() * 50
+        ruta = carpeta / f'INC{incapacidad.id}_certificado_{nombre}.pdf'
+        ruta.write_bytes(contenido)
+        checksum = None if nombre == 'sin_md5' else hashlib.md5(contenido).hexdigest()
+        tamaño = len(contenido)
+        if nombre == 'faltante':
+            ruta.unlink()
+        elif nombre == 'tamano':
+            tamaño += 10
+        elif nombre == 'checksum':
+            ruta.write_bytes(contenido.replace(b'1.4', b'1.7'))
+
+        documento = Documento(
+            incapacidad_id=incapacidad.id,
+            nombre_archivo=f'{nombre}.pdf',
+            nombre_unico=ruta.name,
+            ruta=str(ruta),
+            tipo_documento='certificado',
+            tamaño_bytes=tamaño,
+            checksum_md5=checksum,
+            mime_type='application/pdf',
+            fecha_carga=datetime(2025, 1, 15)
+        )
+        db.session.add(documento)
+        db.session.commit()
+        ids[nombre] = documento.id
+
+    (carpeta / 'sin_registro.pdf').write_bytes(b'%PDF-1.4 huerfano')
+    (carpeta / 'originales').mkdir()
+    (carpeta / 'originales' / 'foto.jpg').write_bytes(b'original conservado')
+    (carpeta / '.gitkeep').write_bytes(b'')
+    return ids
+
+
+def tipos_por_documento(escaneo):
+    return {h.documento_id: h.tipo for h in escaneo.hallazgos if h.documento_id}
+
+
+def test_escaneo_completo_detecta_problemas(app, documentos):
+    escaneo = IntegridadService.escanear()
+
+    assert escaneo.estado == 'COMPLETADO'
+    assert escaneo.documentos_revisados == 5
+    assert (escaneo.faltantes, escaneo.tamaño_incorrecto, escaneo.checksum_incorrecto) == (1, 1, 1)
+    assert tipos_por_documento(escaneo) == {
+        documentos['faltante']: 'FALTANTE',
+        documentos['tamano']: 'TAMAÑO',
+        documentos['checksum']: 'CHECKSUM',
+    }
+
+    huerfanos = [h.clave for h in escaneo.hallazgos if h.tipo == 'HUERFANO']
+    assert huerfanos == ['sin_registro.pdf']
+    assert escaneo.huerfanos == 1
+    assert escaneo.incapacidades_sin_documentos == 1
+
+
+def test_registra_checksum_faltante(app, documentos):
+    escaneo = IntegridadService.escanear()
+
+    documento = db.session.get(Documento, documentos['sin_md5'])
+    assert escaneo.checksums_registrados == 1
+    assert documento.checksum_md5 == hashlib.md5(b'%PDF-1.4 sin_md5' * 50).hexdigest()
+
+
+def test_escaneo_se_reanuda_con_cursor(app, documentos):
+    escaneo = IntegridadService.escanear(max_documentos=3)
+
+    assert escaneo.estado == 'EN_CURSO'
+    assert escaneo.documentos_revisados == 3
+    assert escaneo.ultimo_documento_id == documentos['faltante']
+    assert escaneo.huerfanos is None
+
+    reanudado = IntegridadService.escanear()
+    assert reanudado.id == escaneo.id
+    assert reanudado.estado == 'COMPLETADO'
+    assert reanudado.documentos_revisados == 5
+    assert db.session.query(HallazgoIntegridad).filter_by(tipo='FALTANTE').count() == 1
+
+    nuevo = IntegridadService.escanear(max_documentos=1)
+    assert nuevo.id != escaneo.id
+    assert nuevo.ultimo_documento_id == documentos['integro']
+
+
+def test_escaneo_sin_checksum(app, documentos):
+    escaneo = IntegridadService.escanear(verificar_checksum=False)
+
+    assert escaneo.checksum_incorrecto == 0
+    assert escaneo.bytes_verificados == 0
+    assert escaneo.faltantes == 1
+
+
+def test_validar_integridad_usa_ultimo_escaneo(app, documentos):
+    assert 'No hay escaneos de integridad completados (flask escanear-integridad)' in validar_integridad_sistema()
+
+    IntegridadService.escanear()
+    problemas = validar_integridad_sistema()
+
+    assert '1 incapacidades sin documentos adjuntos' in problemas
+    assert '1 documentos sin archivo fisico' in problemas
+    assert '1 archivos sin registro en la base de datos' in problemas
+
+
+def test_limitador_tasa():
+    limitador = LimitadorTasa(100)
+    inicio = time.monotonic()
+    for _ in range(11):
+        limitador.consumir()
+    assert time.monotonic() - inicio >= 0.09
+
+    sin_limite = LimitadorTasa(0)
+    inicio = time.monotonic()
+    sin_limite.consumir(10 ** 9)
+    assert time.monotonic() - inicio < 0.05
+
+
+def test_comando_escanear(app, documentos):
+    resultado = app.test_cli_runner().invoke(args=['escanear-integridad', '--max', '2'])
+
+    assert resultado.exit_code == 0, resultado.output
+    assert 'EN_CURSO' in resultado.output
+
+    resultado = app.test_cli_runner().invoke(args=['escanear-integridad'])
+    assert 'COMPLETADO' in resultado.output
+    assert 'Faltantes: 1' in resultado.output
@@ -0,0 +1,164 @@
+"""
+Tests para las migraciones de esquema (migrations/versions)
+
+Cobertura:
+1. upgrade desde una base vacía deja el esquema igual a los modelos
+2. downgrade a base y upgrade de nuevo
+3. Bases existentes (create_all o scripts archivados) suben a head sin stamp
+4. create_app no crea tablas al iniciar
+5. Las claves UUID existentes se conservan al pasar a 16 bytes
+6. El consecutivo de radicación parte de los códigos ya emitidos ese día
+"""
+
+from datetime import date, datetime
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import downgrade, upgrade
+from sqlalchemy import inspect, text
+
+from app import create_app, db, iniciar_migraciones
+from app.models.incapacidad import generar_codigos_radicacion
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'migraciones.db'}"})
+    iniciar_migraciones(app)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def diferencias_con_modelos():
+    with db.engine.connect() as conexion:
+        contexto = MigrationContext.configure(conexion, opts={'compare_type': True})
+        return compare_metadata(contexto, db.metadata)
+
+
+def version_actual():
+    with db.engine.connect() as conexion:
+        return MigrationContext.configure(conexion).get_current_revision()
+
+
+def test_create_app_no_crea_tablas(app):
+    assert inspect(db.engine).get_table_names() == []
+
+
+def test_upgrade_desde_base_vacia(app):
+    upgrade()
+
+    assert version_actual() == '0012'
+    assert diferencias_con_modelos() == []
+
+
+def test_downgrade_y_upgrade(app):
+    upgrade()
+    downgrade(revision='base')
+    assert inspect(db.engine).get_table_names() == ['alembic_version']
+
+    upgrade()
+    assert diferencias_con_modelos() == []
+
+
+def test_base_creada_con_create_all(app):
+    db.create_all()
+
+    upgrade()
+
+    assert version_actual() == '0012'
+    assert diferencias_con_modelos() == []
+
+
+def test_base_de_scripts_archivados(app):
+    # Esquema inicial con datos y sin alembic_version, como las bases de producción
+    upgrade(revision='0001')
+    with db.engine.begin() as conexion:
+        conexion.execute(text(
+            "INSERT INTO usuarios (id, nombre, email, password_hash, rol) "
+            "VALUES (1, 'Juan Pérez', 'juan@test.com', 'x', 'colaborador')"
+        ))
+        conexion.execute(text(
+            "INSERT INTO incapacidades (id, usuario_id, tipo, fecha_inicio, fecha_fin, dias, estado, fecha_registro) "
+            "VALUES (26, 1, 'Enfermedad General', :hoy, :hoy, 1, 'En revision', :registro)"
+        ), {'hoy': date(2025, 3, 1), 'registro': datetime(2025, 3, 1, 8, 30)})
+        conexion.execute(text(
+            "INSERT INTO documentos (id, incapacidad_id, nombre_archivo, ruta, tipo_documento) "
+            "VALUES (1, 26, 'certificado.pdf', 'uploads/26/abc123_certificado.pdf', 'certificado')"
+        ))
+        conexion.execute(text('DROP TABLE alembic_version'))
+
+    upgrade()
+
+    assert diferencias_con_modelos() == []
+    with db.engine.connect() as conexion:
+        assert conexion.execute(text('SELECT codigo_radicacion, estado FROM incapacidades')).one() == (
+            'INC-20250301-L001A', 'DOCUMENTACION_COMPLETA'
+        )
+        assert conexion.execute(text(
+            'SELECT nombre_unico, nivel_almacenamiento, estado_inspeccion FROM documentos'
+        )).one() == ('abc123_certificado.pdf', 'caliente', 'PENDIENTE')
+        assert conexion.execute(text('SELECT frecuencia_notificaciones FROM usuarios')).scalar() == 'INMEDIATA'
+
+
+def test_claves_uuid_existentes_se_conservan(app):
+    from app.models.notificacion import Notificacion
+
+    upgrade(revision='0011')
+    solicitud_id = 'b1f4c0de-5a1e-4c3b-9d2e-7f00aa11bb22'
+    notificacion_id = '3e9a7c51-0d4b-4f6a-8e21-c5d6e7f80912'
+    with db.engine.begin() as conexion:
+        conexion.execute(text(
+            "INSERT INTO usuarios (id, nombre, email, password_hash, rol) "
+            "VALUES (1, 'Juan Pérez', 'juan@test.com', 'x', 'colaborador')"
+        ))
+        conexion.execute(text(
+            "INSERT INTO incapacidades (id, usuario_id, tipo, fecha_inicio, fecha_fin, dias, estado) "
+            "VALUES (1, 1, 'Enfermedad General', :hoy, :hoy, 1, 'PENDIENTE_VALIDACION')"
+        ), {'hoy': date(2025, 3, 1)})
+        conexion.execute(text(
+            "INSERT INTO solicitudes_documento (id, incapacidad_id, tipo_documento, estado, fecha_solicitud, "
+            "intentos_notificacion, extension_solicitada, numero_reintentos) "
+            "VALUES (:id, 1, 'certificado', 'PENDIENTE', :ahora, 0, 0, 0)"
+        ), {'id': solicitud_id, 'ahora': datetime(2025, 3, 1)})
+        conexion.execute(text(
+            "INSERT INTO notificaciones (id, tipo, destinatario_id, asunto, contenido, fecha_envio, estado, "
+            "solicitud_documento_id, numero_reintento) "
+            "VALUES (:id, 'SOLICITUD_DOCUMENTOS', 1, 'Documentos', '...', :ahora, 'PENDIENTE', :solicitud, 1)"
+        ), {'id': notificacion_id, 'ahora': datetime(2025, 3, 1), 'solicitud': solicitud_id})
+
+    upgrade()
+
+    with db.engine.connect() as conexion:
+        assert conexion.execute(text('SELECT length(id) FROM notificaciones')).scalar() == 16
+    notificacion = db.session.get(Notificacion, notificacion_id)
+    assert notificacion.solicitud_documento.id == solicitud_id
+
+    downgrade(revision='0011')
+    with db.engine.connect() as conexion:
+        assert conexion.execute(text('SELECT id, solicitud_documento_id FROM notificaciones')).one() == (
+            notificacion_id, solicitud_id
+        )
+
+
+def test_consecutivo_desde_codigos_existentes(app):
+    upgrade(revision='0006')
+    with db.engine.begin() as conexion:
+        conexion.execute(text(
+            "INSERT INTO usuarios (id, nombre, email, password_hash, rol) "
+            "VALUES (1, 'Juan Pérez', 'juan@test.com', 'x', 'colaborador')"
+        ))
+        # Códigos aleatorios del mismo día y uno legacy (no hexadecimal)
+        for numero, codigo in enumerate(('INC-20251103-00A3', 'INC-20251103-1F00', 'INC-20251103-L001A'), 1):
+            conexion.execute(text(
+                "INSERT INTO incapacidades (id, usuario_id, codigo_radicacion, tipo, fecha_inicio, fecha_fin, "
+                "dias, estado) VALUES (:id, 1, :codigo, 'Enfermedad General', :hoy, :hoy, 1, 'PENDIENTE_VALIDACION')"
+            ), {'id': numero, 'codigo': codigo, 'hoy': date(2025, 11, 3)})
+
+    upgrade()
+
+    with db.engine.connect() as conexion:
+        assert conexion.execute(text('SELECT fecha, ultimo FROM consecutivos_radicacion')).one() == ('20251103', 0x1F00)
+    assert generar_codigos_radicacion(2, fecha=date(2025, 11, 3)) == ['INC-20251103-1F01', 'INC-20251103-1F02']
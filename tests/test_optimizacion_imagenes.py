@@ -0,0 +1,139 @@
+"""
+Tests para la optimización de imágenes al cargar
+
+Cobertura:
+1. Reducción de resolución y recompresión de JPEG
+2. Eliminación de metadatos EXIF con orientación aplicada
+3. Conversión opcional de PNG a JPEG/WebP
+4. Política de conservación del original
+5. Integración con procesar_archivo_completo (desactivada por defecto)
+"""
+
+import hashlib
+import io
+import os
+
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+from werkzeug.datastructures import FileStorage
+
+from app.utils.imagenes import optimizar_imagen, CARPETA_ORIGINALES
+from app.utils.validaciones import procesar_archivo_completo
+
+
+def _foto_jpeg(ruta, tamaño=(4000, 3000), orientacion=None):
+    """Foto 'de celular': ruido (poco compresible) y EXIF opcional."""
+    imagen = Image.effect_noise(tamaño, 64).convert('RGB')
+    exif = Image.Exif()
+    exif[0x0110] = 'Telefono de prueba'  # Model
+    if orientacion:
+        exif[0x0112] = orientacion
+    imagen.save(ruta, 'JPEG', quality=95, exif=exif.tobytes())
+
+
+def _escaneo_png(ruta, tamaño=(2480, 3508)):
+    imagen = Image.effect_noise(tamaño, 20).convert('L')
+    imagen.save(ruta, 'PNG')
+
+
+def test_reduce_y_recomprime_jpeg(tmp_path):
+    ruta = tmp_path / 'foto.jpg'
+    _foto_jpeg(ruta)
+    tamaño_original = ruta.stat().st_size
+
+    resultado = optimizar_imagen(str(ruta), 'image/jpeg', max_lado=1600, calidad=75)
+
+    assert resultado is not None
+    assert resultado['ruta'] == str(ruta)
+    assert resultado['tamaño_bytes'] < tamaño_original / 2
+    with Image.open(ruta) as optimizada:
+        assert max(optimizada.size) == 1600
+        assert not optimizada.getexif()
+
+
+def test_aplica_orientacion_exif(tmp_path):
+    ruta = tmp_path / 'vertical.jpg'
+    _foto_jpeg(ruta, tamaño=(3000, 2000), orientacion=6)  # rotada 90°
+
+    optimizar_imagen(str(ruta), 'image/jpeg', max_lado=1500)
+
+    with Image.open(ruta) as optimizada:
+        assert optimizada.size == (1000, 1500)
+
+
+def test_convierte_png_y_conserva_original(tmp_path):
+    ruta = tmp_path / 'escaneo.png'
+    _escaneo_png(ruta)
+
+    resultado = optimizar_imagen(str(ruta), 'image/png', convertir_png='jpeg', conservar_original=True)
+
+    assert resultado['mime_type'] == 'image/jpeg'
+    assert resultado['ruta'] == str(tmp_path / 'escaneo.jpg')
+    assert resultado['ruta_original'] == str(tmp_path / CARPETA_ORIGINALES / 'escaneo.png')
+    assert os.path.exists(resultado['ruta_original'])
+    assert not ruta.exists()
+
+
+def test_convierte_png_a_webp_sin_original(tmp_path):
+    ruta = tmp_path / 'escaneo.png'
+    _escaneo_png(ruta)
+
+    resultado = optimizar_imagen(str(ruta), 'image/png', convertir_png='webp')
+
+    assert resultado['mime_type'] == 'image/webp'
+    assert resultado['ruta_original'] is None
+    assert sorted(os.listdir(tmp_path)) == ['escaneo.webp']
+
+
+def test_sin_ahorro_no_reemplaza(tmp_path):
+    ruta = tmp_path / 'pequeña.jpg'
+    Image.effect_noise((200, 200), 64).convert('RGB').save(ruta, 'JPEG', quality=30)
+    contenido = ruta.read_bytes()
+
+    assert optimizar_imagen(str(ruta), 'image/jpeg', calidad=95) is None
+    assert ruta.read_bytes() == contenido
+
+
+def test_imagen_corrupta_se_guarda_sin_cambios(tmp_path):
+    ruta = tmp_path / 'corrupta.jpg'
+    ruta.write_bytes(b'\xff\xd8\xff' + b'\x00' * 100)
+
+    assert optimizar_imagen(str(ruta), 'image/jpeg') is None
+    assert ruta.exists()
+
+
+def test_procesar_archivo_completo_optimiza_imagen(tmp_path, monkeypatch):
+    from config import Config
+    monkeypatch.setattr(Config, 'IMAGENES_OPTIMIZAR', True)
+    origen = tmp_path / 'origen.jpg'
+    _foto_jpeg(origen, tamaño=(3000, 2000))
+    contenido = origen.read_bytes()
+    carpeta = tmp_path / 'uploads'
+    carpeta.mkdir()
+
+    archivo = FileStorage(stream=io.BytesIO(contenido), filename='certificado.jpg', content_type='image/jpeg')
+    resultado = procesar_archivo_completo(archivo, 'certificado', 999, str(carpeta))
+
+    assert resultado['exito'], resultado['errores']
+    metadatos = resultado['metadatos']
+    assert metadatos['tamaño_bytes'] < len(contenido)
+    assert metadatos['tamaño_bytes'] == os.path.getsize(metadatos['ruta'])
+    with open(metadatos['ruta'], 'rb') as f:
+        assert metadatos['checksum_md5'] == hashlib.md5(f.read()).hexdigest()
+
+
+def test_procesar_archivo_completo_sin_optimizar_por_defecto(tmp_path):
+    origen = tmp_path / 'origen.jpg'
+    _foto_jpeg(origen, tamaño=(3000, 2000))
+    contenido = origen.read_bytes()
+    carpeta = tmp_path / 'uploads'
+    carpeta.mkdir()
+
+    archivo = FileStorage(stream=io.BytesIO(contenido), filename='certificado.jpg', content_type='image/jpeg')
+    resultado = procesar_archivo_completo(archivo, 'certificado', 999, str(carpeta))
+
+    assert resultado['exito'], resultado['errores']
+    with open(resultado['metadatos']['ruta'], 'rb') as f:
+        assert f.read() == contenido
@@ -0,0 +1,107 @@
+"""
+Tests para las plantillas de email precompiladas
+
+Cobertura:
+1. Precompilación al crear la aplicación y caché de bytecode en disco
+2. url_externa en caché LRU (por SERVER_NAME o por host)
+3. Tiempos de render por plantilla
+"""
+
+import os
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from app import create_app, db
+from app.models.usuario import Usuario
+from app.models.incapacidad import Incapacidad
+from app.utils.plantillas import estadisticas_render, renderizar_email, url_externa
+
+
+@pytest.fixture
+def app(crear_app, tmp_path, monkeypatch):
+    """Crear aplicación de prueba con la caché de bytecode en una carpeta temporal."""
+    from config import Config
+    monkeypatch.setattr(Config, 'PLANTILLAS_BYTECODE_FOLDER', str(tmp_path), raising=False)
+
+    app = crear_app()
+    with app.app_context():
+        yield app
+
+
+def test_precompilacion_y_bytecode_en_disco(app, tmp_path):
+    emails = [n for n in app.jinja_env.list_templates() if n.startswith('emails/')]
+    assert emails
+
+    # Todas quedaron en la caché de plantillas del entorno y su bytecode en disco
+    assert {clave[1] for clave in app.jinja_env.cache.keys()} >= set(emails)
+    assert len([f for f in os.listdir(tmp_path) if f.startswith('__jinja2_')]) >= len(emails)
+
+    # Una aplicación nueva carga el bytecode en lugar de compilar
+    with patch.object(app.jinja_env.__class__, 'compile', side_effect=AssertionError('compiló')):
+        create_app()
+
+
+def test_url_externa_en_cache(app):
+    with app.test_request_context(base_url='http://rrhh.empresa.com'):
+        with patch('app.utils.plantillas.url_for', wraps=__import__('flask').url_for) as mock_url_for:
+            primera = url_externa('incapacidades.mis_incapacidades')
+            assert url_externa('incapacidades.mis_incapacidades') == primera
+        assert primera == 'http://rrhh.empresa.com/incapacidades/mis-incapacidades'
+        assert mock_url_for.call_count == 1
+
+    # Otro host: otra URL
+    with app.test_request_context(base_url='http://otro.empresa.com'):
+        assert url_externa('incapacidades.mis_incapacidades').startswith('http://otro.empresa.com/')
+
+
+def test_url_externa_con_server_name(app):
+    app.config.update(SERVER_NAME='rrhh.empresa.com', PREFERRED_URL_SCHEME='https')
+
+    # El Host de la petición no cambia la URL de los emails
+    with app.test_request_context(base_url='http://atacante.example'):
+        assert url_externa('incapacidades.mis_incapacidades') == 'https://rrhh.empresa.com/incapacidades/mis-incapacidades'
+    assert url_externa('incapacidades.mis_incapacidades') == 'https://rrhh.empresa.com/incapacidades/mis-incapacidades'
+
+
+def test_url_externa_cache_acotada(app, monkeypatch):
+    monkeypatch.setattr('app.utils.plantillas.URLS_MAX', 3)
+
+    for i in range(10):
+        with app.test_request_context(base_url=f'http://host{i}.empresa.com'):
+            url_externa('incapacidades.mis_incapacidades')
+
+    assert list(app.extensions['plantillas']['urls']) == [
+        (f'http://host{i}.empresa.com/', 'incapacidades.mis_incapacidades', ()) for i in (7, 8, 9)
+    ]
+
+
+def test_estadisticas_de_render(app):
+    colaborador = Usuario(nombre='Juan Pérez', email='juan@test.com', rol='colaborador')
+    colaborador.set_password('x')
+    db.session.add(colaborador)
+    db.session.commit()
+    incapacidad = Incapacidad(
+        usuario_id=colaborador.id,
+        tipo='Enfermedad General',
+        fecha_inicio=date.today(),
+        fecha_fin=date.today() + timedelta(days=2),
+        dias=3,
+        codigo_radicacion='INC-20250101-0001',
+        estado='PENDIENTE_VALIDACION'
+    )
+    db.session.add(incapacidad)
+    db.session.commit()
+
+    with app.test_request_context():
+        for _ in range(3):
+            html = renderizar_email(
+                'emails/documentacion_completada.html', incapacidad=incapacidad, colaborador=colaborador
+            )
+
+    assert 'INC-20250101-0001' in html
+    registro = estadisticas_render()['emails/documentacion_completada.html']
+    assert registro['renders'] == 3
+    assert registro['segundos'] >= registro['maximo'] > 0
+    assert registro['promedio_ms'] > 0
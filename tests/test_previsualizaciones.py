@@ -0,0 +1,168 @@
+"""
+Tests para las previsualizaciones de documentos
+
+Cobertura:
+1. Miniatura de imágenes y de la primera página de PDFs
+2. Generación en segundo plano (programar_previews; síncrona con TESTING)
+3. GET /documentos/preview/<id> (202 con marcador mientras se genera)
+"""
+
+import os
+import time
+from datetime import date, timedelta
+
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+from app import db
+from app.models.usuario import Usuario
+from app.models.incapacidad import Incapacidad
+from app.models.documento import Documento
+from app.utils.previsualizaciones import generar_preview, programar_previews, ruta_preview, pymupdf
+
+
+def _crear_png(ruta, tamaño=(1600, 1200)):
+    Image.new('RGB', tamaño, (200, 30, 30)).save(ruta, 'PNG')
+
+
+def _crear_pdf(ruta):
+    pdf = pymupdf.open()
+    pagina = pdf.new_page()
+    pagina.insert_text((72, 72), 'Certificado de incapacidad')
+    pdf.save(str(ruta))
+    pdf.close()
+
+
+@pytest.fixture
+def app(crear_app):
+    app = crear_app(PREVIEWS_ENABLED=True)
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def documento_png(app, tmp_path):
+    colaborador = Usuario(nombre='Colaborador Test', email='colaborador@test.com', rol='colaborador')
+    colaborador.set_password('test123')
+    db.session.add(colaborador)
+    db.session.commit()
+
+    incapacidad = Incapacidad(
+        usuario_id=colaborador.id,
+        codigo_radicacion='INC-20250101-0001',
+        tipo='Enfermedad General',
+        fecha_inicio=date.today() - timedelta(days=3),
+        fecha_fin=date.today(),
+        dias=4,
+        estado='PENDIENTE_VALIDACION'
+    )
+    db.session.add(incapacidad)
+    db.session.commit()
+
+    ruta = tmp_path / 'epicrisis.png'
+    _crear_png(ruta)
+    documento = Documento(
+        incapacidad_id=incapacidad.id,
+        nombre_archivo='epicrisis.png',
+        nombre_unico=ruta.name,
+        ruta=str(ruta),
+        tipo_documento='epicrisis',
+        tamaño_bytes=ruta.stat().st_size,
+        checksum_md5='abc123',
+        mime_type='image/png'
+    )
+    db.session.add(documento)
+    db.session.commit()
+    return documento
+
+
+def test_preview_de_imagen(tmp_path):
+    origen = tmp_path / 'grande.png'
+    _crear_png(origen)
+    destino = tmp_path / 'previews' / 'grande.jpg'
+
+    assert generar_preview(str(origen), 'image/png', str(destino), ancho=200)
+
+    with Image.open(destino) as miniatura:
+        assert miniatura.format == 'JPEG'
+        assert miniatura.size == (200, 150)
+    assert destino.stat().st_size < origen.stat().st_size
+
+
+def test_preview_de_pdf(tmp_path):
+    if pymupdf is None:
+        pytest.skip('PyMuPDF no instalado')
+    origen = tmp_path / 'certificado.pdf'
+    _crear_pdf(origen)
+    destino = tmp_path / 'certificado.jpg'
+
+    assert generar_preview(str(origen), 'application/pdf', str(destino), ancho=240)
+
+    with Image.open(destino) as miniatura:
+        assert miniatura.size[0] == 240
+
+
+def test_tipo_no_soportado(tmp_path):
+    origen = tmp_path / 'datos.bin'
+    origen.write_bytes(b'\x00' * 10)
+
+    assert not generar_preview(str(origen), 'application/octet-stream', str(tmp_path / 'x.jpg'))
+
+
+def test_programar_previews_en_segundo_plano(app, documento_png):
+    app.config['TAREAS_SINCRONAS'] = False
+    assert programar_previews([documento_png]) == 1
+
+    ruta = ruta_preview(documento_png.id, documento_png.checksum_md5)
+    for _ in range(50):
+        if os.path.exists(ruta):
+            break
+        time.sleep(0.1)
+    assert os.path.exists(ruta)
+
+
+def test_programar_previews_sincrono_con_testing(app, documento_png):
+    assert programar_previews([documento_png]) == 1
+
+    assert os.path.exists(ruta_preview(documento_png.id, documento_png.checksum_md5))
+
+
+def test_ruta_preview(app, documento_png):
+    client = app.test_client()
+    client.post('/login', data={'email': 'colaborador@test.com', 'password': 'test123'}, follow_redirects=True)
+
+    response = client.get(f'/documentos/preview/{documento_png.id}')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'image/jpeg'
+    assert len(response.data) < documento_png.tamaño_bytes
+    assert 'private' in response.headers['Cache-Control']
+
+
+def test_ruta_preview_pendiente_no_genera_en_la_peticion(app, documento_png, monkeypatch):
+    import app.utils.previsualizaciones as previsualizaciones
+
+    app.config['TAREAS_SINCRONAS'] = False
+    encoladas = []
+    monkeypatch.setattr(previsualizaciones, '_get_executor', lambda: type('Pool', (), {
+        'submit': staticmethod(lambda funcion, *args: encoladas.append((funcion, args)))
+    })())
+    client = app.test_client()
+    client.post('/login', data={'email': 'colaborador@test.com', 'password': 'test123'}, follow_redirects=True)
+
+    response = client.get(f'/documentos/preview/{documento_png.id}')
+
+    assert response.status_code == 202
+    assert response.mimetype == 'image/svg+xml'
+    assert response.headers['Retry-After'] == '2'
+    assert 'no-store' in response.headers['Cache-Control']
+    assert not os.path.exists(ruta_preview(documento_png.id, documento_png.checksum_md5))
+
+    # Una segunda petición no vuelve a encolar la misma miniatura
+    assert client.get(f'/documentos/preview/{documento_png.id}').status_code == 202
+    assert len(encoladas) == 1
+
+    funcion, args = encoladas[0]
+    funcion(*args)
+    assert client.get(f'/documentos/preview/{documento_png.id}').status_code == 200
@@ -0,0 +1,97 @@
+"""
+Tests para el logging estructurado (app/utils/registro_logs.py)
+
+Cobertura:
+1. Línea JSON con mensaje interpolado, campos extra y excepción
+2. La escritura ocurre en el hilo del listener, no en el del llamador
+3. Argumentos sin interpolar cuando el nivel descarta el registro
+4. LOG_LEVEL con niveles por módulo
+"""
+
+import io
+import json
+import logging
+import threading
+
+import pytest
+
+from app.utils.registro_logs import crear_handler, iniciar_cola, niveles_log
+
+
+@pytest.fixture
+def registro():
+    """Logger aislado con cola y un handler JSON que escribe en memoria."""
+    salida = io.StringIO()
+    destino = logging.getLogger('pruebas.registro_logs')
+    destino.propagate = False
+    destino.setLevel(logging.INFO)
+    listener = iniciar_cola(destino, crear_handler('json', salida))
+    yield destino, listener, salida
+    destino.handlers.clear()
+    if listener._thread is not None:
+        listener.stop()
+
+
+def lineas(listener, salida):
+    listener.stop()  # vacía la cola
+    return [json.loads(linea) for linea in salida.getvalue().splitlines()]
+
+
+def test_linea_json(registro):
+    destino, listener, salida = registro
+
+    destino.info('Incapacidad #%s registrada', 42, extra={'usuario_id': 7})
+    try:
+        raise ValueError('sin espacio')
+    except ValueError:
+        destino.exception('Error al guardar')
+
+    primera, segunda = lineas(listener, salida)
+    assert primera['mensaje'] == 'Incapacidad #42 registrada'
+    assert primera['nivel'] == 'INFO'
+    assert primera['logger'] == 'pruebas.registro_logs'
+    assert primera['usuario_id'] == 7
+    assert segunda['nivel'] == 'ERROR'
+    assert 'ValueError: sin espacio' in segunda['excepcion']
+
+
+def test_escritura_fuera_del_hilo(registro):
+    destino, listener, _ = registro
+    hilos = []
+
+    class Espia(logging.Handler):
+        def emit(self, record):
+            hilos.append(threading.current_thread())
+
+    listener.handlers += (Espia(),)
+    destino.warning('Recordatorio no enviado')
+    listener.stop()
+
+    assert hilos and hilos[0] is not threading.current_thread()
+
+
+def test_formato_diferido(registro):
+    destino, listener, salida = registro
+    interpolaciones = []
+
+    class Costoso:
+        def __str__(self):
+            interpolaciones.append(1)
+            return 'costoso'
+
+    destino.debug('Detalle: %s', Costoso())
+    destino.info('Resumen: %s', Costoso())
+
+    assert [linea['mensaje'] for linea in lineas(listener, salida)] == ['Resumen: costoso']
+    assert len(interpolaciones) == 1
+
+
+def test_niveles_por_modulo():
+    assert niveles_log('INFO') == {'': logging.INFO}
+    assert niveles_log('info, app.utils.email_service=WARNING,sqlalchemy.engine=debug') == {
+        '': logging.INFO,
+        'app.utils.email_service': logging.WARNING,
+        'sqlalchemy.engine': logging.DEBUG,
+    }
+    with pytest.raises(ValueError):
+        niveles_log('INFO,app=MUCHO')
@@ -0,0 +1,143 @@
+"""
+Tests para los resúmenes de notificaciones (frecuencia HORARIA / DIARIA)
+
+Cobertura:
+1. Email diferido para usuarios con resumen; inmediato para el resto y tipos urgentes
+2. Un email de resumen por destinatario con sus notificaciones pendientes
+3. notificar_rrhh separa destinatarios inmediatos y en resumen
+4. Preferencia del usuario desde /notificaciones/api/preferencias
+"""
+
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from app import db
+from app.models.usuario import Usuario
+from app.models.incapacidad import Incapacidad
+from app.models.notificacion import Notificacion
+from app.models.enums import TipoNotificacionEnum
+from app.utils.directorio_rrhh import destinatarios_rrhh
+from app.utils.email_service import (
+    enviar_resumenes_notificaciones,
+    notificar_rrhh,
+    notificar_validacion_completada,
+    send_email,
+)
+
+
+def crear_usuario(nombre, email, rol, frecuencia='INMEDIATA'):
+    usuario = Usuario(nombre=nombre, email=email, rol=rol, frecuencia_notificaciones=frecuencia)
+    usuario.set_password('test123')
+    db.session.add(usuario)
+    db.session.commit()
+    return usuario
+
+
+def crear_incapacidad(usuario):
+    consecutivo = Incapacidad.query.count() + 1
+    incapacidad = Incapacidad(
+        usuario_id=usuario.id,
+        tipo='Enfermedad General',
+        fecha_inicio=date.today(),
+        fecha_fin=date.today() + timedelta(days=2),
+        dias=3,
+        codigo_radicacion=f'INC-20250101-{consecutivo:04d}',
+        estado='PENDIENTE_VALIDACION'
+    )
+    db.session.add(incapacidad)
+    db.session.commit()
+    return incapacidad
+
+
+def test_email_diferido_segun_preferencia(app):
+    diario = crear_usuario('Juan Pérez', 'juan@test.com', 'colaborador', 'DIARIA')
+    inmediato = crear_usuario('Eva Díaz', 'eva@test.com', 'colaborador')
+
+    resultado = notificar_validacion_completada(crear_incapacidad(diario))
+    assert resultado['email_ok'] and resultado['en_resumen']
+    notificacion = db.session.get(Notificacion, resultado['notificacion_id'])
+    assert notificacion.estado == 'PENDIENTE' and notificacion.en_resumen
+
+    resultado = notificar_validacion_completada(crear_incapacidad(inmediato))
+    assert not resultado['en_resumen']
+    assert db.session.get(Notificacion, resultado['notificacion_id']).estado == 'ENVIADA'
+
+    # Tipos urgentes no esperan al resumen
+    resultado = send_email(
+        subject='Citación', recipients=['juan@test.com'], html_body='<p>Citación</p>',
+        crear_notificacion=True, tipo_notificacion=TipoNotificacionEnum.REQUERIMIENTO_CITACION,
+        destinatario_id=diario.id
+    )
+    assert not resultado['en_resumen']
+
+    # Con los resúmenes desactivados todo se envía al momento
+    app.config['RESUMEN_NOTIFICACIONES_ENABLED'] = False
+    assert not notificar_validacion_completada(crear_incapacidad(diario))['en_resumen']
+
+
+def test_un_resumen_por_destinatario(app):
+    diario = crear_usuario('Juan Pérez', 'juan@test.com', 'colaborador', 'DIARIA')
+    horario = crear_usuario('Eva Díaz', 'eva@test.com', 'colaborador', 'HORARIA')
+    for _ in range(3):
+        notificar_validacion_completada(crear_incapacidad(diario))
+    notificar_validacion_completada(crear_incapacidad(horario))
+
+    with patch('app.utils.email_service.send_email') as mock_send:
+        mock_send.return_value = {'email_ok': True, 'notificacion_id': None, 'en_resumen': False}
+        assert enviar_resumenes_notificaciones(['DIARIA']) == {'resumenes': 1, 'notificaciones': 3}
+
+        mock_send.assert_called_once()
+        kwargs = mock_send.call_args.kwargs
+        assert kwargs['recipients'] == ['juan@test.com']
+        assert len(kwargs['notificacion_ids']) == 3
+        assert 'INC-20250101-' in kwargs['html_body']
+
+        # Ya enviadas: no se repiten; las horarias esperan su propia tarea
+        assert enviar_resumenes_notificaciones(['DIARIA']) == {'resumenes': 0, 'notificaciones': 0}
+        assert enviar_resumenes_notificaciones(['HORARIA']) == {'resumenes': 1, 'notificaciones': 1}
+
+    assert {n.estado for n in Notificacion.query.all()} == {'ENVIADA'}
+
+
+def test_notificar_rrhh_con_destinatarios_en_resumen(app):
+    incapacidad = crear_incapacidad(crear_usuario('Juan Pérez', 'juan@test.com', 'colaborador'))
+    ana = crear_usuario('Ana García', 'ana@test.com', 'auxiliar', 'DIARIA')
+    crear_usuario('Luis Mora', 'luis@test.com', 'auxiliar')
+    contexto = {'incapacidad': incapacidad, 'colaborador': incapacidad.usuario, 'tipo_notificacion': 'nueva'}
+
+    with patch('app.utils.email_service.send_email') as mock_send:
+        mock_send.return_value = {'email_ok': True, 'notificacion_id': None, 'en_resumen': False}
+        resultado = notificar_rrhh(
+            TipoNotificacionEnum.REGISTRO_INCAPACIDAD, 'Nueva incapacidad',
+            'emails/notificacion_gestion_humana.html', contexto
+        )
+        assert resultado['notificaciones_internas'] == 2
+        assert resultado['en_resumen'] == 1
+        assert mock_send.call_args.kwargs['recipients'] == ['luis@test.com']
+
+        # Todo RRHH en resumen: ningún email (ni al buzón genérico)
+        mock_send.reset_mock()
+        resultado = notificar_rrhh(
+            TipoNotificacionEnum.REGISTRO_INCAPACIDAD, 'Nueva incapacidad',
+            'emails/notificacion_gestion_humana.html', contexto,
+            destinatarios=[d for d in destinatarios_rrhh() if d.id == ana.id]
+        )
+        mock_send.assert_not_called()
+        assert resultado == {'email_ok': True, 'notificaciones_internas': 1, 'destinatarios': [], 'en_resumen': 1}
+
+    assert Notificacion.query.filter_by(destinatario_id=ana.id, en_resumen=True, estado='PENDIENTE').count() == 2
+
+
+def test_preferencia_desde_api(app):
+    usuario = crear_usuario('Ana García', 'ana@test.com', 'auxiliar')
+
+    client = app.test_client()
+    client.post('/login', data={'email': 'ana@test.com', 'password': 'test123'}, follow_redirects=True)
+
+    assert client.get('/notificaciones/api/preferencias').get_json()['frecuencia'] == 'INMEDIATA'
+    assert client.post('/notificaciones/api/preferencias', json={'frecuencia': 'semanal'}).status_code == 400
+
+    response = client.post('/notificaciones/api/preferencias', json={'frecuencia': 'diaria'})
+    assert response.get_json()['frecuencia'] == 'DIARIA'
+    db.session.expire_all()
+    assert db.session.get(Usuario, usuario.id).frecuencia_notificaciones == 'DIARIA'
@@ -0,0 +1,160 @@
+"""
+Tests para el staging de cargas en dos fases
+
+Cobertura:
+1. El archivo llega a UPLOAD_FOLDER solo después del commit
+2. Rollback o cierre de sesión sin commit descartan el archivo del staging
+   (en un SAVEPOINT revertido, solo las cargas hechas dentro de él)
+3. Barrido de archivos abandonados y rescate de promociones fallidas
+"""
+
+import io
+import os
+import time
+from datetime import date
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from app import db
+from app.models.usuario import Usuario
+from app.models.incapacidad import Incapacidad
+from app.models.documento import Documento
+from app.utils.staging import barrer_staging, procesar_carga
+
+
+@pytest.fixture
+def app(crear_app):
+    """Crear aplicación de prueba con carpetas de uploads y staging temporales."""
+    app = crear_app(
+        UPLOAD_STAGING_TTL=60,
+    )
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def incapacidad(app):
+    colaborador = Usuario(nombre='Colaborador Test', email='colaborador@test.com', rol='colaborador')
+    colaborador.set_password('test123')
+    db.session.add(colaborador)
+    db.session.commit()
+
+    incapacidad = Incapacidad(
+        usuario_id=colaborador.id,
+        codigo_radicacion='INC-20250101-0001',
+        tipo='Enfermedad General',
+        fecha_inicio=date(2025, 1, 1),
+        fecha_fin=date(2025, 1, 5),
+        dias=5,
+        estado='PENDIENTE_VALIDACION'
+    )
+    db.session.add(incapacidad)
+    db.session.commit()
+    return incapacidad
+
+
+def cargar(incapacidad):
+    archivo = FileStorage(stream=io.BytesIO(b'%PDF-1.4 certificado'), filename='certificado.pdf')
+    resultado = procesar_carga(archivo, 'certificado', incapacidad.id)
+    assert resultado['exito'], resultado['errores']
+    metadatos = resultado['metadatos']
+    db.session.add(Documento(
+        incapacidad_id=incapacidad.id,
+        nombre_archivo=metadatos['nombre_archivo'],
+        nombre_unico=metadatos['nombre_unico'],
+        ruta=metadatos['ruta'],
+        tipo_documento='certificado',
+        tamaño_bytes=metadatos['tamaño_bytes'],
+        checksum_md5=metadatos['checksum_md5'],
+        mime_type=metadatos['mime_type']
+    ))
+    return metadatos
+
+
+def archivos(carpeta):
+    return sorted(os.listdir(carpeta)) if os.path.isdir(carpeta) else []
+
+
+def test_archivo_se_promueve_al_confirmar(app, incapacidad):
+    metadatos = cargar(incapacidad)
+
+    assert os.path.exists(metadatos['ruta_staging'])
+    assert not os.path.exists(metadatos['ruta'])
+
+    db.session.commit()
+
+    assert not os.path.exists(metadatos['ruta_staging'])
+    with open(metadatos['ruta'], 'rb') as f:
+        assert f.read() == b'%PDF-1.4 certificado'
+    assert os.path.dirname(metadatos['ruta']) == app.config['UPLOAD_FOLDER']
+
+
+def test_rollback_descarta_archivo(app, incapacidad):
+    metadatos = cargar(incapacidad)
+    db.session.rollback()
+
+    assert archivos(app.config['UPLOAD_STAGING_FOLDER']) == []
+    assert not os.path.exists(metadatos['ruta'])
+    assert Documento.query.count() == 0
+
+
+def test_cierre_sin_commit_descarta_archivo(app, incapacidad):
+    cargar(incapacidad)
+    db.session.remove()
+
+    assert archivos(app.config['UPLOAD_STAGING_FOLDER']) == []
+    assert archivos(app.config['UPLOAD_FOLDER']) == []
+
+
+def test_savepoint_revertido_descarta_solo_sus_archivos(app, incapacidad):
+    externo = cargar(incapacidad)
+    with pytest.raises(ValueError):
+        with db.session.begin_nested():
+            interno = cargar(incapacidad)
+            raise ValueError('Error dentro del savepoint')
+    db.session.commit()
+
+    assert os.path.exists(externo['ruta'])
+    assert not os.path.exists(interno['ruta'])
+    assert archivos(app.config['UPLOAD_STAGING_FOLDER']) == []
+    assert Documento.query.count() == 1
+
+
+def test_savepoint_confirmado_espera_al_commit_externo(app, incapacidad):
+    with db.session.begin_nested():
+        metadatos = cargar(incapacidad)
+
+    assert not os.path.exists(metadatos['ruta'])
+    db.session.commit()
+    assert os.path.exists(metadatos['ruta'])
+
+
+def test_barrido_elimina_abandonados(app):
+    staging = app.config['UPLOAD_STAGING_FOLDER']
+    os.makedirs(staging)
+    for nombre, edad in [('viejo.pdf', 3600), ('reciente.pdf', 0)]:
+        ruta = os.path.join(staging, nombre)
+        with open(ruta, 'wb') as f:
+            f.write(b'x' * 10)
+        os.utime(ruta, (time.time() - edad, time.time() - edad))
+
+    resultado = barrer_staging()
+
+    assert resultado == {'eliminados': 1, 'rescatados': 0, 'bytes_liberados': 10}
+    assert archivos(staging) == ['reciente.pdf']
+
+
+def test_barrido_rescata_documento_confirmado(app, incapacidad):
+    metadatos = cargar(incapacidad)
+    # Simula una promoción fallida: la fila existe pero el archivo quedó en staging
+    db.session.info.pop('staging_pendientes')
+    db.session.commit()
+    antiguo = time.time() - 3600
+    os.utime(metadatos['ruta_staging'], (antiguo, antiguo))
+
+    resultado = barrer_staging()
+
+    assert resultado['rescatados'] == 1
+    assert os.path.exists(metadatos['ruta'])
+    assert not os.path.exists(metadatos['ruta_staging'])
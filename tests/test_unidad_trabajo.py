@@ -0,0 +1,154 @@
+"""
+Tests para la unidad de trabajo (un commit por operación)
+
+Cobertura:
+1. El registro de una incapacidad confirma todo con un solo commit
+2. Un error en el registro revierte incapacidad, documentos y notificaciones
+3. Un error en las notificaciones revierte solo las notificaciones (SAVEPOINT)
+4. despues_de_commit: se ejecuta tras el commit y se descarta con rollback
+"""
+
+import io
+import os
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models.usuario import Usuario
+from app.models.incapacidad import Incapacidad
+from app.models.documento import Documento
+from app.models.notificacion import Notificacion
+from app.utils.email_service import send_email
+from app.utils.unidad_trabajo import confirmar, despues_de_commit, unidad_de_trabajo
+
+
+@pytest.fixture
+def app(crear_app):
+    """Crear aplicación de prueba con dos usuarios (inspección y miniaturas desactivadas)."""
+    app = crear_app()
+    with app.app_context():
+        for nombre, email, rol in (('Juan Pérez', 'juan@test.com', 'colaborador'),
+                                   ('Ana García', 'ana@test.com', 'auxiliar')):
+            usuario = Usuario(nombre=nombre, email=email, rol=rol)
+            usuario.set_password('test123')
+            db.session.add(usuario)
+        db.session.commit()
+        yield app
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    client.post('/login', data={'email': 'juan@test.com', 'password': 'test123'})
+    return client
+
+
+@pytest.fixture
+def commits(app):
+    """Cuenta los COMMIT que llegan a la base de datos."""
+    conteo = []
+
+    def contar(conexion):
+        conteo.append(1)
+
+    event.listen(db.engine, 'commit', contar)
+    yield conteo
+    event.remove(db.engine, 'commit', contar)
+
+
+def registrar(client):
+    return client.post(
+        '/incapacidades/registrar',
+        data={
+            'tipo': 'Enfermedad General',
+            'fecha_inicio': '2025-03-03',
+            'fecha_fin': '2025-03-05',
+            'certificado': (io.BytesIO(b'%PDF-1.4 certificado'), 'certificado.pdf'),
+        },
+        headers={'X-Requested-With': 'XMLHttpRequest'},
+        content_type='multipart/form-data',
+    )
+
+
+def test_registro_con_un_solo_commit(app, client, commits):
+    response = registrar(client)
+
+    assert response.status_code == 200, response.get_json()
+    assert len(commits) == 1
+    assert Incapacidad.query.count() == 1
+    documento = Documento.query.one()
+    assert os.path.exists(documento.ruta)
+    # Confirmación al colaborador + notificación a Gestión Humana
+    assert Notificacion.query.count() == 2
+
+
+def test_error_en_registro_revierte_todo(app, client, commits):
+    with patch('app.routes.incapacidades.procesar_archivos', side_effect=RuntimeError('disco lleno')):
+        assert registrar(client).status_code == 500
+
+    assert commits == []
+    assert Incapacidad.query.count() == 0
+    assert Notificacion.query.count() == 0
+    staging = app.config['UPLOAD_STAGING_FOLDER']
+    assert not os.path.exists(staging) or os.listdir(staging) == []
+
+
+def test_error_en_notificaciones_no_revierte_registro(app, client, commits):
+    with patch('app.utils.email_service.notificar_rrhh', side_effect=RuntimeError('plantilla rota')):
+        response = registrar(client)
+
+    assert response.status_code == 200
+    assert len(commits) == 1
+    assert Incapacidad.query.count() == 1
+    assert Documento.query.count() == 1
+    # La notificación al colaborador se creó en el SAVEPOINT que se revirtió
+    assert Notificacion.query.count() == 0
+
+
+def test_despues_de_commit(app):
+    ejecutados = []
+    usuario = Usuario.query.filter_by(rol='colaborador').one()
+
+    with unidad_de_trabajo():
+        usuario.nombre = 'Juan P.'
+        confirmar()
+        despues_de_commit(ejecutados.append, 'commit')
+        assert ejecutados == []
+    assert ejecutados == ['commit']
+
+    with pytest.raises(ValueError):
+        with unidad_de_trabajo():
+            despues_de_commit(ejecutados.append, 'revertido')
+            raise ValueError
+    assert ejecutados == ['commit']
+
+    # Anidada que falla: se descartan solo sus callbacks
+    with unidad_de_trabajo():
+        with pytest.raises(ValueError):
+            with unidad_de_trabajo():
+                despues_de_commit(ejecutados.append, 'anidada')
+                raise ValueError
+        despues_de_commit(ejecutados.append, 'externa')
+    assert ejecutados == ['commit', 'externa']
+
+    # Sin unidad de trabajo se ejecuta de inmediato
+    despues_de_commit(ejecutados.append, 'inmediato')
+    assert ejecutados[-1] == 'inmediato'
+
+
+def test_email_sale_despues_del_commit(app):
+    app.config['MAIL_ENABLED'] = True
+    usuario = Usuario.query.filter_by(rol='colaborador').one()
+
+    with patch('app.utils.email_service.Thread') as hilo:
+        with unidad_de_trabajo():
+            resultado = send_email(
+                subject='Registro', recipients=['juan@test.com'], html_body='<p>ok</p>',
+                crear_notificacion=True, tipo_notificacion='REGISTRO_INCAPACIDAD', destinatario_id=usuario.id
+            )
+            hilo.return_value.start.assert_not_called()
+        hilo.return_value.start.assert_called_once()
+
+    assert db.session.get(Notificacion, resultado['notificacion_id']) is not None